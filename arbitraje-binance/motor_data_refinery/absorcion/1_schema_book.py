@@ -9,13 +9,6 @@ EXCHANGE_ID = 'binance'   # Cambiá por 'bybit', 'kraken', etc.
 SYMBOL = 'BTC/USDT'
 LIMIT = 20
 
-# === Inicializar exchange ===
-exchange_class = getattr(ccxt, EXCHANGE_ID)
-exchange = exchange_class({'enableRateLimit': True})
-
-# === Obtener orderbook real ===
-orderbook = exchange.fetch_order_book(SYMBOL, limit=LIMIT)
-
 # === Inferir estructura ===
 def infer_schema(obj):
     """Recorre la estructura y devuelve tipos sin valores."""
@@ -28,21 +21,34 @@ def infer_schema(obj):
     else:
         return type(obj).__name__
 
-schema_structure = {
-    "exchange": EXCHANGE_ID,
-    "symbol": SYMBOL,
-    "limit": LIMIT,
-    "schema_inferido": infer_schema(orderbook)
-}
 
-# === Guardar plantilla ===
-BASE_DIR = Path(__file__).resolve().parent  # app/absorcion
-DATOS_DIR = BASE_DIR / "datos"
-DATOS_DIR.mkdir(parents=True, exist_ok=True)
+def main():
+    # === Inicializar exchange ===
+    exchange_class = getattr(ccxt, EXCHANGE_ID)
+    exchange = exchange_class({'enableRateLimit': True})
+
+    # === Obtener orderbook real ===
+    orderbook = exchange.fetch_order_book(SYMBOL, limit=LIMIT)
+
+    schema_structure = {
+        "exchange": EXCHANGE_ID,
+        "symbol": SYMBOL,
+        "limit": LIMIT,
+        "schema_inferido": infer_schema(orderbook)
+    }
+
+    # === Guardar plantilla ===
+    BASE_DIR = Path(__file__).resolve().parent  # app/absorcion
+    DATOS_DIR = BASE_DIR / "datos"
+    DATOS_DIR.mkdir(parents=True, exist_ok=True)
+
+    schema_file = DATOS_DIR / f"plantilla_schema_orderbook_{EXCHANGE_ID}_{SYMBOL.replace('/', '-')}.json"
+
+    with open(schema_file, "w", encoding="utf-8") as f:
+        json.dump(schema_structure, f, indent=4, ensure_ascii=False)
 
-schema_file = DATOS_DIR / f"plantilla_schema_orderbook_{EXCHANGE_ID}_{SYMBOL.replace('/', '-')}.json"
+    print(f"✅ Plantilla real del schema guardada en: {schema_file}")
 
-with open(schema_file, "w", encoding="utf-8") as f:
-    json.dump(schema_structure, f, indent=4, ensure_ascii=False)
 
-print(f"✅ Plantilla real del schema guardada en: {schema_file}")
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,78 @@
-import csv
-import os
-from collections import defaultdict
+"""
+🔺 Generador de triadas USDT → A → B → USDT por forma (b1 b2 b3).
+
+Lee los pares operables de `datos/cotizador_universal_unificado.csv` (lo que
+exporta `codigo/7_exportar_a_absorcion.py`), arma la adyacencia CSR
+(`absorcion.triadas.GrafoMercados`) y enumera todas las formas en una sola
+pasada. Se siguen escribiendo los 8 CSV `triadas_por_forma/forma_<n>_<bits>.csv`.
+
+Además enumera los ciclos de 3..LONGITUD_MAX_CICLO piernas para cada ancla de
+`ANCLAS` (`absorcion.ciclos`, con caché por hash de mercados) y los exporta a
+`ciclos_por_ancla/ciclos_<ANCLA>.csv`. Un mismo ciclo alcanzable desde varias
+anclas (rotaciones) se exporta una sola vez, bajo la primera ancla.
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.ciclos import Ciclos, ciclos_con_cache, pares_liquidos  # type: ignore
+from absorcion.triadas import GrafoMercados, Triadas, enumerar_triadas  # type: ignore
+from codigo.config import ANCLAS, INTERESADO_EN, LONGITUD_MAX_CICLO, VOLUMEN_MIN_CICLO  # type: ignore
 
 # Configuración
-archivo_pares = os.path.join(os.path.dirname(__file__), 'absorcion_filtrada.csv')
-directorio_salida = os.path.join(os.path.dirname(__file__), 'triadas_por_forma')
-os.makedirs(directorio_salida, exist_ok=True)
-
-# Cargar pares operables
-with open(archivo_pares, 'r') as f:
-    reader = csv.DictReader(f)
-    datos = list(reader)
-
-# Indexar por base y quote
-por_base = defaultdict(list)
-por_quote = defaultdict(list)
-
-for fila in datos:
-    por_base[fila['base']].append(fila)
-    por_quote[fila['quote']].append(fila)
-
-# Helper robusto para evitar KeyError
-def buscar_pares(origen, modo_compra):
-    """Retorna lista de filas donde se pueda ir desde `origen`"""
-    return por_quote.get(origen, []) if modo_compra else por_base.get(origen, [])
-
-# Probar las 8 combinaciones (000 a 111)
-for forma in range(8):
-    b1 = bool((forma >> 2) & 1)  # dirección primer salto
-    b2 = bool((forma >> 1) & 1)  # dirección segundo salto
-    b3 = bool((forma >> 0) & 1)  # dirección tercer salto
-
-    nombre_forma = f"forma_{forma+1}_{int(b1)}{int(b2)}{int(b3)}"
-    salida = os.path.join(directorio_salida, f"{nombre_forma}.csv")
-
-    triadas = []
-
-    for fila1 in buscar_pares('USDT', b1):
-        moneda_1 = fila1['base'] if b1 else fila1['quote']
-
-        for fila2 in buscar_pares(moneda_1, b2):
-            moneda_2 = fila2['base'] if b2 else fila2['quote']
-
-            for fila3 in buscar_pares(moneda_2, b3):
-                moneda_3 = fila3['base'] if b3 else fila3['quote']
-
-                if moneda_3 == 'USDT':
-                    triadas.append([
-                        fila1['symbol'],
-                        fila2['symbol'],
-                        fila3['symbol'],
-                        f"{nombre_forma}"
-                    ])
-
-    # Guardar CSV aunque esté vacío
-    with open(salida, 'w', newline='') as f_out:
-        writer = csv.writer(f_out)
-        writer.writerow(['par_1', 'par_2', 'par_3', 'forma'])
-        writer.writerows(triadas)
-
-    print(f"✅ {nombre_forma}: {len(triadas)} triadas generadas → {salida}")
+ARCHIVO_PARES = Path(__file__).resolve().parent / "datos" / "cotizador_universal_unificado.csv"
+DIRECTORIO_SALIDA = Path(__file__).resolve().parent / "triadas_por_forma"
+DIRECTORIO_CICLOS = Path(__file__).resolve().parent / "ciclos_por_ancla"
+ANCLA = INTERESADO_EN
+
+
+def generar(df_pares: pd.DataFrame, ancla: str = ANCLA) -> Triadas:
+    """Triadas en memoria desde un frame `symbol | base | quote`."""
+    return enumerar_triadas(GrafoMercados.desde_pares(df_pares), ancla)
+
+
+def generar_ciclos(df_pares: pd.DataFrame) -> Ciclos:
+    """Ciclos multi-ancla; si hay mínimo de volumen se filtra con los tickers del snapshot."""
+    if VOLUMEN_MIN_CICLO > 0:
+        from codigo.equivalencias import TablaPrecios  # type: ignore
+        from codigo.snapshot import obtener_snapshot  # type: ignore
+
+        tabla = TablaPrecios.desde_tickers(obtener_snapshot().tickers)
+        df_pares = pares_liquidos(
+            df_pares, tabla.precios(df_pares["symbol"], "volumen_quote"), VOLUMEN_MIN_CICLO
+        )
+    return ciclos_con_cache(df_pares, ANCLAS, LONGITUD_MAX_CICLO)
+
+
+def main() -> None:
+    if not ARCHIVO_PARES.exists():
+        print(f"❌ No se encontró {ARCHIVO_PARES}: corré codigo/7_exportar_a_absorcion.py primero.")
+        sys.exit(1)
+    df_pares = pd.read_csv(ARCHIVO_PARES, dtype=str, usecols=["symbol", "base", "quote"])
+    triadas = generar(df_pares)
+    conteos = triadas.exportar_por_forma(DIRECTORIO_SALIDA)
+    for nombre, n in conteos.items():
+        print(f"✅ {nombre}: {n} triadas generadas → {DIRECTORIO_SALIDA / (nombre + '.csv')}")
+    print(f"🔺 Total: {len(triadas)} triadas ({len(triadas.simbolos)} pares de entrada)")
+
+    ciclos = generar_ciclos(df_pares)
+    total = len(ciclos)
+    ciclos = ciclos.unicos()
+    if len(ciclos) < total:
+        print(f"🔁 {total - len(ciclos)} ciclos repetidos entre anclas (rotaciones) descartados")
+    DIRECTORIO_CICLOS.mkdir(parents=True, exist_ok=True)
+    df_ciclos = ciclos.a_dataframe()
+    for ancla in ANCLAS:
+        salida = DIRECTORIO_CICLOS / f"ciclos_{ancla}.csv"
+        df_ciclos[df_ciclos["ancla"] == ancla].to_csv(salida, index=False)
+    for fila in ciclos.conteos().itertuples(index=False):
+        print(f"🔁 {fila.ancla} · {fila.longitud} piernas: {fila.ciclos} ciclos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+💧 Capacidad de absorción por símbolo de las triadas / ciclos.
+
+Entrada:
+    - Símbolos de `triadas_por_forma/*.csv` y `ciclos_por_ancla/*.csv`.
+    - `datos/cotizador_universal_unificado.csv` (convierte la escalera USDT a quote).
+    - Libros: Binance vía ccxt (descarga concurrente con prioridad según
+      `datos/triadas_evaluadas.csv`; `--secuencial` para un libro por vez),
+      un JSONL grabado con `--grabacion`, o una grabación del diff stream de
+      profundidad (`--diffs`, réplica local de `replica_libros.py`).
+Salida:
+    - `datos/capacidad_absorcion.csv`: VWAP / slippage por tamaño y `absorption_cap`
+      por símbolo y lado (compra = asks, venta = bids).
+
+Uso:
+    python absorcion/6_capacidad_absorcion.py [--grabacion libros.jsonl | --diffs depth.jsonl] [--grabar libros.jsonl]
+                                              [--continuo --intervalo 5] [--secuencial | --concurrencia 32]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.capacidad import tabla_capacidad  # type: ignore
+from absorcion.descarga_libros import FuenteCCXTAsync, prioridad_desde_evaluadas  # type: ignore
+from absorcion.libros import AlmacenLibros, FuenteCCXT, FuenteGrabada, grabar  # type: ignore
+from absorcion.replica_libros import FuenteReplica  # type: ignore
+from codigo.config import LIBRO_PROFUNDIDAD, LIBROS_CONCURRENCIA, TOLERANCIA_SLIPPAGE  # type: ignore
+from codigo.equivalencias import mapa_equivalencias  # type: ignore
+
+ABSORCION_DIR = Path(__file__).resolve().parent
+TRIADAS_DIR = ABSORCION_DIR / "triadas_por_forma"
+CICLOS_DIR = ABSORCION_DIR / "ciclos_por_ancla"
+COTIZADOR = ABSORCION_DIR / "datos" / "cotizador_universal_unificado.csv"
+SALIDA = ABSORCION_DIR / "datos" / "capacidad_absorcion.csv"
+EVALUADAS = ABSORCION_DIR / "datos" / "triadas_evaluadas.csv"
+
+
+def simbolos_de_rutas() -> list:
+    """Símbolos únicos de todas las piernas de triadas y ciclos exportados."""
+    simbolos = []
+    for ruta in sorted(TRIADAS_DIR.glob("forma_*.csv")) + sorted(CICLOS_DIR.glob("ciclos_*.csv")):
+        df = pd.read_csv(ruta, dtype=str)
+        for col in df.columns:
+            if col.startswith("par_"):
+                simbolos.extend(df[col].dropna().tolist())
+    return list(dict.fromkeys(s for s in simbolos if s))
+
+
+def usdt_equivale_quote(simbolos) -> np.ndarray:
+    """Unidades de la quote de cada símbolo por 1 USDT (NaN si no está cotizada)."""
+    eq_map = mapa_equivalencias(pd.read_csv(COTIZADOR, dtype=str)) if COTIZADOR.exists() else pd.Series(dtype=float)
+    eq_map = pd.concat([eq_map, pd.Series({"USDT": 1.0})])
+    quotes = pd.Index([s.split("/")[1] if "/" in s else "" for s in simbolos], dtype=object)
+    pos = eq_map.index.get_indexer(quotes)
+    out = np.full(len(quotes), np.nan)
+    out[pos >= 0] = eq_map.to_numpy(dtype=np.float64)[pos[pos >= 0]]
+    return out
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Capacidad de absorción por símbolo")
+    parser.add_argument("--grabacion", type=Path, help="JSONL de libros grabados (reemplaza a Binance)")
+    parser.add_argument("--diffs", type=Path, help="JSONL del diff stream + snapshots (réplica local)")
+    parser.add_argument("--grabar", type=Path, help="Agregar los libros obtenidos a este JSONL")
+    parser.add_argument("--profundidad", type=int, default=LIBRO_PROFUNDIDAD)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_SLIPPAGE)
+    parser.add_argument("--continuo", action="store_true", help="Refrescar en bucle")
+    parser.add_argument("--intervalo", type=float, default=5.0, help="Segundos entre rondas (--continuo)")
+    parser.add_argument("--secuencial", action="store_true", help="Un libro por vez (FuenteCCXT)")
+    parser.add_argument("--concurrencia", type=int, default=LIBROS_CONCURRENCIA, help="Libros en vuelo")
+    args = parser.parse_args(argv)
+
+    simbolos = simbolos_de_rutas()
+    if not simbolos:
+        print("⚠️ No hay triadas/ciclos exportados: corré 5_triadas.py primero.")
+        sys.exit(0)
+
+    almacen = AlmacenLibros(simbolos, args.profundidad)
+    eq_quote = usdt_equivale_quote(almacen.simbolos)
+    if args.grabacion:
+        fuente = FuenteGrabada(args.grabacion)
+    elif args.diffs:
+        fuente = FuenteReplica(args.diffs, args.profundidad)
+    elif args.secuencial:
+        fuente = FuenteCCXT(limite=args.profundidad)
+    else:
+        prioridad = prioridad_desde_evaluadas(almacen.simbolos, EVALUADAS)
+        fuente = FuenteCCXTAsync(limite=args.profundidad, concurrencia=args.concurrencia,
+                                 prioridad=dict(zip(almacen.simbolos, prioridad.tolist())))
+    print(f"📚 {len(almacen)} símbolos · fuente {type(fuente).__name__}")
+
+    while True:
+        t0 = time.perf_counter()
+        libros = fuente.libros(list(almacen.simbolos))
+        if args.grabar:
+            libros = grabar(libros, args.grabar)
+        aplicados = sum(almacen.actualizar(libro) for libro in libros)
+        t1 = time.perf_counter()
+        df = tabla_capacidad(almacen, eq_quote, tolerancia=args.tolerancia)
+        t2 = time.perf_counter()
+
+        SALIDA.parent.mkdir(parents=True, exist_ok=True)
+        df.to_csv(SALIDA, index=False)
+        con_libro = int(almacen.con_libro().sum())
+        print(f"✅ {aplicados} libros ingeridos ({con_libro}/{len(almacen)} con libro) "
+              f"en {(t1 - t0) * 1000:.0f} ms · capacidad en {(t2 - t1) * 1000:.1f} ms → {SALIDA}")
+        ronda = getattr(fuente, "ultimo", None)
+        if ronda is not None:
+            print(f"⚖️ Peso {ronda.peso} · {ronda.reintentos} reintentos · {ronda.limitados} respuestas 429/418")
+        if not args.continuo:
+            break
+        time.sleep(max(0.0, args.intervalo - (time.perf_counter() - t0)))
+
+
+if __name__ == "__main__":
+    main()
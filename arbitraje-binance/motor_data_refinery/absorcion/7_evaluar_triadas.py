@@ -0,0 +1,111 @@
+"""
+📈 Evaluación de spread neto de todas las triadas contra el snapshot de tickers.
+
+Entrada:
+    - `triadas_por_forma/*.csv` (salida de 5_triadas.py).
+    - bid/ask del snapshot compartido (`codigo.snapshot`).
+    - `fee_taker` de codigo/datos/estandar/simbolos_spot_<exchange>.csv.
+Salida:
+    - `datos/triadas_evaluadas.csv`: top-K por `net_spread_expected`. Con
+      `--notional` agrega el dimensionado cuantizado (tick/step/mínimos de la
+      tabla spot): `ejecutable`, `net_cuantizado` y `polvo_usdt` (NaN si no es ejecutable).
+    - `triadas_hist` en MariaDB (si responde): el mismo top-K con el ts del snapshot.
+
+Uso:
+    python absorcion/7_evaluar_triadas.py [--top 50] [--notional 1000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.cuantizacion import TablaCuantizacion, dimensionar  # type: ignore
+from absorcion.evaluador import Evaluador, ranking  # type: ignore
+from absorcion.triadas import triadas_desde_csv  # type: ignore
+from codigo.config import DATOS_DIR, EXCHANGE_ID, PERSISTENCIA_HISTORIAL, PERSISTENCIA_CIERRE_S  # type: ignore
+from codigo.equivalencias import TablaPrecios  # type: ignore
+from codigo.snapshot import obtener_snapshot  # type: ignore
+from codigo.persistencia import escritor_por_defecto, filas_triadas  # type: ignore
+
+ABSORCION_DIR = Path(__file__).resolve().parent
+TRIADAS_DIR = ABSORCION_DIR / "triadas_por_forma"
+SPOT_PATH = DATOS_DIR / "estandar" / f"simbolos_spot_{EXCHANGE_ID}.csv"
+SALIDA = ABSORCION_DIR / "datos" / "triadas_evaluadas.csv"
+FEE_TAKER_DEFECTO = 0.001  # si el símbolo no figura en la tabla spot
+
+
+def fees_taker(simbolos: np.ndarray) -> np.ndarray:
+    """fee_taker por símbolo (alineado a `simbolos`), con FEE_TAKER_DEFECTO si falta."""
+    fee = np.full(len(simbolos), FEE_TAKER_DEFECTO)
+    if SPOT_PATH.exists():
+        spot = pd.read_csv(SPOT_PATH, usecols=["symbol", "fee_taker"], dtype={"symbol": str})
+        serie = pd.Series(pd.to_numeric(spot["fee_taker"], errors="coerce").to_numpy(), index=spot["symbol"])
+        serie = serie[~serie.index.duplicated(keep="last")]
+        pos = serie.index.get_indexer(pd.Index(simbolos, dtype=object))
+        valores = serie.to_numpy(dtype=np.float64)[np.maximum(pos, 0)]
+        ok = (pos >= 0) & np.isfinite(valores)
+        fee[ok] = valores[ok]
+    else:
+        print(f"⚠️ No se encontró {SPOT_PATH}: se usa fee_taker={FEE_TAKER_DEFECTO}")
+    return fee
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Spread neto de triadas contra el snapshot")
+    parser.add_argument("--top", type=int, default=50)
+    parser.add_argument("--notional", type=float, default=0.0, help="USDT por triada para el dimensionado (0 = no)")
+    args = parser.parse_args(argv)
+
+    triadas = triadas_desde_csv(TRIADAS_DIR)
+    if not len(triadas):
+        print("⚠️ No hay triadas: corré 5_triadas.py primero.")
+        sys.exit(0)
+
+    snap = obtener_snapshot()
+    tabla = TablaPrecios.desde_tickers(snap.tickers)
+    bid = tabla.precios(triadas.simbolos, "bid")
+    ask = tabla.precios(triadas.simbolos, "ask")
+    fee = fees_taker(triadas.simbolos)
+
+    evaluador = Evaluador.desde_triadas(triadas)
+    t0 = time.perf_counter()
+    evaluacion = evaluador.evaluar(bid, ask, fee)
+    dt = time.perf_counter() - t0
+
+    df = ranking(triadas.simbolos, triadas.piernas, triadas.bits(), evaluacion, args.top)
+    if args.notional > 0 and SPOT_PATH.exists():
+        dim = dimensionar(TablaCuantizacion.desde_csv(SPOT_PATH, triadas.simbolos),
+                          triadas.piernas, triadas.bits(), bid, ask, args.notional, fee)
+        top = evaluacion.top_k(args.top)
+        df["ejecutable"] = dim.ejecutable[top]
+        df["net_cuantizado"] = dim.neto[top]
+        # Sin ejecución no hay residuo: NaN, no el polvo de una orden que no pasa los mínimos
+        df["polvo_usdt"] = np.where(dim.ejecutable[top], np.nansum(dim.residuo_ancla[top], axis=1), np.nan)
+    SALIDA.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(SALIDA, index=False)
+
+    escritor = escritor_por_defecto() if PERSISTENCIA_HISTORIAL else None
+    if escritor is not None:
+        escritor.encolar("triadas_hist", filas_triadas(df, snap.ts))
+
+    evaluables = int(np.isfinite(evaluacion.net_spread_expected).sum())
+    positivas = int((evaluacion.net_spread_expected > 0).sum())
+    print(f"✅ {len(triadas)} triadas evaluadas en {dt * 1000:.2f} ms "
+          f"({evaluables} con bid/ask, {positivas} con spread neto > 0)")
+    print(f"🏆 Top {len(df)} → {SALIDA}")
+    if not df.empty:
+        print(df.head(5).to_string(index=False))
+    if escritor is not None:
+        escritor.cerrar(PERSISTENCIA_CIERRE_S)
+        print(f"🗄️ {escritor.escritas} triadas → triadas_hist")
+
+
+if __name__ == "__main__":
+    main()
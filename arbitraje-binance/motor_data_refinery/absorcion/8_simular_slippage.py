@@ -0,0 +1,91 @@
+"""
+🎲 Slippage multi-escenario y `absorption_cap` por triada.
+
+Entrada:
+    - `triadas_por_forma/*.csv` (salida de 5_triadas.py).
+    - Libros de las piernas: Binance vía ccxt (descarga concurrente con prioridad
+      según `datos/triadas_evaluadas.csv`), un JSONL grabado con `--grabacion`, o
+      una grabación del diff stream de profundidad con `--diffs`.
+Salida:
+    - `datos/triadas_slippage.csv`: por triada, slippage esperado por tamaño de la
+      grilla (`SIMULACION_GRILLA_USDT`), `slippage_expected` en el tamaño de
+      referencia, su percentil de cola, fracción de escenarios que llenan y
+      `absorption_cap` (USDT).
+
+Uso:
+    python absorcion/8_simular_slippage.py [--grabacion libros.jsonl | --diffs depth.jsonl]
+                                           [--escenarios 1000] [--procesos 0] [--semilla 7]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.descarga_libros import FuenteCCXTAsync, prioridad_desde_evaluadas  # type: ignore
+from absorcion.libros import AlmacenLibros, FuenteGrabada  # type: ignore
+from absorcion.replica_libros import FuenteReplica  # type: ignore
+from absorcion.slippage import Escenarios, simular_triadas, tabla_slippage  # type: ignore
+from absorcion.triadas import triadas_desde_csv  # type: ignore
+from codigo.config import (  # type: ignore
+    LIBRO_PROFUNDIDAD, SIMULACION_ESCENARIOS, SIMULACION_LLENADO_MIN, SIMULACION_PROCESOS, TOLERANCIA_SLIPPAGE,
+)
+
+ABSORCION_DIR = Path(__file__).resolve().parent
+TRIADAS_DIR = ABSORCION_DIR / "triadas_por_forma"
+EVALUADAS = ABSORCION_DIR / "datos" / "triadas_evaluadas.csv"
+SALIDA = ABSORCION_DIR / "datos" / "triadas_slippage.csv"
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Slippage multi-escenario por triada")
+    parser.add_argument("--grabacion", type=Path, help="JSONL de libros grabados (reemplaza a Binance)")
+    parser.add_argument("--diffs", type=Path, help="JSONL del diff stream + snapshots (réplica local)")
+    parser.add_argument("--profundidad", type=int, default=LIBRO_PROFUNDIDAD)
+    parser.add_argument("--escenarios", type=int, default=SIMULACION_ESCENARIOS)
+    parser.add_argument("--semilla", type=int, default=7)
+    parser.add_argument("--procesos", type=int, default=SIMULACION_PROCESOS, help="Pool (0 = núcleos, 1 = en línea)")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_SLIPPAGE)
+    args = parser.parse_args(argv)
+
+    triadas = triadas_desde_csv(TRIADAS_DIR)
+    if not len(triadas):
+        print("⚠️ No hay triadas: corré 5_triadas.py primero.")
+        sys.exit(0)
+
+    almacen = AlmacenLibros(triadas.simbolos, args.profundidad)
+    if args.grabacion:
+        fuente = FuenteGrabada(args.grabacion)
+    elif args.diffs:
+        fuente = FuenteReplica(args.diffs, args.profundidad)
+    else:
+        prioridad = prioridad_desde_evaluadas(almacen.simbolos, EVALUADAS)
+        fuente = FuenteCCXTAsync(limite=args.profundidad, prioridad=dict(zip(almacen.simbolos, prioridad.tolist())))
+    t0 = time.perf_counter()
+    aplicados = almacen.ingerir(fuente)
+    t1 = time.perf_counter()
+
+    escenarios = Escenarios.generar(args.escenarios, semilla=args.semilla)
+    sim = simular_triadas(triadas, almacen, escenarios, procesos=args.procesos)
+    t2 = time.perf_counter()
+    df = tabla_slippage(triadas, sim, args.tolerancia, SIMULACION_LLENADO_MIN)
+    SALIDA.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(SALIDA, index=False)
+
+    simuladas = int(np.isfinite(sim.slippage_expected).sum())
+    print(f"📚 {aplicados} libros ({int(almacen.con_libro().sum())}/{len(almacen)} con libro) "
+          f"en {(t1 - t0) * 1000:.0f} ms · fuente {type(fuente).__name__}")
+    print(f"✅ {len(triadas)} triadas × {len(escenarios)} escenarios × {len(sim.grilla)} tamaños "
+          f"en {(t2 - t1) * 1000:.0f} ms ({simuladas} con slippage en {sim.grilla[sim.referencia]:g} USDT) → {SALIDA}")
+    if simuladas:
+        print(f"💧 slippage_expected mediana {np.nanmedian(sim.slippage_expected) * 1e4:.2f} bps · "
+              f"absorption_cap mediana {np.nanmedian(df['absorption_cap']):,.0f} USDT")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# absorcion/capacidad.py
+"""
+💧 Capacidad de absorción: VWAP, slippage y `absorption_cap` vectorizados.
+
+Trabaja sobre los arrays (símbolos × niveles) de `AlmacenLibros`:
+
+- `escalera_vwap`: para una escalera de tamaños (notional en moneda quote) calcula
+  el precio promedio de ejecución (VWAP) barriendo el libro y el slippage contra
+  el mejor precio, para TODOS los símbolos y tamaños a la vez (cumsum por fila +
+  conteo de niveles consumidos, sin bucles Python). NaN si el libro guardado no
+  alcanza para llenar el tamaño.
+- `capacidad_absorcion`: notional máximo (quote) cuyo VWAP queda dentro de la
+  tolerancia de slippage; resuelve en forma cerrada el llenado parcial del nivel
+  que cruza el límite. Si todo el libro guardado entra en la tolerancia, el valor
+  es una cota inferior (la profundidad guardada).
+
+Lados: "compra" consume asks (QUOTE → BASE, bit 1); "venta" consume bids (bit 0).
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from absorcion.libros import AlmacenLibros  # type: ignore
+from codigo.config import ESCALERA_NOTIONAL_USDT, TOLERANCIA_SLIPPAGE  # type: ignore
+
+LADOS = ("compra", "venta")
+
+
+def _acumulados(px: np.ndarray, qty: np.ndarray):
+    valido = np.isfinite(px) & (qty > 0)
+    valor = np.where(valido, px * qty, 0.0)
+    return valido, np.cumsum(valor, axis=1), np.cumsum(np.where(valido, qty, 0.0), axis=1)
+
+
+def escalera_vwap(
+    px: np.ndarray, qty: np.ndarray, notional: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    VWAP y slippage (fracción, >= 0) por símbolo y tamaño.
+    px/qty: (n, d) niveles de un lado; notional: (m,) o (n, m) en moneda quote.
+    """
+    n, d = px.shape
+    _, cum_q, cum_b = _acumulados(px, qty)
+    N = np.broadcast_to(np.asarray(notional, dtype=np.float64), (n, np.shape(notional)[-1]))
+
+    # Niveles consumidos por completo antes de alcanzar N; j == d → profundidad insuficiente
+    j = (cum_q[:, :, None] < N[:, None, :]).sum(axis=1)
+    jj = np.minimum(j, d - 1)
+    previo = np.maximum(j - 1, 0)
+    prev_q = np.where(j > 0, np.take_along_axis(cum_q, previo, axis=1), 0.0)
+    prev_b = np.where(j > 0, np.take_along_axis(cum_b, previo, axis=1), 0.0)
+    p_j = np.take_along_axis(px, jj, axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        base = prev_b + (N - prev_q) / p_j
+        vwap = np.where((j < d) & (N > 0), N / base, np.nan)
+        slippage = np.abs(vwap / px[:, :1] - 1.0)
+    return vwap, slippage
+
+
+def capacidad_absorcion(
+    px: np.ndarray, qty: np.ndarray, compra: bool, tolerancia: float = TOLERANCIA_SLIPPAGE
+) -> np.ndarray:
+    """Notional máximo (quote) con slippage del VWAP <= tolerancia, por símbolo (NaN sin libro)."""
+    valido, cum_q, cum_b = _acumulados(px, qty)
+    mejor = px[:, 0]
+    limite = mejor * (1.0 + tolerancia) if compra else mejor * (1.0 - tolerancia)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vwap_k = cum_q / cum_b
+        dentro = (vwap_k <= limite[:, None]) if compra else (vwap_k >= limite[:, None])
+    dentro &= valido
+    k = dentro.sum(axis=1)            # niveles completos absorbibles (el VWAP es monótono)
+    n_validos = valido.sum(axis=1)
+
+    ultimo = np.maximum(k - 1, 0)[:, None]
+    q_k = np.take_along_axis(cum_q, ultimo, axis=1)[:, 0]
+    b_k = np.take_along_axis(cum_b, ultimo, axis=1)[:, 0]
+    p_sig = np.take_along_axis(px, np.minimum(k, px.shape[1] - 1)[:, None], axis=1)[:, 0]
+
+    # Llenado parcial x (base) del nivel siguiente tal que (q_k + p·x) / (b_k + x) = límite
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (q_k - limite * b_k) / (limite - p_sig)
+    parcial = np.where((k < n_validos) & np.isfinite(x), q_k + p_sig * np.maximum(x, 0.0), q_k)
+    return np.where(k > 0, parcial, np.nan)
+
+
+def tabla_capacidad(
+    almacen: AlmacenLibros,
+    usdt_equivale_quote: np.ndarray,
+    escalera_usdt: Sequence[float] = ESCALERA_NOTIONAL_USDT,
+    tolerancia: float = TOLERANCIA_SLIPPAGE,
+) -> pd.DataFrame:
+    """
+    Tabla larga símbolo × lado con VWAP/slippage por tamaño y `absorption_cap`.
+    `usdt_equivale_quote[i]`: unidades de la quote del símbolo i por 1 USDT
+    (convierte la escalera en USDT a notional quote y el cap de vuelta a USDT).
+    """
+    escalera = np.asarray(escalera_usdt, dtype=np.float64)
+    eq = np.asarray(usdt_equivale_quote, dtype=np.float64)
+    notional = eq[:, None] * escalera[None, :]
+    frames = []
+    for lado in LADOS:
+        compra = lado == "compra"
+        px, qty = (almacen.ask_px, almacen.ask_qty) if compra else (almacen.bid_px, almacen.bid_qty)
+        vwap, slip = escalera_vwap(px, qty, notional)
+        cap = capacidad_absorcion(px, qty, compra, tolerancia)
+        columnas = {
+            "symbol": almacen.simbolos.to_numpy(),
+            "lado": lado,
+            "mejor_precio": px[:, 0],
+            "ts": almacen.ts,
+        }
+        for i, tam in enumerate(escalera):
+            etiqueta = f"{tam:g}"
+            columnas[f"vwap_{etiqueta}"] = vwap[:, i]
+            columnas[f"slippage_{etiqueta}"] = slip[:, i]
+        columnas["absorption_cap"] = cap
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columnas["absorption_cap_usdt"] = cap / eq
+        frames.append(pd.DataFrame(columnas))
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,316 @@
+# absorcion/ciclos.py
+"""
+🔁 Búsqueda de ciclos ANCLA → ... → ANCLA de 3 a 5 piernas sobre la adyacencia CSR.
+
+Generaliza `absorcion.triadas` (solo USDT, solo 3 piernas) a un conjunto de
+anclas configurable (`ANCLAS`) y a un largo máximo (`LONGITUD_MAX_CICLO`):
+
+- Poda por liquidez: solo entran al grafo los pares con quoteVolume >= mínimo.
+- Poda por alcanzabilidad: un BFS desde cada ancla precalcula `dist[activo]`
+  (saltos hasta volver al ancla). Un camino parcial con `r` piernas restantes
+  solo se extiende hacia activos con `dist <= r - 1`.
+- Expansión por capas vectorizada: todos los caminos parciales de largo k se
+  extienden a la vez (`np.repeat` + rangos CSR); el cierre hacia el ancla usa
+  el índice de arcos ENTRANTES, así no se expanden los hubs en la última pierna.
+- Ciclos simples: sin activos intermedios repetidos ni símbolos repetidos.
+- `Ciclos.unicos` deja una sola fila por ciclo dirigido (rotación canónica):
+  el mismo ciclo visto desde dos anclas (USDT→BTC→ETH→USDT y
+  BTC→ETH→USDT→BTC) son las mismas órdenes y se exporta una vez, bajo la
+  primera ancla de `ANCLAS`.
+
+El conjunto enumerado se cachea en `.npz` bajo `CICLOS_DIR`, con clave = hash de
+la lista de mercados + parámetros de búsqueda: solo se recalcula si cambian los
+listados (o la selección de pares líquidos). Al escribir uno nuevo se borran
+los más viejos: quedan los `CICLOS_CACHE_RETENER` más recientes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from absorcion.triadas import GrafoMercados, Triadas, rangos, rotacion_canonica  # type: ignore
+from codigo.config import ANCLAS, CICLOS_CACHE_RETENER, LONGITUD_MAX_CICLO, CICLOS_DIR  # type: ignore
+
+LONGITUD_MIN_CICLO = 3
+LONGITUD_TOPE = 5           # largo máximo soportado (las capas crecen ~grado^L)
+MAX_CAMINOS = 20_000_000    # tope de caminos parciales por capa (protege la memoria)
+_VERSION_CACHE = 1
+
+
+@dataclass
+class Ciclos:
+    """
+    Ciclos en memoria. Filas de largo variable con relleno: `piernas` = -1 y
+    `direcciones` = 0 después de `longitud`. Direcciones: 1 compra, 0 venta.
+    """
+    simbolos: np.ndarray     # diccionario id → símbolo
+    activos: np.ndarray      # diccionario id → activo
+    ancla: np.ndarray        # (n,) int32 id de activo
+    longitud: np.ndarray     # (n,) uint8
+    piernas: np.ndarray      # (n, L) int32
+    direcciones: np.ndarray  # (n, L) uint8
+
+    def __len__(self) -> int:
+        return len(self.longitud)
+
+    @classmethod
+    def vacio(cls, simbolos: np.ndarray, activos: np.ndarray, ancho: int) -> "Ciclos":
+        return cls(
+            simbolos, activos,
+            np.empty(0, np.int32), np.empty(0, np.uint8),
+            np.empty((0, ancho), np.int32), np.empty((0, ancho), np.uint8),
+        )
+
+    def seleccionar(self, mascara: np.ndarray) -> "Ciclos":
+        return Ciclos(
+            self.simbolos, self.activos, self.ancla[mascara], self.longitud[mascara],
+            self.piernas[mascara], self.direcciones[mascara],
+        )
+
+    def unicos(self) -> "Ciclos":
+        """Una fila por ciclo dirigido (la primera, en el orden de anclas), sin rotaciones repetidas."""
+        if not len(self):
+            return self
+        clave = rotacion_canonica(self.piernas, self.direcciones, self.longitud)
+        _, primera = np.unique(clave, axis=0, return_index=True)
+        mascara = np.zeros(len(self), dtype=bool)
+        mascara[primera] = True
+        return self.seleccionar(mascara)
+
+    def de_ancla(self, ancla: str, longitud: Optional[int] = None) -> "Ciclos":
+        ids = np.flatnonzero(self.activos == ancla)
+        mascara = self.ancla == (ids[0] if len(ids) else -1)
+        if longitud is not None:
+            mascara &= self.longitud == longitud
+        return self.seleccionar(mascara)
+
+    def triadas(self, ancla: str = "USDT") -> Triadas:
+        """Ciclos de 3 piernas de un ancla en el formato de `absorcion.triadas`."""
+        sub = self.de_ancla(ancla, 3)
+        d = sub.direcciones[:, :3].astype(np.uint8)
+        forma = ((d[:, 0] << 2) | (d[:, 1] << 1) | d[:, 2]).astype(np.uint8)
+        piernas = sub.piernas[:, :3]
+        orden = np.lexsort((piernas[:, 2], piernas[:, 1], piernas[:, 0], forma))
+        return Triadas(self.simbolos, piernas[orden].copy(), forma[orden])
+
+    def conteos(self) -> pd.DataFrame:
+        """Cantidad de ciclos por (ancla, longitud)."""
+        df = pd.DataFrame({"ancla": self.activos[self.ancla], "longitud": self.longitud})
+        return df.value_counts().rename("ciclos").sort_index().reset_index()
+
+    def a_dataframe(self) -> pd.DataFrame:
+        ancho = self.piernas.shape[1]
+        s = np.append(self.simbolos, "")  # id -1 → ""
+        out = {"ancla": self.activos[self.ancla], "longitud": self.longitud}
+        for k in range(ancho):
+            out[f"par_{k + 1}"] = s[self.piernas[:, k]]
+        out["direcciones"] = ["".join(map(str, fila[:n])) for fila, n in zip(self.direcciones.tolist(), self.longitud)]
+        return pd.DataFrame(out)
+
+    # ─────────── Persistencia .npz ───────────
+    def guardar(self, path: Path) -> None:
+        """Escritura atómica (tmp + os.replace) en .npz (sin comprimir: prioriza la carga)."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(
+                f,
+                simbolos=self.simbolos.astype(str), activos=self.activos.astype(str),
+                ancla=self.ancla, longitud=self.longitud,
+                piernas=self.piernas, direcciones=self.direcciones,
+            )
+        os.replace(tmp, path)
+
+    @classmethod
+    def cargar(cls, path: Path) -> "Ciclos":
+        with np.load(path, allow_pickle=False) as z:
+            return cls(
+                simbolos=z["simbolos"].astype(object), activos=z["activos"].astype(object),
+                ancla=z["ancla"], longitud=z["longitud"],
+                piernas=z["piernas"], direcciones=z["direcciones"],
+            )
+
+
+def pares_liquidos(df_pares: pd.DataFrame, volumen_quote: Optional[np.ndarray], volumen_min: float) -> pd.DataFrame:
+    """Filtra los pares con quoteVolume >= `volumen_min` (sin dato de volumen → fuera si hay mínimo)."""
+    if volumen_min <= 0 or volumen_quote is None:
+        return df_pares
+    v = np.asarray(volumen_quote, dtype=np.float64)
+    return df_pares[np.isfinite(v) & (v >= volumen_min)]
+
+
+def distancias(grafo: GrafoMercados, origen: int) -> np.ndarray:
+    """
+    Saltos mínimos entre `origen` y cada activo (BFS vectorizado por frentes).
+    Cada símbolo aporta arcos en ambos sentidos, así que la distancia de ida
+    coincide con la de vuelta al ancla.
+    """
+    n = len(grafo.activos)
+    dist = np.full(n, np.iinfo(np.int32).max, dtype=np.int32)
+    dist[origen] = 0
+    frente = np.array([origen], dtype=np.int64)
+    nivel = 0
+    while len(frente):
+        nivel += 1
+        _, arcos = grafo.arcos_desde(frente)
+        vecinos = np.unique(grafo.arco_destino[arcos])
+        frente = vecinos[dist[vecinos] > nivel]
+        dist[frente] = nivel
+    return dist
+
+
+def _ciclos_de_ancla(grafo: GrafoMercados, a: int, longitud_max: int, longitud_min: int, max_caminos: int):
+    """Expansión por capas desde el ancla `a`. Devuelve una lista de matrices de arcos (m, largo)."""
+    dist = distancias(grafo, a)
+    in_ptr, in_arcos = grafo.entrada(a)
+    dest = grafo.arco_destino
+
+    # Caminos parciales: arcos usados (m, k) y activos visitados sin el ancla (m, k)
+    arcos = np.arange(grafo.indptr[a], grafo.indptr[a + 1])[:, None]
+    nodos = dest[arcos]
+    ok = dist[nodos[:, 0]] <= longitud_max - 1
+    arcos, nodos = arcos[ok], nodos[ok]
+
+    encontrados = []
+    for k in range(1, longitud_max):
+        if not len(arcos):
+            break
+        actual = nodos[:, -1]
+
+        # Cierre: arcos actual → ancla (ciclo de largo k + 1). Con activos distintos
+        # en el camino, ningún símbolo puede repetirse, no hace falta chequearlo.
+        if k + 1 >= longitud_min:
+            largos = in_ptr[actual + 1] - in_ptr[actual]
+            idx = np.repeat(np.arange(len(actual)), largos)
+            cierre = in_arcos[rangos(in_ptr[actual], largos)]
+            if len(cierre):
+                encontrados.append(np.column_stack([arcos[idx], cierre]))
+
+        # Extensión: una pierna más sin volver al ancla, solo si aún puede cerrar a tiempo
+        restantes = longitud_max - (k + 1)
+        if restantes < 1:
+            break
+        idx, nuevos = grafo.arcos_desde(actual)
+        v = dest[nuevos]
+        ok = (v != a) & (dist[v] <= restantes)
+        idx, nuevos, v = idx[ok], nuevos[ok], v[ok]
+        if len(idx) > max_caminos:
+            raise MemoryError(
+                f"❌ {len(idx)} caminos parciales de {k + 1} piernas desde {grafo.activos[a]} "
+                f"(tope {max_caminos}): subí VOLUMEN_MIN_CICLO o bajá LONGITUD_MAX_CICLO"
+            )
+        ok = ~(nodos[idx] == v[:, None]).any(axis=1)
+        idx, nuevos, v = idx[ok], nuevos[ok], v[ok]
+        arcos = np.column_stack([arcos[idx], nuevos])
+        nodos = np.column_stack([nodos[idx], v])
+    return encontrados
+
+
+def buscar_ciclos(
+    grafo: GrafoMercados,
+    anclas: Sequence[str] = ANCLAS,
+    longitud_max: int = LONGITUD_MAX_CICLO,
+    longitud_min: int = LONGITUD_MIN_CICLO,
+    max_caminos: int = MAX_CAMINOS,
+) -> Ciclos:
+    """
+    Enumera todos los ciclos simples de `longitud_min..longitud_max` piernas por ancla.
+    Orden: ancla (según `anclas`), longitud y luego orden CSR de los arcos. El grafo
+    no tiene símbolos repetidos, así que cada ciclo se genera una sola vez.
+    """
+    if not LONGITUD_MIN_CICLO <= longitud_min <= longitud_max <= LONGITUD_TOPE:
+        raise ValueError(
+            f"❌ Largo de ciclo fuera de rango: {longitud_min}..{longitud_max} "
+            f"(soportado {LONGITUD_MIN_CICLO}..{LONGITUD_TOPE})"
+        )
+    activos = grafo.activos.to_numpy(dtype=object)
+    bloques: List[np.ndarray] = []
+    anclas_id: List[np.ndarray] = []
+    for ancla in dict.fromkeys(anclas):
+        if ancla not in grafo.activos:
+            continue
+        a = int(grafo.activos.get_loc(ancla))
+        for arcos in _ciclos_de_ancla(grafo, a, longitud_max, longitud_min, max_caminos):
+            relleno = np.full((len(arcos), longitud_max), -1, dtype=np.int64)
+            relleno[:, : arcos.shape[1]] = arcos
+            bloques.append(relleno)
+            anclas_id.append(np.full(len(arcos), a, dtype=np.int32))
+    if not bloques:
+        return Ciclos.vacio(grafo.simbolos, activos, longitud_max)
+
+    arcos = np.concatenate(bloques)
+    validos = arcos >= 0
+    seguro = np.where(validos, arcos, 0)
+    return Ciclos(
+        simbolos=grafo.simbolos,
+        activos=activos,
+        ancla=np.concatenate(anclas_id),
+        longitud=validos.sum(axis=1).astype(np.uint8),
+        piernas=np.where(validos, grafo.arco_simbolo[seguro], -1).astype(np.int32),
+        direcciones=np.where(validos, grafo.arco_bit[seguro], 0).astype(np.uint8),
+    )
+
+
+# ─────────── Caché por hash de mercados ───────────
+
+def hash_mercados(
+    df_pares: pd.DataFrame,
+    anclas: Iterable[str] = ANCLAS,
+    longitud_max: int = LONGITUD_MAX_CICLO,
+    longitud_min: int = LONGITUD_MIN_CICLO,
+) -> str:
+    """sha1 de la lista ordenada `symbol|base|quote` + parámetros de búsqueda."""
+    filas = sorted(set(
+        df_pares["symbol"].astype(str) + "|" + df_pares["base"].astype(str) + "|" + df_pares["quote"].astype(str)
+    ))
+    h = hashlib.sha1()
+    h.update(f"v{_VERSION_CACHE}|{','.join(anclas)}|{longitud_min}|{longitud_max}\n".encode())
+    h.update("\n".join(filas).encode())
+    return h.hexdigest()
+
+
+def ruta_cache(clave: str, directorio: Path = CICLOS_DIR) -> Path:
+    return directorio / f"ciclos_{clave[:16]}.npz"
+
+
+def podar_cache(directorio: Path = CICLOS_DIR, retener: int = CICLOS_CACHE_RETENER) -> int:
+    """Borra los `.npz` de ciclos salvo los `retener` más recientes. Devuelve cuántos borró."""
+    archivos = sorted(directorio.glob("ciclos_*.npz"), key=lambda p: p.stat().st_mtime, reverse=True)
+    borrados = 0
+    for viejo in archivos[max(retener, 1):]:
+        try:
+            viejo.unlink()
+            borrados += 1
+        except FileNotFoundError:
+            pass  # otro proceso lo podó primero
+    return borrados
+
+
+def ciclos_con_cache(
+    df_pares: pd.DataFrame,
+    anclas: Sequence[str] = ANCLAS,
+    longitud_max: int = LONGITUD_MAX_CICLO,
+    longitud_min: int = LONGITUD_MIN_CICLO,
+    directorio: Path = CICLOS_DIR,
+    forzar: bool = False,
+) -> Ciclos:
+    """Devuelve el conjunto de ciclos desde caché si la lista de mercados no cambió; si no, lo recalcula."""
+    path = ruta_cache(hash_mercados(df_pares, anclas, longitud_max, longitud_min), directorio)
+    if path.exists() and not forzar:
+        try:
+            ciclos = Ciclos.cargar(path)
+            os.utime(path)  # la poda conserva los usados más recientemente
+            return ciclos
+        except Exception as e:
+            print(f"⚠️ Caché de ciclos ilegible ({path.name}): {e}")
+    ciclos = buscar_ciclos(GrafoMercados.desde_pares(df_pares), anclas, longitud_max, longitud_min)
+    ciclos.guardar(path)
+    podar_cache(directorio)
+    return ciclos
@@ -0,0 +1,250 @@
+# absorcion/cuantizacion.py
+"""
+📏 Tablas de cuantización (tick, step, mínimos) y dimensionado vectorizado de triadas.
+
+`1_mapear_campos_estandar.py` deja `price_precision`, `amount_precision`,
+`min_price`, `min_amount` y `min_cost` como texto en el CSV.
+`TablaCuantizacion` los pasa, una vez por símbolo, a arrays int64 en unidades
+de 1/ESCALA (10⁻⁸, la precisión máxima de Binance):
+    tick          : paso de precio
+    paso          : step de cantidad (base)
+    min_cantidad  : cantidad mínima (base)
+    min_precio    : precio mínimo
+    min_notional  : notional mínimo (quote), `limits.cost.min` de ccxt
+0 = sin dato (no se redondea ni se exige mínimo).
+
+Las cantidades entran como float. Se llevan a unidades de 10⁻⁸ y se ajustan
+al entero más cercano si la diferencia es solo el error de representación:
+0.3 se guarda como 0.29999999999999998 y no debe perder un step. Después se
+redondean hacia abajo con la división entera `unidades // paso` en int64.
+
+`dimensionar` recorre las 3 piernas de TODAS las triadas a la vez (el orden
+de piernas es la única dependencia):
+    bit 1 (compra, QUOTE → BASE): cantidad = ↓step(entrada / ask); sobra entrada - cantidad·ask (quote)
+    bit 0 (venta , BASE → QUOTE): cantidad = ↓step(entrada);       sobra entrada - cantidad (base)
+Se dimensiona y se valúa al tope (bid/ask), que es donde se llena la orden;
+el precio al tick (hacia arriba en compras, hacia abajo en ventas) es sólo el
+límite de la orden y queda en `Dimensionado.precio`. Con precios sobre la
+grilla del tick ambos coinciden.
+La salida de cada pierna, descontado el fee taker, es la entrada de la
+siguiente. El polvo que queda en cada salto se reporta en su moneda y valuado
+en el ancla. La triada es ejecutable si en cada pierna el precio límite es
+positivo y llega al precio mínimo, y la orden a la cantidad y al notional
+(al precio límite) mínimos.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+
+import numpy as np
+
+from codigo.config import PRECISION_MODO  # type: ignore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+ESCALA = 10**8
+_UNIDADES_MAX = float(2**62)  # cantidades mayores (o inf/NaN) no entran en int64: se toman como 0
+_COLUMNAS = {
+    "tick": "price_precision",
+    "paso": "amount_precision",
+    "min_cantidad": "min_amount",
+    "min_precio": "min_price",
+    "min_notional": "min_cost",
+}
+
+
+def a_unidades(valores, modo_decimales: bool = False) -> np.ndarray:
+    """
+    Valores (texto o float; NaN/vacío → 0) a int64 en unidades de 1/ESCALA.
+    `modo_decimales`: el valor es una cantidad de decimales n (ccxt DECIMAL_PLACES) → 10⁻ⁿ.
+    Un valor positivo más fino que 10⁻⁸ queda en 1 unidad.
+    """
+    import pandas as pd
+
+    x = pd.to_numeric(pd.Series(np.asarray(valores, dtype=object).ravel()), errors="coerce").to_numpy(dtype=np.float64)
+    if modo_decimales:
+        x = np.power(10.0, -x)
+    with np.errstate(invalid="ignore"):
+        u = np.rint(x * ESCALA)
+        u = np.where(x > 0, np.maximum(u, 1.0), 0.0)
+    return np.where(np.isfinite(u), u, 0.0).astype(np.int64)
+
+
+def unidades_float(x: np.ndarray) -> np.ndarray:
+    """Cantidad float → unidades de 1/ESCALA (float, enteras), ajustando el error de representación."""
+    u = np.asarray(x, dtype=np.float64) * ESCALA
+    r = np.rint(u)
+    with np.errstate(invalid="ignore"):  # inf - inf
+        return np.where(np.abs(u - r) <= np.maximum(1e-6, np.abs(u) * 1e-12), r, np.floor(u))
+
+
+@dataclass
+class TablaCuantizacion:
+    """Tick, step y mínimos por id de símbolo, en unidades de 1/ESCALA (int64)."""
+    simbolos: np.ndarray
+    tick: np.ndarray
+    paso: np.ndarray
+    min_cantidad: np.ndarray
+    min_precio: np.ndarray
+    min_notional: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    @classmethod
+    def desde_frame(cls, df: "pd.DataFrame", simbolos: Optional[Sequence[str]] = None, modo: str = PRECISION_MODO) -> "TablaCuantizacion":
+        """
+        Desde la tabla estandarizada/spot (`symbol` + columnas de precisión y mínimos).
+        Con `simbolos`, los ids quedan referidos a ese diccionario (faltantes → 0, sin restricción).
+        """
+        import pandas as pd
+
+        df = df.drop_duplicates(subset=["symbol"], keep="last")
+        dic = pd.Index(simbolos if simbolos is not None else df["symbol"], dtype=object)
+        pos = pd.Index(df["symbol"], dtype=object).get_indexer(dic)
+        arrays = {}
+        for campo, col in _COLUMNAS.items():
+            fuente = df[col].to_numpy(dtype=object) if col in df.columns else np.full(len(df), None, dtype=object)
+            u = a_unidades(fuente, modo_decimales=(modo == "decimales" and campo in ("tick", "paso")))
+            arrays[campo] = np.where(pos >= 0, u[np.maximum(pos, 0)] if len(u) else 0, 0).astype(np.int64)
+        return cls(simbolos=dic.to_numpy(dtype=object), **arrays)
+
+    @classmethod
+    def desde_csv(cls, path: Path, simbolos: Optional[Sequence[str]] = None, modo: str = PRECISION_MODO) -> "TablaCuantizacion":
+        import pandas as pd
+
+        return cls.desde_frame(pd.read_csv(path, dtype=str, keep_default_na=False), simbolos, modo)
+
+    def redondear_cantidad(self, ids: np.ndarray, cantidad: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(steps enteros, cantidad ejecutable) redondeando hacia abajo al step de cada símbolo."""
+        u = unidades_float(cantidad)
+        u = np.where(np.isfinite(u) & (u > 0) & (u < _UNIDADES_MAX), u, 0.0).astype(np.int64)
+        paso = self.paso[ids]
+        pasos = np.where(paso > 0, u // np.maximum(paso, 1), u)
+        return pasos, (pasos * np.where(paso > 0, paso, 1)) / ESCALA
+
+    def redondear_precio(self, ids: np.ndarray, precio: np.ndarray, arriba) -> np.ndarray:
+        """Precio al tick: hacia arriba donde `arriba` (compra que cruza), hacia abajo si no."""
+        u = np.asarray(precio, dtype=np.float64) * ESCALA
+        r = np.rint(u)
+        u = np.where(np.abs(u - r) <= np.maximum(1e-6, np.abs(u) * 1e-12), r, u)
+        tick = self.tick[ids].astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            q = u / tick
+            q = np.where(arriba, np.ceil(q), np.floor(q)) * tick
+        return np.where(tick > 0, q, u) / ESCALA
+
+
+@dataclass
+class Dimensionado:
+    """Órdenes de todas las triadas para un notional de entrada (arrays (n, L) por pierna)."""
+    precio: np.ndarray        # precio límite al tick
+    ejecucion: np.ndarray     # precio tope (ask en compras, bid en ventas): dimensiona y valúa
+    pasos: np.ndarray         # cantidad en steps enteros (int64)
+    cantidad: np.ndarray      # cantidad ejecutable (base)
+    entrada: np.ndarray       # disponible al llegar a la pierna (moneda de entrada)
+    salida: np.ndarray        # recibido, neto de fee (moneda de salida)
+    residuo: np.ndarray       # polvo que queda sin ejecutar (moneda de entrada)
+    residuo_ancla: np.ndarray  # ese polvo valuado en el ancla
+    ok_minimos: np.ndarray    # (n, L) la pierna cumple precio, cantidad y notional mínimos
+    notional: np.ndarray      # (n,) entrada en el ancla
+
+    def __len__(self) -> int:
+        return len(self.notional)
+
+    @property
+    def ejecutable(self) -> np.ndarray:
+        return self.ok_minimos.all(axis=1)
+
+    @property
+    def final(self) -> np.ndarray:
+        return self.salida[:, -1]
+
+    @property
+    def neto(self) -> np.ndarray:
+        """Retorno del ciclo con fees y cuantización (el polvo cuenta como pérdida)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self.final / self.notional - 1.0
+
+
+def dimensionar(
+    tabla: TablaCuantizacion,
+    piernas: np.ndarray,
+    bits: np.ndarray,
+    bid: np.ndarray,
+    ask: np.ndarray,
+    notional,
+    fee_taker: Optional[np.ndarray] = None,
+) -> Dimensionado:
+    """
+    Cantidades ejecutables de todas las triadas/ciclos (piernas/bits (n, L),
+    ids sobre `tabla.simbolos`) entrando con `notional` (escalar o (n,)) en el
+    ancla, a precios tope bid/ask (arrays por id). Piernas de relleno (-1) no se admiten.
+    Las cantidades salen del tope; el precio al tick sólo es el límite de la orden.
+    """
+    piernas = np.asarray(piernas, dtype=np.int64)
+    compra = np.asarray(bits).astype(bool)
+    n, L = piernas.shape
+    tope = np.where(compra, ask[piernas], bid[piernas]).astype(np.float64)
+    precio = tabla.redondear_precio(piernas, tope, compra)
+    fee = np.zeros((n, L)) if fee_taker is None else np.asarray(fee_taker, dtype=np.float64)[piernas]
+
+    x = np.broadcast_to(np.asarray(notional, dtype=np.float64), (n,)).astype(np.float64)
+    notional_arr = x.copy()
+    cols = {k: np.empty((n, L)) for k in ("entrada", "salida", "residuo", "residuo_ancla", "cantidad")}
+    pasos = np.empty((n, L), dtype=np.int64)
+    ok = np.empty((n, L), dtype=bool)
+    tasa_acum = np.ones(n)  # unidades de la moneda de entrada por unidad de ancla (a precio tope)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for k in range(L):
+            ids, c, p, e = piernas[:, k], compra[:, k], precio[:, k], tope[:, k]
+            pk, qk = tabla.redondear_cantidad(ids, np.where(c, x / e, x))
+            usado = np.where(c, qk * e, qk)
+            cols["entrada"][:, k] = x
+            cols["residuo"][:, k] = x - usado
+            cols["residuo_ancla"][:, k] = (x - usado) / tasa_acum
+            cols["cantidad"][:, k] = qk
+            pasos[:, k] = pk
+            precio_u = np.rint(p * ESCALA)
+            ok[:, k] = ((pk > 0) & (precio_u > 0) & (precio_u >= tabla.min_precio[ids])
+                        & (unidades_float(qk) >= tabla.min_cantidad[ids])
+                        & (unidades_float(qk * p) >= tabla.min_notional[ids]))
+            x = np.where(c, qk, qk * e) * (1.0 - fee[:, k])
+            cols["salida"][:, k] = x
+            tasa_acum = tasa_acum * np.where(c, 1.0 / e, e)
+    return Dimensionado(precio=precio, ejecucion=tope, pasos=pasos, ok_minimos=ok & np.isfinite(precio),
+                        notional=notional_arr, **cols)
+
+
+def dimensionado_referencia(
+    tabla: TablaCuantizacion, piernas, bits, bid, ask, notional: float, fee_taker=None
+) -> list:
+    """Implementación orden por orden con `decimal` (referencia para el benchmark)."""
+    from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+
+    def q(valor, unidades: int, modo) -> Decimal:
+        d = valor if isinstance(valor, Decimal) else Decimal(repr(float(valor)))
+        if unidades <= 0:
+            return d
+        paso = Decimal(int(unidades)) / ESCALA
+        return (d / paso).to_integral_value(rounding=modo) * paso
+
+    out = []
+    for fila, bfila in zip(np.asarray(piernas).tolist(), np.asarray(bits).tolist()):
+        x = Decimal(repr(float(notional)))
+        piernas_out = []
+        for k, (i, b) in enumerate(zip(fila, bfila)):
+            compra = b == 1
+            tope = Decimal(repr(float(ask[i] if compra else bid[i])))
+            p = q(tope, int(tabla.tick[i]), ROUND_CEILING if compra else ROUND_FLOOR)
+            deseada = x / tope if compra else x
+            cant = q(deseada, int(tabla.paso[i]), ROUND_FLOOR)
+            fee = Decimal(repr(float(fee_taker[i]))) if fee_taker is not None else Decimal(0)
+            piernas_out.append((float(p), float(cant)))
+            x = (cant if compra else cant * tope) * (1 - fee)
+        out.append((piernas_out, float(x)))
+    return out
@@ -0,0 +1,324 @@
+# absorcion/descarga_libros.py
+"""
+⚡ Descarga concurrente de libros (asyncio) con scheduler por request weight.
+
+`FuenteCCXT` pide un libro por vez con el throttle de ccxt (`enableRateLimit`):
+con cientos de piernas de triadas una ronda tarda minutos. Acá:
+
+- Cliente `ccxt.async_support` con el throttle de ccxt apagado; el ritmo lo
+  pone `CuboPesos`, un token bucket en unidades de request weight de Binance
+  (`LIBROS_PESO_POR_MINUTO` × `LIBROS_MARGEN_PESO`, recarga lineal por
+  segundo). Cada respuesta trae `X-MBX-USED-WEIGHT-1M` (lo usado en la ventana
+  de 1 minuto de la IP, incluidos otros procesos) y el cubo nunca queda por
+  encima de lo que el servidor dice que queda, descontando lo que sigue en vuelo.
+- Prioridad por triada: cada símbolo hereda el mejor `net_spread_expected` de
+  las triadas que lo usan (`prioridad_por_triadas`). Un único despachador saca
+  de un heap en ese orden, así que si el presupuesto no alcanza para toda la
+  ronda lo que espera es lo menos prometedor.
+- Concurrencia acotada (`LIBROS_CONCURRENCIA` requests en vuelo) y reintentos
+  con backoff exponencial + jitter ante errores de red; ante 429/418 (límite
+  excedido) el cubo se vacía y se pausa `Retry-After` segundos.
+- `FuenteCCXTAsync` expone la misma interfaz que las demás fuentes de
+  `libros.py` (`libros(simbolos)`), así que `AlmacenLibros.ingerir` la usa tal cual.
+
+El cliente sólo necesita `async fetch_order_book(symbol, limit)` (y,
+opcionalmente, `last_response_headers`): para correr sin red,
+`absorcion/servidor_depth.py` trae un servidor HTTP local que imita
+`/api/v3/depth` (con sus pesos y 429) y un `ExchangeSimulado` en proceso.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from absorcion.libros import Libro  # type: ignore
+from codigo.config import (  # type: ignore
+    CCXT_OPTIONS, EXCHANGE_ID, LIBRO_PROFUNDIDAD,
+    LIBROS_CONCURRENCIA, LIBROS_MARGEN_PESO, LIBROS_PESO_POR_MINUTO, LIBROS_REINTENTOS, LIBROS_TIMEOUT_S,
+)
+
+# GET /api/v3/depth: (limit máximo, peso)
+PESOS_DEPTH: Tuple[Tuple[int, int], ...] = ((100, 5), (500, 25), (1000, 50), (5000, 250))
+BACKOFF_INICIAL_S = 0.25
+BACKOFF_MAX_S = 8.0
+PAUSA_LIMITE_S = 10.0  # si un 429/418 no trae Retry-After
+
+# Por nombre de clase (MRO) para no importar ccxt: RateLimitExceeded ⊂ DDoSProtection ⊂ NetworkError
+_ERRORES_LIMITE = frozenset({"RateLimitExceeded", "DDoSProtection"})
+_ERRORES_RED = frozenset({"NetworkError", "RequestTimeout", "ExchangeNotAvailable", "TimeoutError", "OSError"})
+
+
+def peso_depth(limite: int) -> int:
+    """Request weight de un GET /api/v3/depth con `limit=limite`."""
+    for tope, peso in PESOS_DEPTH:
+        if limite <= tope:
+            return peso
+    raise ValueError(f"❌ limit={limite} fuera de rango para /api/v3/depth (máximo {PESOS_DEPTH[-1][0]})")
+
+
+def clasificar_error(e: BaseException) -> str:
+    """'limite' (429/418), 'red' (transitorio, reintentable) u 'otro' (símbolo inválido, etc.)."""
+    nombres = {c.__name__ for c in type(e).__mro__}
+    if nombres & _ERRORES_LIMITE:
+        return "limite"
+    if nombres & _ERRORES_RED:
+        return "red"
+    return "otro"
+
+
+def _cabecera(headers: Any, nombre: str) -> Optional[str]:
+    if not headers:
+        return None
+    nombre = nombre.lower()
+    for k, v in dict(headers).items():
+        if str(k).lower() == nombre:
+            return v
+    return None
+
+
+class CuboPesos:
+    """Token bucket en unidades de request weight (capacidad y recarga por minuto)."""
+
+    def __init__(self, peso_por_minuto: float = LIBROS_PESO_POR_MINUTO, margen: float = LIBROS_MARGEN_PESO):
+        self.limite = float(peso_por_minuto)
+        self.capacidad = self.limite * margen
+        self.tasa = self.capacidad / 60.0
+        self.tokens = self.capacidad
+        self.consumido = 0
+        self._t = time.monotonic()
+        self._pausa_hasta = 0.0
+
+    def _recargar(self, ahora: float) -> None:
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self._t) * self.tasa)
+        self._t = ahora
+
+    def espera(self, peso: float) -> float:
+        """Segundos hasta poder gastar `peso` (0 = ya)."""
+        ahora = time.monotonic()
+        self._recargar(ahora)
+        if ahora < self._pausa_hasta:
+            return self._pausa_hasta - ahora
+        return max(0.0, (peso - self.tokens) / self.tasa)
+
+    async def adquirir(self, peso: float) -> None:
+        # Un solo despachador adquiere, así que no hace falta lock (y el cubo sirve entre loops)
+        while (e := self.espera(peso)) > 0:
+            await asyncio.sleep(e)
+        self.tokens -= peso
+        self.consumido += peso
+
+    def sincronizar(self, usado_1m: float, en_vuelo: float = 0.0) -> None:
+        """
+        El servidor manda: no quedar por encima de lo que resta en su ventana
+        (con el mismo margen). `en_vuelo` es el peso ya despachado que la
+        cabecera puede no incluir todavía; sin descontarlo, con varias requests
+        en vuelo y poco margen la ventana se pasa.
+        """
+        self._recargar(time.monotonic())
+        self.tokens = min(self.tokens, self.capacidad - usado_1m * (self.capacidad / self.limite) - en_vuelo)
+
+    def pausar(self, segundos: float) -> None:
+        """Tras un 429/418: cubo vacío y nada sale hasta que pase `segundos`."""
+        self._recargar(time.monotonic())
+        self.tokens = min(self.tokens, 0.0)
+        self._pausa_hasta = max(self._pausa_hasta, time.monotonic() + segundos)
+
+
+def prioridad_por_triadas(n_simbolos: int, piernas: np.ndarray, puntaje: np.ndarray) -> np.ndarray:
+    """Por símbolo, el mejor puntaje de las triadas/ciclos que lo usan (-inf si ninguna o NaN)."""
+    piernas = np.asarray(piernas, dtype=np.int64)
+    p = np.where(np.isfinite(puntaje), puntaje, -np.inf).astype(np.float64)
+    prio = np.full(int(n_simbolos), -np.inf)
+    validas = piernas >= 0
+    np.maximum.at(prio, piernas[validas], np.broadcast_to(p[:, None], piernas.shape)[validas])
+    return prio
+
+
+def prioridad_desde_evaluadas(simbolos: Sequence[str], path: Path) -> np.ndarray:
+    """Prioridad alineada a `simbolos` desde `triadas_evaluadas.csv` (7_evaluar_triadas.py); -inf si no figura."""
+    simbolos = pd.Index(list(simbolos), dtype=object)
+    if not Path(path).exists():
+        return np.full(len(simbolos), -np.inf)
+    df = pd.read_csv(path, dtype=str)
+    legs = [c for c in df.columns if c.startswith("leg")]
+    if not legs or "net_spread_expected" not in df.columns:
+        return np.full(len(simbolos), -np.inf)
+    piernas = np.stack([simbolos.get_indexer(df[c].fillna("")) for c in legs], axis=1)
+    puntaje = pd.to_numeric(df["net_spread_expected"], errors="coerce").to_numpy(dtype=np.float64)
+    return prioridad_por_triadas(len(simbolos), piernas, puntaje)
+
+
+@dataclass
+class ResultadoDescarga:
+    libros: Dict[str, Libro] = field(default_factory=dict)     # en orden de llegada
+    fallidos: Dict[str, str] = field(default_factory=dict)     # símbolo → último error
+    llegada_s: Dict[str, float] = field(default_factory=dict)  # segundos desde el inicio de la ronda
+    peso: int = 0
+    reintentos: int = 0
+    limitados: int = 0     # respuestas 429/418
+    duracion_s: float = 0.0
+
+
+class DescargadorLibros:
+    """Ronda de libros con prioridad, presupuesto de peso y concurrencia acotada sobre un cliente async."""
+
+    def __init__(
+        self,
+        cliente: Any,
+        limite: int = LIBRO_PROFUNDIDAD,
+        concurrencia: int = LIBROS_CONCURRENCIA,
+        reintentos: int = LIBROS_REINTENTOS,
+        timeout_s: float = LIBROS_TIMEOUT_S,
+        cubo: Optional[CuboPesos] = None,
+    ):
+        self.cliente = cliente
+        self.limite = int(limite)
+        self.peso = peso_depth(self.limite)
+        self.concurrencia = max(1, int(concurrencia))
+        self.reintentos = int(reintentos)
+        self.timeout_s = timeout_s
+        self.cubo = cubo or CuboPesos()
+        self._en_vuelo = 0  # peso despachado cuya respuesta todavía no llegó
+
+    def _sincronizar(self) -> None:
+        usado = _cabecera(getattr(self.cliente, "last_response_headers", None), "X-MBX-USED-WEIGHT-1M")
+        if usado is not None:
+            self.cubo.sincronizar(float(usado), self._en_vuelo)
+
+    async def descargar(self, simbolos: Sequence[str], prioridad: Optional[np.ndarray] = None) -> ResultadoDescarga:
+        """Pide el libro de cada símbolo (mayor prioridad primero; empates en el orden dado)."""
+        simbolos = list(dict.fromkeys(simbolos))
+        prio = np.zeros(len(simbolos)) if prioridad is None else np.asarray(prioridad, dtype=np.float64)
+        prio = np.where(np.isnan(prio), -np.inf, prio)
+        heap: List[Tuple[float, int, str, int]] = [(-p, i, s, 0) for i, (s, p) in enumerate(zip(simbolos, prio.tolist()))]
+        heapq.heapify(heap)
+
+        res = ResultadoDescarga()
+        cupo = asyncio.Semaphore(self.concurrencia)
+        activos: set = set()
+        t0 = time.perf_counter()
+
+        async def pedir(item: Tuple[float, int, str, int]) -> None:
+            neg_p, orden, symbol, intento = item
+            tipo, error, retry_after = "", "", None
+            try:
+                try:
+                    libro = await asyncio.wait_for(
+                        self.cliente.fetch_order_book(symbol, limit=self.limite), self.timeout_s
+                    )
+                finally:
+                    self._en_vuelo -= self.peso
+                self._sincronizar()
+                res.libros[symbol] = libro
+                res.llegada_s[symbol] = time.perf_counter() - t0
+                res.fallidos.pop(symbol, None)
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # noqa: BLE001 — se clasifica y se reintenta o se reporta
+                self._sincronizar()
+                tipo, error = clasificar_error(e), f"{type(e).__name__}: {e}"
+                retry_after = _cabecera(getattr(self.cliente, "last_response_headers", None), "Retry-After")
+            finally:
+                cupo.release()
+
+            res.fallidos[symbol] = error
+            if tipo == "limite":
+                res.limitados += 1
+                self.cubo.pausar(float(retry_after) if retry_after else PAUSA_LIMITE_S)
+            if tipo == "otro" or intento >= self.reintentos:
+                return
+            res.reintentos += 1
+            if tipo == "red":
+                backoff = min(BACKOFF_INICIAL_S * 2 ** intento, BACKOFF_MAX_S)
+                await asyncio.sleep(backoff * (1 + random.random() * 0.5))
+            heapq.heappush(heap, (neg_p, orden, symbol, intento + 1))
+
+        try:
+            while heap or activos:
+                if not heap:
+                    # Sólo quedan requests en vuelo (o en backoff); pueden volver al heap como reintento
+                    await asyncio.wait(set(activos), return_when=asyncio.FIRST_COMPLETED)
+                    continue
+                await cupo.acquire()
+                if not heap:
+                    cupo.release()
+                    continue
+                item = heapq.heappop(heap)
+                await self.cubo.adquirir(self.peso)
+                res.peso += self.peso
+                self._en_vuelo += self.peso
+                tarea = asyncio.create_task(pedir(item))
+                activos.add(tarea)
+                tarea.add_done_callback(activos.discard)
+        finally:
+            for tarea in list(activos):
+                tarea.cancel()
+        res.duracion_s = time.perf_counter() - t0
+        return res
+
+
+def _redirigir(urls: Dict[str, Any], url_base: str) -> None:
+    """Reescribe host/esquema de las URLs de la API (mismo path) hacia `url_base`."""
+    for clave, valor in urls.items():
+        if isinstance(valor, dict):
+            _redirigir(valor, url_base)
+        elif isinstance(valor, str):
+            urls[clave] = url_base.rstrip("/") + urlsplit(valor).path
+
+
+def exchange_async(exchange_id: str = EXCHANGE_ID, url_base: Optional[str] = None, markets: Optional[dict] = None):
+    """Exchange `ccxt.async_support` sin throttle propio; `url_base` lo apunta a un servidor local."""
+    import ccxt.async_support as ccxt_async  # import diferido: la fuente grabada no necesita ccxt
+
+    ex = getattr(ccxt_async, exchange_id)({**CCXT_OPTIONS, "enableRateLimit": False})
+    if url_base:
+        _redirigir(ex.urls["api"], url_base)
+    if markets:
+        ex.set_markets(markets)  # sin load_markets: ni exchangeInfo ni ajuste de hora por ronda
+    return ex
+
+
+@dataclass
+class FuenteCCXTAsync:
+    """Fuente de libros (interfaz de `libros.py`) que resuelve cada ronda con `DescargadorLibros`."""
+    exchange_id: str = EXCHANGE_ID
+    limite: int = LIBRO_PROFUNDIDAD
+    concurrencia: int = LIBROS_CONCURRENCIA
+    prioridad: Optional[Dict[str, float]] = None  # símbolo → puntaje (ausente = al final)
+    url_base: Optional[str] = None
+    markets: Optional[dict] = None
+    cubo: CuboPesos = field(default_factory=CuboPesos)  # persiste entre rondas: el presupuesto es por minuto
+    ultimo: Optional[ResultadoDescarga] = field(default=None, repr=False)
+
+    async def _ronda(self, simbolos: Sequence[str]) -> ResultadoDescarga:
+        # Exchange nuevo por ronda (la sesión aiohttp queda atada al loop de asyncio.run);
+        # los markets de la primera ronda se reutilizan para no repetir load_markets
+        ex = exchange_async(self.exchange_id, self.url_base, self.markets)
+        try:
+            prio = None
+            if self.prioridad:
+                prio = np.array([self.prioridad.get(s, -np.inf) for s in simbolos], dtype=np.float64)
+            descargador = DescargadorLibros(ex, self.limite, self.concurrencia, cubo=self.cubo)
+            res = await descargador.descargar(simbolos, prio)
+            if self.markets is None and getattr(ex, "markets", None):
+                self.markets = ex.markets
+            return res
+        finally:
+            await ex.close()
+
+    def libros(self, simbolos: Sequence[str]) -> Iterator[Libro]:
+        self.ultimo = res = asyncio.run(self._ronda(simbolos))
+        for symbol, error in res.fallidos.items():
+            print(f"⚠️ {symbol}: no se pudo obtener el libro ({error})")
+        yield from res.libros.values()
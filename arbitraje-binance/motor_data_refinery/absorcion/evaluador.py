@@ -0,0 +1,147 @@
+# absorcion/evaluador.py
+"""
+📈 Evaluador vectorizado de spread neto para triadas / ciclos.
+
+Por pierna, la tasa de conversión con libro tope es:
+    bit 1 (compra, QUOTE → BASE): 1 / ask
+    bit 0 (venta , BASE → QUOTE): bid
+y la comisión taker se descuenta multiplicando por (1 - fee_taker). Entonces:
+    gross_spread        = Π tasa - 1
+    fees_total          = 1 - Π (1 - fee)
+    net_spread_expected = Π tasa·(1 - fee) - 1
+
+`Evaluador` precalcula UNA vez por conjunto de rutas el índice plano de cada
+pierna en un vector [tasas de venta | tasas de compra | neutro], así que por
+snapshot solo se arman los vectores del tamaño del universo de símbolos y se
+hace un `take` por pierna multiplicado in-place sobre n rutas. Las piernas de
+relleno (-1, ciclos más cortos que el ancho) apuntan al elemento neutro
+(tasa 1, sin fee).
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from absorcion.ciclos import Ciclos  # type: ignore
+from absorcion.triadas import Triadas  # type: ignore
+
+
+@dataclass
+class Evaluacion:
+    gross_spread: np.ndarray
+    fees_total: np.ndarray
+    net_spread_expected: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.net_spread_expected)
+
+    def top_k(self, k: int) -> np.ndarray:
+        return top_k(self.net_spread_expected, k)
+
+
+def top_k(valores: np.ndarray, k: int) -> np.ndarray:
+    """Índices de los k mayores valores, de mayor a menor (NaN al final); argpartition + orden de k."""
+    v = np.where(np.isnan(valores), -np.inf, valores)
+    k = min(int(k), len(v))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    candidatos = np.argpartition(v, len(v) - k)[len(v) - k:] if k < len(v) else np.arange(len(v))
+    return candidatos[np.argsort(-v[candidatos], kind="stable")]
+
+
+class Evaluador:
+    """Índices precalculados de un conjunto de rutas sobre un universo de `n_simbolos`."""
+
+    def __init__(self, piernas: np.ndarray, direcciones: np.ndarray, n_simbolos: int):
+        self.n_simbolos = int(n_simbolos)
+        piernas = np.asarray(piernas, dtype=np.int64)
+        direcciones = np.asarray(direcciones, dtype=np.int64)
+        idx = piernas + direcciones * self.n_simbolos
+        self.indice = np.where(piernas < 0, 2 * self.n_simbolos, idx).astype(np.intp)
+        # Una columna contigua por pierna: take + producto in-place sin temporales (n, L)
+        self._columnas = [np.ascontiguousarray(self.indice[:, k]) for k in range(self.indice.shape[1])]
+        self._tmp = np.empty(len(self.indice))
+
+    @classmethod
+    def desde_triadas(cls, triadas: Triadas) -> "Evaluador":
+        return cls(triadas.piernas, triadas.bits(), len(triadas.simbolos))
+
+    @classmethod
+    def desde_ciclos(cls, ciclos: Ciclos) -> "Evaluador":
+        return cls(ciclos.piernas, ciclos.direcciones, len(ciclos.simbolos))
+
+    def __len__(self) -> int:
+        return len(self.indice)
+
+    def tasas(self, bid: np.ndarray, ask: np.ndarray, fee_taker: Optional[np.ndarray] = None):
+        """Vectores planos [venta | compra | neutro] de tasa y de factor con fee (tamaño 2S + 1)."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            tasa = np.concatenate([bid, 1.0 / ask, [1.0]])
+        if fee_taker is None:
+            return tasa, tasa
+        fee = np.asarray(fee_taker, dtype=np.float64)
+        neto = 1.0 - np.concatenate([fee, fee, [0.0]])
+        return tasa, tasa * neto
+
+    def _producto(self, vector: np.ndarray) -> np.ndarray:
+        """Π por ruta de `vector[indice]`, pierna por pierna."""
+        out = np.empty(len(self.indice))
+        if not self._columnas:
+            out.fill(1.0)
+            return out
+        np.take(vector, self._columnas[0], out=out)
+        for col in self._columnas[1:]:
+            np.take(vector, col, out=self._tmp)
+            out *= self._tmp
+        return out
+
+    def producto_de(self, vector: np.ndarray, rutas: np.ndarray) -> np.ndarray:
+        """Igual que `_producto` pero solo para un subconjunto de rutas (mismo orden de operaciones)."""
+        out = vector.take(self._columnas[0].take(rutas))
+        for col in self._columnas[1:]:
+            out *= vector.take(col.take(rutas))
+        return out
+
+    def evaluar(self, bid: np.ndarray, ask: np.ndarray, fee_taker: Optional[np.ndarray] = None) -> Evaluacion:
+        """Evalúa todas las rutas contra un snapshot de bid/ask (arrays indexados por id de símbolo)."""
+        tasa, factor = self.tasas(bid, ask, fee_taker)
+        bruto = self._producto(tasa)
+        neto = self._producto(factor) if fee_taker is not None else bruto
+        return Evaluacion(
+            gross_spread=bruto - 1.0,
+            fees_total=1.0 - neto / bruto,
+            net_spread_expected=neto - 1.0,
+        )
+
+    def neto(self, bid: np.ndarray, ask: np.ndarray, fee_taker: np.ndarray) -> np.ndarray:
+        """Solo `net_spread_expected` (camino caliente: un take por pierna, sin gross ni fees)."""
+        _, factor = self.tasas(bid, ask, fee_taker)
+        out = self._producto(factor)
+        out -= 1.0
+        return out
+
+
+def ranking(
+    simbolos: np.ndarray,
+    piernas: np.ndarray,
+    direcciones: np.ndarray,
+    evaluacion: Evaluacion,
+    k: int,
+) -> pd.DataFrame:
+    """Top-K como tabla: `leg<i>` (símbolo), `dir<i>` (compra/venta) y métricas."""
+    top = evaluacion.top_k(k)
+    s = np.append(np.asarray(simbolos, dtype=object), "")
+    out = {}
+    for i in range(piernas.shape[1]):
+        out[f"leg{i + 1}"] = s[piernas[top, i]]
+        out[f"dir{i + 1}"] = np.where(
+            piernas[top, i] < 0, "", np.where(direcciones[top, i] == 1, "compra", "venta")
+        )
+    out["gross_spread"] = evaluacion.gross_spread[top]
+    out["fees_total"] = evaluacion.fees_total[top]
+    out["net_spread_expected"] = evaluacion.net_spread_expected[top]
+    return pd.DataFrame(out)
@@ -0,0 +1,181 @@
+# absorcion/incremental.py
+"""
+⚡ Re-puntuación incremental de rutas ante updates de precio por símbolo.
+
+- `IndiceInvertido`: CSR símbolo → rutas que lo usan en alguna pierna (armado
+  desde las triadas de `triadas_por_forma` o desde `Ciclos`).
+- `PuntuadorIncremental`: mantiene bid/ask/fee por símbolo, el vector plano de
+  factores del `Evaluador` y el `net_spread_expected` de cada ruta. Cada update
+  reescribe solo las entradas del vector de factores de los símbolos tocados y
+  recalcula las rutas que los usan: O(rutas del símbolo) en vez de O(todas).
+- Los mejores spreads se mantienen en un heap con borrado perezoso: cada ruta
+  tiene una versión; las entradas viejas se descartan al llegar a la cima y el
+  heap se compacta cuando crece demasiado. Solo entran al heap las rutas con
+  spread >= `umbral` (las candidatas reales): un símbolo hub toca miles de rutas
+  y empujarlas todas costaría más que el recálculo. Para el ranking completo
+  (incluidas las rutas bajo el umbral) está `ranking_completo`.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from absorcion.ciclos import Ciclos  # type: ignore
+from absorcion.evaluador import Evaluador, top_k  # type: ignore
+from absorcion.triadas import Triadas, rangos  # type: ignore
+
+COMPACTAR_FACTOR = 4  # compactar el heap cuando supera COMPACTAR_FACTOR × rutas (mín. 1024)
+UMBRAL_HEAP = 0.0      # spread neto mínimo para seguir una ruta en el heap
+
+
+class IndiceInvertido:
+    """símbolo id → rutas (CSR: `indptr` por símbolo sobre `rutas`)."""
+
+    def __init__(self, piernas: np.ndarray, n_simbolos: int):
+        piernas = np.asarray(piernas, dtype=np.int64)
+        n, ancho = piernas.shape
+        plano = piernas.ravel()
+        ruta = np.repeat(np.arange(n, dtype=np.int64), ancho)
+        ok = plano >= 0
+        # Pares (símbolo, ruta) únicos, ordenados por símbolo y luego por ruta
+        clave = np.unique(plano[ok] * max(n, 1) + ruta[ok])
+        simbolo = clave // max(n, 1)
+        self.rutas = clave % max(n, 1)
+        self.indptr = np.zeros(n_simbolos + 1, dtype=np.int64)
+        np.cumsum(np.bincount(simbolo, minlength=n_simbolos), out=self.indptr[1:])
+
+    def grado(self) -> np.ndarray:
+        """Cantidad de rutas por símbolo."""
+        return np.diff(self.indptr)
+
+    def rutas_de(self, simbolos: np.ndarray) -> np.ndarray:
+        """Rutas únicas que usan alguno de los símbolos dados."""
+        simbolos = np.atleast_1d(np.asarray(simbolos, dtype=np.int64))
+        if len(simbolos) == 1:
+            s = int(simbolos[0])
+            return self.rutas[self.indptr[s]: self.indptr[s + 1]]
+        largos = self.indptr[simbolos + 1] - self.indptr[simbolos]
+        return np.unique(self.rutas[rangos(self.indptr[simbolos], largos)])
+
+
+class PuntuadorIncremental:
+    """Spread neto por ruta, actualizado solo donde cambian los precios, con heap de mejores."""
+
+    def __init__(
+        self,
+        simbolos: np.ndarray,
+        piernas: np.ndarray,
+        direcciones: np.ndarray,
+        bid: np.ndarray,
+        ask: np.ndarray,
+        fee_taker: np.ndarray,
+        umbral: float = UMBRAL_HEAP,
+    ):
+        self.umbral = float(umbral)
+        self.simbolos = pd.Index(np.asarray(simbolos, dtype=object))
+        n_sim = len(self.simbolos)
+        self.evaluador = Evaluador(piernas, direcciones, n_sim)
+        self.indice = IndiceInvertido(piernas, n_sim)
+        self.bid = np.array(bid, dtype=np.float64)
+        self.ask = np.array(ask, dtype=np.float64)
+        self.fee = np.array(fee_taker, dtype=np.float64)
+        _, self.factor = self.evaluador.tasas(self.bid, self.ask, self.fee)
+        self.net = self.evaluador.neto(self.bid, self.ask, self.fee)
+        self.version = np.zeros(len(self.net), dtype=np.int64)
+        self._heap: List[Tuple[float, int, int]] = []
+        self._reconstruir_heap()
+
+    @classmethod
+    def desde_triadas(cls, triadas: Triadas, bid, ask, fee_taker, umbral: float = UMBRAL_HEAP) -> "PuntuadorIncremental":
+        return cls(triadas.simbolos, triadas.piernas, triadas.bits(), bid, ask, fee_taker, umbral)
+
+    @classmethod
+    def desde_ciclos(cls, ciclos: Ciclos, bid, ask, fee_taker, umbral: float = UMBRAL_HEAP) -> "PuntuadorIncremental":
+        return cls(ciclos.simbolos, ciclos.piernas, ciclos.direcciones, bid, ask, fee_taker, umbral)
+
+    def __len__(self) -> int:
+        return len(self.net)
+
+    # ─────────── Heap con borrado perezoso ───────────
+    def _reconstruir_heap(self) -> None:
+        validas = np.flatnonzero(self.net >= self.umbral)  # NaN queda afuera
+        self._heap = list(zip((-self.net[validas]).tolist(), validas.tolist(), self.version[validas].tolist()))
+        heapq.heapify(self._heap)
+
+    def mejores(self, k: int) -> List[Tuple[int, float]]:
+        """[(ruta, net_spread_expected)] de hasta k mejores rutas con spread >= umbral, de mayor a menor."""
+        vistos: List[Tuple[float, int, int]] = []
+        out: List[Tuple[int, float]] = []
+        heap, version = self._heap, self.version
+        while heap and len(out) < k:
+            entrada = heapq.heappop(heap)
+            neg, ruta, ver = entrada
+            if ver != version[ruta]:
+                continue  # entrada vieja: se descarta definitivamente
+            vistos.append(entrada)
+            out.append((ruta, -neg))
+        for entrada in vistos:
+            heapq.heappush(heap, entrada)
+        return out
+
+    def ranking_completo(self, k: int) -> np.ndarray:
+        """Top-K vectorizado sobre todas las rutas (sin umbral)."""
+        return top_k(self.net, k)
+
+    # ─────────── Updates ───────────
+    def ids(self, simbolos: Iterable[str]) -> np.ndarray:
+        return self.simbolos.get_indexer(pd.Index(list(simbolos), dtype=object))
+
+    def actualizar(
+        self,
+        ids: np.ndarray,
+        bid: np.ndarray,
+        ask: np.ndarray,
+        fee_taker: Optional[np.ndarray] = None,
+    ) -> np.ndarray:
+        """
+        Aplica bid/ask (y opcionalmente fee) de los símbolos `ids` y re-puntúa solo
+        las rutas afectadas. Devuelve los ids de ruta recalculados.
+        """
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        ok = ids >= 0
+        ids = ids[ok]
+        if not len(ids):
+            return np.empty(0, dtype=np.int64)
+        self.bid[ids] = np.atleast_1d(bid)[ok]
+        self.ask[ids] = np.atleast_1d(ask)[ok]
+        if fee_taker is not None:
+            self.fee[ids] = np.atleast_1d(fee_taker)[ok]
+
+        # Entradas del vector plano [venta | compra | neutro] de esos símbolos
+        S = len(self.simbolos)
+        neto = 1.0 - self.fee[ids]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Mismas operaciones que `Evaluador.tasas`, para que el resultado sea bit a bit igual
+            self.factor[ids] = self.bid[ids] * neto
+            self.factor[ids + S] = (1.0 / self.ask[ids]) * neto
+
+        rutas = self.indice.rutas_de(ids)
+        if not len(rutas):
+            return rutas
+        nuevo = self.evaluador.producto_de(self.factor, rutas)
+        nuevo -= 1.0
+        self.net[rutas] = nuevo
+        self.version[rutas] += 1
+
+        candidatas = nuevo >= self.umbral
+        if candidatas.any():
+            r_c = rutas[candidatas]
+            for r, v, ver in zip(r_c.tolist(), (-nuevo[candidatas]).tolist(), self.version[r_c].tolist()):
+                heapq.heappush(self._heap, (v, r, ver))
+            if len(self._heap) > COMPACTAR_FACTOR * max(len(self.net), 1024):
+                self._reconstruir_heap()
+        return rutas
+
+    def actualizar_simbolo(self, simbolo: str, bid: float, ask: float) -> np.ndarray:
+        """Atajo para un update de bookTicker por nombre de símbolo."""
+        return self.actualizar(self.ids([simbolo]), np.array([bid]), np.array([ask]))
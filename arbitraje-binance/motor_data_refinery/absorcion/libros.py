@@ -0,0 +1,143 @@
+# absorcion/libros.py
+"""
+📚 Ingesta de orderbooks para la fase de absorción.
+
+- Fuentes enchufables con la misma interfaz (`libros(simbolos)` → iterador de
+  dicts con formato ccxt: `symbol`, `bids`, `asks`, `timestamp`, `nonce`):
+    · `FuenteCCXT`: REST `fetch_order_book` contra el exchange, un libro por vez.
+    · `FuenteCCXTAsync` (`descarga_libros.py`): la misma ronda con asyncio,
+      prioridad por triada y presupuesto de request weight.
+    · `FuenteGrabada`: reproduce un archivo JSONL grabado (una línea por libro),
+      para correr offline o reproducir una sesión real.
+  `grabar` vuelca libros de cualquier fuente a JSONL.
+- `AlmacenLibros`: arrays NumPy preasignados (símbolos × niveles) de precio y
+  cantidad por lado. Cada libro nuevo se copia sobre su fila: sin dicts por
+  nivel ni realocaciones, listo para el cálculo vectorizado de `capacidad.py`.
+  Los niveles faltantes quedan con precio NaN y cantidad 0.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Protocol, Sequence
+
+import numpy as np
+import pandas as pd
+
+from codigo.config import EXCHANGE_ID, CCXT_OPTIONS, LIBRO_PROFUNDIDAD  # type: ignore
+
+Libro = Dict[str, Any]
+
+
+class FuenteLibros(Protocol):
+    def libros(self, simbolos: Sequence[str]) -> Iterator[Libro]: ...
+
+
+@dataclass
+class FuenteCCXT:
+    """Libros REST vía ccxt (un `fetch_order_book` por símbolo)."""
+    exchange_id: str = EXCHANGE_ID
+    limite: int = LIBRO_PROFUNDIDAD
+    _exchange: Any = field(default=None, repr=False)
+
+    def _ex(self):
+        if self._exchange is None:
+            import ccxt  # import diferido: la fuente grabada no necesita ccxt
+
+            self._exchange = getattr(ccxt, self.exchange_id)(CCXT_OPTIONS)
+        return self._exchange
+
+    def libros(self, simbolos: Sequence[str]) -> Iterator[Libro]:
+        ex = self._ex()
+        for symbol in simbolos:
+            try:
+                yield ex.fetch_order_book(symbol, limit=self.limite)
+            except Exception as e:  # un símbolo caído no corta la ronda
+                print(f"⚠️ {symbol}: no se pudo obtener el libro ({type(e).__name__}: {e})")
+
+
+@dataclass
+class FuenteGrabada:
+    """Reproduce libros desde un JSONL grabado; ignora los símbolos no pedidos."""
+    path: Path
+
+    def libros(self, simbolos: Sequence[str]) -> Iterator[Libro]:
+        pedidos = set(simbolos)
+        with open(self.path, "r", encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                libro = json.loads(linea)
+                if libro.get("symbol") in pedidos:
+                    yield libro
+
+
+def grabar(libros: Iterable[Libro], path: Path) -> Iterator[Libro]:
+    """Pasa los libros tal cual y los agrega al JSONL `path` (para reproducir después)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for libro in libros:
+            f.write(json.dumps({
+                "symbol": libro.get("symbol"),
+                "timestamp": libro.get("timestamp"),
+                "nonce": libro.get("nonce"),
+                "bids": [lvl[:2] for lvl in libro.get("bids") or []],
+                "asks": [lvl[:2] for lvl in libro.get("asks") or []],
+            }, separators=(",", ":")) + "\n")
+            yield libro
+
+
+class AlmacenLibros:
+    """Libros de N símbolos en arrays (N, profundidad) preasignados."""
+
+    def __init__(self, simbolos: Sequence[str], profundidad: int = LIBRO_PROFUNDIDAD):
+        self.simbolos = pd.Index(list(dict.fromkeys(simbolos)), dtype=object)
+        self.profundidad = int(profundidad)
+        n, d = len(self.simbolos), self.profundidad
+        self.bid_px = np.full((n, d), np.nan)
+        self.bid_qty = np.zeros((n, d))
+        self.ask_px = np.full((n, d), np.nan)
+        self.ask_qty = np.zeros((n, d))
+        self.ts = np.zeros(n, dtype=np.int64)        # timestamp ms del último libro (0 = nunca)
+        self.nonce = np.full(n, -1, dtype=np.int64)
+        self._fila: Dict[str, int] = {s: i for i, s in enumerate(self.simbolos)}
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    @staticmethod
+    def _copiar(niveles, px: np.ndarray, qty: np.ndarray) -> None:
+        arr = np.asarray(niveles or [], dtype=np.float64)
+        k = min(len(arr), len(px))
+        if k:
+            px[:k] = arr[:k, 0]
+            qty[:k] = arr[:k, 1]
+        px[k:] = np.nan
+        qty[k:] = 0.0
+
+    def actualizar(self, libro: Libro) -> bool:
+        """Copia un libro sobre la fila de su símbolo. False si el símbolo no está en el almacén."""
+        i = self._fila.get(libro.get("symbol"))  # type: ignore[arg-type]
+        if i is None:
+            return False
+        self._copiar(libro.get("bids"), self.bid_px[i], self.bid_qty[i])
+        self._copiar(libro.get("asks"), self.ask_px[i], self.ask_qty[i])
+        self.ts[i] = libro.get("timestamp") or 0
+        nonce = libro.get("nonce")
+        self.nonce[i] = nonce if nonce is not None else -1
+        return True
+
+    def ingerir(self, fuente: FuenteLibros, simbolos: Optional[Sequence[str]] = None) -> int:
+        """Consume una ronda de la fuente; devuelve cuántos libros se aplicaron."""
+        pedidos = list(self.simbolos) if simbolos is None else list(simbolos)
+        return sum(self.actualizar(libro) for libro in fuente.libros(pedidos))
+
+    def filas(self, simbolos: Iterable[str]) -> np.ndarray:
+        """Filas del almacén para los símbolos pedidos (-1 si no están)."""
+        return self.simbolos.get_indexer(pd.Index(list(simbolos), dtype=object))
+
+    def con_libro(self) -> np.ndarray:
+        """Máscara de filas que ya recibieron al menos un libro con ambos lados."""
+        return np.isfinite(self.bid_px[:, 0]) & np.isfinite(self.ask_px[:, 0])
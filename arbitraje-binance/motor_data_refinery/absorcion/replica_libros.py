@@ -0,0 +1,395 @@
+# absorcion/replica_libros.py
+"""
+📗 Réplica local de orderbooks desde el diff stream de profundidad (`<id>@depth`).
+
+Para calcular absorción en continuo no se puede re-pedir el snapshot REST de
+cada libro en cada ronda: se siembra una vez y se mantiene con los eventos
+`depthUpdate` (`U` primer update id, `u` último, `b`/`a` niveles con cantidad
+absoluta; 0 = borrar el nivel), siguiendo el procedimiento de Binance:
+
+- Sin sincronizar, los eventos se encolan. Al sembrar con un snapshot
+  (`lastUpdateId`) se descartan los de `u <= lastUpdateId` y se aplican los
+  demás en orden. Si el snapshot es anterior al primer encolado
+  (`lastUpdateId + 1 < U`) la réplica no queda vigente y también se avisa a
+  `on_hueco`: hace falta un snapshot más nuevo.
+- Sincronizado, un evento con `u <= last_update_id` es viejo (se descarta) y
+  uno con `U > last_update_id + 1` es un hueco: la réplica queda no vigente,
+  encola desde ahí y avisa a `on_hueco` para pedir un snapshot nuevo
+  (`GestorReplicas.resincronizar` lo hace con `DescargadorLibros`).
+
+Cada lado guarda las claves ordenadas (precio como entero escalado a 1e-8),
+con el mejor nivel al FINAL, y un dict clave → cantidad: el tope es O(1), un
+update de un nivel existente (el caso común) es un acceso al dict, y sólo si
+el nivel es nuevo o se borra hay búsqueda binaria O(log n) más un memmove de
+los niveles peores que él (pocos: los updates se concentran cerca del tope).
+El texto de precio → clave entera se memoiza por lado (los mismos precios se
+repiten evento tras evento). Sin claves float inexactas.
+
+`GestorReplicas` enruta mensajes por símbolo, se maneja igual en vivo o desde
+un JSONL grabado (`reproducir`: mensajes combinados del stream + líneas
+`{"tipo": "snapshot", ...}`) y vuelca los libros vigentes a `AlmacenLibros`
+para `capacidad.py`. `FuenteReplica` envuelve una grabación con la interfaz
+de fuentes de `libros.py` (`6_capacidad_absorcion.py --diffs`).
+"""
+
+from __future__ import annotations
+
+import json
+from bisect import bisect_left, insort
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from absorcion.libros import AlmacenLibros, Libro  # type: ignore
+from codigo.config import LIBRO_PROFUNDIDAD  # type: ignore
+from codigo.feed_bookticker import id_stream  # type: ignore
+
+ESCALA_PRECIO = 10 ** 8  # Binance spot: hasta 8 decimales → claves enteras exactas
+PENDIENTES_MAX = 10_000  # eventos encolados por símbolo mientras espera snapshot
+CLAVES_MEMO_MAX = 4_096  # textos de precio memoizados por lado (se vacía al pasarse)
+
+# Resultado de `ReplicaLibro.aplicar`
+APLICADO, VIEJO, HUECO, PENDIENTE = 0, 1, 2, 3
+
+OnHuecoReplica = Callable[[str], None]  # símbolo
+
+
+class LadoLibro:
+    """Niveles de un lado: claves enteras (signo · precio · 1e8) ascendentes, mejor al final, y su cantidad."""
+
+    __slots__ = ("signo", "claves", "cantidad", "_memo")
+
+    def __init__(self, signo: int):
+        self.signo = signo  # +1 bids (mejor = mayor precio), -1 asks (mejor = menor precio)
+        self.claves: List[int] = []
+        self.cantidad: Dict[int, float] = {}
+        self._memo: Dict[object, int] = {}  # texto de precio → clave
+
+    def __len__(self) -> int:
+        return len(self.claves)
+
+    @property
+    def cantidades(self) -> List[float]:
+        """Cantidades alineadas a `claves` (peor → mejor)."""
+        return [self.cantidad[k] for k in self.claves]
+
+    def cargar(self, niveles: Iterable[Sequence]) -> None:
+        """Reemplaza el lado por los niveles de un snapshot (precio, cantidad) en cualquier orden."""
+        s = self.signo
+        self.cantidad = {s * round(float(p) * ESCALA_PRECIO): float(q) for p, q, *_ in niveles if float(q) > 0}
+        self.claves = sorted(self.cantidad)
+
+    def aplicar(self, niveles: Iterable[Sequence]) -> None:
+        """Aplica niveles (precio, cantidad absoluta; 0 borra)."""
+        claves, cantidad, memo = self.claves, self.cantidad, self._memo
+        for p, q in niveles:
+            k = memo.get(p)
+            if k is None:
+                if len(memo) >= CLAVES_MEMO_MAX:
+                    memo.clear()
+                k = memo[p] = self.signo * round(float(p) * ESCALA_PRECIO)
+            q = float(q)
+            if q:
+                if k not in cantidad:
+                    insort(claves, k)
+                cantidad[k] = q
+            elif cantidad.pop(k, None) is not None:
+                del claves[bisect_left(claves, k)]
+
+    def mejor(self) -> Tuple[float, float]:
+        """(precio, cantidad) del tope; (nan, 0) si el lado está vacío."""
+        if not self.claves:
+            return float("nan"), 0.0
+        k = self.claves[-1]
+        return self.signo * k / ESCALA_PRECIO, self.cantidad[k]
+
+    def niveles(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Los n mejores niveles, del mejor al peor, como arrays (precio, cantidad)."""
+        mejores = self.claves[-n:][::-1]
+        claves = np.asarray(mejores, dtype=np.int64)
+        px = (claves * self.signo).astype(np.float64) / ESCALA_PRECIO  # división exacta, igual que `mejor`
+        return px, np.asarray([self.cantidad[k] for k in mejores], dtype=np.float64)
+
+
+class ReplicaLibro:
+    """Libro de un símbolo mantenido con eventos `depthUpdate` secuenciados."""
+
+    def __init__(self, symbol: str, pendientes_max: int = PENDIENTES_MAX):
+        self.symbol = symbol
+        self.bids = LadoLibro(1)
+        self.asks = LadoLibro(-1)
+        self.last_update_id = -1
+        self.ts = 0  # `E` (ms) del último evento aplicado
+        self.sincronizado = False
+        self.pendientes: deque = deque(maxlen=pendientes_max)
+        self.aplicados = 0
+        self.descartados = 0
+        self.huecos = 0
+        self.siembras = 0
+
+    def sembrar(self, snapshot: Libro) -> bool:
+        """
+        Carga un snapshot (crudo de Binance `lastUpdateId` o ccxt `nonce`) y aplica
+        lo encolado posterior. Devuelve si quedó sincronizado: False si entre el
+        snapshot y lo encolado falta algún update (hueco al reaplicar).
+        """
+        lid = snapshot.get("lastUpdateId", snapshot.get("nonce"))
+        if lid is None:
+            raise ValueError(f"❌ Snapshot de {self.symbol} sin lastUpdateId/nonce: no se puede secuenciar")
+        self.bids.cargar(snapshot.get("bids") or [])
+        self.asks.cargar(snapshot.get("asks") or [])
+        self.last_update_id = int(lid)
+        self.ts = snapshot.get("timestamp") or self.ts
+        self.sincronizado = True
+        self.siembras += 1
+        encolados = list(self.pendientes)
+        self.pendientes.clear()
+        for evento in encolados:
+            self.aplicar(evento)
+        return self.sincronizado
+
+    def aplicar(self, evento: dict) -> int:
+        """Aplica un `depthUpdate`; APLICADO, VIEJO (u ya visto), HUECO (falta U) o PENDIENTE (sin snapshot)."""
+        if not self.sincronizado:
+            self.pendientes.append(evento)
+            return PENDIENTE
+        u = evento["u"]
+        if u <= self.last_update_id:
+            self.descartados += 1
+            return VIEJO
+        if evento["U"] > self.last_update_id + 1:
+            self.huecos += 1
+            self.sincronizado = False
+            self.pendientes.clear()
+            self.pendientes.append(evento)
+            return HUECO
+        self.bids.aplicar(evento["b"])
+        self.asks.aplicar(evento["a"])
+        self.last_update_id = u
+        self.ts = evento.get("E", self.ts)
+        self.aplicados += 1
+        return APLICADO
+
+    def tope(self) -> Tuple[float, float, float, float]:
+        """(bid, bid_qty, ask, ask_qty) en O(1); se lee tras cada evento, así que sin pasar por `mejor`."""
+        bids, asks = self.bids, self.asks
+        if bids.claves and asks.claves:
+            kb, ka = bids.claves[-1], asks.claves[-1]
+            return kb / ESCALA_PRECIO, bids.cantidad[kb], -ka / ESCALA_PRECIO, asks.cantidad[ka]
+        return (*bids.mejor(), *asks.mejor())
+
+    def a_libro(self, profundidad: int) -> Libro:
+        """Libro con formato ccxt (lo que consume `AlmacenLibros.actualizar`)."""
+        bpx, bq = self.bids.niveles(profundidad)
+        apx, aq = self.asks.niveles(profundidad)
+        return {
+            "symbol": self.symbol,
+            "bids": np.column_stack([bpx, bq]).tolist(),
+            "asks": np.column_stack([apx, aq]).tolist(),
+            "timestamp": self.ts,
+            "nonce": self.last_update_id,
+        }
+
+
+class GestorReplicas:
+    """Réplicas de N símbolos: enruta eventos por id de exchange y coordina las resincronizaciones."""
+
+    def __init__(self, simbolos: Sequence[str], markets: Optional[Dict[str, dict]] = None):
+        self.replicas: Dict[str, ReplicaLibro] = {s: ReplicaLibro(s) for s in dict.fromkeys(simbolos)}
+        self._por_id: Dict[str, ReplicaLibro] = {id_stream(s, markets).upper(): r for s, r in self.replicas.items()}
+        self.on_hueco: List[OnHuecoReplica] = []
+        self.eventos = 0
+        self.ignorados = 0  # eventos de símbolos que no están en el gestor
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def __getitem__(self, symbol: str) -> ReplicaLibro:
+        return self.replicas[symbol]
+
+    def aplicar_evento(self, data: dict) -> int:
+        """Payload `depthUpdate` de Binance ({e, E, s, U, u, b, a})."""
+        replica = self._por_id.get(data["s"])
+        if replica is None:
+            self.ignorados += 1
+            return VIEJO
+        self.eventos += 1
+        estado = replica.aplicar(data)
+        if estado == HUECO:
+            for cb in self.on_hueco:
+                cb(replica.symbol)
+        return estado
+
+    def sembrar(self, symbol: str, snapshot: Libro) -> bool:
+        """Siembra `symbol`; True si quedó sincronizado. Un snapshot viejo para lo encolado avisa a `on_hueco`."""
+        replica = self.replicas.get(symbol)
+        if replica is None:
+            return False
+        if replica.sembrar(snapshot):
+            return True
+        for cb in self.on_hueco:
+            cb(symbol)
+        return False
+
+    def aplicar_mensaje(self, msg: dict) -> int:
+        """Mensaje combinado del stream (`{"stream", "data"}`), payload suelto o línea de snapshot grabada."""
+        if msg.get("tipo") == "snapshot":
+            if msg["symbol"] not in self.replicas:
+                return VIEJO
+            return APLICADO if self.sembrar(msg["symbol"], msg) else HUECO
+        return self.aplicar_evento(msg.get("data", msg))
+
+    def reproducir(self, path: Path) -> int:
+        """Aplica un JSONL grabado (mensajes + snapshots) en orden; devuelve cuántas líneas procesó."""
+        n = 0
+        with open(path, encoding="utf-8") as f:
+            for linea in f:
+                if linea.strip():
+                    self.aplicar_mensaje(json.loads(linea))
+                    n += 1
+        return n
+
+    def por_sincronizar(self) -> List[str]:
+        """Símbolos sin snapshot o con hueco pendiente de resincronizar."""
+        return [s for s, r in self.replicas.items() if not r.sincronizado]
+
+    async def resincronizar(self, descargador, prioridad: Optional[np.ndarray] = None) -> int:
+        """
+        Pide snapshots de los símbolos no vigentes con `DescargadorLibros` y los
+        siembra; devuelve cuántos quedaron sincronizados (los demás avisan a `on_hueco`).
+        """
+        pendientes = self.por_sincronizar()
+        if not pendientes:
+            return 0
+        res = await descargador.descargar(pendientes, prioridad)
+        return sum(self.sembrar(symbol, libro) for symbol, libro in res.libros.items())
+
+    def volcar_en(self, almacen: AlmacenLibros) -> int:
+        """Copia los libros vigentes a las filas de `almacen`; devuelve cuántos copió."""
+        return sum(
+            almacen.actualizar(r.a_libro(almacen.profundidad))
+            for r in self.replicas.values() if r.sincronizado
+        )
+
+    def resumen(self) -> Dict[str, int]:
+        rs = self.replicas.values()
+        return {
+            "eventos": self.eventos,
+            "aplicados": sum(r.aplicados for r in rs),
+            "descartados": sum(r.descartados for r in rs),
+            "huecos": sum(r.huecos for r in rs),
+            "siembras": sum(r.siembras for r in rs),
+            "vigentes": sum(r.sincronizado for r in rs),
+            "ignorados": self.ignorados,
+        }
+
+
+@dataclass
+class FuenteReplica:
+    """Fuente de libros: reproduce un JSONL de diffs + snapshots y entrega los libros vigentes al final."""
+    path: Path
+    profundidad: int = LIBRO_PROFUNDIDAD
+
+    def libros(self, simbolos: Sequence[str]) -> Iterator[Libro]:
+        gestor = GestorReplicas(simbolos)
+        gestor.reproducir(self.path)
+        for replica in gestor.replicas.values():
+            if replica.sincronizado:
+                yield replica.a_libro(self.profundidad)
+
+
+def grabacion_sintetica(
+    simbolos: Sequence[str],
+    n_eventos: int,
+    niveles_por_evento: int = 10,
+    prob_hueco: float = 0.0,
+    retraso_snapshot: int = 50,
+    profundidad_snapshot: int = 1000,
+    semilla: int = 7,
+) -> Tuple[List[dict], Dict[str, Tuple[List[Tuple[int, float]], List[Tuple[int, float]]]]]:
+    """
+    Stream `depthUpdate` sintético: snapshot inicial por símbolo y eventos con
+    updates concentrados cerca del tope (20% borrados). Con `prob_hueco`, un
+    evento se pierde (el libro "real" lo aplica pero no sale en la grabación) y
+    `retraso_snapshot` eventos después aparece un snapshot nuevo de ese
+    símbolo, como la resincronización por REST. Devuelve (mensajes, libro real
+    final por símbolo como listas ordenadas de (clave entera, cantidad)).
+    """
+    rng = np.random.default_rng(semilla)
+    ids = [id_stream(s).upper() for s in simbolos]
+    mids = np.round(np.exp(rng.uniform(-3, 8, len(simbolos))), 2) * ESCALA_PRECIO
+    ticks = np.maximum(1, (mids * 1e-5).astype(np.int64))
+    libros: List[Tuple[Dict[int, float], Dict[int, float]]] = []
+    last = [1_000] * len(simbolos)
+    mensajes: List[dict] = []
+
+    def precio(k: int) -> str:
+        return f"{k / ESCALA_PRECIO:.8f}"
+
+    def snapshot(i: int) -> dict:
+        bids, asks = libros[i]
+        b = sorted(bids.items(), reverse=True)[:profundidad_snapshot]
+        a = sorted(asks.items())[:profundidad_snapshot]
+        return {"tipo": "snapshot", "symbol": simbolos[i], "lastUpdateId": last[i],
+                "bids": [[precio(k), f"{q:.4f}"] for k, q in b], "asks": [[precio(k), f"{q:.4f}"] for k, q in a]}
+
+    for i in range(len(simbolos)):
+        mid, tick = int(mids[i]), int(ticks[i])
+        bids = {mid - (j + 1) * tick: round(float(rng.uniform(0.1, 50)), 4) for j in range(200)}
+        asks = {mid + (j + 1) * tick: round(float(rng.uniform(0.1, 50)), 4) for j in range(200)}
+        libros.append((bids, asks))
+        mensajes.append(snapshot(i))
+
+    quien = rng.integers(0, len(simbolos), n_eventos)
+    distancia = np.minimum(rng.geometric(0.15, (n_eventos, niveles_por_evento)), 400)
+    lado = rng.random((n_eventos, niveles_por_evento)) < 0.5
+    borrar = rng.random((n_eventos, niveles_por_evento)) < 0.2
+    qty = np.round(rng.uniform(0.1, 50, (n_eventos, niveles_por_evento)), 4)
+    perdido = rng.random(n_eventos) < prob_hueco
+    extra = rng.integers(0, 3, n_eventos)
+    resync: Dict[int, List[int]] = {}
+
+    for e in range(n_eventos):
+        for i in resync.pop(e, []):
+            mensajes.append(snapshot(i))
+        i = int(quien[e])
+        mid, tick = int(mids[i]), int(ticks[i])
+        bids, asks = libros[i]
+        b, a = [], []
+        for d, es_bid, borra, q in zip(distancia[e].tolist(), lado[e].tolist(), borrar[e].tolist(), qty[e].tolist()):
+            k = mid - d * tick if es_bid else mid + d * tick
+            libro, salida = (bids, b) if es_bid else (asks, a)
+            texto = "0.0000" if borra else f"{q:.4f}"
+            if borra:
+                libro.pop(k, None)
+            else:
+                libro[k] = float(texto)  # lo mismo que parsea la réplica
+            salida.append([precio(k), texto])
+        U = last[i] + 1
+        last[i] = U + int(extra[e])
+        if perdido[e]:
+            resync.setdefault(e + retraso_snapshot, []).append(i)
+            continue
+        mensajes.append({
+            "stream": f"{ids[i].lower()}@depth@100ms",
+            "data": {"e": "depthUpdate", "E": 1_700_000_000_000 + e, "s": ids[i], "U": U, "u": last[i], "b": b, "a": a},
+        })
+    for e in sorted(resync):
+        for i in resync[e]:
+            mensajes.append(snapshot(i))
+
+    finales = {
+        s: (sorted(bids.items()), sorted((-k, q) for k, q in asks.items()))
+        for s, (bids, asks) in zip(simbolos, libros)
+    }
+    return mensajes, finales
+
+
+def guardar_grabacion(mensajes: Iterable[dict], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for m in mensajes:
+            f.write(json.dumps(m, separators=(",", ":")) + "\n")
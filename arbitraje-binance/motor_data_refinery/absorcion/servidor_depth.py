@@ -0,0 +1,262 @@
+# absorcion/servidor_depth.py
+"""
+🧪 Servidor HTTP local que imita `GET /api/v3/depth` de Binance (y un stand-in en proceso).
+
+Para probar `absorcion/descarga_libros.py` sin red ni riesgo de ban de IP:
+
+- `MotorDepth`: libros sintéticos deterministas por símbolo (mismo id → mismo
+  mid) y contabilidad de request weight en ventanas fijas de 1 minuto, como
+  Binance: cada request suma su peso (también las rechazadas) y pasado el
+  límite se responde 429 con `Retry-After` hasta el cambio de ventana.
+- `ServidorDepth`: app aiohttp con `/api/v3/depth` (respuesta cruda de
+  Binance: `lastUpdateId`, `bids`, `asks` como strings) y la cabecera
+  `X-MBX-USED-WEIGHT-1M`; errores con el cuerpo `{"code", "msg"}` de Binance
+  (-1003 límite, -1121 símbolo inválido, -1001 error interno inyectado).
+  `exchange_async(url_base="http://127.0.0.1:8766")` apunta ccxt acá.
+- `ExchangeSimulado`: el mismo motor detrás de un `fetch_order_book` async en
+  proceso (latencia y errores inyectables, excepciones con los nombres de las
+  de ccxt), para benchmarks del scheduler sin aiohttp ni ccxt.
+
+CLI:
+    python -m absorcion.servidor_depth [--puerto 8766] [--peso-por-minuto 6000] [--latencia 0.05] [--tasa-error 0.01]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from absorcion.descarga_libros import peso_depth  # type: ignore
+from codigo.config import LIBROS_PESO_POR_MINUTO  # type: ignore
+
+PUERTO_DEFECTO = 8766
+
+
+# Mismos nombres que las excepciones de ccxt: `clasificar_error` las trata igual
+class NetworkError(Exception):
+    pass
+
+
+class RateLimitExceeded(NetworkError):
+    pass
+
+
+class BadSymbol(Exception):
+    pass
+
+
+def id_exchange(simbolo: str) -> str:
+    """'BTC/USDT' → 'BTCUSDT'."""
+    return simbolo.replace("/", "").upper()
+
+
+class MotorDepth:
+    """Libros sintéticos + peso usado por ventana fija (por defecto 1 minuto)."""
+
+    def __init__(
+        self,
+        simbolos: Optional[Sequence[str]] = None,
+        peso_por_minuto: int = LIBROS_PESO_POR_MINUTO,
+        ventana_s: float = 60.0,
+        spread: float = 2e-4,
+    ):
+        self.ids: Optional[Dict[str, str]] = None if simbolos is None else {id_exchange(s): s for s in simbolos}
+        self.peso_por_minuto = int(peso_por_minuto)
+        self.ventana_s = float(ventana_s)
+        self.spread = spread
+        self.usado = 0
+        self.servidos = 0
+        self.rechazados = 0
+        self.usado_max = 0
+        self._ventana = -1
+        self._update_id = 0
+
+    def cobrar(self, peso: int, ahora: Optional[float] = None) -> Tuple[bool, int, float]:
+        """(aceptada, peso usado en la ventana, segundos hasta la próxima ventana si se rechaza)."""
+        ahora = time.time() if ahora is None else ahora
+        ventana = int(ahora // self.ventana_s)
+        if ventana != self._ventana:
+            self._ventana, self.usado = ventana, 0
+        self.usado += peso
+        self.usado_max = max(self.usado_max, self.usado)
+        if self.usado > self.peso_por_minuto:
+            self.rechazados += 1
+            return False, self.usado, (ventana + 1) * self.ventana_s - ahora
+        return True, self.usado, 0.0
+
+    def libro_crudo(self, id_ex: str, limite: int) -> Optional[dict]:
+        """Respuesta cruda de /api/v3/depth; None si el símbolo no existe."""
+        id_ex = id_ex.upper()
+        if not id_ex or (self.ids is not None and id_ex not in self.ids):
+            return None
+        semilla = zlib.crc32(id_ex.encode())
+        rng = np.random.default_rng(semilla ^ self._update_id)
+        mid = math.exp((semilla % 2000) / 200.0 - 5.0)
+        tick = mid * 1e-5
+        k = np.arange(limite)
+        bids = mid * (1 - self.spread) - k * tick
+        asks = mid * (1 + self.spread) + k * tick
+        qty = rng.uniform(0.1, 50.0, (2, limite))
+        self._update_id += 1
+        self.servidos += 1
+        return {
+            "lastUpdateId": self._update_id,
+            "bids": [[f"{p:.8g}", f"{q:.4f}"] for p, q in zip(bids.tolist(), qty[0].tolist()) if p > 0],
+            "asks": [[f"{p:.8g}", f"{q:.4f}"] for p, q in zip(asks.tolist(), qty[1].tolist())],
+        }
+
+
+def a_ccxt(symbol: str, crudo: dict) -> dict:
+    """Respuesta cruda de Binance → libro con el formato de `fetch_order_book` de ccxt."""
+    return {
+        "symbol": symbol,
+        "bids": [[float(p), float(q)] for p, q in crudo["bids"]],
+        "asks": [[float(p), float(q)] for p, q in crudo["asks"]],
+        "timestamp": None,
+        "datetime": None,
+        "nonce": crudo["lastUpdateId"],
+    }
+
+
+class ExchangeSimulado:
+    """`fetch_order_book` async en proceso sobre un `MotorDepth` (latencia lognormal, errores inyectables)."""
+
+    def __init__(self, motor: MotorDepth, latencia_s: float = 0.08, tasa_error: float = 0.0, semilla: int = 7):
+        self.motor = motor
+        self.latencia_s = latencia_s
+        self.tasa_error = tasa_error
+        self.last_response_headers: Dict[str, str] = {}
+        self.pedidos = 0
+        self.en_vuelo = 0
+        self.max_en_vuelo = 0
+        self._rng = np.random.default_rng(semilla)
+
+    async def fetch_order_book(self, symbol: str, limit: int = 100, params: Optional[dict] = None) -> dict:
+        self.pedidos += 1
+        self.en_vuelo += 1
+        self.max_en_vuelo = max(self.max_en_vuelo, self.en_vuelo)
+        try:
+            if self.latencia_s > 0:
+                await asyncio.sleep(self.latencia_s * float(self._rng.lognormal(0.0, 0.35)))
+            ok, usado, retry = self.motor.cobrar(peso_depth(limit))
+            self.last_response_headers = {"X-MBX-USED-WEIGHT-1M": str(usado)}
+            if not ok:
+                self.last_response_headers["Retry-After"] = str(math.ceil(retry))
+                raise RateLimitExceeded(f'binance {{"code":-1003,"msg":"Too many requests; weight {usado}."}}')
+            if self.tasa_error and self._rng.random() < self.tasa_error:
+                raise NetworkError("binance GET /api/v3/depth: conexión reiniciada (simulada)")
+            crudo = self.motor.libro_crudo(id_exchange(symbol), limit)
+            if crudo is None:
+                raise BadSymbol(f"binance does not have market symbol {symbol}")
+            return a_ccxt(symbol, crudo)
+        finally:
+            self.en_vuelo -= 1
+
+    async def close(self) -> None:
+        pass
+
+
+class ServidorDepth:
+    """App aiohttp con `/api/v3/depth` sobre un `MotorDepth`."""
+
+    def __init__(self, motor: MotorDepth, latencia_s: float = 0.0, tasa_error: float = 0.0, semilla: int = 7):
+        self.motor = motor
+        self.latencia_s = latencia_s
+        self.tasa_error = tasa_error
+        self.pedidos = 0
+        self._rng = np.random.default_rng(semilla)
+
+    def app(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/api/v3/depth", self._depth)
+        app.router.add_get("/api/v3/ping", self._ping)
+        return app
+
+    async def _ping(self, request):
+        from aiohttp import web
+
+        return web.json_response({})
+
+    async def _depth(self, request):
+        from aiohttp import web
+
+        self.pedidos += 1
+        try:
+            limite = int(request.query.get("limit", 100))
+            peso = peso_depth(limite)
+        except ValueError:
+            return web.json_response({"code": -1100, "msg": "Illegal characters found in parameter 'limit'."}, status=400)
+        if self.latencia_s > 0:
+            await asyncio.sleep(self.latencia_s * float(self._rng.lognormal(0.0, 0.35)))
+
+        ok, usado, retry = self.motor.cobrar(peso)
+        cabeceras = {"X-MBX-USED-WEIGHT-1M": str(usado)}
+        if not ok:
+            cabeceras["Retry-After"] = str(math.ceil(retry))
+            return web.json_response(
+                {"code": -1003, "msg": f"Too many requests; current limit is {self.motor.peso_por_minuto} request weight per 1 MINUTE."},
+                status=429, headers=cabeceras,
+            )
+        if self.tasa_error and self._rng.random() < self.tasa_error:
+            return web.json_response(
+                {"code": -1001, "msg": "Internal error; unable to process your request. Please try again."},
+                status=503, headers=cabeceras,
+            )
+        crudo = self.motor.libro_crudo(request.query.get("symbol", ""), limite)
+        if crudo is None:
+            return web.json_response({"code": -1121, "msg": "Invalid symbol."}, status=400, headers=cabeceras)
+        return web.json_response(crudo, headers=cabeceras)
+
+
+async def servir(servidor: ServidorDepth, host: str = "127.0.0.1", puerto: int = PUERTO_DEFECTO):
+    """Levanta el servidor y devuelve el runner (llamar `await runner.cleanup()` al terminar)."""
+    from aiohttp import web
+
+    runner = web.AppRunner(servidor.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, puerto).start()
+    return runner
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Servidor local que imita GET /api/v3/depth de Binance")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    parser.add_argument("--peso-por-minuto", type=int, default=LIBROS_PESO_POR_MINUTO)
+    parser.add_argument("--latencia", type=float, default=0.05, help="Latencia media por request (s)")
+    parser.add_argument("--tasa-error", type=float, default=0.0, help="Fracción de respuestas 503 inyectadas")
+    args = parser.parse_args(argv)
+
+    motor = MotorDepth(peso_por_minuto=args.peso_por_minuto)
+    servidor = ServidorDepth(motor, args.latencia, args.tasa_error)
+    print(f"🧪 http://{args.host}:{args.puerto}/api/v3/depth · {args.peso_por_minuto} de peso por minuto")
+
+    async def _correr():
+        runner = await servir(servidor, args.host, args.puerto)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(_correr())
+    except KeyboardInterrupt:
+        print(f"\n👋 {servidor.pedidos} pedidos · {motor.servidos} libros · {motor.rechazados} rechazados (429)")
+
+
+if __name__ == "__main__":
+    main()
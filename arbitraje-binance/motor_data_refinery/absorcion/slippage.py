@@ -0,0 +1,302 @@
+# absorcion/slippage.py
+"""
+🎲 Simulador de slippage multi-escenario por triada (Monte Carlo vectorizado).
+
+Cada pierna barre su libro (`AlmacenLibros`) y eso es una curva lineal por
+tramos entrada acumulada → salida acumulada:
+    bit 1 (compra, QUOTE → BASE): Σ px·qty (quote gastada) → Σ qty (base recibida)
+    bit 0 (venta , BASE → QUOTE): Σ qty (base vendida)     → Σ px·qty (quote recibida)
+
+Un escenario perturba cada pierna k con dos factores (`Escenarios`):
+    - decaimiento de profundidad f ≤ 1: cantidades × f;
+    - deriva de precio por latencia m: precios × m, log m ~ N(0, σ·√(k·latencia)),
+      porque la pierna k sale después de k saltos.
+Los dos solo re-escalan la curva g del libro guardado:
+    compra: f·g(x / (f·m))        venta: f·m·g(x / f)
+así que no hace falta rearmar libros por escenario.
+
+`TablaBarrido` concatena las curvas de todos los símbolos y lados en un solo
+eje ordenado. La curva c ocupa [2c, 2c + 1], con la entrada normalizada por su
+profundidad total. Así una pierna de un bloque triadas × escenarios × tamaños
+es UN `np.interp` (más un par de productos elemento a elemento). La clave
+2c + u redondea u al ulp de 2c; eso se corrige a primer orden con la pendiente
+del mejor nivel, así que entradas chicas frente a la profundidad no pierden
+dígitos. Una entrada que supera la profundidad guardada da NaN (como
+`escalera_vwap`).
+
+Por triada y tamaño de la grilla (USDT que entran por el ancla):
+    slippage = 1 - salida / (notional · Π tasa del mejor nivel)
+promediado sobre los escenarios que llenan, más la fracción que llena.
+Fees aparte: multiplican igual al ideal y al simulado.
+`absorption_cap` es el mayor tamaño de la grilla tal que él y todos los
+menores tienen slippage esperado ≤ tolerancia y llenado ≥ `SIMULACION_LLENADO_MIN`.
+
+`simular` reparte bloques de triadas en un pool de procesos. La tabla de
+curvas y los escenarios viajan una vez por proceso, en el initializer.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+
+import numpy as np
+
+from codigo.config import (  # type: ignore
+    SIMULACION_DECAIMIENTO, SIMULACION_ESCENARIOS, SIMULACION_GRILLA_USDT, SIMULACION_LATENCIA_MS,
+    SIMULACION_LLENADO_MIN, SIMULACION_PERCENTIL, SIMULACION_PROCESOS, SIMULACION_REFERENCIA_USDT,
+    SIMULACION_VOLATILIDAD, TOLERANCIA_SLIPPAGE,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from absorcion.libros import AlmacenLibros
+    from absorcion.triadas import Triadas
+
+ELEMENTOS_POR_BLOQUE = 2_000_000  # triadas × escenarios × tamaños por bloque (~16 MB por array)
+
+
+@dataclass
+class Escenarios:
+    """Perturbaciones por escenario y pierna: factor de profundidad y multiplicador de precio."""
+    decaimiento: np.ndarray  # (E, L) f ∈ (0, 1]
+    deriva: np.ndarray       # (E, L) m > 0
+
+    def __len__(self) -> int:
+        return len(self.decaimiento)
+
+    @classmethod
+    def generar(
+        cls,
+        n: int = SIMULACION_ESCENARIOS,
+        piernas: int = 3,
+        decaimiento: float = SIMULACION_DECAIMIENTO,
+        latencia_ms: float = SIMULACION_LATENCIA_MS,
+        volatilidad: float = SIMULACION_VOLATILIDAD,
+        semilla: int = 7,
+    ) -> "Escenarios":
+        rng = np.random.default_rng(semilla)
+        f = np.exp(-rng.exponential(decaimiento, (n, piernas))) if decaimiento > 0 else np.ones((n, piernas))
+        latencia_s = latencia_ms / 1000.0 * rng.lognormal(0.0, 0.5, (n, 1))
+        horizonte = latencia_s * np.arange(1, piernas + 1)
+        m = np.exp(rng.standard_normal((n, piernas)) * volatilidad * np.sqrt(horizonte))
+        return cls(f, m)
+
+
+@dataclass
+class TablaBarrido:
+    """Curvas de barrido de 2n lados ([venta | compra], como el `Evaluador`) sobre un eje común."""
+    claves: np.ndarray   # (2n·(d+1),) 2c + entrada acumulada / total, creciente
+    salidas: np.ndarray  # (2n·(d+1),) salida acumulada
+    total: np.ndarray    # (2n,) entrada que agota la profundidad guardada (0 sin libro)
+    tasa: np.ndarray     # (2n,) salida por unidad de entrada en el mejor nivel (NaN sin libro)
+
+    @classmethod
+    def desde_arrays(cls, bid_px, bid_qty, ask_px, ask_qty) -> "TablaBarrido":
+        n, d = bid_px.shape
+        px = np.concatenate([bid_px, ask_px])
+        qty = np.concatenate([bid_qty, ask_qty])
+        valido = np.isfinite(px) & (qty > 0)
+        cantidad = np.where(valido, qty, 0.0)
+        valor = np.where(valido, px, 0.0) * cantidad
+        compra = (np.arange(2 * n) >= n)[:, None]
+        entrada = np.zeros((2 * n, d + 1))
+        salida = np.zeros((2 * n, d + 1))
+        np.cumsum(np.where(compra, valor, cantidad), axis=1, out=entrada[:, 1:])
+        np.cumsum(np.where(compra, cantidad, valor), axis=1, out=salida[:, 1:])
+        total = entrada[:, -1].copy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            normal = np.where(total[:, None] > 0, entrada / total[:, None], 0.0)
+            tasa = np.where(valido[:, 0], salida[:, 1] / entrada[:, 1], np.nan)
+        claves = normal + 2.0 * np.arange(2 * n)[:, None]
+        return cls(claves.ravel(), salida.ravel(), total, tasa)
+
+    @classmethod
+    def desde_almacen(cls, almacen: "AlmacenLibros") -> "TablaBarrido":
+        return cls.desde_arrays(almacen.bid_px, almacen.bid_qty, almacen.ask_px, almacen.ask_qty)
+
+    def barrer(self, curva: np.ndarray, x: np.ndarray, escala_entrada: np.ndarray, escala_salida: np.ndarray) -> np.ndarray:
+        """
+        Salida de una pierna. curva: (t,) índice de curva; x: (t, E, S) entrada;
+        escalas (t, E, 1). NaN si la entrada supera la profundidad (o ya era NaN).
+        """
+        total = self.total[curva][:, None, None]
+        u = x / (total * escala_entrada)
+        lleno = u <= 1.0
+        base = (2.0 * curva)[:, None, None]
+        clave = u + base
+        y = np.interp(clave, self.claves, self.salidas)
+        # Corrección del redondeo de 2c + u: (clave - 2c) - u es exacto, por la pendiente del mejor nivel
+        clave -= base
+        clave -= u
+        clave *= total * self.tasa[curva][:, None, None]
+        y -= clave
+        y *= escala_salida
+        y[~lleno] = np.nan
+        return y
+
+
+@dataclass
+class Simulacion:
+    """Resultado por triada sobre la grilla de tamaños (USDT del ancla)."""
+    grilla: np.ndarray          # (S,)
+    slippage: np.ndarray        # (n, S) media sobre los escenarios que llenan
+    llenado: np.ndarray         # (n, S) fracción de escenarios que llenan
+    slippage_cola: np.ndarray   # (n,) percentil `percentil` en el tamaño de referencia
+    referencia: int             # índice del tamaño de referencia en la grilla
+    percentil: float = SIMULACION_PERCENTIL
+
+    def __len__(self) -> int:
+        return len(self.slippage)
+
+    @property
+    def slippage_expected(self) -> np.ndarray:
+        return self.slippage[:, self.referencia]
+
+    def absorption_cap(self, tolerancia: float = TOLERANCIA_SLIPPAGE, llenado_min: float = SIMULACION_LLENADO_MIN) -> np.ndarray:
+        """Mayor tamaño de la grilla con slippage esperado ≤ tolerancia y llenado ≥ mínimo (él y los menores)."""
+        ok = (self.slippage <= tolerancia) & (self.llenado >= llenado_min)
+        k = np.logical_and.accumulate(ok, axis=1).sum(axis=1)
+        return np.where(k > 0, self.grilla[np.maximum(k - 1, 0)], np.nan)
+
+
+def simular_bloque(
+    tabla: TablaBarrido,
+    escenarios: Escenarios,
+    grilla: np.ndarray,
+    curvas: np.ndarray,
+    bits: np.ndarray,
+    referencia: int,
+    percentil: float = SIMULACION_PERCENTIL,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(slippage (t, S), llenado (t, S), cola (t,)) para un bloque de triadas; curvas/bits (t, 3)."""
+    t = len(curvas)
+    x = np.broadcast_to(grilla, (t, len(escenarios), len(grilla))).copy()
+    for k in range(curvas.shape[1]):
+        f = escenarios.decaimiento[None, :, k, None]
+        fm = f * escenarios.deriva[None, :, k, None]
+        compra = bits[:, k].astype(bool)[:, None, None]
+        x = tabla.barrer(curvas[:, k], x, np.where(compra, fm, f), np.where(compra, f, fm))
+
+    ideal = tabla.tasa[curvas].prod(axis=1)[:, None, None] * grilla
+    slip = 1.0 - x / ideal
+    lleno = np.isfinite(slip)
+    cuenta = lleno.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        media = np.where(lleno, slip, 0.0).sum(axis=1) / cuenta
+    # Los escenarios que no llenan cuentan como la peor cola: si son más que 100 - percentil, queda NaN
+    cola = np.percentile(np.where(lleno[:, :, referencia], slip[:, :, referencia], np.inf), percentil, axis=1,
+                         method="inverted_cdf")
+    return media, cuenta / len(escenarios), np.where(np.isfinite(cola), cola, np.nan)
+
+
+_ESTADO: Optional[tuple] = None
+
+
+def _iniciar(tabla, escenarios, grilla, referencia, percentil) -> None:
+    global _ESTADO
+    _ESTADO = (tabla, escenarios, grilla, referencia, percentil)
+
+
+def _bloque(args):
+    tabla, escenarios, grilla, referencia, percentil = _ESTADO  # type: ignore[misc]
+    curvas, bits = args
+    return simular_bloque(tabla, escenarios, grilla, curvas, bits, referencia, percentil)
+
+
+def simular(
+    tabla: TablaBarrido,
+    curvas: np.ndarray,
+    bits: np.ndarray,
+    escenarios: Optional[Escenarios] = None,
+    grilla: Sequence[float] = SIMULACION_GRILLA_USDT,
+    referencia_usdt: float = SIMULACION_REFERENCIA_USDT,
+    percentil: float = SIMULACION_PERCENTIL,
+    procesos: int = SIMULACION_PROCESOS,
+) -> Simulacion:
+    """
+    Simula todas las triadas (curvas/bits (n, 3)). Las que tienen una pierna sin
+    libro quedan en NaN sin simular. `procesos` 0 = núcleos disponibles, 1 = en línea.
+    """
+    escenarios = escenarios or Escenarios.generar()
+    grilla = np.asarray(grilla, dtype=np.float64)
+    referencia = int(np.argmin(np.abs(grilla - referencia_usdt)))
+    curvas = np.asarray(curvas, dtype=np.int64)
+    bits = np.asarray(bits, dtype=np.uint8)
+    n, S = len(curvas), len(grilla)
+
+    sim = Simulacion(grilla, np.full((n, S), np.nan), np.zeros((n, S)), np.full(n, np.nan), referencia, percentil)
+    activas = np.flatnonzero(np.isfinite(tabla.tasa[curvas]).all(axis=1)) if n else np.empty(0, np.int64)
+    por_bloque = max(1, ELEMENTOS_POR_BLOQUE // max(1, len(escenarios) * S))
+    tramos = [activas[i:i + por_bloque] for i in range(0, len(activas), por_bloque)]
+    bloques = [(curvas[idx], bits[idx]) for idx in tramos]
+
+    n_proc = min(procesos or os.cpu_count() or 1, len(bloques))
+    if n_proc <= 1:
+        partes = [simular_bloque(tabla, escenarios, grilla, c, b, referencia, percentil) for c, b in bloques]
+    else:
+        # spawn como multi_exchange: procesos limpios, la tabla viaja una vez por hijo
+        with ProcessPoolExecutor(
+            max_workers=n_proc,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_iniciar,
+            initargs=(tabla, escenarios, grilla, referencia, percentil),
+        ) as pool:
+            partes = list(pool.map(_bloque, bloques))
+
+    for idx, (media, llenado, cola) in zip(tramos, partes):
+        sim.slippage[idx] = media
+        sim.llenado[idx] = llenado
+        sim.slippage_cola[idx] = cola
+    return sim
+
+
+def simular_triadas(
+    triadas: "Triadas",
+    almacen: "AlmacenLibros",
+    escenarios: Optional[Escenarios] = None,
+    **opciones,
+) -> Simulacion:
+    """
+    Atajo: tabla de curvas del almacén + `simular`. Se agrega una fila sin libro
+    al final para las piernas cuyo símbolo no está en el almacén.
+    """
+    vacio = np.full((1, almacen.profundidad), np.nan)
+    tabla = TablaBarrido.desde_arrays(
+        np.concatenate([almacen.bid_px, vacio]), np.concatenate([almacen.bid_qty, np.zeros_like(vacio)]),
+        np.concatenate([almacen.ask_px, vacio]), np.concatenate([almacen.ask_qty, np.zeros_like(vacio)]),
+    )
+    filas = almacen.filas(triadas.simbolos)
+    bits = triadas.bits()
+    fila = filas[triadas.piernas]
+    fila = np.where(fila >= 0, fila, len(almacen))
+    curvas = fila.astype(np.int64) + bits.astype(np.int64) * (len(almacen) + 1)
+    return simular(tabla, curvas, bits, escenarios, **opciones)
+
+
+def tabla_slippage(
+    triadas: "Triadas",
+    sim: Simulacion,
+    tolerancia: float = TOLERANCIA_SLIPPAGE,
+    llenado_min: float = SIMULACION_LLENADO_MIN,
+) -> "pd.DataFrame":
+    """Una fila por triada: piernas, `slippage_<tam>` por tamaño, `slippage_expected`, cola, llenado y `absorption_cap`."""
+    import pandas as pd
+
+    s = np.asarray(triadas.simbolos, dtype=object)
+    bits = triadas.bits()
+    out = {}
+    for i in range(triadas.piernas.shape[1]):
+        out[f"leg{i + 1}"] = s[triadas.piernas[:, i]]
+        out[f"dir{i + 1}"] = np.where(bits[:, i] == 1, "compra", "venta")
+    for j, tam in enumerate(sim.grilla):
+        out[f"slippage_{tam:g}"] = sim.slippage[:, j]
+    out["slippage_expected"] = sim.slippage_expected
+    out[f"slippage_p{sim.percentil:g}"] = sim.slippage_cola
+    out["llenado"] = sim.llenado[:, sim.referencia]
+    out["absorption_cap"] = sim.absorption_cap(tolerancia, llenado_min)
+    return pd.DataFrame(out)
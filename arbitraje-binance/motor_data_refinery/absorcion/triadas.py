@@ -0,0 +1,302 @@
+# absorcion/triadas.py
+"""
+🔺 Motor de enumeración de triadas ANCLA → A → B → ANCLA sobre adyacencia CSR.
+
+Reemplaza los 8 bucles triples de `5_triadas.py` (uno por forma) por una sola
+pasada vectorizada:
+
+- Cada símbolo BASE/QUOTE aporta dos arcos dirigidos con su bit de dirección:
+    bit 1 (compra): QUOTE → BASE
+    bit 0 (venta) : BASE  → QUOTE
+  Los arcos se ordenan por origen (CSR: `indptr` + arrays por arco).
+- Se expanden en bloque los arcos que salen del ancla, luego los que salen de
+  cada A, y se cierran con un índice precomputado de arcos que ENTRAN al ancla.
+- Cada triada queda etiquetada con su bitmask de forma (b1 b2 b3) y se
+  deduplica por rotación canónica (`rotacion_canonica`): el mismo ciclo
+  dirigido aparece una sola vez aunque se haya generado desde otra pierna.
+
+El resultado (`Triadas`) es una estructura en memoria (ids de símbolo por pierna
++ forma) y sigue exportándose a los CSV `triadas_por_forma/forma_<n>_<bits>.csv`.
+
+`actualizar_triadas` rehace el conjunto tras un cambio de listados sin volver a
+enumerar todo: conserva las triadas previas cuyos símbolos siguen y enumera
+solo el subgrafo alrededor de los símbolos que entraron.
+"""
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+
+def rangos(inicios: np.ndarray, largos: np.ndarray) -> np.ndarray:
+    """Concatena `arange(inicio, inicio + largo)` para cada par, sin bucles Python."""
+    total = int(largos.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64)
+    offs = np.repeat(np.cumsum(largos) - largos, largos)
+    return np.repeat(inicios, largos) + (np.arange(total) - offs)
+
+
+def rotacion_canonica(piernas: np.ndarray, bits: np.ndarray, longitud: np.ndarray | None = None) -> np.ndarray:
+    """
+    Clave de ciclo independiente de la pierna de inicio: por fila, la rotación
+    lexicográficamente mínima de los tokens `símbolo·2 + bit` de sus piernas
+    (relleno -1 después de `longitud`). Dos filas con la misma clave son el
+    mismo ciclo dirigido (mismas órdenes, en el mismo orden cíclico).
+    """
+    piernas = np.asarray(piernas, dtype=np.int64)
+    n, ancho = piernas.shape
+    tokens = np.where(piernas >= 0, piernas * 2 + np.asarray(bits, dtype=np.int64), -1)
+    largos = np.full(n, ancho) if longitud is None else np.asarray(longitud, dtype=np.int64)
+    out = np.full((n, ancho), -1, dtype=np.int64)
+    for largo in np.unique(largos).tolist():
+        filas = np.flatnonzero(largos == largo)
+        if largo <= 0 or not len(filas):
+            continue
+        k = np.arange(largo)
+        rot = tokens[filas][:, (k[:, None] + k[None, :]) % largo]   # (m, rotación, pierna)
+        # Descarta rotaciones columna a columna hasta quedarse con la mínima
+        candidata = np.ones(rot.shape[:2], dtype=bool)
+        for c in range(largo):
+            v = np.where(candidata, rot[:, :, c], np.iinfo(np.int64).max)
+            candidata &= v == v.min(axis=1, keepdims=True)
+        out[filas, :largo] = rot[np.arange(len(filas)), candidata.argmax(axis=1)]
+    return out
+
+
+def _unicas(filas: np.ndarray) -> np.ndarray:
+    """Filas (forma, p1, p2, p3) ordenadas y sin ciclos repetidos (misma rotación canónica)."""
+    filas = np.unique(filas, axis=0)
+    bits = (filas[:, :1] >> np.array([2, 1, 0])) & 1
+    _, primera = np.unique(rotacion_canonica(filas[:, 1:], bits), axis=0, return_index=True)
+    return filas[np.sort(primera)]
+
+
+@dataclass
+class GrafoMercados:
+    """Adyacencia dirigida activo → activo (dos arcos por símbolo) en formato CSR."""
+    activos: pd.Index
+    simbolos: np.ndarray      # (n_simbolos,) object
+    base: np.ndarray          # (n_simbolos,) int32 id de activo
+    quote: np.ndarray         # (n_simbolos,) int32 id de activo
+    indptr: np.ndarray        # (n_activos + 1,) arcos salientes por activo
+    arco_simbolo: np.ndarray  # (2·n_simbolos,) int32
+    arco_destino: np.ndarray  # (2·n_simbolos,) int32
+    arco_bit: np.ndarray      # (2·n_simbolos,) uint8 — 1 compra, 0 venta
+
+    @classmethod
+    def desde_pares(cls, df: pd.DataFrame) -> "GrafoMercados":
+        """Arma el grafo desde un frame/CSV con columnas `symbol | base | quote`."""
+        df = df.drop_duplicates(subset=["symbol"])
+        simbolos = df["symbol"].to_numpy(dtype=object)
+        activos = pd.Index(pd.unique(np.concatenate([
+            df["base"].to_numpy(dtype=object), df["quote"].to_numpy(dtype=object),
+        ])), dtype=object)
+        base = activos.get_indexer(df["base"]).astype(np.int32)
+        quote = activos.get_indexer(df["quote"]).astype(np.int32)
+
+        n = len(simbolos)
+        ids = np.arange(n, dtype=np.int32)
+        origen = np.concatenate([quote, base])                     # compra: quote → base
+        destino = np.concatenate([base, quote])                    # venta : base  → quote
+        bit = np.concatenate([np.ones(n, np.uint8), np.zeros(n, np.uint8)])
+        orden = np.argsort(origen, kind="stable")
+        indptr = np.zeros(len(activos) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origen, minlength=len(activos)), out=indptr[1:])
+        return cls(
+            activos=activos, simbolos=simbolos, base=base, quote=quote, indptr=indptr,
+            arco_simbolo=np.concatenate([ids, ids])[orden],
+            arco_destino=destino[orden].astype(np.int32),
+            arco_bit=bit[orden],
+        )
+
+    def arcos_desde(self, nodos: np.ndarray):
+        """(arco_padre_idx, arco) para todos los arcos que salen de cada nodo dado."""
+        largos = self.indptr[nodos + 1] - self.indptr[nodos]
+        padre = np.repeat(np.arange(len(nodos)), largos)
+        return padre, rangos(self.indptr[nodos], largos)
+
+    def entrada(self, destino: int):
+        """CSR de arcos que llegan a `destino`, indexado por activo de origen."""
+        llegan = np.flatnonzero(self.arco_destino == destino)
+        origen = np.searchsorted(self.indptr, llegan, side="right") - 1
+        orden = np.argsort(origen, kind="stable")
+        indptr = np.zeros(len(self.activos) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origen, minlength=len(self.activos)), out=indptr[1:])
+        return indptr, llegan[orden]
+
+
+@dataclass
+class Triadas:
+    """Triadas en memoria: ids de símbolo por pierna + bitmask de forma (b1 b2 b3)."""
+    simbolos: np.ndarray   # diccionario id → símbolo
+    piernas: np.ndarray    # (n, 3) int32
+    forma: np.ndarray      # (n,) uint8, b1 es el bit más significativo
+
+    def __len__(self) -> int:
+        return len(self.forma)
+
+    def bits(self) -> np.ndarray:
+        """(n, 3) uint8 con la dirección de cada pierna (1 compra, 0 venta)."""
+        return ((self.forma[:, None] >> np.array([2, 1, 0], dtype=np.uint8)) & 1).astype(np.uint8)
+
+    @staticmethod
+    def nombre_forma(forma: int) -> str:
+        return f"forma_{forma + 1}_{forma:03b}"
+
+    def a_dataframe(self) -> pd.DataFrame:
+        s = self.simbolos
+        return pd.DataFrame({
+            "par_1": s[self.piernas[:, 0]],
+            "par_2": s[self.piernas[:, 1]],
+            "par_3": s[self.piernas[:, 2]],
+            "forma": [self.nombre_forma(int(f)) for f in self.forma],
+        })
+
+    def exportar_por_forma(self, directorio: Path) -> Dict[str, int]:
+        """Escribe los 8 CSV `forma_<n>_<bits>.csv` (aunque estén vacíos). Devuelve conteos."""
+        directorio.mkdir(parents=True, exist_ok=True)
+        s = self.simbolos
+        conteos: Dict[str, int] = {}
+        for forma in range(8):
+            nombre = self.nombre_forma(forma)
+            sel = self.piernas[self.forma == forma]
+            with open(directorio / f"{nombre}.csv", "w", newline="") as f_out:
+                writer = csv.writer(f_out)
+                writer.writerow(["par_1", "par_2", "par_3", "forma"])
+                writer.writerows([s[a], s[b], s[c], nombre] for a, b, c in sel.tolist())
+            conteos[nombre] = len(sel)
+        return conteos
+
+
+def enumerar_triadas(grafo: GrafoMercados, ancla: str = "USDT") -> Triadas:
+    """Encuentra todos los ciclos ancla → A → B → ancla en una sola pasada vectorizada."""
+    vacio = Triadas(grafo.simbolos, np.empty((0, 3), np.int32), np.empty(0, np.uint8))
+    if ancla not in grafo.activos:
+        return vacio
+    a = int(grafo.activos.get_loc(ancla))
+
+    # Pierna 1: arcos que salen del ancla
+    e1 = np.arange(grafo.indptr[a], grafo.indptr[a + 1])
+    # Pierna 2: arcos que salen de cada A (sin volver al ancla)
+    p, e2 = grafo.arcos_desde(grafo.arco_destino[e1])
+    e1 = e1[p]
+    b = grafo.arco_destino[e2]
+    ok = (b != a) & (grafo.arco_simbolo[e2] != grafo.arco_simbolo[e1])
+    e1, e2, b = e1[ok], e2[ok], b[ok]
+
+    # Pierna 3: arcos que vuelven al ancla desde cada B
+    in_ptr, in_arcos = grafo.entrada(a)
+    largos = in_ptr[b + 1] - in_ptr[b]
+    idx = np.repeat(np.arange(len(b)), largos)
+    e3 = in_arcos[rangos(in_ptr[b], largos)]
+    e1, e2 = e1[idx], e2[idx]
+    ok = grafo.arco_simbolo[e3] != grafo.arco_simbolo[e2]
+    e1, e2, e3 = e1[ok], e2[ok], e3[ok]
+    if not len(e1):
+        return vacio
+
+    sym = grafo.arco_simbolo
+    bits = grafo.arco_bit
+    filas = np.stack([
+        bits[e1].astype(np.int64) << 2 | bits[e2].astype(np.int64) << 1 | bits[e3].astype(np.int64),
+        sym[e1], sym[e2], sym[e3],
+    ], axis=1)
+    # Dedup por rotación canónica + orden estable (forma, par_1, par_2, par_3)
+    filas = _unicas(filas)
+    return Triadas(
+        simbolos=grafo.simbolos,
+        piernas=filas[:, 1:].astype(np.int32),
+        forma=filas[:, 0].astype(np.uint8),
+    )
+
+
+def actualizar_triadas(
+    previas: Triadas, df_pares: pd.DataFrame, entran: Iterable[str], ancla: str = "USDT"
+) -> Triadas:
+    """
+    Mismo resultado que `enumerar_triadas(GrafoMercados.desde_pares(df_pares), ancla)`
+    partiendo de `previas`. `entran` son los símbolos nuevos o con base/quote
+    cambiado; los que ya no están en `df_pares` se caen solos al re-indexar.
+    """
+    grafo = GrafoMercados.desde_pares(df_pares)
+    dic = pd.Index(grafo.simbolos, dtype=object)
+    entran_arr = np.asarray(list(dict.fromkeys(entran)), dtype=object)
+
+    # 1) Conservadas: ids re-referidos al diccionario nuevo (fuera las que tocan símbolos que salieron o cambiaron)
+    partes = []
+    if len(previas):
+        mapa = dic.get_indexer(pd.Index(previas.simbolos, dtype=object))
+        mapa[np.isin(previas.simbolos, entran_arr)] = -1
+        piernas = mapa[previas.piernas]
+        ok = (piernas >= 0).all(axis=1)
+        partes.append(np.column_stack([previas.forma[ok].astype(np.int64), piernas[ok]]))
+
+    # 2) Nuevas: toda triada con un símbolo entrante vive en los pares que tocan sus activos
+    #    (sin el ancla) más los pares ancla ↔ vecino de esos activos.
+    if len(entran_arr) and ancla in grafo.activos:
+        a = int(grafo.activos.get_loc(ancla))
+        sel = dic.get_indexer(pd.Index(entran_arr, dtype=object))
+        sel = sel[sel >= 0]
+        tocados = np.zeros(len(grafo.activos), dtype=bool)
+        tocados[grafo.base[sel]] = True
+        tocados[grafo.quote[sel]] = True
+        tocados[a] = False
+        toca = tocados[grafo.base] | tocados[grafo.quote]
+        vecinos = np.zeros(len(grafo.activos), dtype=bool)
+        vecinos[grafo.base[toca]] = True
+        vecinos[grafo.quote[toca]] = True
+        al_ancla = ((grafo.base == a) & vecinos[grafo.quote]) | ((grafo.quote == a) & vecinos[grafo.base])
+        ids = np.flatnonzero(toca | al_ancla)
+        sub = pd.DataFrame({
+            "symbol": grafo.simbolos[ids],
+            "base": grafo.activos.to_numpy(dtype=object)[grafo.base[ids]],
+            "quote": grafo.activos.to_numpy(dtype=object)[grafo.quote[ids]],
+        })
+        nuevas = enumerar_triadas(GrafoMercados.desde_pares(sub), ancla)
+        if len(nuevas):
+            piernas = dic.get_indexer(pd.Index(nuevas.simbolos, dtype=object))[nuevas.piernas]
+            ok = np.isin(nuevas.simbolos, entran_arr)[nuevas.piernas].any(axis=1)
+            partes.append(np.column_stack([nuevas.forma[ok].astype(np.int64), piernas[ok]]))
+
+    if not partes or not sum(len(p) for p in partes):
+        return Triadas(grafo.simbolos, np.empty((0, 3), np.int32), np.empty(0, np.uint8))
+    filas = _unicas(np.concatenate(partes))
+    return Triadas(
+        simbolos=grafo.simbolos,
+        piernas=filas[:, 1:].astype(np.int32),
+        forma=filas[:, 0].astype(np.uint8),
+    )
+
+
+def triadas_desde_csv(directorio: Path, simbolos: np.ndarray | None = None) -> Triadas:
+    """
+    Reconstruye `Triadas` desde los CSV por forma. Si se pasa `simbolos`, los ids
+    quedan referidos a ese diccionario (los símbolos desconocidos se descartan).
+    """
+    frames: List[pd.DataFrame] = []
+    for ruta in sorted(directorio.glob("forma_*.csv")):
+        df = pd.read_csv(ruta, dtype=str)
+        if not df.empty:
+            frames.append(df)
+    if not frames:
+        dic = simbolos if simbolos is not None else np.empty(0, dtype=object)
+        return Triadas(dic, np.empty((0, 3), np.int32), np.empty(0, np.uint8))
+
+    df = pd.concat(frames, ignore_index=True)
+    pares = df[["par_1", "par_2", "par_3"]].to_numpy(dtype=object)
+    dic = pd.Index(simbolos if simbolos is not None else pd.unique(pares.ravel()), dtype=object)
+    piernas = dic.get_indexer(pares.ravel()).reshape(-1, 3)
+    forma = df["forma"].str.rsplit("_", n=1).str[1].map(lambda b: int(b, 2)).to_numpy()
+    ok = (piernas >= 0).all(axis=1)
+    return Triadas(
+        simbolos=dic.to_numpy(dtype=object),
+        piernas=piernas[ok].astype(np.int32),
+        forma=forma[ok].astype(np.uint8),
+    )
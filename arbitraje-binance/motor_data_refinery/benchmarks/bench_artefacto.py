@@ -0,0 +1,108 @@
+# benchmarks/bench_artefacto.py
+"""
+⏱️ Micro-benchmark del artefacto columnar binario (codigo/artefacto_binario.py).
+
+Arma un cotizador sintético de N filas con las columnas del unificado, lo
+escribe como CSV (18 decimales, como `formatear_decimales`) y como artefacto
+binario, y compara la carga del lado consumidor: `read_csv(dtype=str)` +
+conversión de tipos contra `cargar` (mapeo) y contra `cargar` + DataFrame.
+Verifica que el binario reproduzca el frame original bit a bit (el CSV de 18
+decimales fijos pierde dígitos significativos en valores chicos).
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_artefacto.py [--filas 20000] [--repeticiones 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from codigo import artefacto_binario  # type: ignore
+from codigo.equivalencias import formatear_decimales  # type: ignore
+
+
+def cotizador_sintetico(n: int, semilla: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(semilla)
+    quotes = np.array(["USDT", "BTC", "ETH", "FDUSD", "USDC", "BNB", "TRY"], dtype=object)
+    base = np.array([f"A{i:05d}" for i in range(n)], dtype=object)
+    quote = quotes[rng.integers(0, len(quotes), n)]
+    indirecta = quote != "USDT"
+    return pd.DataFrame({
+        "symbol": base + "/" + quote,
+        "base": base,
+        "quote": quote,
+        "1_usdt_equivale_base": np.exp(rng.uniform(-12, 8, n)),
+        "cotizacion_indirecta": indirecta,
+        "fuente": np.where(indirecta, "Indirecto derivado", "CCXT directo"),
+    })
+
+
+def _leer_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path, dtype=str)
+    df["1_usdt_equivale_base"] = pd.to_numeric(df["1_usdt_equivale_base"], errors="coerce")
+    df["cotizacion_indirecta"] = df["cotizacion_indirecta"].str.lower().eq("true")
+    return df
+
+
+def _medir(fn, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return float(np.median(tiempos))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df = cotizador_sintetico(args.filas)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv, col = Path(tmp) / "cotizador.csv", Path(tmp) / "cotizador.col"
+        t0 = time.perf_counter()
+        formatear_decimales(df).to_csv(csv, index=False)
+        t_csv_w = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        artefacto_binario.escribir(df, col)
+        t_col_w = time.perf_counter() - t0
+
+        t_csv = _medir(lambda: _leer_csv(csv), args.repeticiones)
+        t_map = _medir(lambda: artefacto_binario.cargar(col), args.repeticiones)
+        t_df = _medir(lambda: artefacto_binario.cargar(col).a_dataframe(), args.repeticiones)
+
+        ref = _leer_csv(csv)
+        art = artefacto_binario.cargar(col)
+        ok = (
+            bool((art.valores("symbol") == df["symbol"].to_numpy()).all())
+            and bool((art["cotizacion_indirecta"] == df["cotizacion_indirecta"].to_numpy()).all())
+            and bool(np.array_equal(art["1_usdt_equivale_base"], df["1_usdt_equivale_base"].to_numpy()))
+        )
+        err_csv = float(np.max(np.abs(ref["1_usdt_equivale_base"].to_numpy() - df["1_usdt_equivale_base"].to_numpy())))
+        tam_csv, tam_col = csv.stat().st_size, col.stat().st_size
+
+    print(f"\n⏱️  Artefacto columnar — {args.filas:,} filas")
+    print(f"🔹 escritura CSV / binario          : {t_csv_w * 1000:8.2f} / {t_col_w * 1000:8.2f} ms")
+    print(f"🔹 tamaño CSV / binario             : {tam_csv / 1024:8.0f} / {tam_col / 1024:8.0f} KiB")
+    print(f"🔹 carga CSV (dtype=str + tipos)    : {t_csv * 1000:8.2f} ms")
+    print(f"🔹 carga binaria (mapeo)            : {t_map * 1000:8.3f} ms")
+    print(f"🔹 carga binaria + DataFrame        : {t_df * 1000:8.3f} ms")
+    print(f"🔸 speedup (mapeo vs CSV)           : {t_csv / t_map:8.1f}x")
+    print(f"{'✅' if ok else '❌'} Binario idéntico al frame original: {ok} "
+          f"(el CSV difiere hasta {err_csv:.1e} por redondeo a 18 decimales)\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# benchmarks/bench_capacidad.py
+"""
+⏱️ Micro-benchmark de la capacidad de absorción (absorcion/capacidad.py).
+
+Genera libros sintéticos, los graba en JSONL y los reproduce con `FuenteGrabada`
+hacia un `AlmacenLibros`; mide ingesta y cálculo vectorizado de VWAP/slippage
+por escalera + `absorption_cap`, y los compara contra un barrido nivel a nivel
+en Python puro.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_capacidad.py [--simbolos 3000] [--niveles 20] [--repeticiones 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.capacidad import capacidad_absorcion, escalera_vwap, tabla_capacidad  # type: ignore
+from absorcion.libros import AlmacenLibros, FuenteGrabada, grabar  # type: ignore
+from codigo.config import ESCALERA_NOTIONAL_USDT, TOLERANCIA_SLIPPAGE  # type: ignore
+
+
+def libros_sinteticos(n: int, niveles: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    medio = np.exp(rng.uniform(-6, 10, n))
+    paso = medio * rng.uniform(1e-5, 5e-4, n)
+    for i in range(n):
+        # Algunos libros más cortos que la profundidad pedida
+        k = niveles if rng.random() > 0.1 else int(rng.integers(1, niveles))
+        qty = rng.lognormal(0, 1, (2, k)) * (2_000 / medio[i])
+        bids = [[medio[i] - paso[i] * (j + 1), float(q)] for j, q in enumerate(qty[0])]
+        asks = [[medio[i] + paso[i] * (j + 1), float(q)] for j, q in enumerate(qty[1])]
+        yield {"symbol": f"TK{i}/USDT", "timestamp": 1_700_000_000_000 + i, "nonce": i, "bids": bids, "asks": asks}
+
+
+def vwap_bucle(niveles, notional):
+    """Barrido nivel a nivel (referencia)."""
+    restante, base = notional, 0.0
+    for px, qty in niveles:
+        valor = px * qty
+        if valor >= restante:
+            return notional / (base + restante / px)
+        restante -= valor
+        base += qty
+    return float("nan")
+
+
+def cap_bucle(niveles, compra, tol):
+    """Búsqueda binaria del notional con slippage <= tol (referencia)."""
+    mejor = niveles[0][0]
+    total = sum(p * q for p, q in niveles)
+    if abs(vwap_bucle(niveles, total * (1 - 1e-12)) / mejor - 1) <= tol:
+        return total
+    lo, hi = 0.0, total
+    for _ in range(100):
+        mid = (lo + hi) / 2
+        if abs(vwap_bucle(niveles, mid) / mejor - 1) <= tol:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simbolos", type=int, default=3_000)
+    parser.add_argument("--niveles", type=int, default=20)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "libros.jsonl"
+        for _ in grabar(libros_sinteticos(args.simbolos, args.niveles), ruta):
+            pass
+        almacen = AlmacenLibros([f"TK{i}/USDT" for i in range(args.simbolos)], args.niveles)
+        t0 = time.perf_counter()
+        aplicados = almacen.ingerir(FuenteGrabada(ruta))
+        t_ingesta = time.perf_counter() - t0
+
+    eq = np.ones(len(almacen))
+    mejor = float("inf")
+    for _ in range(args.repeticiones):
+        t0 = time.perf_counter()
+        tabla_capacidad(almacen, eq)
+        mejor = min(mejor, time.perf_counter() - t0)
+    t0 = time.perf_counter()
+    for _ in range(args.repeticiones):
+        escalera_vwap(almacen.ask_px, almacen.ask_qty, np.asarray(ESCALERA_NOTIONAL_USDT, float))
+        capacidad_absorcion(almacen.ask_px, almacen.ask_qty, True)
+    t_nucleo = (time.perf_counter() - t0) / args.repeticiones
+
+    # Verificación contra el barrido en Python sobre una muestra
+    rng = np.random.default_rng(1)
+    muestra = rng.choice(len(almacen), min(200, len(almacen)), replace=False)
+    vwap, _ = escalera_vwap(almacen.ask_px, almacen.ask_qty, np.asarray(ESCALERA_NOTIONAL_USDT, float))
+    cap_c = capacidad_absorcion(almacen.ask_px, almacen.ask_qty, True)
+    cap_v = capacidad_absorcion(almacen.bid_px, almacen.bid_qty, False)
+    peor = 0.0
+    for i in muestra:
+        asks = [(p, q) for p, q in zip(almacen.ask_px[i], almacen.ask_qty[i]) if np.isfinite(p)]
+        bids = [(p, q) for p, q in zip(almacen.bid_px[i], almacen.bid_qty[i]) if np.isfinite(p)]
+        for k, tam in enumerate(ESCALERA_NOTIONAL_USDT):
+            ref = vwap_bucle(asks, tam)
+            if np.isfinite(ref) or np.isfinite(vwap[i, k]):
+                peor = max(peor, abs(vwap[i, k] / ref - 1))
+        peor = max(peor, abs(cap_c[i] / cap_bucle(asks, True, TOLERANCIA_SLIPPAGE) - 1))
+        peor = max(peor, abs(cap_v[i] / cap_bucle(bids, False, TOLERANCIA_SLIPPAGE) - 1))
+    ok = peor < 1e-9
+
+    print(f"\n⏱️  Capacidad de absorción — {args.simbolos} símbolos × {args.niveles} niveles, "
+          f"escalera {len(ESCALERA_NOTIONAL_USDT)} tamaños")
+    print(f"🔹 ingesta JSONL → arrays       : {t_ingesta * 1000:10.1f} ms ({aplicados} libros)")
+    print(f"🔹 núcleo (1 lado, vwap + cap)  : {t_nucleo * 1000:10.2f} ms")
+    print(f"🔹 tabla completa (2 lados, df) : {mejor * 1000:10.2f} ms")
+    print(f"{'✅' if ok else '❌'} Coincide con barrido nivel a nivel: {ok} (error relativo máx {peor:.2e})\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# benchmarks/bench_ciclos.py
+"""
+⏱️ Micro-benchmark de la búsqueda de ciclos multi-ancla (absorcion/ciclos.py).
+
+Arma un listado sintético con la forma de Binance spot (muchos activos contra
+pocas quotes, volumen log-normal), aplica el filtro de liquidez y mide la
+enumeración por largo máximo, más la carga desde caché .npz. Verifica además
+que los ciclos de 3 piernas de USDT coincidan con `enumerar_triadas`.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_ciclos.py [--mercados 3000] [--volumen-min 250000] [--longitud-max 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.ciclos import buscar_ciclos, ciclos_con_cache, pares_liquidos  # type: ignore
+from absorcion.triadas import GrafoMercados, enumerar_triadas  # type: ignore
+from codigo.config import ANCLAS  # type: ignore
+
+# Reparto aproximado de quotes en Binance spot
+QUOTES = {
+    "USDT": 0.40, "BTC": 0.15, "FDUSD": 0.08, "USDC": 0.08, "TRY": 0.07,
+    "ETH": 0.06, "BNB": 0.06, "EUR": 0.04, "BRL": 0.03, "JPY": 0.03,
+}
+
+
+def mercados_sinteticos(n: int, seed: int = 7):
+    """(pares symbol|base|quote, quoteVolume por par): cripto/quote + cruces entre quotes."""
+    rng = np.random.default_rng(seed)
+    activos = np.array([f"TK{i}" for i in range(max(10, int(n / 1.5)))])
+    # Los activos "grandes" listan contra más quotes: elección sesgada (Zipf)
+    pesos = 1.0 / np.arange(1, len(activos) + 1) ** 0.8
+    base = rng.choice(activos, n, p=pesos / pesos.sum())
+    quote = rng.choice(list(QUOTES), n, p=np.array(list(QUOTES.values())) / sum(QUOTES.values()))
+    # Cruces entre quotes (BTC/USDT, ETH/BTC, USDT/TRY, ...): siempre líquidos
+    jerarquia = list(QUOTES)
+    cruces = [(b, q) for i, q in enumerate(jerarquia) for b in jerarquia[i + 1:]]
+    base = np.concatenate([[b for b, _ in cruces], base])
+    quote = np.concatenate([[q for _, q in cruces], quote])
+    df = pd.DataFrame({"base": base, "quote": quote})
+    df = df[df["base"] != df["quote"]]
+    df["symbol"] = df["base"] + "/" + df["quote"]
+    df = df.drop_duplicates(subset=["symbol"])[["symbol", "base", "quote"]].reset_index(drop=True)
+    volumen = rng.lognormal(mean=12.0, sigma=2.5, size=len(df))
+    volumen[: len(cruces)] = 1e12
+    return df, volumen
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mercados", type=int, default=3_000)
+    parser.add_argument("--volumen-min", type=float, default=250_000.0)
+    parser.add_argument("--longitud-max", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df, volumen = mercados_sinteticos(args.mercados)
+    liquidos = pares_liquidos(df, volumen, args.volumen_min)
+    grafo = GrafoMercados.desde_pares(liquidos)
+    print(f"\n⏱️  Ciclos — {len(df)} mercados sintéticos, {len(liquidos)} líquidos "
+          f"(quoteVolume >= {args.volumen_min:,.0f}), anclas {', '.join(ANCLAS)}")
+
+    for largo in range(3, args.longitud_max + 1):
+        t0 = time.perf_counter()
+        ciclos = buscar_ciclos(grafo, ANCLAS, largo)
+        dt = time.perf_counter() - t0
+        print(f"🔹 hasta {largo} piernas: {dt * 1000:10.1f} ms  → {len(ciclos):>10,} ciclos")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        ciclos_con_cache(liquidos, ANCLAS, args.longitud_max, directorio=Path(tmp))
+        t_frio = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        cacheados = ciclos_con_cache(liquidos, ANCLAS, args.longitud_max, directorio=Path(tmp))
+        t_cache = time.perf_counter() - t0
+    print(f"🔸 con caché: frío {t_frio * 1000:.1f} ms / caliente {t_cache * 1000:.1f} ms ({len(cacheados):,} ciclos)")
+
+    tri = enumerar_triadas(grafo, "USDT")
+    tri_ciclos = buscar_ciclos(grafo, ["USDT"], 3).triadas("USDT")
+    iguales = np.array_equal(tri.piernas, tri_ciclos.piernas) and np.array_equal(tri.forma, tri_ciclos.forma)
+    print(f"{'✅' if iguales else '❌'} Triadas USDT idénticas a enumerar_triadas: {iguales} ({len(tri)} triadas)\n")
+
+
+if __name__ == "__main__":
+    main()
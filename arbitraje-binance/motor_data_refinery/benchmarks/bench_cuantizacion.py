@@ -0,0 +1,115 @@
+# benchmarks/bench_cuantizacion.py
+"""
+⏱️ Micro-benchmark del dimensionado cuantizado de triadas (absorcion/cuantizacion.py).
+
+Sobre el mercado sintético de `bench_slippage.py` arma una tabla spot con
+filtros tipo Binance (tick y step potencias de 10 según el precio, cantidad
+mínima = step, notional mínimo 5 o 10 en la quote) como texto, igual que el
+CSV de la etapa 1, y mide:
+
+- tabla de cuantización desde el frame de texto (una vez por refresco),
+- `dimensionar` para todas las triadas (una operación por pierna),
+- referencia orden por orden con `decimal`.
+
+Verifica que precios límite y cantidades coincidan exactamente con la
+referencia y que el retorno final coincida a 1e-12.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_cuantizacion.py [--activos 400] [--cruces 2500] [--notional 1000] [--repeticiones 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from absorcion.cuantizacion import TablaCuantizacion, dimensionado_referencia, dimensionar  # type: ignore
+from absorcion.triadas import GrafoMercados, enumerar_triadas  # type: ignore
+
+
+def tabla_spot(df: pd.DataFrame, mid: np.ndarray, seed: int = 5) -> pd.DataFrame:
+    """Filtros tipo Binance como texto (como los deja la etapa 1 en el CSV)."""
+    rng = np.random.default_rng(seed)
+    dec_precio = np.clip(7 - np.floor(np.log10(mid)).astype(int) - 2, 0, 8)
+    dec_cant = np.clip(np.floor(np.log10(mid)).astype(int) + 2, 0, 8)
+    fmt = np.vectorize(lambda d: f"{10.0 ** -d:.8f}".rstrip("0").rstrip(".") if d else "1")
+    return pd.DataFrame({
+        "symbol": df["symbol"], "base": df["base"], "quote": df["quote"],
+        "fee_taker": "0.001",
+        "price_precision": fmt(dec_precio),
+        "amount_precision": fmt(dec_cant),
+        "min_price": fmt(dec_precio),
+        "min_amount": fmt(dec_cant),
+        "min_cost": np.where(rng.random(len(df)) < 0.5, "5", "10"),
+    })
+
+
+def main(argv: list[str] | None = None) -> None:
+    from bench_slippage import mercado_sintetico  # type: ignore
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activos", type=int, default=400)
+    parser.add_argument("--cruces", type=int, default=2_500)
+    parser.add_argument("--notional", type=float, default=1_000.0)
+    parser.add_argument("--repeticiones", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df, libros = mercado_sintetico(args.activos, args.cruces, 1)
+    triadas = enumerar_triadas(GrafoMercados.desde_pares(df), "USDT")
+    por_simbolo = {l["symbol"]: l for l in libros}
+    bid = np.array([por_simbolo[s]["bids"][0][0] for s in triadas.simbolos])
+    ask = np.array([por_simbolo[s]["asks"][0][0] for s in triadas.simbolos])
+    spot = tabla_spot(pd.DataFrame({"symbol": triadas.simbolos}).merge(df, on="symbol"), (bid + ask) / 2)
+    fee = np.full(len(triadas.simbolos), 0.001)
+    bits = triadas.bits()
+
+    t0 = time.perf_counter()
+    tabla = TablaCuantizacion.desde_frame(spot, triadas.simbolos)
+    t_tabla = time.perf_counter() - t0
+
+    mejor = float("inf")
+    for _ in range(args.repeticiones):
+        t0 = time.perf_counter()
+        dim = dimensionar(tabla, triadas.piernas, bits, bid, ask, args.notional, fee)
+        mejor = min(mejor, time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    ref = dimensionado_referencia(tabla, triadas.piernas, bits, bid, ask, args.notional, fee)
+    t_ref = time.perf_counter() - t0
+
+    precios_ref = np.array([[p for p, _ in piernas] for piernas, _ in ref])
+    cant_ref = np.array([[c for _, c in piernas] for piernas, _ in ref])
+    final_ref = np.array([f for _, f in ref])
+    difieren = int((dim.cantidad != cant_ref).sum() + (dim.precio != precios_ref).sum())
+    # Triadas que quedan en 0 (alguna pierna redondea a 0 steps): tienen que dar 0 en ambos
+    llenas = final_ref > 0
+    err_final = float(np.max(np.abs(dim.final[llenas] / final_ref[llenas] - 1.0)))
+    difieren += int((dim.final[~llenas] != 0).sum())
+    ok = difieren == 0 and err_final < 1e-12
+
+    # Polvo solo de las ejecutables: las que no pasan mínimos no dejan residuo real
+    polvo_bps = np.nansum(dim.residuo_ancla[dim.ejecutable], axis=1) / args.notional * 1e4
+    print(f"\n⏱️  Dimensionado cuantizado — {len(triadas):,} triadas ({len(tabla):,} símbolos), "
+          f"notional {args.notional:g} USDT")
+    print(f"🔹 tabla de cuantización        : {t_tabla * 1000:9.2f} ms")
+    print(f"🔹 dimensionar (vectorizado)    : {mejor * 1000:9.2f} ms ({len(triadas) * 3 / mejor / 1e6:,.1f} M órdenes/s)")
+    print(f"🔹 referencia orden por orden   : {t_ref * 1000:9.2f} ms")
+    print(f"🔸 speedup                      : {t_ref / mejor:9.1f}x")
+    print(f"🔸 ejecutables                  : {int(dim.ejecutable.sum()):,}/{len(dim):,} · "
+          + (f"polvo mediano {np.median(polvo_bps):.3f} bps, máx {np.max(polvo_bps):.2f} bps"
+             if len(polvo_bps) else "sin polvo"))
+    print(f"{'✅' if ok else '❌'} Precios y cantidades idénticos a la referencia ({difieren} distintos), "
+          f"final a {err_final:.1e}: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# benchmarks/bench_descarga.py
+"""
+⏱️ Micro-benchmark de la descarga de libros: secuencial vs scheduler concurrente.
+
+Contra `ExchangeSimulado` (`absorcion/servidor_depth.py`: latencia lognormal,
+peso por ventana de 1 minuto y 429 como Binance, errores de red inyectados):
+
+- secuencial     : un `fetch_order_book` por vez con el ritmo del throttle de
+                   ccxt para Binance (`rateLimit` 50 ms), como `FuenteCCXT`.
+                   Se mide sobre `--secuenciales` símbolos y se proyecta.
+- concurrente    : `DescargadorLibros` (prioridad por triada, cubo de pesos,
+                   concurrencia acotada, reintentos) sobre todos los símbolos.
+
+Verifica que lleguen todos los libros, que el servidor no haya rechazado nada
+(429) y que el peso usado entre en el presupuesto, y mide la llegada media del
+10% de símbolos con mayor prioridad contra el resto.
+
+Con `--http` la ronda concurrente pasa por `ServidorDepth` en localhost y
+`ccxt.async_support` real (requiere aiohttp y ccxt).
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_descarga.py [--simbolos 800] [--latencia 0.08] [--tasa-error 0.02] [--http]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from absorcion.descarga_libros import CuboPesos, DescargadorLibros, exchange_async, peso_depth  # type: ignore
+from absorcion.servidor_depth import ExchangeSimulado, MotorDepth, ServidorDepth, servir  # type: ignore
+from codigo.config import LIBRO_PROFUNDIDAD, LIBROS_CONCURRENCIA, LIBROS_PESO_POR_MINUTO  # type: ignore
+
+RATE_LIMIT_CCXT_S = 0.05  # `rateLimit` de ccxt.binance
+
+
+async def secuencial(cliente, simbolos, limite: int) -> float:
+    """Un libro por vez, respetando el intervalo mínimo del throttle de ccxt."""
+    t0 = time.perf_counter()
+    for symbol in simbolos:
+        t = time.perf_counter()
+        try:
+            await cliente.fetch_order_book(symbol, limit=limite)
+        except Exception:  # noqa: BLE001 — como FuenteCCXT: se sigue con el próximo
+            pass
+        await asyncio.sleep(max(0.0, RATE_LIMIT_CCXT_S - (time.perf_counter() - t)))
+    return time.perf_counter() - t0
+
+
+async def concurrente_http(simbolos, prioridad, args):
+    """Ronda concurrente vía ServidorDepth + ccxt.async_support apuntado a localhost."""
+    from bench_mapeo import market_binance  # type: ignore
+
+    rng = np.random.default_rng(3)
+    markets = {s: market_binance(*s.split("/"), rng) for s in simbolos}
+    motor = MotorDepth(simbolos, args.peso_por_minuto)
+    runner = await servir(ServidorDepth(motor, args.latencia, args.tasa_error), puerto=args.puerto)
+    ex = exchange_async("binance", f"http://127.0.0.1:{args.puerto}", markets)
+    try:
+        descargador = DescargadorLibros(ex, args.profundidad, args.concurrencia,
+                                        cubo=CuboPesos(args.peso_por_minuto))
+        res = await descargador.descargar(simbolos, prioridad)
+    finally:
+        await ex.close()
+        await runner.cleanup()
+    return res, motor, args.concurrencia
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simbolos", type=int, default=800)
+    parser.add_argument("--secuenciales", type=int, default=60, help="Símbolos medidos en la corrida secuencial")
+    parser.add_argument("--profundidad", type=int, default=LIBRO_PROFUNDIDAD)
+    parser.add_argument("--latencia", type=float, default=0.08, help="Latencia media por request (s)")
+    parser.add_argument("--tasa-error", type=float, default=0.02)
+    parser.add_argument("--concurrencia", type=int, default=LIBROS_CONCURRENCIA)
+    parser.add_argument("--peso-por-minuto", type=int, default=LIBROS_PESO_POR_MINUTO)
+    parser.add_argument("--http", action="store_true", help="Concurrente vía servidor HTTP local + ccxt")
+    parser.add_argument("--puerto", type=int, default=18766)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(5)
+    simbolos = [f"TK{i}/USDT" for i in range(args.simbolos)]
+    prioridad = rng.normal(0.0, 1e-3, len(simbolos))  # como net_spread_expected de la mejor triada
+
+    motor_sec = MotorDepth(simbolos, args.peso_por_minuto)
+    n_sec = min(args.secuenciales, len(simbolos))
+    t_sec = asyncio.run(secuencial(ExchangeSimulado(motor_sec, args.latencia, args.tasa_error), simbolos[:n_sec], args.profundidad))
+    t_sec_total = t_sec / max(n_sec, 1) * len(simbolos)
+
+    if args.http:
+        res, motor, max_en_vuelo = asyncio.run(concurrente_http(simbolos, prioridad, args))
+    else:
+        motor = MotorDepth(simbolos, args.peso_por_minuto)
+        cliente = ExchangeSimulado(motor, args.latencia, args.tasa_error)
+        descargador = DescargadorLibros(cliente, args.profundidad, args.concurrencia,
+                                        cubo=CuboPesos(args.peso_por_minuto))
+        res = asyncio.run(descargador.descargar(simbolos, prioridad))
+        max_en_vuelo = cliente.max_en_vuelo
+
+    presupuesto = CuboPesos(args.peso_por_minuto).capacidad
+    top = np.argsort(-prioridad)[: max(1, len(simbolos) // 10)]
+    es_top = np.zeros(len(simbolos), dtype=bool)
+    es_top[top] = True
+    llegada = np.array([res.llegada_s.get(s, np.nan) for s in simbolos])
+    ok = (len(res.libros) == len(simbolos) and motor.rechazados == 0 and res.peso <= presupuesto
+          and max_en_vuelo <= args.concurrencia)
+
+    print(f"\n⏱️  Descarga de libros — {len(simbolos):,} símbolos, limit={args.profundidad} "
+          f"(peso {peso_depth(args.profundidad)} c/u), latencia media {args.latencia * 1000:.0f} ms, "
+          f"errores {args.tasa_error:.0%}{' · HTTP + ccxt' if args.http else ''}")
+    print(f"🔹 secuencial ({n_sec} medidos)     : {t_sec * 1000:9.1f} ms → proyectado {t_sec_total:7.1f} s")
+    print(f"🔹 concurrente ({args.concurrencia} en vuelo)    : {res.duracion_s * 1000:9.1f} ms")
+    print(f"🔸 speedup                      : {t_sec_total / res.duracion_s:9.1f}x")
+    print(f"🔸 peso usado                   : {res.peso:,} / presupuesto {presupuesto:,.0f} "
+          f"(servidor: máximo {motor.usado_max:,} en la ventana, {motor.rechazados} rechazos 429)")
+    print(f"🔸 reintentos / fallidos        : {res.reintentos} / {len(res.fallidos)} · máximo en vuelo {max_en_vuelo}")
+    print(f"🔸 llegada media top 10% / resto: {np.nanmean(llegada[es_top]) * 1000:.0f} ms / "
+          f"{np.nanmean(llegada[~es_top]) * 1000:.0f} ms")
+    print(f"{'✅' if ok else '❌'} Todos los libros dentro del presupuesto y sin 429: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/bench_equivalencias.py
+"""
+⏱️ Micro-benchmark del resolutor de equivalencias USDT (codigo/grafo_activos.py).
+
+Sobre el listado sintético de bench_ciclos (forma de Binance spot, precios
+coherentes por activo) compara la resolución completa (Dijkstra desde USDT)
+contra `ResolutorEquivalencias.actualizar_precios` con un stream de updates
+de un símbolo:
+
+- solo `last`              : el costo de ruta no cambia, se recalcula el subárbol.
+- `last` + libro           : bid/ask/volumen mueven el costo; si toca el árbol
+                             (o una arista de afuera lo acorta) se re-resuelve.
+
+Al final verifica equivalencias y rutas contra un resolutor nuevo.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_equivalencias.py [--mercados 3000] [--updates 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from benchmarks.bench_ciclos import mercados_sinteticos  # type: ignore
+from codigo.equivalencias import TablaPrecios  # type: ignore
+from codigo.grafo_activos import GrafoActivos, ResolutorEquivalencias  # type: ignore
+
+SPREAD = 2e-4
+SEMILLAS = {"USDT": 1.0}
+
+
+def _stream(resolutor: ResolutorEquivalencias, simbolos, last, bid, ask, vol, con_libro: bool):
+    """Aplica los updates uno por uno; devuelve (segundos, re-resoluciones completas)."""
+    n_activos = len(resolutor.grafo.activos)
+    completas = 0
+    t0 = time.perf_counter()
+    for i in range(len(simbolos)):
+        s = simbolos[i]
+        libros = {s: (bid[i], ask[i], vol[i])} if con_libro else None
+        completas += len(resolutor.actualizar_precios({s: last[i]}, libros)) == n_activos
+    return time.perf_counter() - t0, completas
+
+
+def _igual_a_nuevo(resolutor: ResolutorEquivalencias) -> bool:
+    ref = ResolutorEquivalencias(resolutor.grafo, SEMILLAS)
+    activos = list(resolutor.grafo.activos)
+    return (
+        np.allclose(resolutor.equivalencias(activos), ref.equivalencias(activos), rtol=1e-9, equal_nan=True)
+        and all(resolutor.ruta(a) == ref.ruta(a) for a in activos)
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mercados", type=int, default=3_000)
+    parser.add_argument("--updates", type=int, default=5_000)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(11)
+    df, volumen = mercados_sinteticos(args.mercados)
+    activos = np.unique(np.concatenate([df["base"], df["quote"]]))
+    valor = dict(zip(activos, np.exp(rng.uniform(-5, 5, len(activos)))))
+    last = np.array([valor[b] / valor[q] for b, q in zip(df["base"], df["quote"])])
+    spread = SPREAD * rng.lognormal(0.0, 1.0, len(df))
+    tabla = TablaPrecios.desde_tickers({
+        s: {"last": p, "bid": p * (1 - h), "ask": p * (1 + h), "quoteVolume": v}
+        for s, p, h, v in zip(df["symbol"], last, spread, volumen)
+    })
+
+    grafo = GrafoActivos.desde_pares(df, tabla)
+    t0 = time.perf_counter()
+    resolutor = ResolutorEquivalencias(grafo, SEMILLAS)
+    t_completo = time.perf_counter() - t0
+
+    # Updates de un símbolo, más frecuentes en los pares con más volumen
+    p = volumen / volumen.sum()
+    idx = rng.choice(len(df), args.updates, p=p)
+    simbolos = df["symbol"].to_numpy()[idx]
+    nuevo = last[idx] * np.exp(rng.normal(0.0, 1e-3, args.updates))
+    h = spread[idx] * np.exp(rng.normal(0.0, 0.2, args.updates))
+    bid, ask, vol = nuevo * (1 - h), nuevo * (1 + h), volumen[idx]
+
+    t_last, c_last = _stream(resolutor, simbolos, nuevo, bid, ask, vol, con_libro=False)
+    ok = _igual_a_nuevo(resolutor)
+    t_libro, c_libro = _stream(resolutor, simbolos, nuevo, bid, ask, vol, con_libro=True)
+    ok = ok and _igual_a_nuevo(resolutor)
+
+    n = args.updates
+    print(f"\n⏱️  Equivalencias — {len(grafo.activos):,} activos / {len(grafo.simbolos):,} símbolos / {n:,} updates")
+    print(f"🔹 resolución completa (Dijkstra) : {t_completo * 1000:9.2f} ms  "
+          f"(cobertura {resolutor.cobertura():.1%})")
+    print(f"🔹 por update, solo last          : {t_last / n * 1e6:9.1f} µs  ({c_last} re-resoluciones)")
+    print(f"🔹 por update, last + libro       : {t_libro / n * 1e6:9.1f} µs  ({c_libro} re-resoluciones)")
+    print(f"🔸 speedup solo last              : {t_completo / (t_last / n):9.1f}x")
+    print(f"{'✅' if ok else '❌'} Incremental == resolución nueva: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
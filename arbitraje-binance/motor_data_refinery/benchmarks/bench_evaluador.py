@@ -0,0 +1,91 @@
+# benchmarks/bench_evaluador.py
+"""
+⏱️ Micro-benchmark del evaluador de spread neto (absorcion/evaluador.py).
+
+Arma N triadas sintéticas sobre un universo de S símbolos, genera snapshots de
+bid/ask al azar y mide la evaluación completa por snapshot (gross, fees, net)
+y el camino caliente (solo net + top-K), contra el presupuesto de 3 ms de
+ARQUITECTURA.md. Verifica una muestra contra el cálculo pierna a pierna.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_evaluador.py [--triadas 100000] [--simbolos 3000] [--snapshots 200]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.evaluador import Evaluador, top_k  # type: ignore
+
+PRESUPUESTO_MS = 3.0
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--triadas", type=int, default=100_000)
+    parser.add_argument("--simbolos", type=int, default=3_000)
+    parser.add_argument("--snapshots", type=int, default=200)
+    parser.add_argument("--top", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(7)
+    piernas = rng.integers(0, args.simbolos, (args.triadas, 3))
+    bits = rng.integers(0, 2, (args.triadas, 3)).astype(np.uint8)
+    fee = np.full(args.simbolos, 0.001)
+    medio = np.exp(rng.uniform(-5, 5, args.simbolos))
+
+    t0 = time.perf_counter()
+    evaluador = Evaluador(piernas, bits, args.simbolos)
+    t_indice = time.perf_counter() - t0
+
+    snaps = []
+    for _ in range(args.snapshots):
+        m = medio * np.exp(rng.normal(0, 1e-3, args.simbolos))
+        spread = rng.uniform(1e-5, 1e-3, args.simbolos)
+        snaps.append((m * (1 - spread), m * (1 + spread)))
+
+    t_completo, t_caliente = [], []
+    for bid, ask in snaps:
+        t0 = time.perf_counter()
+        evaluador.evaluar(bid, ask, fee)
+        t_completo.append(time.perf_counter() - t0)
+    for bid, ask in snaps:
+        t0 = time.perf_counter()
+        net = evaluador.neto(bid, ask, fee)
+        top_k(net, args.top)
+        t_caliente.append(time.perf_counter() - t0)
+
+    # Verificación pierna a pierna sobre una muestra
+    bid, ask = snaps[-1]
+    ev = evaluador.evaluar(bid, ask, fee)
+    peor = 0.0
+    for i in rng.choice(args.triadas, 500, replace=False):
+        bruto, neto = 1.0, 1.0
+        for s, b in zip(piernas[i], bits[i]):
+            tasa = 1.0 / ask[s] if b else bid[s]
+            bruto *= tasa
+            neto *= tasa * (1 - fee[s])
+        peor = max(peor, abs(ev.gross_spread[i] - (bruto - 1)), abs(ev.net_spread_expected[i] - (neto - 1)))
+    ok = peor < 1e-12
+
+    p50 = lambda xs: np.percentile(xs, 50) * 1000  # noqa: E731
+    p99 = lambda xs: np.percentile(xs, 99) * 1000  # noqa: E731
+    print(f"\n⏱️  Evaluador — {args.triadas:,} triadas / {args.simbolos} símbolos / {args.snapshots} snapshots")
+    print(f"🔹 índice (una vez por set)       : {t_indice * 1000:8.2f} ms")
+    print(f"🔹 completo (gross, fees, net)    : p50 {p50(t_completo):6.2f} ms · p99 {p99(t_completo):6.2f} ms")
+    print(f"🔹 caliente (net + top-{args.top})     : p50 {p50(t_caliente):6.2f} ms · p99 {p99(t_caliente):6.2f} ms")
+    dentro = p50(t_caliente) < PRESUPUESTO_MS
+    print(f"{'✅' if dentro else '⚠️'} Presupuesto {PRESUPUESTO_MS:.0f} ms por snapshot (p50 caliente): {dentro}")
+    print(f"{'✅' if ok else '❌'} Coincide con el cálculo pierna a pierna: {ok} (error abs máx {peor:.1e})\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_filtro.py
+"""
+⏱️ Micro-benchmark del filtro spot (etapa 2).
+
+Compara `aplicar_criterios_fila_a_fila` (iterrows, implementación original)
+contra `aplicar_criterios` (máscaras vectorizadas) sobre una tabla sintética
+de mercados y verifica que ambos caminos produzcan el mismo resultado.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_filtro.py [--filas 50000] [--repeticiones 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from codigo.static.fiat import fiat_tokens  # type: ignore
+
+filtro = importlib.import_module("codigo.2_filtrar_spot")
+
+
+def tabla_sintetica(n: int, seed: int = 7) -> pd.DataFrame:
+    """Tabla estandarizada falsa con ~10% fiat, ~5% inactivos y ~5% no-spot."""
+    rng = np.random.default_rng(seed)
+    cripto = np.array([f"TK{i}" for i in range(2_000)])
+    fiat = np.array(fiat_tokens)
+    base = rng.choice(cripto, n)
+    quote = np.where(rng.random(n) < 0.10, rng.choice(fiat, n), rng.choice(["USDT", "BTC", "ETH", "FDUSD"], n))
+    es_spot = rng.random(n) >= 0.05
+    return pd.DataFrame({
+        "symbol": pd.Series(base).str.cat(pd.Series(quote), sep="/"),
+        "base": base,
+        "quote": quote,
+        "fee_maker": "0.001",
+        "fee_taker": "0.001",
+        "type": np.where(es_spot, "spot", "swap"),
+        "spot": np.where(es_spot, "True", "False"),
+        "active": np.where(rng.random(n) >= 0.05, "True", "False"),
+    })
+
+
+def _medir(fn, df, criterios, repeticiones: int):
+    mejor = float("inf")
+    out = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        out = fn(df, criterios)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, out
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=50_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = tabla_sintetica(args.filas)
+    criterios = filtro.cargar_criterios()
+
+    t_old, (f_old, d_old) = _medir(filtro.aplicar_criterios_fila_a_fila, df, criterios, 1)
+    t_new, (f_new, d_new) = _medir(filtro.aplicar_criterios, df, criterios, args.repeticiones)
+
+    iguales = (
+        f_old["symbol"].tolist() == f_new["symbol"].tolist()
+        and d_old["motivo_descartado"].tolist() == d_new["motivo_descartado"].tolist()
+    )
+
+    print(f"\n⏱️  Filtro spot — {args.filas} filas sintéticas")
+    print(f"🔹 fila a fila (iterrows): {t_old * 1000:10.1f} ms")
+    print(f"🔹 vectorizado (máscaras): {t_new * 1000:10.1f} ms")
+    print(f"🔸 speedup               : {t_old / t_new:10.1f}x")
+    print(f"{'✅' if iguales else '❌'} Resultados idénticos: {iguales} "
+          f"({len(f_new)} funcionales / {len(d_new)} descartados)\n")
+
+
+if __name__ == "__main__":
+    main()
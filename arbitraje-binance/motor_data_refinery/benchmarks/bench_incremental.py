@@ -0,0 +1,103 @@
+# benchmarks/bench_incremental.py
+"""
+⏱️ Micro-benchmark de la re-puntuación incremental (absorcion/incremental.py).
+
+Usa los ciclos reales de un listado sintético con forma de Binance
+(`bench_ciclos.mercados_sinteticos` + `buscar_ciclos`), con precios coherentes
+(valor por activo + ruido) y simula un stream de updates de bookTicker, un
+símbolo por update, más frecuentes en los pares con más volumen. Compara el
+costo por update de `PuntuadorIncremental.actualizar` + `mejores` contra
+re-evaluar todas las rutas, y verifica estado y heap contra la evaluación completa.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_incremental.py [--mercados 3000] [--longitud-max 4] [--updates 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.ciclos import buscar_ciclos  # type: ignore
+from absorcion.evaluador import Evaluador, top_k  # type: ignore
+from absorcion.incremental import PuntuadorIncremental  # type: ignore
+from absorcion.triadas import GrafoMercados  # type: ignore
+from benchmarks.bench_ciclos import mercados_sinteticos  # type: ignore
+from codigo.config import ANCLAS  # type: ignore
+
+SPREAD = 2e-4
+RUIDO = 1.5e-3
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mercados", type=int, default=3_000)
+    parser.add_argument("--longitud-max", type=int, default=4)
+    parser.add_argument("--updates", type=int, default=20_000)
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    df, volumen = mercados_sinteticos(args.mercados)
+    grafo = GrafoMercados.desde_pares(df)
+    ciclos = buscar_ciclos(grafo, ANCLAS, args.longitud_max)
+    S = len(grafo.simbolos)
+
+    rng = np.random.default_rng(7)
+    valor = np.exp(rng.uniform(-5, 5, len(grafo.activos)))
+    justo = valor[grafo.base] / valor[grafo.quote]
+
+    def libro(ids):
+        medio = justo[ids] * np.exp(rng.normal(0, RUIDO, len(ids)))
+        return medio * (1 - SPREAD), medio * (1 + SPREAD)
+
+    bid, ask = libro(np.arange(S))
+    fee = np.full(S, 0.001)
+
+    t0 = time.perf_counter()
+    punt = PuntuadorIncremental.desde_ciclos(ciclos, bid, ask, fee)
+    t_init = time.perf_counter() - t0
+
+    p = np.minimum(volumen, 1e9)
+    ids = rng.choice(S, args.updates, p=p / p.sum())
+    tocadas = 0
+    t0 = time.perf_counter()
+    for i in ids.tolist():
+        b, a = libro(np.array([i]))
+        tocadas += len(punt.actualizar(np.array([i]), b, a))
+        punt.mejores(args.top)
+    t_inc = (time.perf_counter() - t0) / args.updates
+
+    evaluador = Evaluador.desde_ciclos(ciclos)
+    n_full = min(200, args.updates)
+    t0 = time.perf_counter()
+    for _ in range(n_full):
+        top_k(evaluador.neto(punt.bid, punt.ask, fee), args.top)
+    t_full = (time.perf_counter() - t0) / n_full
+
+    ref = evaluador.neto(punt.bid, punt.ask, fee)
+    iguales = bool(np.array_equal(punt.net, ref, equal_nan=True))
+    esperados = [r for r in top_k(ref, args.top).tolist() if ref[r] >= punt.umbral]
+    # Se comparan valores: rutas con el mismo spread pueden salir en distinto orden
+    heap_ok = [v for _, v in punt.mejores(args.top)] == ref[esperados].tolist()
+
+    print(f"\n⏱️  Incremental — {len(ciclos):,} ciclos (hasta {args.longitud_max} piernas) / {S} símbolos / "
+          f"{args.updates:,} updates")
+    print(f"🔹 armado (índice invertido + heap)   : {t_init * 1000:8.1f} ms")
+    print(f"🔹 por update (incremental + mejores) : {t_inc * 1e6:8.1f} µs "
+          f"({tocadas / args.updates:.0f} rutas recalculadas en promedio)")
+    print(f"🔹 por update (re-evaluación total)   : {t_full * 1e6:8.1f} µs")
+    print(f"🔸 speedup                            : {t_full / t_inc:8.1f}x")
+    print(f"{'✅' if iguales else '❌'} Estado incremental == evaluación completa: {iguales}")
+    print(f"{'✅' if heap_ok else '❌'} Heap == top-{args.top} completo sobre el umbral: {heap_ok} "
+          f"({len(esperados)} rutas con spread >= {punt.umbral})\n")
+
+
+if __name__ == "__main__":
+    main()
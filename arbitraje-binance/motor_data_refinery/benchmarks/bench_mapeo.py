@@ -0,0 +1,142 @@
+# benchmarks/bench_mapeo.py
+"""
+⏱️ Micro-benchmark del mapeo a campos estándar (etapa 1).
+
+Arma un `load_markets()` sintético con la forma completa de Binance en CCXT
+(precision / limits anidados e `info` crudo con filtros, orderTypes y
+permissionSets) y compara `construir_tabla_estandar_aplanando` (flatten_json
+por market, implementación original) contra `construir_tabla_estandar`
+(mapeo compilado a rutas anidadas, extracción directa a columnas).
+
+Una fracción de markets viene sin `limits.price` ni `precision.price` para
+ejercitar las claves que la ruta compilada no encuentra. Verifica que ambos
+caminos produzcan la misma tabla.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_mapeo.py [--mercados 20000] [--repeticiones 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+mapeo = importlib.import_module("codigo.1_mapear_campos_estandar")
+
+
+def market_binance(base: str, quote: str, rng: np.random.Generator, incompleto: bool = False) -> dict:
+    symbol = f"{base}/{quote}"
+    tick, paso = float(10.0 ** -rng.integers(2, 8)), float(10.0 ** -rng.integers(0, 6))
+    m = {
+        "id": f"{base}{quote}", "lowercaseId": f"{base}{quote}".lower(), "symbol": symbol,
+        "base": base, "quote": quote, "settle": None, "baseId": base, "quoteId": quote, "settleId": None,
+        "type": "spot", "spot": True, "margin": bool(rng.random() < 0.3), "swap": False, "future": False,
+        "option": False, "index": None, "active": bool(rng.random() >= 0.05), "contract": False,
+        "linear": None, "inverse": None, "subType": None, "taker": 0.001, "maker": 0.001,
+        "contractSize": None, "expiry": None, "expiryDatetime": None, "strike": None, "optionType": None,
+        "precision": {"amount": paso, "price": tick, "cost": None, "base": 1e-08, "quote": 1e-08},
+        "limits": {
+            "leverage": {"min": None, "max": None},
+            "amount": {"min": paso, "max": 9000000.0},
+            "price": {"min": tick, "max": 1000000.0},
+            "cost": {"min": 5.0, "max": 9000000.0},
+            "market": {"min": 0.0, "max": 100000.0},
+        },
+        "marginModes": {"cross": None, "isolated": None},
+        "created": None,
+        "info": {
+            "symbol": f"{base}{quote}", "status": "TRADING", "baseAsset": base, "baseAssetPrecision": "8",
+            "quoteAsset": quote, "quotePrecision": "8", "quoteAssetPrecision": "8",
+            "baseCommissionPrecision": "8", "quoteCommissionPrecision": "8",
+            "orderTypes": ["LIMIT", "LIMIT_MAKER", "MARKET", "STOP_LOSS_LIMIT", "TAKE_PROFIT_LIMIT"],
+            "icebergAllowed": True, "ocoAllowed": True, "otoAllowed": True,
+            "quoteOrderQtyMarketAllowed": True, "allowTrailingStop": True, "cancelReplaceAllowed": True,
+            "isSpotTradingAllowed": True, "isMarginTradingAllowed": False,
+            "filters": [
+                {"filterType": "PRICE_FILTER", "minPrice": str(tick), "maxPrice": "1000000.00", "tickSize": str(tick)},
+                {"filterType": "LOT_SIZE", "minQty": str(paso), "maxQty": "9000000.00", "stepSize": str(paso)},
+                {"filterType": "ICEBERG_PARTS", "limit": "10"},
+                {"filterType": "MARKET_LOT_SIZE", "minQty": "0.00", "maxQty": "100000.00", "stepSize": "0.00"},
+                {"filterType": "TRAILING_DELTA", "minTrailingAboveDelta": "10", "maxTrailingAboveDelta": "2000",
+                 "minTrailingBelowDelta": "10", "maxTrailingBelowDelta": "2000"},
+                {"filterType": "PERCENT_PRICE_BY_SIDE", "bidMultiplierUp": "5", "bidMultiplierDown": "0.2",
+                 "askMultiplierUp": "5", "askMultiplierDown": "0.2", "avgPriceMins": "5"},
+                {"filterType": "NOTIONAL", "minNotional": "5.00", "applyMinToMarket": True,
+                 "maxNotional": "9000000.00", "applyMaxToMarket": False, "avgPriceMins": "5"},
+                {"filterType": "MAX_NUM_ORDERS", "maxNumOrders": "200"},
+                {"filterType": "MAX_NUM_ALGO_ORDERS", "maxNumAlgoOrders": "5"},
+            ],
+            "permissions": [],
+            "permissionSets": [["SPOT", "MARGIN", "TRD_GRP_004", "TRD_GRP_005", "TRD_GRP_006"]],
+            "defaultSelfTradePreventionMode": "EXPIRE_MAKER",
+            "allowedSelfTradePreventionModes": ["EXPIRE_TAKER", "EXPIRE_MAKER", "EXPIRE_BOTH"],
+        },
+    }
+    if incompleto:
+        del m["limits"]["price"]
+        m["precision"].pop("price")
+    return m
+
+
+def markets_sinteticos(n: int, seed: int = 11) -> dict:
+    rng = np.random.default_rng(seed)
+    quotes = ["USDT", "BTC", "ETH", "FDUSD", "USDC", "BNB", "TRY", "EUR"]
+    out: dict = {}
+    i = 0
+    while len(out) < n:
+        base = f"TK{i}"
+        for q in quotes[: rng.integers(1, len(quotes) + 1)]:
+            if len(out) >= n:
+                break
+            out[f"{base}/{q}"] = market_binance(base, q, rng, incompleto=bool(rng.random() < 0.02))
+        i += 1
+    return out
+
+
+def _medir(fn, markets, repeticiones: int):
+    mejor = float("inf")
+    out = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        out = fn(markets, "binance")
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, out
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mercados", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    markets = markets_sinteticos(args.mercados)
+
+    t_ref, df_ref = _medir(mapeo.construir_tabla_estandar_aplanando, markets, args.repeticiones)
+    mapeo._compilar.cache_clear()
+    t0 = time.perf_counter()
+    mapeo.construir_tabla_estandar(markets, "binance")
+    t_frio = time.perf_counter() - t0
+    t_comp, df_comp = _medir(mapeo.construir_tabla_estandar, markets, args.repeticiones)
+
+    compilado = mapeo.compilar_mapeo("binance")
+    ok = df_ref.equals(df_comp)
+    print(f"\n⏱️  Mapeo a campos estándar — {len(markets):,} markets")
+    print(f"🔹 flatten_json por market      : {t_ref * 1000:9.1f} ms")
+    print(f"🔹 compilado (primera corrida)  : {t_frio * 1000:9.1f} ms")
+    print(f"🔹 compilado                    : {t_comp * 1000:9.1f} ms")
+    print(f"🔸 speedup                      : {t_ref / t_comp:9.1f}x")
+    print(f"🔸 rutas compiladas             : {len(compilado.rutas)} "
+          f"(markets aplanados por claves desconocidas: {compilado.aplanados:,})")
+    print(f"{'✅' if ok else '❌'} Misma tabla que la implementación original: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_persistencia.py
+"""
+⏱️ Throughput del historial (codigo/persistencia.py) contra un stand-in SQLite.
+
+Arma un cotizador sintético de N filas (el de bench_artefacto) y lo persiste
+en `equivalencias_hist` de tres formas:
+
+- fila a fila      : conexión nueva + INSERT + commit por fila (lo que daría
+                     llamar a `connect()` por registro).
+- por lotes        : `Historial.insertar` (pool + executemany en una transacción).
+- escritor fondo   : `EscritorFondo.encolar` (lo que paga el pipeline) y el
+                     tiempo hasta vaciar la cola.
+
+Con `--mariadb` corre contra la base de la config en vez de SQLite (las
+tablas de historial tienen que poder crearse).
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_persistencia.py [--filas 20000] [--fila-a-fila 2000] [--mariadb]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_artefacto import cotizador_sintetico  # type: ignore
+from codigo.persistencia import (  # type: ignore
+    EQUIVALENCIAS, EscritorFondo, Historial, PoolConexiones, filas_equivalencias,
+)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--filas", type=int, default=20_000)
+    parser.add_argument("--fila-a-fila", type=int, default=2_000, help="Filas del caso ingenuo (es lento)")
+    parser.add_argument("--mariadb", action="store_true")
+    args = parser.parse_args(argv)
+
+    df = cotizador_sintetico(args.filas)
+    filas = filas_equivalencias(df, int(time.time() * 1000))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "historial.db"
+        pool = PoolConexiones.mariadb() if args.mariadb else PoolConexiones.sqlite(ruta)
+        historial = Historial(pool)
+        historial.crear_tablas()
+
+        # 1) fila a fila, conexión nueva por registro
+        n_ingenuo = min(args.fila_a_fila, len(filas))
+        marca = "%s" if pool.dialecto == "mariadb" else "?"
+        sql = (f"INSERT {'IGNORE' if pool.dialecto == 'mariadb' else 'OR IGNORE'} INTO {EQUIVALENCIAS.nombre} "
+               f"VALUES ({', '.join([marca] * len(EQUIVALENCIAS.columnas))})")
+        t0 = time.perf_counter()
+        for fila in filas[:n_ingenuo]:
+            if args.mariadb:
+                from codigo.config import connect  # type: ignore
+                conn = connect()
+            else:
+                conn = sqlite3.connect(str(ruta), timeout=30)
+            conn.cursor().execute(sql, fila)
+            conn.commit()
+            conn.close()
+        t_ingenuo = time.perf_counter() - t0
+
+        # 2) por lotes (las filas ya insertadas se ignoran; se mide el resto + re-envío)
+        t0 = time.perf_counter()
+        historial.insertar(EQUIVALENCIAS.nombre, filas)
+        t_lotes = time.perf_counter() - t0
+
+        # 3) escritor de fondo con otro ts (filas nuevas)
+        filas_2 = filas_equivalencias(df, int(time.time() * 1000) + 1)
+        escritor = EscritorFondo(historial).iniciar()
+        t0 = time.perf_counter()
+        for i in range(0, len(filas_2), 1_000):
+            escritor.encolar(EQUIVALENCIAS.nombre, filas_2[i:i + 1_000])
+        t_encolar = time.perf_counter() - t0
+        escritor.cerrar()
+        t_fondo = time.perf_counter() - t0
+
+        total = historial.contar(EQUIVALENCIAS.nombre)
+        pool.cerrar()
+
+    fps = lambda n, s: n / s if s > 0 else float("inf")  # noqa: E731
+    print(f"\n⏱️  Historial — {args.filas:,} filas ({'MariaDB' if args.mariadb else 'SQLite stand-in'})")
+    print(f"🔹 fila a fila ({n_ingenuo:,})          : {t_ingenuo * 1000:9.1f} ms  ({fps(n_ingenuo, t_ingenuo):10,.0f} filas/s)")
+    print(f"🔹 por lotes (executemany)      : {t_lotes * 1000:9.1f} ms  ({fps(len(filas), t_lotes):10,.0f} filas/s)")
+    print(f"🔹 escritor fondo: encolar      : {t_encolar * 1000:9.3f} ms  (lo que bloquea al pipeline)")
+    print(f"🔹 escritor fondo: hasta vaciar : {t_fondo * 1000:9.1f} ms  ({fps(len(filas_2), t_fondo):10,.0f} filas/s)")
+    print(f"🔸 speedup lotes vs fila a fila : {fps(len(filas), t_lotes) / fps(n_ingenuo, t_ingenuo):9.1f}x")
+    print(f"{'✅' if total == 2 * len(filas) else '❌'} Filas en {EQUIVALENCIAS.nombre}: {total:,} "
+          f"(esperadas {2 * len(filas):,}; descartadas {escritor.descartadas}, errores {escritor.errores})\n")
+
+
+if __name__ == "__main__":
+    main()
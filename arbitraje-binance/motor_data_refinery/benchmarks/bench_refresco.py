@@ -0,0 +1,128 @@
+# benchmarks/bench_refresco.py
+"""
+⏱️ Micro-benchmark del refresco incremental de mercados (codigo/refresco.py).
+
+Arma un `load_markets()` sintético con forma de Binance
+(`bench_ciclos.mercados_sinteticos`, markets con la estructura CCXT que mapea
+`campos_estandar.py`) y compara la reconstrucción completa de estandar → spot
+→ separación → triadas contra:
+
+- mismo snapshot             : no-op inmediato (ts igual a la generación previa).
+- snapshot nuevo sin cambios : normalización + diff, no-op.
+- delta chico                : altas, bajas y cambios de `active` / precisión.
+
+y, dentro del delta, la separación por anclas: `separar_por_anclas` sobre
+todo spot contra `_separar_delta` (solo los frames donde caen los pares que
+entran / salen).
+
+Verifica que el estado incremental sea idéntico al de una reconstrucción.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_refresco.py [--mercados 3000] [--cambios 10] [--repeticiones 5]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from benchmarks.bench_ciclos import mercados_sinteticos  # type: ignore
+from codigo.refresco import EstadoRefresco, _etapa, _pares, _separar_delta, refrescar  # type: ignore
+
+
+def market_ccxt(symbol: str, base: str, quote: str) -> dict:
+    return {
+        "id": symbol.replace("/", ""), "symbol": symbol, "base": base, "quote": quote,
+        "type": "spot", "spot": True, "active": True, "maker": 0.001, "taker": 0.001,
+        "precision": {"price": 1e-6, "amount": 1e-3},
+        "limits": {"price": {"min": 1e-6, "max": 1e6}, "amount": {"min": 1e-3, "max": 9e6}},
+        "info": {"status": "TRADING", "permissions": ["SPOT"]},
+    }
+
+
+def _medir(fn, repeticiones: int) -> float:
+    tiempos = []
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        fn()
+        tiempos.append(time.perf_counter() - t0)
+    return float(np.median(tiempos))
+
+
+def _iguales(a: EstadoRefresco, b: EstadoRefresco) -> bool:
+    return (
+        a.estandar.equals(b.estandar)
+        and a.spot.equals(b.spot)
+        and a.descartados.equals(b.descartados)
+        and all(
+            x.reset_index(drop=True).equals(y.reset_index(drop=True))
+            for ancla in b.separados for x, y in zip(a.separados[ancla], b.separados[ancla])
+        )
+        and bool((a.triadas.simbolos == b.triadas.simbolos).all())
+        and np.array_equal(a.triadas.piernas, b.triadas.piernas)
+        and np.array_equal(a.triadas.forma, b.triadas.forma)
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mercados", type=int, default=3_000)
+    parser.add_argument("--cambios", type=int, default=10, help="Altas, bajas y cambios en el delta")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    df, _ = mercados_sinteticos(args.mercados)
+    markets = {s: market_ccxt(s, b, q) for s, b, q in df.itertuples(index=False)}
+
+    # Delta: bajas, altas (activos nuevos contra USDT / BTC) y cambios de campos
+    rng = np.random.default_rng(3)
+    nuevos = copy.deepcopy(markets)
+    simbolos = list(markets)
+    for s in rng.choice(simbolos, args.cambios, replace=False):
+        nuevos.pop(s, None)
+    for i in range(args.cambios):
+        for q in ("USDT", "BTC"):
+            nuevos[f"NEW{i}/{q}"] = market_ccxt(f"NEW{i}/{q}", f"NEW{i}", q)
+    for s in rng.choice(list(nuevos), args.cambios, replace=False):
+        nuevos[s]["active"] = False
+    for s in rng.choice(list(nuevos), args.cambios, replace=False):
+        nuevos[s]["precision"]["price"] = 1e-4
+
+    previo = refrescar(markets, 1).estado
+    t_completo = _medir(lambda: refrescar(nuevos, 2), args.repeticiones)
+    t_mismo = _medir(lambda: refrescar(markets, 1, previo), args.repeticiones)
+    t_sin_cambios = _medir(lambda: refrescar(markets, 2, previo), args.repeticiones)
+    t_delta = _medir(lambda: refrescar(nuevos, 2, previo), args.repeticiones)
+
+    inc = refrescar(nuevos, 2, previo)
+    ok = _iguales(inc.estado, refrescar(nuevos, 2).estado)
+
+    spot = inc.estado.spot
+    entran = spot[~_pares(spot).isin(_pares(previo.spot)).to_numpy()]
+    salen = previo.spot[~_pares(previo.spot).isin(_pares(spot)).to_numpy()]
+    separar_por_anclas = _etapa("3_simbolos_separacion").separar_por_anclas
+    t_sep = _medir(lambda: separar_por_anclas(spot), args.repeticiones)
+    t_sep_delta = _medir(lambda: _separar_delta(previo.separados, salen, entran), args.repeticiones)
+
+    print(f"\n⏱️  Refresco de mercados — {len(markets):,} markets, delta {inc.diff.resumen()}")
+    print(f"🔹 reconstrucción completa      : {t_completo * 1000:9.2f} ms")
+    print(f"🔹 mismo snapshot (no-op)       : {t_mismo * 1000:9.3f} ms")
+    print(f"🔹 snapshot nuevo sin cambios   : {t_sin_cambios * 1000:9.2f} ms (no-op)")
+    print(f"🔹 delta                        : {t_delta * 1000:9.2f} ms")
+    print(f"🔸 speedup delta vs completa    : {t_completo / t_delta:9.1f}x")
+    print(f"🔹 separación completa / delta  : {t_sep * 1000:9.2f} ms / {t_sep_delta * 1000:.2f} ms "
+          f"({len(entran)} pares entran, {len(salen)} salen)")
+    print(f"{'✅' if ok else '❌'} Estado incremental idéntico a la reconstrucción: {ok} "
+          f"(spot {len(inc.estado.spot)}, triadas {len(inc.estado.triadas)})\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# benchmarks/bench_replica.py
+"""
+⏱️ Micro-benchmark de la réplica de libros por diff stream (absorcion/replica_libros.py).
+
+Genera un stream `depthUpdate` sintético (`grabacion_sintetica`: snapshot
+inicial por símbolo, updates concentrados cerca del tope, una fracción de
+eventos perdidos con su snapshot de resincronización más adelante) y mide:
+
+- réplica (eventos ya parseados)   : `GestorReplicas.aplicar_mensaje`.
+- réplica + tope por evento        : lo anterior leyendo el tope tras cada
+                                     evento (lo que hace un evaluador en vivo).
+                                     Es el que se compara con el objetivo, en
+                                     eventos `depthUpdate`/s (no niveles).
+- desde JSONL                      : `GestorReplicas.reproducir` (incluye json.loads).
+- referencia dict de floats        : precio float → cantidad por lado y tope con
+                                     max/min tras cada evento.
+
+Cada tramo en memoria se mide `--repeticiones` veces y se toma el mejor.
+Verifica que cada réplica termine vigente e idéntica al libro "real" del
+generador, que se hayan detectado los huecos, que el volcado a
+`AlmacenLibros` tenga el mismo tope y que la réplica con tope por evento
+llegue a `OBJETIVO_EVENTOS_S`.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_replica.py [--simbolos 200] [--eventos 100000] [--niveles 10] [--prob-hueco 0.001]
+                                       [--repeticiones 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.libros import AlmacenLibros  # type: ignore
+from absorcion.replica_libros import GestorReplicas, grabacion_sintetica, guardar_grabacion  # type: ignore
+
+OBJETIVO_EVENTOS_S = 50_000  # eventos depthUpdate/s con lectura del tope tras cada uno
+
+
+class ReplicaDict:
+    """Referencia: dict precio float → cantidad por lado, sin chequeo de secuencia."""
+
+    def __init__(self):
+        self.bids: dict = {}
+        self.asks: dict = {}
+
+    def aplicar_mensaje(self, msg: dict) -> None:
+        if msg.get("tipo") == "snapshot":
+            self.bids = {float(p): float(q) for p, q in msg["bids"]}
+            self.asks = {float(p): float(q) for p, q in msg["asks"]}
+            return
+        data = msg["data"]
+        for lado, niveles in ((self.bids, data["b"]), (self.asks, data["a"])):
+            for p, q in niveles:
+                q = float(q)
+                if q:
+                    lado[float(p)] = q
+                else:
+                    lado.pop(float(p), None)
+
+    def tope(self):
+        b, a = max(self.bids), min(self.asks)
+        return b, self.bids[b], a, self.asks[a]
+
+
+def _correr(gestor: GestorReplicas, mensajes, leer_tope: bool) -> float:
+    t0 = time.perf_counter()
+    replicas = gestor.replicas
+    for m in mensajes:
+        gestor.aplicar_mensaje(m)
+        if leer_tope:
+            replicas[m["symbol"] if "tipo" in m else m["_symbol"]].tope()
+    return time.perf_counter() - t0
+
+
+def _mejor(simbolos, mensajes, leer_tope: bool, repeticiones: int):
+    """(mejor tiempo, gestor de la última corrida): cada repetición arranca de réplicas vacías."""
+    mejor, gestor = float("inf"), None
+    for _ in range(max(1, repeticiones)):
+        gestor = GestorReplicas(simbolos)
+        mejor = min(mejor, _correr(gestor, mensajes, leer_tope))
+    return mejor, gestor
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simbolos", type=int, default=200)
+    parser.add_argument("--eventos", type=int, default=100_000)
+    parser.add_argument("--niveles", type=int, default=10, help="Niveles por evento depthUpdate")
+    parser.add_argument("--prob-hueco", type=float, default=0.001)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    simbolos = [f"TK{i}/USDT" for i in range(args.simbolos)]
+    mensajes, finales = grabacion_sintetica(simbolos, args.eventos, args.niveles, args.prob_hueco)
+    eventos = [m for m in mensajes if "data" in m]
+    n_niveles = sum(len(m["data"]["b"]) + len(m["data"]["a"]) for m in eventos)
+    perdidos = args.eventos - len(eventos)
+
+    # Para leer el tope sin mapear id → símbolo dentro del tramo medido
+    por_id = {s.replace("/", ""): s for s in simbolos}
+    for m in eventos:
+        m["_symbol"] = por_id[m["data"]["s"]]
+
+    t_replica, gestor = _mejor(simbolos, mensajes, False, args.repeticiones)
+    t_tope, _ = _mejor(simbolos, mensajes, True, args.repeticiones)
+
+    t_dict = float("inf")
+    for _ in range(max(1, args.repeticiones)):
+        referencias = {s: ReplicaDict() for s in simbolos}
+        t0 = time.perf_counter()
+        for m in mensajes:
+            ref = referencias[m["symbol"] if "tipo" in m else m["_symbol"]]
+            ref.aplicar_mensaje(m)
+            ref.tope()
+        t_dict = min(t_dict, time.perf_counter() - t0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ruta = Path(tmp) / "depth.jsonl"
+        guardar_grabacion(({k: v for k, v in m.items() if k != "_symbol"} if "data" in m else m for m in mensajes), ruta)
+        desde_archivo = GestorReplicas(simbolos)
+        t0 = time.perf_counter()
+        lineas = desde_archivo.reproducir(ruta)
+        t_archivo = time.perf_counter() - t0
+
+    def identica(r, s) -> bool:
+        bids, asks = finales[s]
+        return (r.sincronizado and list(zip(r.bids.claves, r.bids.cantidades)) == bids
+                and list(zip(r.asks.claves, r.asks.cantidades)) == asks)
+
+    ok_libros = all(identica(gestor[s], s) and identica(desde_archivo[s], s) for s in simbolos)
+    almacen = AlmacenLibros(simbolos, 20)
+    gestor.volcar_en(almacen)
+    topes = np.array([gestor[s].tope() for s in simbolos])
+    ok_almacen = (np.array_equal(almacen.bid_px[:, 0], topes[:, 0]) and np.array_equal(almacen.ask_px[:, 0], topes[:, 2]))
+    res = gestor.resumen()
+
+    eps = len(eventos) / t_tope
+    ok = ok_libros and ok_almacen and (res["huecos"] > 0 or perdidos == 0) and eps >= OBJETIVO_EVENTOS_S
+    print(f"\n⏱️  Réplica de libros — {len(simbolos)} símbolos, {len(eventos):,} eventos "
+          f"({n_niveles:,} niveles, {args.niveles} por evento), {perdidos} perdidos")
+    print(f"🔹 réplica                      : {t_replica * 1000:9.1f} ms "
+          f"({len(eventos) / t_replica:,.0f} eventos/s · {n_niveles / t_replica:,.0f} niveles/s)")
+    print(f"🔹 réplica + tope por evento    : {t_tope * 1000:9.1f} ms ({len(eventos) / t_tope:,.0f} eventos/s)")
+    print(f"🔹 desde JSONL ({lineas:,} líneas)  : {t_archivo * 1000:9.1f} ms ({len(eventos) / t_archivo:,.0f} eventos/s)")
+    print(f"🔹 referencia dict + tope       : {t_dict * 1000:9.1f} ms ({len(eventos) / t_dict:,.0f} eventos/s)")
+    print(f"🔸 speedup con tope vs dict     : {t_dict / t_tope:9.1f}x")
+    print(f"🔸 huecos / siembras / viejos   : {res['huecos']} / {res['siembras']} / {res['descartados']} "
+          f"(vigentes {res['vigentes']}/{len(simbolos)})")
+    print(f"{'✅' if ok else '❌'} Libros idénticos al generador, almacén con el mismo tope y "
+          f"≥ {OBJETIVO_EVENTOS_S:,} eventos/s con tope: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
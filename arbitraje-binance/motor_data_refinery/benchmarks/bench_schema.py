@@ -0,0 +1,109 @@
+# benchmarks/bench_schema.py
+"""
+⏱️ Micro-benchmark de la inferencia de schema (etapa 0) y de su carga.
+
+Sobre el `load_markets()` sintético de bench_mapeo (forma completa de Binance)
+compara:
+
+- inferencia completa   : `infer_type` + `merge_dicts` por market (original).
+- por formas únicas     : `inferir_schema` (huella por market, inferencia/merge
+                          sólo por forma distinta).
+- formas sin cambios    : lo que paga una regeneración con la misma huella
+                          (`formas_unicas` + `huella_formas`, sin merge ni escritura).
+- muestra sin cambios   : el atajo previo a eso (`muestra_sin_formas_nuevas`:
+                          altas + SCHEMA_MUESTRA markets) sobre un snapshot nuevo
+                          con 1% de altas; y que una forma nueva lo haga caer.
+                          No es una prueba: la etapa no registra nada con él.
+
+y la carga del schema: `exec_module` de un .py generado (formato anterior)
+contra `config.cargar_schema` (JSON, primera lectura y cacheada).
+
+Verifica que ambos schemas sean idénticos (incluido el orden de claves).
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_schema.py [--mercados 20000] [--repeticiones 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_mapeo import markets_sinteticos  # type: ignore
+from codigo.config import SCHEMA_MUESTRA, cargar_schema  # type: ignore
+from codigo.config.config import _import_module_from_path  # type: ignore
+
+etapa0 = importlib.import_module("codigo.0_generar_schemas")
+
+
+def _medir(fn, repeticiones: int):
+    mejor = float("inf")
+    out = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        out = fn()
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor, out
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mercados", type=int, default=20_000)
+    parser.add_argument("--repeticiones", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    markets = markets_sinteticos(args.mercados)
+
+    t_completo, ref = _medir(lambda: etapa0.inferir_schema_completo(markets), args.repeticiones)
+    t_formas, (schema, unicas) = _medir(lambda: etapa0.inferir_schema(markets), args.repeticiones)
+    t_sin_cambios, _ = _medir(lambda: etapa0.huella_formas(etapa0.formas_unicas(markets)), args.repeticiones)
+    ok = json.dumps(ref) == json.dumps(schema)
+
+    # Snapshot siguiente: mismas formas, 1% de los símbolos son altas
+    previo = {"formas": [h for h, _ in unicas]}
+    anteriores = list(markets)[len(markets) // 100:]
+    t_muestra, sin_nuevas = _medir(
+        lambda: etapa0.muestra_sin_formas_nuevas(markets, previo, SCHEMA_MUESTRA, anteriores), args.repeticiones
+    )
+    alta = dict(markets)
+    alta["NUEVO/USDT"] = {**next(iter(markets.values())), "campo_nuevo": 1}
+    ok = ok and sin_nuevas and not etapa0.muestra_sin_formas_nuevas(alta, previo, SCHEMA_MUESTRA, anteriores)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        py = Path(tmp) / "schema_bench.py"
+        py.write_text("schema = " + json.dumps(ref, indent=4), encoding="utf-8")
+        js = Path(tmp) / "schema.json"
+        etapa0.escribir_schema(js, "binance", schema, unicas, len(markets), simbolos=list(markets))
+        # Los símbolos van al archivo aparte: el schema que parsea cada etapa no crece con el universo
+        ok = ok and "simbolos" not in json.loads(js.read_text(encoding="utf-8"))
+        ok = ok and etapa0.leer_simbolos(js) == list(markets)
+
+        t_exec, _ = _medir(lambda: _import_module_from_path(py).schema, args.repeticiones)
+        t0 = time.perf_counter()
+        cargado = cargar_schema(js)
+        t_json_frio = time.perf_counter() - t0
+        t_json, _ = _medir(lambda: cargar_schema(js), args.repeticiones)
+        ok = ok and cargado == ref
+
+    print(f"\n⏱️  Schema — {len(markets):,} markets, {len(unicas)} formas únicas")
+    print(f"🔹 inferencia completa          : {t_completo * 1000:9.1f} ms")
+    print(f"🔹 por formas únicas            : {t_formas * 1000:9.1f} ms")
+    print(f"🔹 formas sin cambios (huella)  : {t_sin_cambios * 1000:9.1f} ms")
+    print(f"🔹 muestra sin cambios          : {t_muestra * 1000:9.1f} ms  ({SCHEMA_MUESTRA} + altas)")
+    print(f"🔸 speedup                      : {t_completo / t_formas:9.1f}x")
+    print(f"🔹 carga .py (exec_module)      : {t_exec * 1000:9.3f} ms")
+    print(f"🔹 carga JSON (primera / caché) : {t_json_frio * 1000:9.3f} ms / {t_json * 1000:.4f} ms")
+    print(f"{'✅' if ok else '❌'} Schema idéntico y atajo de muestra correcto: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# benchmarks/bench_slippage.py
+"""
+⏱️ Micro-benchmark del simulador de slippage multi-escenario (absorcion/slippage.py).
+
+Arma un mercado sintético coherente: activos con precio en USD, todos contra
+USDT más cruces al azar, libros de 20 niveles con profundidad en USD. Enumera
+sus triadas con `enumerar_triadas` y simula la grilla de tamaños × escenarios:
+
+- en línea (un proceso),
+- con el pool (`--procesos`, 0 = núcleos disponibles).
+
+Verifica contra un barrido nivel a nivel en Python sobre libros perturbados
+explícitamente (precios × m, cantidades × f) para una muestra de triadas y
+escenarios, y que el pool dé lo mismo que la corrida en línea.
+
+Uso (desde la raíz del motor):
+    python benchmarks/bench_slippage.py [--activos 400] [--cruces 2500] [--escenarios 1000] [--procesos 0]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(APP_DIR))
+
+from absorcion.libros import AlmacenLibros  # type: ignore
+from absorcion.slippage import Escenarios, TablaBarrido, simular_bloque, simular_triadas, tabla_slippage  # type: ignore
+from absorcion.triadas import GrafoMercados, enumerar_triadas  # type: ignore
+from codigo.config import LIBRO_PROFUNDIDAD, SIMULACION_GRILLA_USDT  # type: ignore
+
+OBJETIVO_S = 10.0
+
+
+def mercado_sintetico(activos: int, cruces: int, niveles: int, seed: int = 11):
+    """(pares symbol|base|quote, libros ccxt) con precios consistentes entre sí."""
+    rng = np.random.default_rng(seed)
+    usd = np.exp(rng.uniform(-6, 10, activos))
+    nombres = [f"A{i}" for i in range(activos)]
+    filas = [(f"{a}/USDT", a, "USDT", u, 1.0) for a, u in zip(nombres, usd)]
+    pares = set()
+    while len(pares) < cruces:
+        i, j = rng.integers(0, activos, 2)
+        if i != j and (j, i) not in pares:
+            pares.add((int(i), int(j)))
+    filas += [(f"{nombres[i]}/{nombres[j]}", nombres[i], nombres[j], usd[i], usd[j]) for i, j in sorted(pares)]
+
+    libros = []
+    for symbol, _, _, pb, pq in filas:
+        mid = pb / pq
+        paso = mid * rng.uniform(1e-5, 5e-4)
+        profundidad_usd = rng.uniform(300, 30_000)
+        qty = rng.lognormal(0, 0.8, (2, niveles)) * profundidad_usd / pb
+        k = np.arange(1, niveles + 1)
+        libros.append({
+            "symbol": symbol, "timestamp": 0, "nonce": 0,
+            "bids": np.column_stack([mid - paso * k, qty[0]]).tolist(),
+            "asks": np.column_stack([mid + paso * k, qty[1]]).tolist(),
+        })
+    df = pd.DataFrame([f[:3] for f in filas], columns=["symbol", "base", "quote"])
+    return df, libros
+
+
+def barrido(niveles, compra: bool, x: float) -> float:
+    """Referencia: entrada x por el libro, nivel a nivel (NaN si no alcanza)."""
+    salida, resto = 0.0, x
+    for px, qty in niveles:
+        capacidad = px * qty if compra else qty
+        if capacidad >= resto:
+            return salida + (resto / px if compra else resto * px)
+        resto -= capacidad
+        salida += qty if compra else px * qty
+    return float("nan")
+
+
+def referencia(almacen, triadas, escenarios, t: int, e: int, notional: float) -> float:
+    x = notional
+    ideal = notional
+    for k, bit in enumerate(triadas.bits()[t]):
+        fila = almacen.filas([triadas.simbolos[triadas.piernas[t, k]]])[0]
+        compra = bool(bit)
+        px = (almacen.ask_px if compra else almacen.bid_px)[fila]
+        qty = (almacen.ask_qty if compra else almacen.bid_qty)[fila]
+        f, m = escenarios.decaimiento[e, k], escenarios.deriva[e, k]
+        niveles = [(p * m, q * f) for p, q in zip(px, qty) if np.isfinite(p)]
+        x = barrido(niveles, compra, x)
+        ideal *= (1.0 / px[0]) if compra else px[0]
+    return 1.0 - x / ideal
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activos", type=int, default=400)
+    parser.add_argument("--cruces", type=int, default=2_500)
+    parser.add_argument("--escenarios", type=int, default=1_000)
+    parser.add_argument("--procesos", type=int, default=0)
+    parser.add_argument("--muestra", type=int, default=20, help="Triadas verificadas contra el barrido en Python")
+    args = parser.parse_args(argv)
+
+    df, libros = mercado_sintetico(args.activos, args.cruces, LIBRO_PROFUNDIDAD)
+    triadas = enumerar_triadas(GrafoMercados.desde_pares(df), "USDT")
+    almacen = AlmacenLibros(triadas.simbolos, LIBRO_PROFUNDIDAD)
+    for libro in libros:
+        almacen.actualizar(libro)
+    escenarios = Escenarios.generar(args.escenarios)
+    grilla = np.asarray(SIMULACION_GRILLA_USDT, dtype=np.float64)
+
+    t0 = time.perf_counter()
+    sim = simular_triadas(triadas, almacen, escenarios, procesos=1)
+    t_linea = time.perf_counter() - t0
+    n_proc = args.procesos or os.cpu_count() or 1
+    t0 = time.perf_counter()
+    sim_pool = simular_triadas(triadas, almacen, escenarios, procesos=n_proc)
+    t_pool = time.perf_counter() - t0
+    df_out = tabla_slippage(triadas, sim_pool)
+
+    # Un escenario suelto por vez: el promedio de un solo escenario es su slippage
+    tabla = TablaBarrido.desde_almacen(almacen)
+    bits = triadas.bits()
+    curvas = almacen.filas(triadas.simbolos)[triadas.piernas] + bits.astype(np.int64) * len(almacen)
+    rng = np.random.default_rng(3)
+    peor = 0.0
+    for t in rng.choice(len(triadas), min(args.muestra, len(triadas)), replace=False):
+        for e in rng.choice(len(escenarios), 5, replace=False):
+            uno = Escenarios(escenarios.decaimiento[[e]], escenarios.deriva[[e]])
+            media, _, _ = simular_bloque(tabla, uno, grilla, curvas[[t]], bits[[t]], 0)
+            for j in range(len(grilla)):
+                ref = referencia(almacen, triadas, escenarios, int(t), int(e), grilla[j])
+                if np.isfinite(ref) or np.isfinite(media[0, j]):
+                    peor = max(peor, abs(media[0, j] - ref))
+    iguales = np.allclose(sim.slippage, sim_pool.slippage, equal_nan=True) and np.array_equal(sim.llenado, sim_pool.llenado)
+
+    puntos = len(triadas) * len(escenarios) * len(grilla)
+    ok = peor < 1e-9 and iguales and t_pool <= OBJETIVO_S
+    cap = df_out["absorption_cap"]
+    print(f"\n⏱️  Slippage multi-escenario — {len(triadas):,} triadas ({len(almacen):,} símbolos) × "
+          f"{len(escenarios):,} escenarios × {len(grilla)} tamaños = {puntos / 1e6:,.0f} M caminos de 3 piernas")
+    print(f"🔹 en línea (1 proceso)         : {t_linea * 1000:9.1f} ms ({puntos * 3 / t_linea / 1e6:,.1f} M piernas/s)")
+    print(f"🔹 pool ({n_proc} procesos)           : {t_pool * 1000:9.1f} ms")
+    print(f"🔸 slippage_expected mediana    : {np.nanmedian(sim.slippage_expected) * 1e4:9.2f} bps "
+          f"· p95 mediana {np.nanmedian(sim.slippage_cola) * 1e4:.2f} bps")
+    print(f"🔸 absorption_cap               : mediana {np.nanmedian(cap):,.0f} USDT · "
+          f"{int(cap.isna().sum())} triadas sin tamaño dentro de la tolerancia")
+    print(f"🔸 error máx vs barrido Python  : {peor:.2e} · pool = en línea: {iguales}")
+    print(f"{'✅' if ok else '❌'} Coincide con el barrido y corre en ≤ {OBJETIVO_S:.0f} s: {ok}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,27 @@
 Genera un archivo de *schema* estructural basado en todos los mercados que
 retorna `load_markets()` de CCXT para el exchange definido en config.EXCHANGE_ID.
 
+Cada market se reduce a su *forma* (claves anidadas + tipos, hashable) y sólo
+se infiere/fusiona una vez por forma distinta: en un exchange real miles de
+markets comparten unas pocas formas. La huella del conjunto de formas queda en
+el JSON de salida; si no cambió, la regeneración no reescribe nada.
+
 🗂  Salida:
-   - El schema se guarda en: app/codigo/temp/schema.py  (sin prefijo de exchange)
+   - El schema se guarda en: app/codigo/temp/schema.json  (sin prefijo de exchange)
+     y se lee con `config.cargar_schema()` (JSON cacheado, sin ejecutar módulos).
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import sys
+import time
+from itertools import compress, islice
+from operator import not_
 from pathlib import Path
-from typing import Any
-import ccxt
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
 
 # ---------------------------------------------------------------------------
 # 🔗 Config centralizada (soporta ejecución como módulo o script)
@@ -23,12 +34,17 @@ try:
     from .config import config
 except Exception:
     # cuando corrés: python app/codigo/1_generar_schemas.py
-    import sys, os
     THIS_DIR = Path(__file__).resolve().parent
     sys.path.insert(0, str(THIS_DIR / "config"))   # app/codigo/config
     sys.path.insert(0, str(THIS_DIR))              # app/codigo
     import config  # type: ignore
 
+# Snapshot compartido (markets descargados una sola vez por corrida)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))   # app
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+from codigo.snapshot import obtener_snapshot  # type: ignore
+
 # ---------------------------------------------------------------------------
 # 🔧 Utilitarios de inferencia/estructura
 # ---------------------------------------------------------------------------
@@ -57,6 +73,142 @@ def infer_type(value: Any) -> Any:
         return "None"
     return "any"
 
+_HOJAS = frozenset({str, bool, int, float, type(None)})
+_ESCALARES_LISTA = frozenset({str, bool, int, float})
+_ES_HOJA = _HOJAS.__contains__
+_ES_PAR = (2).__eq__
+
+
+def _tipo_de_clase(t: type) -> str:
+    # Mismo orden de chequeos que infer_type, sobre la clase
+    if issubclass(t, str): return "str"
+    if issubclass(t, bool): return "bool"
+    if issubclass(t, int): return "int"
+    if issubclass(t, float): return "float"
+    if t is type(None): return "None"
+    return "any"
+
+
+def _forma_lista(value: list) -> str:
+    """Lo mismo que infer_type sobre una lista, con los recorridos en C."""
+    if not value:
+        return "[[any, any]]"  # all() sobre lista vacía: así lo clasifica infer_type
+    tipos = set(map(type, value))
+    if tipos <= _ESCALARES_LISTA:
+        return f"[{_tipo_de_clase(type(value[0]))}]"
+    if tipos == {list}:
+        return "[[any, any]]" if all(map(_ES_PAR, map(len, value))) else "[any]"
+    return infer_type(value)
+
+
+def _forma_contenedor(value: Any) -> Hashable:
+    if isinstance(value, dict):
+        return forma(value)
+    if value.__class__ is list:
+        return _forma_lista(value)
+    return infer_type(value)
+
+
+def forma(value: Any) -> Hashable:
+    """
+    Forma de un valor (claves anidadas + tipos), hashable, para agrupar markets
+    por estructura sin inferir cada uno. Un dict queda como
+    (claves, clases de los valores, formas de los valores no-hoja): las clases
+    se toman en C con `map(type, ...)` y sólo se recorre a mano lo que no es
+    hoja (dicts anidados, listas, otros).
+    """
+    if not isinstance(value, dict):
+        return infer_type(value)
+    tipos = tuple(map(type, value.values()))
+    if _HOJAS.issuperset(tipos):
+        return (tuple(value), tipos, ())
+    otros = compress(value.values(), map(not_, map(_ES_HOJA, tipos)))
+    return (tuple(value), tipos, tuple(map(_forma_contenedor, otros)))
+
+
+def forma_a_schema(f: Hashable) -> Any:
+    """Inversa de `forma`: lo que daría `infer_type` sobre cualquier market con esa forma."""
+    if not isinstance(f, tuple):
+        return f  # hoja / lista ya inferida
+    claves, tipos, otros = f
+    resto = iter(otros)
+    return {
+        k: _tipo_de_clase(t) if t in _HOJAS else forma_a_schema(next(resto))
+        for k, t in zip(claves, tipos)
+    }
+
+
+def huella_forma(f: Hashable) -> str:
+    return hashlib.sha1(repr(f).encode("utf-8")).hexdigest()[:16]
+
+
+def formas_unicas(markets: Dict[str, Any]) -> List[Tuple[str, Hashable]]:
+    """(huella, forma) de cada forma distinta, en orden de primera aparición."""
+    vistas: Dict[Hashable, None] = {}
+    for market in markets.values():
+        vistas.setdefault(forma(market), None)
+    return [(huella_forma(f), f) for f in vistas]
+
+
+def muestra_sin_formas_nuevas(markets: Dict[str, Any], previo: dict, muestra: int,
+                              anteriores: Optional[Sequence[str]]) -> bool:
+    """
+    Atajo para un snapshot nuevo del mismo exchange: True si ningún market
+    revisado trae una forma que no esté en `previo["formas"]`. Se revisan
+    todas las altas (símbolos que no estaban en `anteriores`, los de la última
+    pasada completa) y `muestra` markets equiespaciados del resto; así no se
+    llama a `forma()` sobre los miles que casi nunca cambian.
+
+    Es una muestra, no una prueba: un cambio de forma en un market ya listado
+    y no muestreado pasa inadvertido. Por eso `generate_schema` no registra
+    nada con este atajo y vuelve a la pasada completa cada
+    SCHEMA_VERIFICACION_S. Cualquier forma desconocida devuelve False.
+    """
+    conocidas = set(previo.get("formas") or ())
+    if not conocidas or anteriores is None or muestra <= 0:
+        return False
+    altas = markets.keys() - set(anteriores)
+    paso = max(1, len(markets) // muestra)
+    revisar = [markets[s] for s in altas]
+    revisar += islice(markets.values(), 0, None, paso)
+    return all(huella_forma(forma(m)) in conocidas for m in revisar)
+
+
+def huella_formas(unicas: List[Tuple[str, Hashable]]) -> str:
+    """Huella del conjunto ordenado de formas (el orden define el de las claves del schema)."""
+    return hashlib.sha1("|".join(h for h, _ in unicas).encode("utf-8")).hexdigest()
+
+
+def inferir_schema(markets: Dict[str, Any]) -> Tuple[dict, List[Tuple[str, Hashable]]]:
+    """
+    Schema fusionado de todos los markets, inferido sólo sobre las formas
+    únicas. Como `merge_dicts` conserva la primera aparición de cada clave,
+    fusionar cada forma una vez (en el mismo orden) da el mismo resultado que
+    fusionar market por market.
+    """
+    unicas = formas_unicas(markets)
+    return fusionar_formas(unicas), unicas
+
+
+def fusionar_formas(unicas: List[Tuple[str, Hashable]]) -> dict:
+    schema: dict[str, Any] = {}
+    for _, f in unicas:
+        inferred = forma_a_schema(f)
+        if isinstance(inferred, dict):
+            schema = merge_dicts(schema, inferred)
+    return schema
+
+
+def inferir_schema_completo(markets: Dict[str, Any]) -> dict:
+    """Implementación original (infer_type + merge por market). Se conserva como referencia para el benchmark."""
+    schema: dict[str, Any] = {}
+    for market in markets.values():
+        inferred = infer_type(market)
+        if isinstance(inferred, dict):
+            schema = merge_dicts(schema, inferred)
+    return schema
+
+
 def merge_dicts(base: dict, new: dict) -> dict:
     """
     Une dos diccionarios recursivamente. Preserva las claves existentes,
@@ -82,10 +234,55 @@ def ensure_init(path: Path) -> None:
 # 🚀 Generador principal (config-driven)
 # ---------------------------------------------------------------------------
 
-def generate_schema() -> None:
+def ruta_simbolos(output_path: Path) -> Path:
+    """Archivo aparte con los símbolos de la última pasada completa (no lo parsean las etapas que cargan el schema)."""
+    return output_path.with_name(f"{output_path.stem}.simbolos.json")
+
+
+def _escribir_json(path: Path, contenido: Any, indent: Optional[int] = None) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(contenido, indent=indent, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def leer_simbolos(output_path: Path) -> Optional[List[str]]:
+    try:
+        return json.loads(ruta_simbolos(output_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def escribir_schema(output_path: Path, exchange_id: str, schema: dict,
+                    unicas: List[Tuple[str, Hashable]], mercados: int, markets_ts: int = 0,
+                    simbolos: Optional[Sequence[str]] = None) -> None:
+    """Persiste el schema como JSON (tmp + replace: los lectores nunca ven un archivo a medias)."""
+    payload = {
+        "exchange_id": exchange_id,
+        "generado_ts": int(time.time() * 1000),
+        "markets_ts": markets_ts,
+        "origen": "app/codigo/0_generar_schemas.py",
+        "mercados": mercados,
+        "formas": [h for h, _ in unicas],
+        "huella": huella_formas(unicas),
+        "schema": schema,
+    }
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if simbolos is not None:  # antes que el schema: el par queda coherente si se corta en el medio
+        _escribir_json(ruta_simbolos(output_path), list(simbolos))
+    _escribir_json(output_path, payload, indent=4)
+
+
+def generate_schema(forzar: bool = False) -> dict | None:
     """
-    Crea el archivo de schema basado en `exchange.markets`,
-    infiriendo los tipos de datos y exportándolo como archivo .py estructurado.
+    Crea el archivo de schema basado en `exchange.markets`, infiriendo los
+    tipos de datos sobre las formas únicas y exportándolo como JSON.
+    Si el archivo existente es del mismo snapshot no se recorre nada. Con un
+    snapshot nuevo, mientras la última pasada completa tenga menos de
+    SCHEMA_VERIFICACION_S, se revisa una muestra (`muestra_sin_formas_nuevas`):
+    si no trae formas nuevas se devuelve el schema vigente SIN reescribirlo
+    (`markets_ts` sigue siendo el de la última pasada completa). Si no, se
+    recorren todos los markets; si la huella de formas coincide (mismo
+    exchange) no se hace el merge. `forzar` ignora los tres atajos.
     Usa EXCHANGE_ID y SCHEMA_OUTPUT_PATH desde config.
     """
     exchange_id = config.EXCHANGE_ID
@@ -98,35 +295,49 @@ def generate_schema() -> None:
         ensure_init(output_path.parent)
 
     try:
-        # Inicializa exchange desde CCXT con opciones de config
-        exchange_class = getattr(ccxt, exchange_id)
-        exchange = exchange_class(config.CCXT_OPTIONS)
-        exchange.load_markets()  # Carga info de todos los mercados disponibles
+        # Markets desde el snapshot compartido. Se pide CON tickers aunque el
+        # schema sólo mire la estructura: así el caché que queda en disco es el
+        # completo y la etapa 1 lo reutiliza en vez de descargar todo de nuevo.
+        # Un exchange desconocido para CCXT falla ahí con AttributeError.
+        snap = obtener_snapshot(exchange_id)
+
+        previo = config.cargar_schema_payload(output_path) if output_path.exists() and not forzar else {}
+        mismo_exchange = previo.get("exchange_id") == exchange_id
+        if mismo_exchange and previo.get("markets_ts") == snap.ts:
+            print(f"✅ Schema al día con el snapshot {snap.ts}: {output_path}")
+            return previo["schema"]
 
-        schema: dict[str, Any] = {}
+        edad_s = time.time() - previo.get("generado_ts", 0) / 1000
+        if (mismo_exchange and edad_s < getattr(config, "SCHEMA_VERIFICACION_S", 0)
+                and muestra_sin_formas_nuevas(snap.markets, previo, getattr(config, "SCHEMA_MUESTRA", 0),
+                                              leer_simbolos(output_path))):
+            # La muestra no prueba nada: no se registra el snapshot, la próxima pasada completa lo hará
+            print(f"✅ Schema vigente: muestra sin formas nuevas en {len(snap.markets)} mercados "
+                  f"(pasada completa hace {edad_s:.0f} s): {output_path}")
+            return previo["schema"]
 
-        # Recorrer todos los mercados para inferir y fusionar estructura
-        for market in exchange.markets.values():
-            inferred = infer_type(market)
-            if isinstance(inferred, dict):
-                schema = merge_dicts(schema, inferred)
+        unicas = formas_unicas(snap.markets)
+        if mismo_exchange and previo.get("huella") == huella_formas(unicas):
+            # Sin merge: sólo se actualiza el snapshot de referencia para el próximo atajo
+            escribir_schema(output_path, exchange_id, previo["schema"], unicas, len(snap.markets), snap.ts, snap.markets)
+            print(f"✅ Schema sin cambios ({len(unicas)} formas en {len(snap.markets)} mercados): {output_path}")
+            return previo["schema"]
 
-        # Guardar como archivo Python con el schema (sin prefijo del exchange)
-        with output_path.open("w", encoding="utf-8") as f:
-            f.write("# Auto-generado: estructura completa deducida desde CCXT.\n")
-            f.write(f"# Exchange origen: {exchange_id}\n")
-            f.write("# Origen del generador: app/codigo/1_generar_schemas.py\n\n")
-            f.write("schema = ")
-            json.dump(schema, f, indent=4, ensure_ascii=False)  # Dict Python serializado
+        schema = fusionar_formas(unicas)
 
-        print(f"✅ Schema generado en: {output_path}")
+        # Guardar como JSON con el schema (sin prefijo del exchange)
+        escribir_schema(output_path, exchange_id, schema, unicas, len(snap.markets), snap.ts, snap.markets)
+        print(f"✅ Schema generado en: {output_path} ({len(unicas)} formas en {len(snap.markets)} mercados)")
+        return schema
 
     except AttributeError:
         print(f"❌ Exchange '{exchange_id}' no es reconocido por CCXT.")
-    except (ccxt.NetworkError, ccxt.ExchangeError) as err:
-        print(f"⚠️ Error procesando '{exchange_id}' vía CCXT: {err}")
     except Exception as e:
-        print(f"❌ Error inesperado: {e}")
+        if type(e).__module__.startswith("ccxt"):
+            print(f"⚠️ Error procesando '{exchange_id}' vía CCXT: {e}")
+        else:
+            print(f"❌ Error inesperado: {e}")
+    return None
 
 # ---------------------------------------------------------------------------
 # ⏩ Punto de entrada
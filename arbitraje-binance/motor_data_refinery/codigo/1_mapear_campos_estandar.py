@@ -1,28 +1,42 @@
 """
 Genera una exportación de símbolos con campos ESTANDARIZADOS independiente del exchange.
 
-Lee markets desde CCXT, aplana las estructuras y aplica el mapeo definido en
+Lee markets desde el snapshot compartido (codigo/snapshot.py) y aplica el mapeo definido en
 `codigo/static/campos_estandar.py` para producir un CSV en `codigo/datos/estandar/`.
 
+El mapeo se compila una vez por exchange (`compilar_mapeo`): cada clave aplanada
+(`precision_price`, `limits_amount_min`, ...) se resuelve a su ruta anidada
+(`market["precision"]["price"]`) y se extrae directo a columnas, sin aplanar el
+market entero. Sólo las claves que la ruta compilada no encuentra en un market
+caen al `flatten_json` de ese market.
+
 Dominus puede ajustar los mapeos en tiempo real modificando `campos_estandar.py`.
 """
 
 from __future__ import annotations
 
 import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 from decimal import Decimal
 
 import pandas as pd
-import ccxt
 
 # Rutas/imports robustos
 THIS_DIR = Path(__file__).resolve().parent
 ROOT_DIR = THIS_DIR.parent
 sys.path.insert(0, str(ROOT_DIR))
 
-from codigo.config import EXCHANGE_ID, CCXT_OPTIONS, DATOS_DIR  # type: ignore
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
+from codigo.config import EXCHANGE_ID, DATOS_DIR  # type: ignore
+from codigo.snapshot import obtener_snapshot  # type: ignore
+from codigo.cache_redis import guardar_si_hay_redis  # type: ignore
+from codigo.tablas import tipar_estandar  # type: ignore
 from codigo.static.campos_estandar import TARGET_FIELDS, MAPPING  # type: ignore
 
 
@@ -42,21 +56,180 @@ def flatten_json(value: Any, prefix: str = "") -> Dict[str, Any]:
     return out
 
 
-def main() -> None:
-    exchange_id = EXCHANGE_ID
+def ruta_salida(exchange_id: str = EXCHANGE_ID) -> Path:
+    return DATOS_DIR / "estandar" / f"symbols_estandar_{exchange_id}.csv"
+
+
+Ruta = Tuple[Union[str, int], ...]
+_FALTA = object()
+
+
+def _seguir(market: Any, ruta: Ruta) -> Any:
+    """Sigue una ruta compilada; `_FALTA` si no existe o no termina en una hoja."""
+    v = market
+    try:
+        for paso in ruta:
+            if paso.__class__ is int and not isinstance(v, list):
+                return _FALTA
+            v = v[paso]
+    except (KeyError, IndexError, TypeError):
+        return _FALTA
+    return _FALTA if isinstance(v, (dict, list)) else v
+
+
+def resolver_ruta(valor: Any, clave: str) -> Optional[Ruta]:
+    """
+    Busca en `valor` la ruta anidada cuya clave aplanada (como la arma
+    `flatten_json`) es `clave`. Las claves CCXT pueden tener '_' propios, así
+    que se prueban los cortes posibles recorriendo sólo lo que existe.
+    """
+    partes = clave.split("_")
+
+    def buscar(v: Any, i: int) -> Optional[Ruta]:
+        if i == len(partes):
+            return () if not isinstance(v, (dict, list)) else None
+        for j in range(i + 1, len(partes) + 1):
+            seg = "_".join(partes[i:j])
+            if isinstance(v, dict) and seg in v:
+                paso: Union[str, int] = seg
+            elif isinstance(v, list) and seg.isdigit() and str(int(seg)) == seg and int(seg) < len(v):
+                paso = int(seg)
+            else:
+                continue
+            resto = buscar(v[paso], j)
+            if resto is not None:
+                return (paso,) + resto
+        return None
+
+    return buscar(valor, 0)
+
+
+def _acceso(ruta: Ruta) -> Optional[Callable[[Any], Any]]:
+    """Accesor directo para rutas sólo de claves (`m["precision"]["price"]`); None si hay índices."""
+    if not ruta or any(paso.__class__ is not str for paso in ruta):
+        return None
+    if len(ruta) == 1:
+        return itemgetter(ruta[0])
+    if len(ruta) == 2:
+        a, b = ruta
+        return lambda m: m[a][b]
+    if len(ruta) == 3:
+        a, b, c = ruta
+        return lambda m: m[a][b][c]
+
+    def profundo(m: Any) -> Any:
+        for paso in ruta:
+            m = m[paso]
+        return m
+
+    return profundo
+
+
+@dataclass
+class MapeadorCompilado:
+    """
+    MAPPING[exchange_id] compilado a accesos directos por campo destino.
+
+    Cada ruta se resuelve contra el primer market que tenga la clave y se
+    extrae columna por columna para todos los markets. Los markets donde esa
+    ruta no llega a una hoja se resuelven de nuevo y, si tampoco, se aplanan
+    (comportamiento original).
+    """
+
+    fuentes: Dict[str, str]                              # target_field -> source_key (la última del mapeo gana)
+    rutas: Dict[str, Ruta] = field(default_factory=dict)  # source_key -> ruta anidada
+    aplanados: int = 0                                    # markets que necesitaron flatten_json (acumulado)
+
+    def _ruta(self, clave: str, lista: List[Dict[str, Any]]) -> Optional[Ruta]:
+        if clave not in self.rutas:
+            for market in lista:
+                ruta = resolver_ruta(market, clave)
+                if ruta is not None:
+                    self.rutas[clave] = ruta
+                    break
+        return self.rutas.get(clave)
+
+    def _valor(self, market: Dict[str, Any], clave: str, planos: List[Optional[Dict[str, Any]]], i: int) -> Any:
+        ruta = resolver_ruta(market, clave)
+        if ruta is not None:
+            return _seguir(market, ruta)
+        # Clave desconocida para este market: flatten (una vez por market)
+        if planos[i] is None:
+            planos[i] = flatten_json(market)
+            self.aplanados += 1
+        return planos[i].get(clave)
+
+    def columnas(self, markets: Dict[str, Any]) -> Dict[str, List[Any]]:
+        """Extrae los markets directo a columnas {target_field: valores}."""
+        lista = list(markets.values())
+        planos: List[Optional[Dict[str, Any]]] = [None] * len(lista)
+        cols: Dict[str, List[Any]] = {}
+        for target, clave in self.fuentes.items():
+            ruta = self._ruta(clave, lista)
+            acceso = _acceso(ruta) if ruta is not None else None
+            vals: Optional[List[Any]] = None
+            if acceso is not None:
+                try:
+                    vals = [acceso(m) for m in lista]
+                except (KeyError, IndexError, TypeError):
+                    vals = None
+            if vals is None:
+                vals = [_seguir(m, ruta) for m in lista] if ruta is not None else [_FALTA] * len(lista)
+
+            for i in [i for i, v in enumerate(vals) if v is _FALTA or isinstance(v, (dict, list))]:
+                vals[i] = self._valor(lista[i], clave, planos, i)
+
+            # Normalizaciones simples (bool tal cual, números y resto a str)
+            cols[target] = [v if v is None or v.__class__ is bool else str(v) for v in vals]
+        return cols
+
+
+@lru_cache(maxsize=16)
+def _compilar(items: Tuple[Tuple[str, str], ...]) -> MapeadorCompilado:
+    fuentes: Dict[str, str] = {}
+    for source_key, target_field in items:
+        fuentes.pop(target_field, None)
+        fuentes[target_field] = source_key
+    return MapeadorCompilado(fuentes)
+
+
+def compilar_mapeo(exchange_id: str = EXCHANGE_ID) -> MapeadorCompilado:
+    """Mapeador compilado de MAPPING[exchange_id] (cacheado mientras el mapeo no cambie)."""
     mapping = MAPPING.get(exchange_id, {})
     if not mapping:
         raise RuntimeError(
             f"❌ No hay mapeo definido para '{exchange_id}' en codigo/static/campos_estandar.py"
         )
+    return _compilar(tuple(mapping.items()))
 
-    # Instanciar exchange y cargar markets
-    ex_class = getattr(ccxt, exchange_id)
-    ex = ex_class(CCXT_OPTIONS)
-    ex.load_markets()
+
+def construir_tabla_estandar(markets: Dict[str, Any], exchange_id: str = EXCHANGE_ID) -> pd.DataFrame:
+    """Aplica MAPPING[exchange_id] (compilado) a los markets y devuelve la tabla estandarizada tipada."""
+    cols = compilar_mapeo(exchange_id).columnas(markets)
+    n = len(markets)
+    data = {k: cols.get(k, [None] * n) for k in TARGET_FIELDS}
+
+    # Asegurar clave de identificación
+    for k, respaldo in (("symbol", list(markets)), ("base", None), ("quote", None)):
+        if k not in data:
+            continue
+        if respaldo is None:
+            respaldo = [m.get(k) for m in markets.values()]
+        data[k] = [v or r for v, r in zip(cols.get(k, [None] * n), respaldo)]
+
+    return tipar_estandar(pd.DataFrame(data, columns=TARGET_FIELDS))
+
+
+def construir_tabla_estandar_aplanando(markets: Dict[str, Any], exchange_id: str = EXCHANGE_ID) -> pd.DataFrame:
+    """Implementación original (flatten_json por market). Se conserva como referencia para el benchmark."""
+    mapping = MAPPING.get(exchange_id, {})
+    if not mapping:
+        raise RuntimeError(
+            f"❌ No hay mapeo definido para '{exchange_id}' en codigo/static/campos_estandar.py"
+        )
 
     rows_out = []
-    for symbol, market in ex.markets.items():
+    for symbol, market in markets.items():
         flat = flatten_json(market)
         normalized: Dict[str, Any] = {k: None for k in TARGET_FIELDS}
 
@@ -80,15 +253,26 @@ def main() -> None:
 
         rows_out.append(normalized)
 
-    # Exportar CSV
-    out_dir = DATOS_DIR / "estandar"
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_csv = out_dir / f"symbols_estandar_{exchange_id}.csv"
+    return tipar_estandar(pd.DataFrame(rows_out, columns=TARGET_FIELDS))
+
 
-    df = pd.DataFrame(rows_out)
+def main() -> None:
+    exchange_id = EXCHANGE_ID
+
+    # Markets desde el snapshot compartido (una sola descarga por corrida)
+    snap = obtener_snapshot(exchange_id)
+    df = construir_tabla_estandar(snap.markets, exchange_id)
+
+    # Exportar CSV
+    out_csv = ruta_salida(exchange_id)
+    out_csv.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(out_csv, index=False)
     print(f"✅ Export estandarizada generada: {out_csv} ({len(df)} símbolos)")
 
+    # Caché compartida (otros contenedores / reinicios leen de Redis sin CCXT)
+    if guardar_si_hay_redis("estandar", df):
+        print("🧊 Tabla estandarizada publicada en Redis")
+
 
 if __name__ == "__main__":
     main()
@@ -10,14 +10,20 @@ Genera:
 
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # ─────────── Paths y configuración ───────────
 APP_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(APP_DIR))
 
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
 from codigo.config import EXCHANGE_ID, DATOS_DIR
 from codigo.static.fiat import fiat_tokens   # ✅ lista global de fiat
+from codigo.tablas import tipar_estandar
+from codigo.cache_redis import guardar_si_hay_redis, leer_tabla_o_csv
 # (fiat.py debe estar en codigo/static/fiat.py)
 
 # Rutas de entrada/salida
@@ -53,8 +59,51 @@ def cargar_criterios() -> dict[str, set[str]]:
             criterios[campo] = {_norm(v) for v in valores.split(";")}
     return criterios
 
+def compilar_criterios(df: pd.DataFrame, criterios: dict[str, set[str]]) -> list[tuple[np.ndarray, np.ndarray]]:
+    """
+    Compila cada criterio a (máscara_rechazo, motivo) por columna.
+
+    La columna se factoriza: `_norm`, la regla (NOT_FIAT contra fiat_tokens o
+    valores permitidos) y el texto del motivo se evalúan una vez por valor único
+    y se expanden a todas las filas con un `take` por código.
+    """
+    fiat_upper = {f.upper() for f in fiat_tokens}
+    compilados = []
+    for campo, permitidos in criterios.items():
+        if campo not in df.columns:
+            continue
+        codigos, unicos = pd.factorize(df[campo].astype(str), use_na_sentinel=False)
+        valores = [_norm(u) for u in unicos]
+        if "NOT_FIAT" in permitidos:
+            rechazo_u = np.array([v in fiat_upper for v in valores], dtype=bool)
+            motivo_u = np.array([f"{campo}=FIAT"] * len(valores), dtype=object)
+        else:
+            rechazo_u = np.array([v not in permitidos for v in valores], dtype=bool)
+            motivo_u = np.array([f"{campo}='{v}' no permitido" for v in valores], dtype=object)
+        compilados.append((rechazo_u[codigos], motivo_u[codigos]))
+    return compilados
+
 def aplicar_criterios(df: pd.DataFrame, criterios: dict[str, set[str]]):
     """Aplica los criterios sobre el DataFrame estandar y devuelve (funcional, descartados)."""
+    rechazo_total = np.zeros(len(df), dtype=bool)
+    motivos = np.full(len(df), "", dtype=object)
+
+    for rechazo, motivo in compilar_criterios(df, criterios):
+        if not rechazo.any():
+            continue
+        # Concatena "; " solo en filas rechazadas que ya tenían un motivo previo
+        previo = rechazo & rechazo_total
+        nuevo = rechazo & ~rechazo_total
+        motivos[nuevo] = motivo[nuevo]
+        motivos[previo] = motivos[previo] + "; " + motivo[previo]
+        rechazo_total |= rechazo
+
+    funcional = df[~rechazo_total]
+    descartados = df[rechazo_total].assign(motivo_descartado=motivos[rechazo_total])
+    return funcional, descartados
+
+def aplicar_criterios_fila_a_fila(df: pd.DataFrame, criterios: dict[str, set[str]]):
+    """Implementación original (iterrows). Se conserva como referencia para el benchmark."""
     funcional, descartados = [], []
     fiat_upper = {f.upper() for f in fiat_tokens}
 
@@ -87,14 +136,10 @@ def aplicar_criterios(df: pd.DataFrame, criterios: dict[str, set[str]]):
 
     return pd.DataFrame(funcional), pd.DataFrame(descartados)
 
-# ─────────── Main ───────────
-def main():
-    if not INPUT_PATH.exists():
-        print(f"❌ No existe el CSV de entrada: {INPUT_PATH}")
-        sys.exit(1)
-
-    df = pd.read_csv(INPUT_PATH, dtype=str)
-    criterios = cargar_criterios()
+def filtrar(df: pd.DataFrame, criterios: dict[str, set[str]] | None = None):
+    """Filtra la tabla estandarizada y devuelve (funcional sin claves de control, descartados)."""
+    if criterios is None:
+        criterios = cargar_criterios()
 
     df_funcional, df_descartados = aplicar_criterios(df, criterios)
 
@@ -102,6 +147,16 @@ def main():
     # pero preservamos symbol, base y quote
     campos_a_excluir = set(criterios.keys()) - {"symbol", "base", "quote"}
     df_funcional = df_funcional.drop(columns=[c for c in campos_a_excluir if c in df_funcional.columns])
+    return df_funcional, df_descartados
+
+# ─────────── Main ───────────
+def main():
+    df = leer_tabla_o_csv("estandar", INPUT_PATH)
+    if df is None:
+        print(f"❌ No existe el CSV de entrada: {INPUT_PATH}")
+        sys.exit(1)
+
+    df_funcional, df_descartados = filtrar(tipar_estandar(df))
 
     out_func = OUTPUT_DIR / f"simbolos_spot_{EXCHANGE_ID}.csv"
     out_desc = OUTPUT_DIR / f"descartados_spot_{EXCHANGE_ID}.csv"
@@ -111,6 +166,8 @@ def main():
 
     print(f"✅ {len(df_funcional)} funcionales guardados en {out_func}")
     print(f"📄 {len(df_descartados)} descartados guardados en {out_desc}")
+    if guardar_si_hay_redis("spot", df_funcional):
+        print("🧊 Filtro spot publicado en Redis")
 
 if __name__ == "__main__":
     main()
@@ -6,74 +6,106 @@ Separa símbolos del archivo funcional en:
 
 Entrada:
     - Lee simbolos_spot_<exchange>.csv desde codigo/datos/estandar/
-    - El activo de referencia (INTERESADO_EN) se define en el código.
+    - El activo de referencia (INTERESADO_EN) viene de la config; además se
+      separa respecto de cada ancla de `ANCLAS` (config) para la búsqueda de ciclos.
 Salida:
     - CSVs en codigo/datos/tratamiento_de_cotizacion/
       (solo columnas symbol, base, quote)
+
+Sin Redis y con las salidas más nuevas que el CSV de entrada no hay nada que
+hacer: sale sin importar pandas (`--forzar` regenera igual).
 """
 
+from __future__ import annotations
+
 import sys
 from pathlib import Path
-import pandas as pd
+from typing import TYPE_CHECKING
 
 # --- Configuración de rutas ---
 APP_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(APP_DIR))
 
-from codigo.config import EXCHANGE_ID, DATOS_DIR
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
 
-# --- Parámetros configurables ---
-INTERESADO_EN = "USDT"  # 💡 podés cambiarlo a BUSD, EUR, ARS, etc.
+from codigo.config import EXCHANGE_ID, DATOS_DIR, ANCLAS, INTERESADO_EN
+from codigo.tablas import normalizar_claves, salidas_al_dia
+from codigo.cache_redis import CacheRefineria, leer_tabla_o_csv
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 INPUT_PATH = DATOS_DIR / "estandar" / f"simbolos_spot_{EXCHANGE_ID}.csv"
 OUTPUT_DIR = DATOS_DIR / "tratamiento_de_cotizacion"
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def main():
-    if not INPUT_PATH.exists():
-        print(f"❌ No se encontró el archivo de entrada: {INPUT_PATH}")
-        sys.exit(1)
-
-    # Cargar la tabla funcional
-    df = pd.read_csv(INPUT_PATH, dtype=str)
-    if df.empty:
-        print("⚠️ El archivo está vacío.")
-        sys.exit(0)
-
-    # Normalizar texto
-    for col in ("symbol", "base", "quote"):
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip().str.upper()
-
+def separar(df: pd.DataFrame, interesado_en: str = INTERESADO_EN):
+    """
+    Separa la tabla funcional (claves ya normalizadas) en (directo, invertido, indirecto)
+    respecto de `interesado_en`, con solo symbol/base/quote y ordenados por symbol.
+    """
     # ✅ Mantener solo columnas esenciales
     columnas_relevantes = [c for c in ("symbol", "base", "quote") if c in df.columns]
     df = df[columnas_relevantes]
 
     # Separar según el activo de referencia
-    directo   = df[df["quote"] == INTERESADO_EN]
-    invertido = df[df["base"]  == INTERESADO_EN]
-    indirecto = df[(df["base"] != INTERESADO_EN) & (df["quote"] != INTERESADO_EN)]
+    directo   = df[df["quote"] == interesado_en]
+    invertido = df[df["base"]  == interesado_en]
+    indirecto = df[(df["base"] != interesado_en) & (df["quote"] != interesado_en)]
 
     # 🔤 Ordenar alfabéticamente por 'symbol'
     directo   = directo.sort_values(by="symbol", ascending=True)
     invertido = invertido.sort_values(by="symbol", ascending=True)
     indirecto = indirecto.sort_values(by="symbol", ascending=True)
+    return directo, invertido, indirecto
+
 
-    # Exportar CSVs
-    out_directo   = OUTPUT_DIR / f"directo_{INTERESADO_EN}.csv"
-    out_invertido = OUTPUT_DIR / f"invertido_{INTERESADO_EN}.csv"
-    out_indirecto = OUTPUT_DIR / f"indirecto_{INTERESADO_EN}.csv"
+def separar_por_anclas(df: pd.DataFrame, anclas=ANCLAS):
+    """{ancla: (directo, invertido, indirecto)} para INTERESADO_EN y cada ancla configurada."""
+    return {ancla: separar(df, ancla) for ancla in dict.fromkeys((INTERESADO_EN, *anclas))}
 
-    directo.to_csv(out_directo, index=False)
-    invertido.to_csv(out_invertido, index=False)
-    indirecto.to_csv(out_indirecto, index=False)
+
+def salidas(anclas=ANCLAS) -> list[Path]:
+    return [
+        OUTPUT_DIR / f"{nombre}_{ancla}.csv"
+        for ancla in dict.fromkeys((INTERESADO_EN, *anclas))
+        for nombre in ("directo", "invertido", "indirecto")
+    ]
+
+
+def main(forzar: bool = False):
+    # Atajo: sin tabla en Redis la entrada es el CSV; si no cambió, las salidas ya están
+    if not forzar:
+        cache = CacheRefineria.por_defecto()
+        if (cache is None or not cache.generacion("spot")) and salidas_al_dia(INPUT_PATH, salidas()):
+            print(f"✅ Separación al día con {INPUT_PATH.name} (nada que regenerar; --forzar para rehacer)")
+            return
+
+    # Cargar la tabla funcional (Redis si hay generación vigente, si no el CSV)
+    df = leer_tabla_o_csv("spot", INPUT_PATH)
+    if df is None:
+        print(f"❌ No se encontró el archivo de entrada: {INPUT_PATH}")
+        sys.exit(1)
+    if df.empty:
+        print("⚠️ El archivo está vacío.")
+        sys.exit(0)
+
+    # Normalizar texto
+    normalizar_claves(df)
 
     print(f"✅ Exportados en {OUTPUT_DIR}")
-    print(f"✔ directo_{INTERESADO_EN}.csv:   {len(directo)} símbolos")
-    print(f"✔ invertido_{INTERESADO_EN}.csv: {len(invertido)} símbolos")
-    print(f"✔ indirecto_{INTERESADO_EN}.csv: {len(indirecto)} símbolos")
+    for ancla, (directo, invertido, indirecto) in separar_por_anclas(df).items():
+        # Exportar CSVs
+        directo.to_csv(OUTPUT_DIR / f"directo_{ancla}.csv", index=False)
+        invertido.to_csv(OUTPUT_DIR / f"invertido_{ancla}.csv", index=False)
+        indirecto.to_csv(OUTPUT_DIR / f"indirecto_{ancla}.csv", index=False)
+
+        print(f"✔ directo_{ancla}.csv:   {len(directo)} símbolos")
+        print(f"✔ invertido_{ancla}.csv: {len(invertido)} símbolos")
+        print(f"✔ indirecto_{ancla}.csv: {len(indirecto)} símbolos")
 
 
 if __name__ == "__main__":
-    main()
+    main(forzar="--forzar" in sys.argv[1:])
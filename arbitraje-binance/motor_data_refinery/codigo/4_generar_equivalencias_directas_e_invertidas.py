@@ -1,19 +1,19 @@
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import ccxt
-from decimal import Decimal, getcontext
-
-# --- Precisión alta ---
-getcontext().prec = 50
 
 # --- Configuración principal ---
 APP_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(APP_DIR))
 
-from codigo.config import EXCHANGE_ID, CCXT_OPTIONS, DATOS_DIR  # type: ignore
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
 
-INTERESADO_EN = "USDT"
+from codigo.config import EXCHANGE_ID, DATOS_DIR, AUDIT_STRUCT_EXPORT, INTERESADO_EN  # type: ignore
+from codigo.snapshot import obtener_snapshot  # type: ignore
+from codigo import equivalencias as eqv  # type: ignore
+from codigo.tablas import leer_csv  # type: ignore
 
 BASE_PATH = DATOS_DIR / "tratamiento_de_cotizacion"
 INPUT_DIRECTO = BASE_PATH / f"directo_{INTERESADO_EN}.csv"
@@ -21,81 +21,53 @@ INPUT_INVERTIDO = BASE_PATH / f"invertido_{INTERESADO_EN}.csv"
 OUTPUT_USDT_EQUIVALE = BASE_PATH / "1_usdt_equivale.csv"
 
 
-def cargar_df(path: Path) -> pd.DataFrame:
-    if not path.exists():
-        print(f"⚠️ No se encontró: {path}")
-        return pd.DataFrame()
-    df = pd.read_csv(path, dtype=str)
-    for col in ("symbol", "base", "quote"):
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip().str.upper()
-    return df
+def equivalencias_directas_e_invertidas(
+    df_dir: pd.DataFrame, df_inv: pd.DataFrame, tickers, verificar: bool = False
+) -> pd.DataFrame:
+    """
+    Devuelve el frame `base | 1_usdt_equivale_base` (float64) para directos e invertidos.
+    `tickers` puede ser el dict del snapshot o una `TablaPrecios` ya armada.
+    """
+    tabla = eqv.como_tabla(tickers)
+
+    # --- Directos (base/USDT): 1 usdt = 1/p base ---
+    ok_d, p_d, eq_d = eqv.equivalencias_directas(tabla, df_dir)
+    # --- Invertidos (USDT/quote): 1 usdt = p quote ---
+    ok_i, p_i, eq_i = eqv.equivalencias_invertidas(tabla, df_inv)
+
+    if verificar:
+        t_d = tabla.textos(df_dir["symbol"])[ok_d] if not df_dir.empty else []
+        t_i = tabla.textos(df_inv["symbol"])[ok_i] if not df_inv.empty else []
+        err_d = eqv.verificar_decimal(t_d, eq_d[ok_d], "directo")
+        err_i = eqv.verificar_decimal(t_i, eq_i[ok_i], "invertido")
+        print(f"🔎 Verificación Decimal: error relativo máx directo={err_d:.2e} invertido={err_i:.2e}")
+
+    bases = np.concatenate([
+        df_dir["base"].to_numpy(dtype=object)[ok_d] if not df_dir.empty else np.empty(0, dtype=object),
+        df_inv["quote"].to_numpy(dtype=object)[ok_i] if not df_inv.empty else np.empty(0, dtype=object),
+    ])
+    return pd.DataFrame({
+        "base": bases,
+        eqv.COL_EQUIV: np.concatenate([eq_d[ok_d], eq_i[ok_i]]),
+    })
 
 
 def main():
-    df_dir = cargar_df(INPUT_DIRECTO)
-    df_inv = cargar_df(INPUT_INVERTIDO)
+    df_dir = leer_csv(INPUT_DIRECTO)
+    df_inv = leer_csv(INPUT_INVERTIDO)
 
     if df_dir.empty and df_inv.empty:
         print("❌ No hay datos en directo ni invertido.")
         sys.exit(1)
 
-    # --- Conexión CCXT ---
-    ex_class = getattr(ccxt, EXCHANGE_ID)
-    exchange = ex_class(CCXT_OPTIONS)
-    exchange.load_markets()
-
-    tickers = exchange.fetch_tickers()
-    rows_usdt_a_base = []  # 1 usdt = X base
-
-    # --- Procesar directos (base/USDT) ---
-    for _, row in df_dir.iterrows():
-        symbol, base = row.get("symbol"), row.get("base")
-        if not symbol or not base:
-            continue
-
-        t = tickers.get(symbol)
-        if not t:
-            continue
-        last = t.get("last") or t.get("close") or t.get("info", {}).get("lastPrice")
-        if not last:
-            continue
-
-        precio = Decimal(str(last))
-        if precio <= 0:
-            continue
-
-        rows_usdt_a_base.append({
-            "base": base,
-            "1_usdt_equivale_base": f"{(Decimal('1') / precio):.18f}"
-        })
-
-    # --- Procesar invertidos (USDT/quote) ---
-    for _, row in df_inv.iterrows():
-        symbol, quote = row.get("symbol"), row.get("quote")
-        if not symbol or not quote:
-            continue
-
-        t = tickers.get(symbol)
-        if not t:
-            continue
-        last = t.get("last") or t.get("close") or t.get("info", {}).get("lastPrice")
-        if not last:
-            continue
-
-        precio = Decimal(str(last))
-        if precio <= 0:
-            continue
-
-        rows_usdt_a_base.append({
-            "base": quote,
-            "1_usdt_equivale_base": f"{precio:.18f}"
-        })
+    # --- Tickers del snapshot compartido (mismo tick para todas las etapas) ---
+    tickers = obtener_snapshot(EXCHANGE_ID).tickers
+    df_eq = equivalencias_directas_e_invertidas(df_dir, df_inv, tickers, verificar=AUDIT_STRUCT_EXPORT)
 
     # --- Guardar resultados ---
-    pd.DataFrame(rows_usdt_a_base).to_csv(OUTPUT_USDT_EQUIVALE, index=False)
+    eqv.formatear_decimales(df_eq).to_csv(OUTPUT_USDT_EQUIVALE, index=False)
     print(f"✅ Generado {OUTPUT_USDT_EQUIVALE}")
-    print(f"✔️ Total directo+invertido: {len(rows_usdt_a_base)} equivalencias")
+    print(f"✔️ Total directo+invertido: {len(df_eq)} equivalencias")
 
 
 if __name__ == "__main__":
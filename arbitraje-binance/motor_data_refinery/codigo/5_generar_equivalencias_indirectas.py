@@ -1,16 +1,22 @@
 # codigo/5_generar_equivalencias_indirectas.py
 """
 Genera equivalencias indirectas entre BASE y USDT
-usando los símbolos sin USDT (indirectos) y las equivalencias ya calculadas.
+usando los símbolos sin USDT (indirectos) y el grafo de toda la tabla spot.
 
 Entrada:
+    - codigo/datos/tratamiento_de_cotizacion/directo_USDT.csv
+    - codigo/datos/tratamiento_de_cotizacion/invertido_USDT.csv
     - codigo/datos/tratamiento_de_cotizacion/indirecto_USDT.csv
-    - codigo/datos/tratamiento_de_cotizacion/1_usdt_equivale.csv
+      (las tres juntas son la tabla spot completa)
 
 Lógica:
-    - Si la quote del par existe en 1_usdt_equivale.csv → el par es ruteable
-    - Se obtiene su precio desde CCXT y se calcula:
-        1_usdt_equivale_quote  (desde CSV)
+    - El grafo de activos (codigo/grafo_activos.py) se arma con TODOS los pares
+      spot (directos, invertidos e indirectos) y se corre un Dijkstra desde USDT:
+      cada activo queda resuelto por su ruta más líquida, sea de 1 o de N saltos
+    - La quote de cada par indirecto toma esa equivalencia; si no es alcanzable
+      desde USDT, el par es no ruteable
+    - Se obtiene su precio desde el snapshot compartido y se calcula:
+        1_usdt_equivale_quote  (desde el resolutor)
         1_usdt_equivale_base   = 1_usdt_equivale_quote / precio_par
 
 Salida:
@@ -21,127 +27,109 @@ Salida:
 
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
-import ccxt
-from decimal import Decimal, getcontext
-
-# --- Precisión alta ---
-getcontext().prec = 50
 
 # --- Configuración principal ---
 APP_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(APP_DIR))
 
-from codigo.config import EXCHANGE_ID, CCXT_OPTIONS, DATOS_DIR  # type: ignore
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
+from codigo.config import EXCHANGE_ID, DATOS_DIR, AUDIT_STRUCT_EXPORT, INTERESADO_EN  # type: ignore
+from codigo.snapshot import obtener_snapshot  # type: ignore
+from codigo import equivalencias as eqv  # type: ignore
+from codigo.grafo_activos import GrafoActivos, ResolutorEquivalencias  # type: ignore
+from codigo.tablas import normalizar_claves  # type: ignore
 
-INTERESADO_EN = "USDT"
 BASE_PATH = DATOS_DIR / "tratamiento_de_cotizacion"
+INPUT_DIRECTO = BASE_PATH / f"directo_{INTERESADO_EN}.csv"
+INPUT_INVERTIDO = BASE_PATH / f"invertido_{INTERESADO_EN}.csv"
 INPUT_INDIRECTO = BASE_PATH / f"indirecto_{INTERESADO_EN}.csv"
-INPUT_EQUIV = BASE_PATH / "1_usdt_equivale.csv"
 OUTPUT_RUTEABLES = BASE_PATH / "1_usdt_equivale_indirectos.csv"
 OUTPUT_NO_RUTEABLES = BASE_PATH / "no_ruteables_indirectos.csv"
 
 
+def equivalencias_indirectas(df_indir: pd.DataFrame, df_spot: pd.DataFrame, tickers, verificar: bool = False):
+    """
+    Deriva `1_usdt_equivale_base` de cada par indirecto a partir de la equivalencia
+    de su quote, resuelta sobre el grafo de `df_spot` (todos los pares spot,
+    `symbol | base | quote`). Devuelve (ruteables, no_ruteables) como DataFrames.
+    """
+    tabla = eqv.como_tabla(tickers)
+    grafo = GrafoActivos.desde_pares(df_spot[["symbol", "base", "quote"]], tabla)
+    resolutor = ResolutorEquivalencias(grafo, {INTERESADO_EN: 1.0})
+
+    quotes = df_indir["quote"].to_numpy(dtype=object)
+    precio = tabla.precios(df_indir["symbol"])
+    eq_quote = resolutor.equivalencias(quotes)
+    saltos_quote = resolutor.saltos_de(quotes)
+    saltos = np.where(saltos_quote >= 0, saltos_quote + 1, -1).astype(np.int32)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eq_base = eq_quote / precio
+    conocida = np.isfinite(eq_quote)
+
+    con_precio = np.isfinite(precio) & (precio != 0)
+    ruteable = conocida & con_precio & (precio > 0)
+    # Quote sin equivalencia o par sin precio → no ruteable (precio <= 0 se descarta)
+    no_ruteable = ~conocida | ~con_precio
+
+    if verificar:
+        textos = tabla.textos(df_indir["symbol"])[ruteable]
+        err = eqv.verificar_decimal(textos, eq_base[ruteable], "indirecto", eq_quote[ruteable])
+        print(f"🔎 Verificación Decimal: error relativo máx indirecto={err:.2e}")
+
+    df_rut = df_indir.loc[ruteable, ["symbol", "base", "quote"]].reset_index(drop=True)
+    df_rut[eqv.COL_EQUIV_QUOTE] = eq_quote[ruteable]
+    df_rut[eqv.COL_EQUIV] = eq_base[ruteable]
+    df_rut[eqv.COL_PRECIO] = precio[ruteable]
+    df_rut["saltos"] = saltos[ruteable]
+    return df_rut, df_indir.loc[no_ruteable].reset_index(drop=True)
+
+
+def imprimir_resumen(total: int, tot_rut: int, tot_no: int) -> None:
+    ratio = (tot_rut / total * 100) if total else 0
+
+    print("\n📊 --- Resumen de coherencia ---")
+    print(f"🔹 Total de pares indirectos: {total}")
+    print(f"🔹 Ruteables: {tot_rut}")
+    print(f"🔹 No ruteables: {tot_no}")
+    print(f"✅ Cobertura de rutas: {ratio:.2f}%")
+    if ratio < 50:
+        print("⚠️ Advertencia: baja cobertura. Revisa equivalencias directas o liquidez del exchange.")
+    else:
+        print("👌 Cobertura aceptable para simulaciones.")
+
+
 def main():
     if not INPUT_INDIRECTO.exists():
         print(f"❌ No se encontró el archivo de indirectos: {INPUT_INDIRECTO}")
         sys.exit(1)
-    if not INPUT_EQUIV.exists():
-        print(f"❌ No se encontró el archivo de equivalencias: {INPUT_EQUIV}")
-        sys.exit(1)
 
     df_indir = pd.read_csv(INPUT_INDIRECTO, dtype=str)
-    df_eq = pd.read_csv(INPUT_EQUIV, dtype=str)
-
     if df_indir.empty:
         print("⚠️ No hay pares indirectos para procesar.")
         sys.exit(0)
-    if df_eq.empty:
-        print("⚠️ No hay equivalencias de USDT disponibles.")
-        sys.exit(0)
+
+    # Tabla spot completa = directos + invertidos + indirectos (salidas de la etapa 3)
+    partes = [pd.read_csv(p, dtype=str) for p in (INPUT_DIRECTO, INPUT_INVERTIDO) if p.exists()]
+    df_spot = pd.concat([*partes, df_indir], ignore_index=True)
 
     # Normalizar texto y nombres de columnas
-    df_indir.columns = [c.strip().lower() for c in df_indir.columns]
-    df_eq.columns = [c.strip().lower() for c in df_eq.columns]
-
-    for df in (df_indir, df_eq):
-        for col in df.columns:
-            df[col] = df[col].astype(str).str.strip().str.upper()
-
-    # Detectar nombre real de la columna de equivalencias
-    col_equiv = next((c for c in df_eq.columns if "1_usdt_equivale_base" in c.lower()), None)
-    if not col_equiv:
-        raise KeyError("❌ No se encontró la columna '1_usdt_equivale_base' en el CSV de equivalencias.")
-
-    eq_map = dict(zip(df_eq["base"], df_eq[col_equiv]))
-
-    # Conexión CCXT
-    ex_class = getattr(ccxt, EXCHANGE_ID)
-    exchange = ex_class(CCXT_OPTIONS)
-    exchange.load_markets()
-    tickers = exchange.fetch_tickers()
-
-    ruteables, no_ruteables = [], []
-
-    for _, row in df_indir.iterrows():
-        symbol = row.get("symbol")
-        base = row.get("base")
-        quote = row.get("quote")
-        if not symbol or not base or not quote:
-            continue
-
-        if quote not in eq_map:
-            no_ruteables.append(row)
-            continue
-
-        ticker = tickers.get(symbol)
-        if not ticker:
-            no_ruteables.append(row)
-            continue
-
-        last = ticker.get("last") or ticker.get("close") or ticker.get("info", {}).get("lastPrice")
-        if not last:
-            no_ruteables.append(row)
-            continue
-
-        try:
-            precio = Decimal(str(last))
-            if precio <= 0:
-                continue
-
-            usdt_vs_quote = Decimal(str(eq_map[quote]))
-            usdt_vs_base = usdt_vs_quote / precio
-
-            ruteables.append({
-                "symbol": symbol,
-                "base": base,
-                "quote": quote,
-                "1_usdt_equivale_quote": f"{usdt_vs_quote:.18f}",
-                "1_usdt_equivale_base": f"{usdt_vs_base:.18f}",
-                "precio_base_vs_quote": f"{precio:.10f}"
-            })
-        except Exception as e:
-            print(f"⚠️ Error en {symbol}: {e}")
-            no_ruteables.append(row)
+    for df in (df_indir, df_spot):
+        df.columns = [c.strip().lower() for c in df.columns]
+        normalizar_claves(df)
 
-    # Guardar resultados
-    pd.DataFrame(ruteables).to_csv(OUTPUT_RUTEABLES, index=False)
-    pd.DataFrame(no_ruteables).to_csv(OUTPUT_NO_RUTEABLES, index=False)
+    # Tickers del snapshot compartido
+    tickers = obtener_snapshot(EXCHANGE_ID).tickers
+    df_rut, df_no = equivalencias_indirectas(df_indir, df_spot, tickers, verificar=AUDIT_STRUCT_EXPORT)
 
-    total = len(df_indir)
-    tot_rut = len(ruteables)
-    tot_no = len(no_ruteables)
-    ratio = (tot_rut / total * 100) if total else 0
+    # Guardar resultados
+    eqv.formatear_decimales(df_rut).to_csv(OUTPUT_RUTEABLES, index=False)
+    df_no.to_csv(OUTPUT_NO_RUTEABLES, index=False)
 
-    print("\n📊 --- Resumen de coherencia ---")
-    print(f"🔹 Total de pares indirectos: {total}")
-    print(f"🔹 Ruteables: {tot_rut}")
-    print(f"🔹 No ruteables: {tot_no}")
-    print(f"✅ Cobertura de rutas: {ratio:.2f}%")
-    if ratio < 50:
-        print("⚠️ Advertencia: baja cobertura. Revisa equivalencias directas o liquidez del exchange.")
-    else:
-        print("👌 Cobertura aceptable para simulaciones.")
+    imprimir_resumen(len(df_indir), len(df_rut), len(df_no))
 
     print(f"\n📄 Archivos generados:")
     print(f"   - {OUTPUT_RUTEABLES}")
@@ -8,42 +8,98 @@ Copia el archivo generado en:
 Hacia:
     app/absorcion/datos/cotizador_universal_unificado.csv
 
+junto con su versión columnar binaria (`cotizador_universal_unificado.col`,
+ver `codigo/artefacto_binario.py`) que se mapea sin parsear, y publica el tope
+de libro (bid/ask/cantidades) de los símbolos spot en la tabla compartida mmap
+(`codigo/tabla_compartida.py`), que realtime / sentinel leen sin parsear CSV.
+
+CSV y binario se publican juntos con `codigo/publicador.py` (tmp + fsync +
+rename, una generación nueva en `manifest.json` y aviso por Redis pub/sub),
+así un lector nunca ve archivos a medio escribir.
+
+Si el manifest ya tiene publicado este mismo CSV (mismo sha256) junto con su
+binario, el modo script no relee el CSV ni importa pandas: sólo refresca la
+tabla compartida (`--forzar` republica igual).
+
 💡 Esta etapa representa la 'fase de absorción de datos' lista para ser consumida
 por motores de arbitraje o análisis externo.
 """
 
+from __future__ import annotations
+
+import csv
 import sys
 from pathlib import Path
-import shutil
-import pandas as pd
+from typing import TYPE_CHECKING, List, Optional
 from datetime import datetime
 
 # --- Configuración de rutas ---
 APP_DIR = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(APP_DIR))
 
-from codigo.config import DATOS_DIR  # type: ignore
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
+from codigo.config import DATOS_DIR, EXCHANGE_ID, ABSORCION_DATOS_DIR, TABLA_COMPARTIDA_PATH  # type: ignore
+from codigo.publicador import Publicador, publicador_por_defecto, sha256_de  # type: ignore
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from codigo.tabla_compartida import TablaCompartida  # type: ignore
 
 # Origen y destino
 SRC_FILE = DATOS_DIR / "tratamiento_de_cotizacion" / "cotizador_universal_unificado.csv"
-DEST_DIR = APP_DIR / "absorcion" / "datos"
+DEST_DIR = ABSORCION_DATOS_DIR
 DEST_FILE = DEST_DIR / "cotizador_universal_unificado.csv"
+DEST_BINARIO = DEST_DIR / "cotizador_universal_unificado.col"
 
+COL_EQUIV = "1_usdt_equivale_base"
+COL_INDIRECTA = "cotizacion_indirecta"
 
-def main():
-    if not SRC_FILE.exists():
-        print(f"❌ No se encontró el archivo fuente: {SRC_FILE}")
-        sys.exit(1)
 
-    DEST_DIR.mkdir(parents=True, exist_ok=True)
+def exportar(df: pd.DataFrame, publicador: Optional[Publicador] = None) -> Path:
+    """Publica el cotizador en memoria en el destino de absorción (modo pipeline)."""
+    publicador = publicador or Publicador(DEST_DIR)
+    return publicador.publicar_csv(DEST_FILE.name, df).path
+
+
+def exportar_binario(df: pd.DataFrame, publicador: Optional[Publicador] = None) -> Path:
+    """Escribe el cotizador tipado (float/bool reales) en formato columnar mapeable."""
+    import pandas as pd
+    from codigo import artefacto_binario  # type: ignore
+
+    df = df.copy()
+    if COL_EQUIV in df.columns:
+        df[COL_EQUIV] = pd.to_numeric(df[COL_EQUIV], errors="coerce").astype("float64")
+    if COL_INDIRECTA in df.columns and not pd.api.types.is_bool_dtype(df[COL_INDIRECTA]):
+        df[COL_INDIRECTA] = df[COL_INDIRECTA].astype(str).str.strip().str.lower().eq("true")
+    publicador = publicador or Publicador(DEST_DIR)
+    return publicador.publicar(DEST_BINARIO.name, lambda p: artefacto_binario.escribir(df, p)).path
+
+
+def exportar_tabla_compartida(simbolos, tickers: dict, ts: int | None = None) -> TablaCompartida:
+    """Escribe bid/ask de los símbolos en la tabla compartida; la recrea si cambió el universo."""
+    from codigo.tabla_compartida import TablaCompartida  # type: ignore  (numpy + pandas)
+
+    simbolos = list(dict.fromkeys(simbolos))
+    tabla = None
+    if TABLA_COMPARTIDA_PATH.exists():
+        try:
+            tabla = TablaCompartida.abrir(TABLA_COMPARTIDA_PATH, escritura=True)
+        except (ValueError, OSError):
+            tabla = None
+    if tabla is None or list(tabla.simbolos) != simbolos:
+        tabla = TablaCompartida.crear(TABLA_COMPARTIDA_PATH, simbolos)
+    tabla.escribir_tickers(tickers, ts)
+    return tabla
 
-    # Leer y copiar archivo
-    df = pd.read_csv(SRC_FILE, dtype=str)
-    shutil.copy2(SRC_FILE, DEST_FILE)
 
+def imprimir_resumen(df: pd.DataFrame, origen: str, generacion: int = 0) -> None:
     print("\n📤 Exportación completada")
-    print(f"📦 Origen : {SRC_FILE}")
+    print(f"📦 Origen : {origen}")
     print(f"📥 Destino: {DEST_FILE}")
+    print(f"📦 Binario: {DEST_BINARIO}")
+    print(f"🔢 Generación publicada: {generacion}")
     print(f"📊 Registros exportados: {len(df)}")
     print(f"🕒 Fecha de exportación: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
@@ -54,5 +110,52 @@ def main():
     print("\n✅ Cotizador universal disponible para absorción de datos.")
 
 
+def publicado_al_dia(publicador: Publicador) -> bool:
+    """True si el manifest ya tiene este SRC_FILE (mismo sha256) y el binario de esa generación o posterior."""
+    artefactos = publicador.manifest().get("artefactos", {})
+    csv_pub, bin_pub = artefactos.get(DEST_FILE.name), artefactos.get(DEST_BINARIO.name)
+    if not csv_pub or not bin_pub or not DEST_FILE.exists() or not DEST_BINARIO.exists():
+        return False
+    if int(bin_pub.get("generacion", 0)) < int(csv_pub.get("generacion", 0)):
+        return False
+    return csv_pub.get("sha256") == sha256_de(SRC_FILE)
+
+
+def leer_simbolos(path: Path) -> List[str]:
+    """Columna `symbol` de un CSV sin pandas (vacíos fuera)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [s for s in (fila.get("symbol") for fila in csv.DictReader(f)) if s]
+
+
+def main(forzar: bool = False):
+    if not SRC_FILE.exists():
+        print(f"❌ No se encontró el archivo fuente: {SRC_FILE}")
+        sys.exit(1)
+
+    DEST_DIR.mkdir(parents=True, exist_ok=True)
+
+    publicador = publicador_por_defecto(DEST_DIR)
+    if not forzar and publicado_al_dia(publicador):
+        print(f"✅ Cotizador ya publicado sin cambios (generación {publicador.generacion}; --forzar para republicar)")
+    else:
+        import pandas as pd
+
+        # Leer y publicar (CSV tal cual + binario) en una sola generación
+        df = pd.read_csv(SRC_FILE, dtype=str)
+        with publicador.lote():
+            publicador.publicar_archivo(DEST_FILE.name, SRC_FILE)
+            exportar_binario(df, publicador)
+
+        imprimir_resumen(df, str(SRC_FILE), publicador.generacion)
+
+    spot = DATOS_DIR / "estandar" / f"simbolos_spot_{EXCHANGE_ID}.csv"
+    if spot.exists():
+        from codigo.snapshot import obtener_snapshot  # type: ignore
+
+        snap = obtener_snapshot()
+        tabla = exportar_tabla_compartida(leer_simbolos(spot), snap.tickers, snap.ts)
+        print(f"🧠 Tabla compartida: {len(tabla)} símbolos → {TABLA_COMPARTIDA_PATH}")
+
+
 if __name__ == "__main__":
-    main()
+    main(forzar="--forzar" in sys.argv[1:])
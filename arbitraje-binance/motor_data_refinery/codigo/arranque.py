@@ -0,0 +1,114 @@
+# codigo/arranque.py
+"""
+🚀 Perfil de arranque de los entry points de la refinería (`--profile-startup`).
+
+Las etapas corren seguido desde cron y en cada reinicio de contenedor, así que
+lo que pagan antes de llegar a `main()` (imports) importa. Cualquier entry
+point que llame a `perfil_si_se_pide(__name__, __file__)` antes de sus imports
+pesados acepta `--profile-startup`. Esa opción re-importa el módulo en un
+intérprete nuevo con `-X importtime` (sin ejecutar `main`) e imprime:
+
+- tiempo de pared del intérprete vacío y del arranque del módulo,
+- tiempo propio de import agrupado por paquete raíz (pandas, numpy, pymysql, ...),
+- los módulos más caros por tiempo acumulado.
+
+Sólo usa stdlib y deja `subprocess`/`time` para cuando el flag está presente:
+importarlo no agrega costo al arranque que mide.
+
+Uso:
+    python codigo/3_simbolos_separacion.py --profile-startup
+    python -m codigo.pipeline --profile-startup
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+APP_DIR = Path(__file__).resolve().parents[1]
+FLAG = "--profile-startup"
+
+
+class ImportMedido(NamedTuple):
+    modulo: str
+    propio_us: int
+    acumulado_us: int
+    nivel: int
+
+
+def modulo_de(archivo: str) -> str:
+    """Nombre importable (`codigo.3_simbolos_separacion`) de un archivo bajo la raíz del motor."""
+    rel = Path(archivo).resolve().relative_to(APP_DIR).with_suffix("")
+    return ".".join(rel.parts)
+
+
+def _correr(codigo: str, importtime: bool) -> Tuple[float, "subprocess.CompletedProcess"]:
+    import subprocess
+    import time
+
+    cmd = [sys.executable, *(("-X", "importtime") if importtime else ()), "-c", codigo]
+    t0 = time.perf_counter()
+    proc = subprocess.run(cmd, capture_output=True, text=True, cwd=APP_DIR, env={**os.environ})
+    return time.perf_counter() - t0, proc
+
+
+def parsear_importtime(stderr: str) -> List[ImportMedido]:
+    """Líneas `import time: self | cumulative | paquete` de `-X importtime`."""
+    out: List[ImportMedido] = []
+    for linea in stderr.splitlines():
+        if not linea.startswith("import time:"):
+            continue
+        partes = linea[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[0].strip().isdigit():
+            continue  # cabecera
+        nombre = partes[2].rstrip()
+        sangria = len(nombre) - len(nombre.lstrip(" "))
+        out.append(ImportMedido(nombre.strip(), int(partes[0]), int(partes[1]), (sangria - 1) // 2))
+    return out
+
+
+def medir_arranque(modulo: str) -> Tuple[float, float, List[ImportMedido]]:
+    """(pared intérprete vacío, pared con el import del módulo, imports medidos) en un proceso nuevo."""
+    vacio, _ = _correr("pass", importtime=False)
+    codigo = f"import sys; sys.path.insert(0, {str(APP_DIR)!r}); import importlib; importlib.import_module({modulo!r})"
+    pared, proc = _correr(codigo, importtime=True)
+    if proc.returncode != 0:
+        resto = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))
+        raise RuntimeError(f"❌ No se pudo importar {modulo}:\n{resto[-2000:]}")
+    return vacio, pared, parsear_importtime(proc.stderr)
+
+
+def por_paquete(medidos: Sequence[ImportMedido]) -> Dict[str, int]:
+    """Tiempo propio (µs) sumado por paquete raíz, de mayor a menor."""
+    tot: Dict[str, int] = {}
+    for m in medidos:
+        raiz = m.modulo.split(".")[0]
+        tot[raiz] = tot.get(raiz, 0) + m.propio_us
+    return dict(sorted(tot.items(), key=lambda kv: -kv[1]))
+
+
+def imprimir_perfil(modulo: str, vacio: float, pared: float, medidos: Sequence[ImportMedido], top: int = 12) -> None:
+    total_us = sum(m.acumulado_us for m in medidos if m.nivel == 0)
+    print(f"\n🚀 Arranque de {modulo}")
+    print(f"🔹 intérprete vacío   : {vacio * 1000:8.1f} ms")
+    print(f"🔹 arranque + imports : {pared * 1000:8.1f} ms (imports {total_us / 1000:.1f} ms, {len(medidos)} módulos)")
+    print("\n📦 Tiempo propio por paquete:")
+    for raiz, us in list(por_paquete(medidos).items())[:top]:
+        print(f"   - {raiz:<24} {us / 1000:8.1f} ms")
+    print("\n🐢 Módulos más caros (acumulado):")
+    for m in sorted(medidos, key=lambda m: -m.acumulado_us)[:top]:
+        print(f"   - {m.modulo:<40} {m.acumulado_us / 1000:8.1f} ms (propio {m.propio_us / 1000:.1f})")
+    print()
+
+
+def perfil_si_se_pide(nombre: str, archivo: str, argv: Optional[Sequence[str]] = None) -> None:
+    """Si el entry point corre como `__main__` con `--profile-startup`, imprime el perfil y sale."""
+    argv = sys.argv[1:] if argv is None else argv
+    if nombre != "__main__" or FLAG not in argv:
+        return
+    modulo = modulo_de(archivo)
+    vacio, pared, medidos = medir_arranque(modulo)
+    imprimir_perfil(modulo, vacio, pared, medidos)
+    sys.exit(0)
@@ -0,0 +1,245 @@
+# codigo/artefacto_binario.py
+"""
+📦 Artefacto columnar binario (mapeable en memoria) para el hand-off refinería → absorción.
+
+El cotizador se exporta como CSV con números en texto de 18 decimales y
+booleanos `True`/`False`, y cada consumidor lo re-parsea con `dtype=str`. Este
+formato guarda las mismas columnas ya tipadas, una a continuación de otra,
+para que el lector las mapee con `np.memmap` sin parsear ni copiar.
+
+Layout (little-endian):
+
+    [0, 64)   cabecera : magic b"ARBCOL01" · version u32 · largo_meta u32 ·
+                         n_filas u64 · schema_hash S32 (hex) · (relleno)
+    [64, M)   meta JSON: {"columnas": [{nombre, tipo, offset, largo[, diccionario]}]}
+    [M, ...)  datos    : una región por columna, alineada a 64 bytes
+
+Tipos de columna:
+    f8  → float64 · i8 → int64 · b1 → bool (1 byte)
+    dic → códigos int32 (-1 = nulo) sobre un diccionario de strings: `symbol`,
+          `base`, `quote`, `fuente`. El diccionario viaja en el archivo como dos
+          regiones más (offsets int64 de k+1 elementos + bytes UTF-8
+          concatenados) y se decodifica recién cuando se pide.
+
+`schema_hash` es el sha256 (primeros 32 hex) de la lista `nombre:tipo`; el
+lector puede exigir uno esperado y fallar rápido si el productor cambió el
+esquema. La escritura es atómica (tmp + fsync + rename).
+
+CLI:
+    python -m codigo.artefacto_binario <archivo.col> [--csv salida.csv]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b"ARBCOL01"
+VERSION = 1
+ALINEACION = 64
+
+CABECERA = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("largo_meta", "<u4"),
+    ("n_filas", "<u8"), ("schema_hash", "S32"), ("_relleno", "V8"),
+])
+assert CABECERA.itemsize == ALINEACION
+
+TIPOS = {"f8": np.dtype("<f8"), "i8": np.dtype("<i8"), "b1": np.dtype("?"), "dic": np.dtype("<i4")}
+
+
+def _alinear(n: int) -> int:
+    return (n + ALINEACION - 1) // ALINEACION * ALINEACION
+
+
+def _tipo_de(serie: pd.Series) -> str:
+    if pd.api.types.is_bool_dtype(serie):
+        return "b1"
+    if pd.api.types.is_integer_dtype(serie):
+        return "i8"
+    if pd.api.types.is_float_dtype(serie):
+        return "f8"
+    return "dic"
+
+
+def schema_hash(columnas: List[tuple]) -> str:
+    """sha256 (32 hex) de `nombre:tipo` en orden."""
+    texto = "|".join(f"{n}:{t}" for n, t in columnas)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()[:32]
+
+
+def _empaquetar(valores: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Diccionario de strings → (offsets int64 de k+1, bytes UTF-8 concatenados)."""
+    codificados = [v.encode("utf-8") for v in valores]
+    offsets = np.zeros(len(codificados) + 1, dtype="<i8")
+    np.cumsum([len(b) for b in codificados], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(codificados), dtype=np.uint8)
+
+
+def _desempaquetar(offsets: np.ndarray, datos: np.ndarray) -> np.ndarray:
+    texto = datos.tobytes()
+    o = offsets.tolist()
+    return np.array([texto[a:b].decode("utf-8") for a, b in zip(o[:-1], o[1:])], dtype=object)
+
+
+def escribir(df: pd.DataFrame, path: Path) -> str:
+    """Escribe el frame en formato columnar (atómico). Devuelve el schema hash."""
+    path = Path(path)
+    n = len(df)
+    columnas, bloques, diccionarios = [], [], {}
+    for nombre in df.columns:
+        serie = df[nombre]
+        tipo = _tipo_de(serie)
+        if tipo == "dic":
+            codigos, valores = pd.factorize(serie.astype(object), use_na_sentinel=True)
+            diccionarios[str(nombre)] = _empaquetar([str(v) for v in valores])
+            datos = codigos.astype(TIPOS["dic"])
+        elif tipo == "b1":
+            datos = serie.fillna(False).to_numpy(dtype=bool)
+        else:
+            datos = serie.to_numpy(dtype=TIPOS[tipo])
+        columnas.append((str(nombre), tipo))
+        bloques.append(np.ascontiguousarray(datos, dtype=TIPOS[tipo]))
+
+    hash_ = schema_hash(columnas)
+    # La meta depende de los offsets y los offsets del largo de la meta: se estima y se corrige
+    largo_meta, meta = 0, b""
+    for _ in range(4):
+        offset = _alinear(ALINEACION + largo_meta)
+        specs, regiones = [], []
+
+        def region(datos: np.ndarray) -> Dict[str, int]:
+            nonlocal offset
+            r = {"offset": offset, "largo": datos.nbytes}
+            regiones.append((offset, datos))
+            offset = _alinear(offset + datos.nbytes)
+            return r
+
+        for (nombre, tipo), datos in zip(columnas, bloques):
+            spec = {"nombre": nombre, "tipo": tipo, **region(datos)}
+            if tipo == "dic":
+                offsets_dic, bytes_dic = diccionarios[nombre]
+                spec["diccionario"] = {"offsets": region(offsets_dic), "bytes": region(bytes_dic)}
+            specs.append(spec)
+        meta = json.dumps({"columnas": specs}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        if len(meta) == largo_meta:
+            break
+        largo_meta = len(meta)
+
+    cab = np.zeros(1, dtype=CABECERA)
+    cab["magic"], cab["version"], cab["largo_meta"] = MAGIC, VERSION, len(meta)
+    cab["n_filas"], cab["schema_hash"] = n, hash_.encode("ascii")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(cab.tobytes())
+        f.write(meta)
+        for offset, datos in regiones:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(datos.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return hash_
+
+
+@dataclass
+class ArtefactoColumnar:
+    """Columnas mapeadas (vistas de solo lectura sobre el archivo, sin copias)."""
+    path: Path
+    n_filas: int
+    schema_hash: str
+    columnas: Dict[str, np.ndarray]
+    tipos: Dict[str, str]
+    _dic_crudos: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, repr=False)
+    _dic_cache: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+
+    def __len__(self) -> int:
+        return self.n_filas
+
+    def __getitem__(self, nombre: str) -> np.ndarray:
+        """Columna cruda: floats/bools tal cual; las de diccionario como códigos int32."""
+        return self.columnas[nombre]
+
+    def diccionario(self, nombre: str) -> np.ndarray:
+        """Strings del diccionario de una columna `dic` (se decodifican una vez, al primer uso)."""
+        if nombre not in self._dic_cache:
+            self._dic_cache[nombre] = _desempaquetar(*self._dic_crudos[nombre])
+        return self._dic_cache[nombre]
+
+    def valores(self, nombre: str) -> np.ndarray:
+        """Columna decodificada (las de diccionario se expanden a strings; esto sí copia)."""
+        datos = self.columnas[nombre]
+        if self.tipos[nombre] != "dic":
+            return datos
+        dic = np.append(self.diccionario(nombre), None)  # código -1 → None
+        return dic[datos]
+
+    def indice(self, nombre: str = "symbol") -> Dict[str, int]:
+        """valor → fila para una columna de diccionario con valores únicos (p. ej. símbolos)."""
+        dic, codigos = self.diccionario(nombre), self.columnas[nombre]
+        return {dic[c]: i for i, c in enumerate(codigos.tolist()) if c >= 0}
+
+    def a_dataframe(self) -> pd.DataFrame:
+        out = {}
+        for nombre, datos in self.columnas.items():
+            if self.tipos[nombre] == "dic":
+                out[nombre] = pd.Categorical.from_codes(datos, categories=self.diccionario(nombre))
+            else:
+                out[nombre] = datos
+        return pd.DataFrame(out)
+
+
+def cargar(path: Path, schema_esperado: Optional[str] = None) -> ArtefactoColumnar:
+    """Mapea el archivo y devuelve vistas por columna (sin parsear ni copiar datos)."""
+    path = Path(path)
+    mm = np.memmap(path, dtype=np.uint8, mode="r")
+    cab = mm[:CABECERA.itemsize].view(CABECERA)[0]
+    if bytes(cab["magic"]) != MAGIC or int(cab["version"]) != VERSION:
+        raise ValueError(f"❌ {path} no es un artefacto columnar v{VERSION}")
+    hash_ = bytes(cab["schema_hash"]).decode("ascii")
+    if schema_esperado is not None and hash_ != schema_esperado:
+        raise ValueError(f"❌ Schema distinto en {path}: {hash_} (esperado {schema_esperado})")
+    n = int(cab["n_filas"])
+    meta = json.loads(bytes(mm[ALINEACION:ALINEACION + int(cab["largo_meta"])]).decode("utf-8"))
+
+    def region(r: dict, dtype) -> np.ndarray:
+        return mm[r["offset"]:r["offset"] + r["largo"]].view(dtype)
+
+    columnas, tipos, dics = {}, {}, {}
+    for spec in meta["columnas"]:
+        nombre, tipo = spec["nombre"], spec["tipo"]
+        columnas[nombre] = region(spec, TIPOS[tipo])
+        tipos[nombre] = tipo
+        if tipo == "dic":
+            d = spec["diccionario"]
+            dics[nombre] = (region(d["offsets"], "<i8"), region(d["bytes"], np.uint8))
+    return ArtefactoColumnar(path, n, hash_, columnas, tipos, dics)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Inspección de un artefacto columnar binario")
+    parser.add_argument("archivo", type=Path)
+    parser.add_argument("--csv", type=Path, help="Volcar a CSV (para auditoría)")
+    args = parser.parse_args(argv)
+
+    art = cargar(args.archivo)
+    print(f"📦 {args.archivo} · {len(art)} filas · schema {art.schema_hash}")
+    for nombre, tipo in art.tipos.items():
+        extra = f" ({len(art.diccionario(nombre))} valores)" if tipo == "dic" else ""
+        print(f"🔹 {nombre:<24} {tipo}{extra}")
+    if args.csv:
+        art.a_dataframe().to_csv(args.csv, index=False)
+        print(f"✅ CSV → {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
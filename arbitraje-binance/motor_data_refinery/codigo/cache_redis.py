@@ -0,0 +1,280 @@
+# codigo/cache_redis.py
+"""
+🧊 Caché caliente en Redis de las tablas normalizadas de la refinería.
+
+Guarda en hashes de Redis, compartidos entre contenedores:
+
+- `estandar`      : tabla de mercados normalizada (etapa 1), una fila por símbolo.
+- `spot`          : resultado del filtro spot (etapa 2), una fila por símbolo.
+- `equivalencias` : mapa base → `1_usdt_equivale_base` (cotizador unificado, etapa 6).
+- `snapshot_markets` / `snapshot_tickers`: el snapshot CCXT, para que otro
+  contenedor (o un reinicio) dentro del TTL no vuelva a llamar al exchange.
+
+Esquema de claves (`<p>` = `CACHE_REDIS_PREFIJO`, `<ex>` = exchange):
+
+    <p>:<ex>:<tabla>:seq      INCR → número de generación nuevo
+    <p>:<ex>:<tabla>:g<N>     HASH  campo → fila JSON (lista de valores) | número
+                                    `_meta` → {"columnas", "tipos", "orden", "ts", "clave"}
+    <p>:<ex>:<tabla>:gen      STRING N (generación vigente)
+
+Escritura: la generación nueva se llena entera con HSET por lotes en un solo
+pipeline (un round-trip), con TTL, y recién después se mueve el puntero `gen`;
+la generación anterior queda viva `CACHE_REDIS_GRACIA_S` para lectores en
+curso. Un lector nunca ve una tabla a medio escribir.
+
+Lectura: `GET gen` + `HGETALL` (o `HMGET` de algunos campos). Si Redis no está
+disponible todo degrada a los CSV de siempre (`leer_tabla_o_csv`).
+
+Para tests sin servidor: `CacheRefineria(RedisLocal())` (`codigo/redis_local.py`).
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd  # en runtime se importa recién al leer/escribir tablas
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.config import (  # type: ignore
+    CACHE_REDIS_GRACIA_S, CACHE_REDIS_PREFIJO, CACHE_REDIS_TTL_S,
+    EXCHANGE_ID, SNAPSHOT_TTL_S,
+)
+
+CAMPO_META = "_meta"
+LOTE_HSET = 1_000  # campos por HSET dentro del pipeline
+COL_EQUIV = "1_usdt_equivale_base"
+
+_CLIENTE: dict = {}  # memo del cliente por proceso (None = Redis no disponible)
+
+
+def _puerto_abierto(cfg: dict) -> bool:
+    """Sondeo TCP previo: con el servidor caído no se paga el import de redis (~200 ms) ni sus reintentos."""
+    try:
+        socket.create_connection((cfg["host"], cfg["port"]), timeout=cfg.get("socket_connect_timeout")).close()
+        return True
+    except OSError:
+        return False
+
+
+def conectar(avisar: bool = True):
+    """Cliente Redis (ping OK) o None si el paquete o el servidor no están; se resuelve una vez por proceso."""
+    if "cliente" not in _CLIENTE:
+        try:
+            from codigo.config import connect_redis, get_redis_config  # type: ignore
+
+            if not _puerto_abierto(get_redis_config()):
+                raise ConnectionRefusedError(f"{get_redis_config()['host']}:{get_redis_config()['port']}")
+            connect_redis(reintentar=False).ping()  # sin backoff: un servidor que no responde falla al instante
+            cliente = connect_redis()
+        except Exception as e:  # noqa: BLE001 — sin Redis la refinería sigue con CSV / manifest
+            if avisar:
+                print(f"⚠️ Redis no disponible ({type(e).__name__}); se sigue sin caché compartida")
+            cliente = None
+        _CLIENTE["cliente"] = cliente
+    return _CLIENTE["cliente"]
+
+
+def _a_json(valor):
+    if valor is None or (isinstance(valor, float) and valor != valor):
+        return None
+    if hasattr(valor, "item"):  # escalares numpy
+        return valor.item()
+    return valor
+
+
+class CacheRefineria:
+    """Tablas de la refinería en hashes de Redis, versionadas por generación."""
+
+    def __init__(
+        self,
+        redis,
+        exchange_id: str = EXCHANGE_ID,
+        ttl_s: float = CACHE_REDIS_TTL_S,
+        prefijo: str = CACHE_REDIS_PREFIJO,
+    ):
+        self.redis = redis
+        self.exchange_id = exchange_id
+        self.ttl_s = int(ttl_s)
+        self.prefijo = f"{prefijo}:{exchange_id}"
+
+    @classmethod
+    def por_defecto(cls, exchange_id: str = EXCHANGE_ID) -> Optional["CacheRefineria"]:
+        cliente = conectar()
+        return cls(cliente, exchange_id) if cliente is not None else None
+
+    def clave(self, tabla: str, sufijo: str) -> str:
+        return f"{self.prefijo}:{tabla}:{sufijo}"
+
+    def generacion(self, tabla: str) -> int:
+        return int(self.redis.get(self.clave(tabla, "gen")) or 0)
+
+    # ─────────── Escritura ───────────
+    def _guardar_hash(self, tabla: str, campos: Dict[str, str], meta: dict, ttl_s: Optional[float] = None) -> int:
+        ttl = int(ttl_s if ttl_s is not None else self.ttl_s)
+        previa = self.generacion(tabla)
+        gen = int(self.redis.incr(self.clave(tabla, "seq")))
+        destino = self.clave(tabla, f"g{gen}")
+        meta = {**meta, "ts": int(time.time() * 1000), "generacion": gen}
+
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(destino)
+        items = list(campos.items())
+        for i in range(0, len(items), LOTE_HSET):
+            pipe.hset(destino, mapping=dict(items[i:i + LOTE_HSET]))
+        pipe.hset(destino, CAMPO_META, json.dumps(meta))
+        pipe.expire(destino, ttl)
+        pipe.set(self.clave(tabla, "gen"), gen, ex=ttl)  # el puntero se mueve con la tabla ya completa
+        if previa and previa != gen:
+            pipe.expire(self.clave(tabla, f"g{previa}"), min(CACHE_REDIS_GRACIA_S, ttl))
+        pipe.execute()
+        return gen
+
+    def guardar_tabla(self, tabla: str, df: pd.DataFrame, clave: str = "symbol", ttl_s: Optional[float] = None) -> int:
+        """Una fila JSON por valor de `clave` (que se asume única). Devuelve la generación."""
+        columnas = [str(c) for c in df.columns]
+        valores = df.astype(object).where(df.notna(), None)
+        idx = columnas.index(clave)
+        campos = {
+            str(fila[idx]): json.dumps([_a_json(v) for v in fila], default=str, separators=(",", ":"))
+            for fila in valores.itertuples(index=False, name=None)
+        }
+        meta = {"clave": clave, "columnas": columnas, "tipos": [str(t) for t in df.dtypes], "orden": list(campos)}
+        return self._guardar_hash(tabla, campos, meta, ttl_s)
+
+    def guardar_mapa(self, tabla: str, mapa: Dict[str, float], ttl_s: Optional[float] = None) -> int:
+        campos = {str(k): repr(float(v)) for k, v in mapa.items() if v == v}
+        return self._guardar_hash(tabla, campos, {"mapa": True}, ttl_s)
+
+    def guardar_equivalencias(self, df_unificado: pd.DataFrame) -> int:
+        """base → 1_usdt_equivale_base, priorizando la cotización directa si una base aparece varias veces."""
+        import pandas as pd
+
+        df = df_unificado.copy()
+        df[COL_EQUIV] = pd.to_numeric(df[COL_EQUIV], errors="coerce")
+        if "cotizacion_indirecta" in df.columns:
+            indirecta = df["cotizacion_indirecta"].astype(str).str.lower().eq("true")
+            df = df.assign(_ind=indirecta).sort_values("_ind", kind="stable")
+        df = df.dropna(subset=[COL_EQUIV]).drop_duplicates("base")
+        return self.guardar_mapa("equivalencias", dict(zip(df["base"], df[COL_EQUIV])))
+
+    # ─────────── Lectura ───────────
+    def _hash_vigente(self, tabla: str) -> Optional[Dict[str, str]]:
+        gen = self.generacion(tabla)
+        if not gen:
+            return None
+        datos = self.redis.hgetall(self.clave(tabla, f"g{gen}"))
+        return datos or None
+
+    def meta(self, tabla: str) -> Optional[dict]:
+        gen = self.generacion(tabla)
+        crudo = self.redis.hget(self.clave(tabla, f"g{gen}"), CAMPO_META) if gen else None
+        return json.loads(crudo) if crudo else None
+
+    def leer_tabla(self, tabla: str) -> Optional[pd.DataFrame]:
+        """DataFrame con las columnas y tipos originales; None si no hay generación vigente."""
+        datos = self._hash_vigente(tabla)
+        if not datos or CAMPO_META not in datos:
+            return None
+        import pandas as pd
+
+        meta = json.loads(datos.pop(CAMPO_META))
+        # HGETALL no garantiza orden: se respeta el de la tabla original
+        orden = [k for k in meta.get("orden", datos) if k in datos]
+        df = pd.DataFrame([json.loads(datos[k]) for k in orden], columns=meta["columnas"])
+        for col, tipo in zip(meta["columnas"], meta["tipos"]):
+            if tipo != "object":
+                try:
+                    df[col] = df[col].astype(tipo)
+                except (TypeError, ValueError):
+                    pass
+        return df
+
+    def leer_filas(self, tabla: str, claves: Iterable[str]) -> Dict[str, dict]:
+        """Solo las filas pedidas (HMGET), como dicts columna → valor."""
+        gen = self.generacion(tabla)
+        if not gen:
+            return {}
+        claves = list(claves)
+        clave_hash = self.clave(tabla, f"g{gen}")
+        crudos = self.redis.hmget(clave_hash, [CAMPO_META, *claves])
+        if not crudos[0]:
+            return {}
+        columnas = json.loads(crudos[0])["columnas"]
+        return {k: dict(zip(columnas, json.loads(v))) for k, v in zip(claves, crudos[1:]) if v is not None}
+
+    def leer_mapa(self, tabla: str) -> Dict[str, float]:
+        datos = self._hash_vigente(tabla) or {}
+        datos.pop(CAMPO_META, None)
+        return {k: float(v) for k, v in datos.items()}
+
+    def equivalencias(self) -> Dict[str, float]:
+        return self.leer_mapa("equivalencias")
+
+    def equivalencia(self, base: str) -> Optional[float]:
+        gen = self.generacion("equivalencias")
+        v = self.redis.hget(self.clave("equivalencias", f"g{gen}"), base) if gen else None
+        return float(v) if v is not None else None
+
+    # ─────────── Snapshot CCXT ───────────
+    def guardar_snapshot(self, snap) -> None:
+        """markets y tickers del snapshot (los tickers con el TTL del snapshot)."""
+        meta = {"snapshot_ts": snap.ts}
+        markets = {s: json.dumps(m, default=str, separators=(",", ":")) for s, m in snap.markets.items()}
+        self._guardar_hash("snapshot_markets", markets, meta)
+        if snap.tickers:
+            tickers = {s: json.dumps(t, default=str, separators=(",", ":")) for s, t in snap.tickers.items()}
+            self._guardar_hash("snapshot_tickers", tickers, meta, ttl_s=max(SNAPSHOT_TTL_S, 1))
+
+    def leer_snapshot(self, incluir_tickers: bool = True):
+        from codigo.snapshot import Snapshot  # type: ignore  (import diferido: snapshot importa este módulo)
+
+        markets = self._hash_vigente("snapshot_markets")
+        if not markets:
+            return None
+        meta = json.loads(markets.pop(CAMPO_META, "{}"))
+        tickers: Dict[str, str] = {}
+        if incluir_tickers:
+            tickers = self._hash_vigente("snapshot_tickers") or {}
+            meta_t = json.loads(tickers.pop(CAMPO_META, "{}"))
+            if meta_t.get("snapshot_ts") != meta.get("snapshot_ts"):
+                return None  # tickers de otro instante (o vencidos): el snapshot no es coherente
+        return Snapshot(
+            exchange_id=self.exchange_id,
+            ts=int(meta.get("snapshot_ts", 0)),
+            markets={s: json.loads(v) for s, v in markets.items()},
+            tickers={s: json.loads(v) for s, v in tickers.items()},
+        )
+
+
+def guardar_si_hay_redis(tabla: str, df: pd.DataFrame, clave: str = "symbol") -> Optional[int]:
+    """Atajo de las etapas en modo script: guarda si hay Redis, no-op si no."""
+    cache = CacheRefineria.por_defecto()
+    if cache is None:
+        return None
+    if tabla == "equivalencias":
+        return cache.guardar_equivalencias(df)
+    return cache.guardar_tabla(tabla, df, clave)
+
+
+def leer_tabla_o_csv(tabla: str, path: Path) -> Optional[pd.DataFrame]:
+    """Lee la tabla desde Redis si hay generación vigente; si no, del CSV de hand-off (None si tampoco existe)."""
+    cache = CacheRefineria.por_defecto()
+    df = cache.leer_tabla(tabla) if cache is not None else None
+    if df is not None:
+        print(f"🧊 {tabla}: {len(df)} filas desde Redis (generación {cache.generacion(tabla)})")
+        return df
+    if not path.exists():
+        return None
+    import pandas as pd
+
+    return pd.read_csv(path, dtype=str)
+
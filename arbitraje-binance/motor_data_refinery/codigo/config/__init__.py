@@ -2,19 +2,63 @@
 from .config import (
     APP_DIR, CODIGO_DIR, TEMP_DIR, STATIC_DIR,
     DATOS_DIR, ESTRUCTURAL_DIR,
-    EXCHANGE_ID, CCXT_OPTIONS,
-    SCHEMA_PRIMARY_PATH, SCHEMA_OUTPUT_PATH,
+    EXCHANGE_PRINCIPAL, EXCHANGE_ID, NAMESPACE_EXCHANGE, CCXT_OPTIONS,
+    EXCHANGES, MULTI_EXCHANGE_PROCESOS,
+    SNAPSHOT_DIR, SNAPSHOT_TTL_S,
+    CACHE_REDIS_PREFIJO, CACHE_REDIS_TTL_S, CACHE_REDIS_GRACIA_S,
+    INTERESADO_EN, ANCLAS, LONGITUD_MAX_CICLO, VOLUMEN_MIN_CICLO, CICLOS_DIR, CICLOS_CACHE_RETENER,
+    LIBRO_PROFUNDIDAD, ESCALERA_NOTIONAL_USDT, TOLERANCIA_SLIPPAGE,
+    SIMULACION_ESCENARIOS, SIMULACION_GRILLA_USDT, SIMULACION_REFERENCIA_USDT, SIMULACION_DECAIMIENTO,
+    SIMULACION_LATENCIA_MS, SIMULACION_VOLATILIDAD, SIMULACION_LLENADO_MIN, SIMULACION_PERCENTIL,
+    SIMULACION_PROCESOS, PRECISION_MODO,
+    LIBROS_PESO_POR_MINUTO, LIBROS_MARGEN_PESO, LIBROS_CONCURRENCIA, LIBROS_REINTENTOS, LIBROS_TIMEOUT_S,
+    BINANCE_WS_URL, WS_STREAMS_POR_CONEXION, WS_SILENCIO_MAX_S,
+    ABSORCION_DATOS_DIR, TABLA_COMPARTIDA_PATH, MANIFEST_PATH, CANAL_ARTEFACTOS, CANAL_MERCADOS,
+    PERSISTENCIA_HISTORIAL, PERSISTENCIA_POOL, PERSISTENCIA_LOTE, PERSISTENCIA_UMBRAL_INFILE,
+    PERSISTENCIA_COLA_MAX, PERSISTENCIA_DIAS_ADELANTE, PERSISTENCIA_CIERRE_S,
+    SCHEMA_PRIMARY_PATH, SCHEMA_PRIMARY_LEGACY_PATH, SCHEMA_OUTPUT_PATH, SCHEMA_MUESTRA, SCHEMA_VERIFICACION_S,
     AUDIT_STRUCT_EXPORT,
-    ensure_runtime_dirs, load_schema_or_abort,
+    ensure_runtime_dirs, load_schema_or_abort, cargar_schema, cargar_schema_payload,
 )
-from .db import get_db_config, connect
+
+# db.py (pymysql + load_dotenv) y redis_conn.py se importan recién al primer
+# acceso: las etapas que no tocan la base ni Redis no pagan ese arranque.
+_DIFERIDOS = {
+    "get_db_config": "db", "connect": "db",
+    "get_redis_config": "redis_conn", "connect_redis": "redis_conn",
+}
+
+
+def __getattr__(nombre: str):
+    if nombre in _DIFERIDOS:
+        import importlib
+
+        valor = getattr(importlib.import_module(f".{_DIFERIDOS[nombre]}", __name__), nombre)
+        globals()[nombre] = valor
+        return valor
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
 
 __all__ = [
     "APP_DIR", "CODIGO_DIR", "TEMP_DIR", "STATIC_DIR",
     "DATOS_DIR", "ESTRUCTURAL_DIR",
-    "EXCHANGE_ID", "CCXT_OPTIONS",
-    "SCHEMA_PRIMARY_PATH", "SCHEMA_OUTPUT_PATH",
+    "EXCHANGE_PRINCIPAL", "EXCHANGE_ID", "NAMESPACE_EXCHANGE", "CCXT_OPTIONS",
+    "EXCHANGES", "MULTI_EXCHANGE_PROCESOS",
+    "SNAPSHOT_DIR", "SNAPSHOT_TTL_S",
+    "CACHE_REDIS_PREFIJO", "CACHE_REDIS_TTL_S", "CACHE_REDIS_GRACIA_S",
+    "INTERESADO_EN", "ANCLAS", "LONGITUD_MAX_CICLO", "VOLUMEN_MIN_CICLO", "CICLOS_DIR", "CICLOS_CACHE_RETENER",
+    "LIBRO_PROFUNDIDAD", "ESCALERA_NOTIONAL_USDT", "TOLERANCIA_SLIPPAGE",
+    "SIMULACION_ESCENARIOS", "SIMULACION_GRILLA_USDT", "SIMULACION_REFERENCIA_USDT", "SIMULACION_DECAIMIENTO",
+    "SIMULACION_LATENCIA_MS", "SIMULACION_VOLATILIDAD", "SIMULACION_LLENADO_MIN", "SIMULACION_PERCENTIL",
+    "SIMULACION_PROCESOS", "PRECISION_MODO",
+    "LIBROS_PESO_POR_MINUTO", "LIBROS_MARGEN_PESO", "LIBROS_CONCURRENCIA", "LIBROS_REINTENTOS", "LIBROS_TIMEOUT_S",
+    "BINANCE_WS_URL", "WS_STREAMS_POR_CONEXION", "WS_SILENCIO_MAX_S",
+    "ABSORCION_DATOS_DIR", "TABLA_COMPARTIDA_PATH", "MANIFEST_PATH", "CANAL_ARTEFACTOS", "CANAL_MERCADOS",
+    "PERSISTENCIA_HISTORIAL", "PERSISTENCIA_POOL", "PERSISTENCIA_LOTE", "PERSISTENCIA_UMBRAL_INFILE",
+    "PERSISTENCIA_COLA_MAX", "PERSISTENCIA_DIAS_ADELANTE", "PERSISTENCIA_CIERRE_S",
+    "SCHEMA_PRIMARY_PATH", "SCHEMA_PRIMARY_LEGACY_PATH", "SCHEMA_OUTPUT_PATH", "SCHEMA_MUESTRA", "SCHEMA_VERIFICACION_S",
     "AUDIT_STRUCT_EXPORT",
-    "ensure_runtime_dirs", "load_schema_or_abort",
+    "ensure_runtime_dirs", "load_schema_or_abort", "cargar_schema", "cargar_schema_payload",
     "get_db_config", "connect",
+    "get_redis_config", "connect_redis",
 ]
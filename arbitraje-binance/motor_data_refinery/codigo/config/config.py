@@ -4,15 +4,37 @@ Config centralizada para el pipeline (Docker-friendly).
 """
 
 from __future__ import annotations
+from functools import lru_cache
 from pathlib import Path
 import importlib.util
+import json
+import os
+
+# ─────────── Exchange / CCXT ───────────
+# El exchange principal escribe en las rutas de siempre; cualquier otro en su
+# propio namespace (codigo/datos/<exchange>/, absorcion/datos/<exchange>/).
+# REFINERIA_EXCHANGE lo fija el runner multi-exchange (codigo/multi_exchange.py)
+# en cada proceso hijo, antes de importar la config.
+EXCHANGE_PRINCIPAL = "binance"
+EXCHANGE_ID = os.environ.get("REFINERIA_EXCHANGE", EXCHANGE_PRINCIPAL)
+NAMESPACE_EXCHANGE = "" if EXCHANGE_ID == EXCHANGE_PRINCIPAL else EXCHANGE_ID
+CCXT_OPTIONS = {
+    "enableRateLimit": True,
+    "timeout": 20_000,
+    "options": {"adjustForTimeDifference": True},
+}
+
+# ─────────── Multi-exchange (codigo/multi_exchange.py) ───────────
+# Lista por defecto (REFINERIA_EXCHANGES="binance,kraken" la pisa); cada uno necesita su MAPPING.
+EXCHANGES = tuple(e.strip() for e in os.environ.get("REFINERIA_EXCHANGES", EXCHANGE_PRINCIPAL).split(",") if e.strip())
+MULTI_EXCHANGE_PROCESOS = 0  # 0 = un proceso por exchange (tope: núcleos disponibles)
 
 # ─────────── Rutas base ───────────
 CODIGO_DIR = Path(__file__).resolve().parents[1]     # .../<repo>/codigo
 APP_DIR    = CODIGO_DIR.parent                       # .../<repo>
 TEMP_DIR   = CODIGO_DIR / "temp"
-STATIC_DIR = CODIGO_DIR / "static"
-DATOS_DIR  = CODIGO_DIR / "datos"
+STATIC_DIR = CODIGO_DIR / "static"                   # compartido: mapeos, criterios, fiat
+DATOS_DIR  = CODIGO_DIR / "datos" / NAMESPACE_EXCHANGE  # namespace vacío = principal
 ESTRUCTURAL_DIR = DATOS_DIR / "estructural"
 
 def ensure_runtime_dirs() -> None:
@@ -22,19 +44,87 @@ def ensure_runtime_dirs() -> None:
     DATOS_DIR.mkdir(parents=True, exist_ok=True)
     ESTRUCTURAL_DIR.mkdir(parents=True, exist_ok=True)
 
-# ─────────── Exchange / CCXT ───────────
-EXCHANGE_ID = "binance"
-CCXT_OPTIONS = {
-    "enableRateLimit": True,
-    "timeout": 20_000,
-    "options": {"adjustForTimeDifference": True},
-}
+# ─────────── Snapshot compartido (markets + tickers) ───────────
+# Una sola descarga por corrida; las etapas reutilizan el caché mientras no venza el TTL.
+SNAPSHOT_DIR   = DATOS_DIR / "snapshot"
+SNAPSHOT_TTL_S = 60  # segundos
+
+# ─────────── Caché Redis (tablas normalizadas compartidas entre contenedores) ───────────
+CACHE_REDIS_PREFIJO  = "refineria"
+CACHE_REDIS_TTL_S    = 6 * 3600  # tablas de mercados / spot / equivalencias
+CACHE_REDIS_GRACIA_S = 60       # vida de la generación anterior tras publicar una nueva (lectores en curso)
+
+# ─────────── Búsqueda de ciclos (absorción) ───────────
+# Activo de referencia: equivalencias 1 <INTERESADO_EN> = X (etapas 3-6) y ancla de las triadas.
+INTERESADO_EN = "USDT"
+# Activos ancla desde los que se buscan ciclos ANCLA → ... → ANCLA y largo máximo en piernas (3..5).
+ANCLAS = ("USDT", "FDUSD", "USDC", "BTC", "ETH")
+LONGITUD_MAX_CICLO = 4
+VOLUMEN_MIN_CICLO = 0.0  # quoteVolume 24h mínimo por par para entrar al grafo (0 = sin filtro)
+CICLOS_DIR = DATOS_DIR / "ciclos"  # caché .npz por hash de la lista de mercados
+CICLOS_CACHE_RETENER = 3  # .npz más recientes que se conservan al escribir uno nuevo
+
+# ─────────── Libros y capacidad de absorción ───────────
+LIBRO_PROFUNDIDAD = 20  # niveles por lado guardados por símbolo
+ESCALERA_NOTIONAL_USDT = (100, 500, 1_000, 5_000, 10_000, 50_000)  # tamaños a simular (en USDT)
+TOLERANCIA_SLIPPAGE = 0.001  # slippage máximo (VWAP vs mejor precio) que define absorption_cap
+
+# ─────────── Simulación de slippage multi-escenario por triada (absorcion/slippage.py) ───────────
+SIMULACION_ESCENARIOS      = 1_000
+SIMULACION_GRILLA_USDT     = (25, 50, 100, 250, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000)
+SIMULACION_REFERENCIA_USDT = 1_000   # tamaño al que se reporta `slippage_expected`
+SIMULACION_DECAIMIENTO     = 0.3     # λ medio: cantidades × e^(-λ), λ ~ Exponencial (factor medio ≈ 0.77)
+SIMULACION_LATENCIA_MS     = 50.0    # mediana por salto (lognormal); la pierna k sale tras k saltos
+SIMULACION_VOLATILIDAD     = 2e-4    # desvío del log-precio por √segundo
+SIMULACION_LLENADO_MIN     = 0.95    # fracción de escenarios que deben llenarse para contar en absorption_cap
+SIMULACION_PERCENTIL       = 95      # cola reportada (`slippage_p95`)
+SIMULACION_PROCESOS        = 0       # 0 = núcleos disponibles
+
+# ─────────── Cuantización de órdenes (absorcion/cuantizacion.py) ───────────
+# Cómo vienen `price_precision` / `amount_precision` de ccxt: "tick" (TICK_SIZE, p. ej. 0.01,
+# lo que usa Binance) o "decimales" (DECIMAL_PLACES, p. ej. 2 → 0.01).
+PRECISION_MODO = "tick"
+
+# ─────────── Descarga concurrente de libros (absorcion/descarga_libros.py) ───────────
+# Binance: REQUEST_WEIGHT por IP en ventanas de 1 minuto; GET /api/v3/depth pesa
+# 5 (limit ≤ 100), 25 (≤ 500), 50 (≤ 1000) o 250 (≤ 5000).
+LIBROS_PESO_POR_MINUTO = 6_000
+LIBROS_MARGEN_PESO     = 0.8   # fracción del límite que usa la descarga (el resto queda para otros procesos)
+LIBROS_CONCURRENCIA    = 32    # requests de libro en vuelo
+LIBROS_REINTENTOS      = 3     # por símbolo, ante error de red o límite excedido
+LIBROS_TIMEOUT_S       = 10.0
+
+# ─────────── Feed WebSocket bookTicker ───────────
+BINANCE_WS_URL = "wss://stream.binance.com:9443"  # combined streams: <url>/stream?streams=a/b/c
+WS_STREAMS_POR_CONEXION = 200  # Binance admite hasta 1024 streams por conexión
+WS_SILENCIO_MAX_S = 30         # sin mensajes por más de esto → reconectar y marcar hueco
+
+# ─────────── Artefactos de absorción (hand-off a realtime / sentinel) ───────────
+ABSORCION_DATOS_DIR   = APP_DIR / "absorcion" / "datos" / NAMESPACE_EXCHANGE
+TABLA_COMPARTIDA_PATH = ABSORCION_DATOS_DIR / "cotizaciones.tabla"  # tope de libro mmap (seqlock por fila)
+MANIFEST_PATH         = ABSORCION_DATOS_DIR / "manifest.json"       # generación + sha256 por artefacto
+CANAL_ARTEFACTOS      = "refineria:artefactos" + (f":{NAMESPACE_EXCHANGE}" if NAMESPACE_EXCHANGE else "")  # pub/sub Redis: aviso de generación nueva
+CANAL_MERCADOS        = "refineria:mercados"                        # pub/sub Redis: generación + diff de listados
+
+# ─────────── Historial en MariaDB (codigo/persistencia.py) ───────────
+PERSISTENCIA_HISTORIAL     = True      # False: la refinería no intenta conectarse a la base
+PERSISTENCIA_POOL          = 4         # conexiones reutilizadas por proceso
+PERSISTENCIA_LOTE          = 5_000     # filas por executemany (INSERT multi-fila)
+PERSISTENCIA_UMBRAL_INFILE = 50_000    # desde acá: LOAD DATA LOCAL INFILE
+PERSISTENCIA_COLA_MAX      = 64        # lotes pendientes en el escritor de fondo (lleno → se descarta)
+PERSISTENCIA_DIAS_ADELANTE = 7         # particiones diarias creadas por adelantado
+PERSISTENCIA_CIERRE_S      = 30        # espera máxima al vaciar el escritor al final de una corrida
 
 # ─────────── Fuentes de schema ───────────
-# Obligatorio: schema manual estable
-SCHEMA_PRIMARY_PATH = STATIC_DIR / "schema_funcional.py"
-# Temporal (lo usa el paso 1; NO es fallback en este script)
-SCHEMA_OUTPUT_PATH  = TEMP_DIR / "schema.py"
+# Obligatorio: schema manual estable (JSON; el .py queda como formato heredado)
+SCHEMA_PRIMARY_PATH        = STATIC_DIR / "schema_funcional.json"
+SCHEMA_PRIMARY_LEGACY_PATH = STATIC_DIR / "schema_funcional.py"
+# Temporal (lo genera la etapa 0; NO es fallback en este script)
+SCHEMA_OUTPUT_PATH  = TEMP_DIR / "schema.json"
+# Regeneración con snapshot nuevo: markets muestreados (más las altas) antes de recorrer todos.
+# La muestra no registra el snapshot; pasado SCHEMA_VERIFICACION_S se recorren todos igual.
+SCHEMA_MUESTRA        = 256
+SCHEMA_VERIFICACION_S = 3600
 
 # ─────────── Auditoría (export CSV de estructura) ───────────
 AUDIT_STRUCT_EXPORT = True  # ponelo en False si no querés CSVs en datos/estructural/
@@ -47,20 +137,42 @@ def _import_module_from_path(path: Path):
     spec.loader.exec_module(mod)  # type: ignore[attr-defined]
     return mod
 
+@lru_cache(maxsize=8)
+def _leer_json(path: str, mtime_ns: int, size: int) -> dict:
+    # La clave incluye mtime/size: si el archivo se reescribe se vuelve a leer
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def cargar_schema_payload(path: Path = SCHEMA_OUTPUT_PATH) -> dict:
+    """JSON completo del schema (huella, formas, schema), cacheado por mtime. No copiar para mutar."""
+    st = Path(path).stat()
+    payload = _leer_json(str(path), st.st_mtime_ns, st.st_size)
+    if not isinstance(payload, dict):
+        raise RuntimeError(f"❌ {path} no contiene un objeto JSON.")
+    return payload
+
+def cargar_schema(path: Path = SCHEMA_OUTPUT_PATH) -> dict:
+    """Dict `schema` desde un JSON (generado por la etapa 0 o escrito a mano), sin ejecutar módulos."""
+    payload = cargar_schema_payload(path)
+    return payload["schema"] if isinstance(payload.get("schema"), dict) else payload
+
 def load_schema_or_abort():
     """
-    Carga y devuelve el dict `schema` desde codigo/static/schema_funcional.py.
-    Si no existe o no exporta `schema`, aborta (no hay fallback a temp).
+    Carga y devuelve el dict `schema` desde codigo/static/schema_funcional.json
+    (o, si sólo existe el formato heredado, desde schema_funcional.py).
+    Si no existe o no trae `schema`, aborta (no hay fallback a temp).
     """
-    if not SCHEMA_PRIMARY_PATH.exists():
+    if SCHEMA_PRIMARY_PATH.exists():
+        return cargar_schema(SCHEMA_PRIMARY_PATH)
+    if not SCHEMA_PRIMARY_LEGACY_PATH.exists():
         raise RuntimeError(
             f"❌ Falta el schema manual: {SCHEMA_PRIMARY_PATH}\n"
             f"   Generá/validá tu schema estable antes de continuar."
         )
-    mod = _import_module_from_path(SCHEMA_PRIMARY_PATH)
+    mod = _import_module_from_path(SCHEMA_PRIMARY_LEGACY_PATH)
     if not hasattr(mod, "schema"):
-        raise RuntimeError(f"❌ `{SCHEMA_PRIMARY_PATH.name}` no exporta la variable `schema`.")
+        raise RuntimeError(f"❌ `{SCHEMA_PRIMARY_LEGACY_PATH.name}` no exporta la variable `schema`.")
     schema = getattr(mod, "schema")
     if not isinstance(schema, dict):
-        raise RuntimeError(f"❌ `schema` debe ser dict en {SCHEMA_PRIMARY_PATH}.")
+        raise RuntimeError(f"❌ `schema` debe ser dict en {SCHEMA_PRIMARY_LEGACY_PATH}.")
     return schema
@@ -21,5 +21,6 @@ def get_db_config() -> Dict[str, Any]:
         "cursorclass": pymysql.cursors.DictCursor,
     }
 
-def connect():
-    return pymysql.connect(**get_db_config())
+def connect(**extra: Any):
+    """Conexión nueva; `extra` pisa la config (p. ej. `local_infile=True`, `autocommit=False`)."""
+    return pymysql.connect(**{**get_db_config(), **extra})
@@ -0,0 +1,35 @@
+# codigo/config/redis_conn.py
+"""
+Conector Redis centralizado (servicio `redis` del docker-compose).
+"""
+from __future__ import annotations
+import os
+from typing import Any, Dict
+from dotenv import load_dotenv
+
+# Carga variables de entorno
+load_dotenv()
+
+def get_redis_config() -> Dict[str, Any]:
+    return {
+        "host": os.getenv("REDIS_HOST", "localhost"),
+        "port": int(os.getenv("REDIS_PORT", "6379")),
+        "db": int(os.getenv("REDIS_DB", "0")),
+        "decode_responses": True,
+        "socket_connect_timeout": 2,
+    }
+
+def connect_redis(reintentar: bool = True):
+    """Cliente Redis; `reintentar=False` falla al primer error (sondeo de disponibilidad).
+
+    redis-py >= 6 reintenta con backoff por defecto: contra un servidor caído un
+    ping tarda segundos en vez de fallar al instante.
+    """
+    import redis  # import diferido: solo lo pagan los caminos que publican/leen de Redis
+
+    if reintentar:
+        return redis.Redis(**get_redis_config())
+    from redis.backoff import NoBackoff
+    from redis.retry import Retry
+
+    return redis.Redis(**get_redis_config(), retry=Retry(NoBackoff(), 0))
@@ -0,0 +1,183 @@
+# codigo/equivalencias.py
+"""
+🧮 Motor vectorizado de equivalencias USDT (etapas 4, 5 y 6).
+
+Reemplaza los bucles `iterrows()` + `Decimal(str(last))` por operaciones en bloque:
+- Los símbolos del snapshot se mapean a ids enteros (`TablaPrecios`).
+- Los `last` se juntan una sola vez en un array float64 (NaN si falta o es <= 0).
+- `1_usdt_equivale_base` se calcula para directos (1/p), invertidos (p) e
+  indirectos (eq_quote / p, con la quote resuelta en `grafo_activos`) con un
+  par de operaciones de array.
+
+La aritmética Decimal (50 dígitos) queda solo como modo de verificación para la
+salida de auditoría: `verificar_decimal` recalcula cada equivalencia desde el
+precio en TEXTO tal como lo publicó el exchange (`info.lastPrice`, no el float
+de ccxt) y reporta el error relativo máximo del camino float64.
+`formatear_decimales` produce el texto de 18 decimales de los CSV.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal, getcontext
+from typing import Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from codigo.snapshot import precio_last  # type: ignore
+
+COL_EQUIV = "1_usdt_equivale_base"
+COL_EQUIV_QUOTE = "1_usdt_equivale_quote"
+COL_PRECIO = "precio_base_vs_quote"
+
+# Decimales con los que se escriben los CSV de auditoría
+DECIMALES_AUDITORIA = {COL_EQUIV: 18, COL_EQUIV_QUOTE: 18, COL_PRECIO: 10}
+
+
+def _campo_float(tickers: Dict[str, dict], campo: str) -> np.ndarray:
+    return np.fromiter(
+        ((t or {}).get(campo) or np.nan for t in tickers.values()),
+        dtype=np.float64, count=len(tickers),
+    )
+
+
+def _texto_last(t: Optional[dict]) -> Optional[str]:
+    """`last` como texto del exchange; en cachés viejos (sin `last_texto`), str del float."""
+    t = t or {}
+    texto = t.get("last_texto")
+    if texto:
+        return str(texto)
+    last = precio_last(t)
+    return None if last is None else str(last)
+
+
+@dataclass
+class TablaPrecios:
+    """Símbolos del snapshot indexados por id entero + `last`/`bid`/`ask`/volumen en float64."""
+    simbolos: pd.Index
+    last: np.ndarray
+    bid: Optional[np.ndarray] = None
+    ask: Optional[np.ndarray] = None
+    volumen_quote: Optional[np.ndarray] = None
+    last_texto: Optional[np.ndarray] = None   # object: precio original en texto (solo verificación)
+
+    @classmethod
+    def desde_tickers(cls, tickers: Dict[str, dict]) -> "TablaPrecios":
+        simbolos = pd.Index(list(tickers.keys()), dtype=object)
+        last = np.fromiter(
+            ((precio_last(t) or np.nan) for t in tickers.values()),
+            dtype=np.float64, count=len(simbolos),
+        )
+        return cls(
+            simbolos=simbolos,
+            last=last,
+            bid=_campo_float(tickers, "bid"),
+            ask=_campo_float(tickers, "ask"),
+            volumen_quote=_campo_float(tickers, "quoteVolume"),
+            last_texto=np.array([_texto_last(t) for t in tickers.values()], dtype=object),
+        )
+
+    def ids(self, simbolos: Iterable[str]) -> np.ndarray:
+        """Ids enteros de los símbolos pedidos (-1 si no están en el snapshot)."""
+        return self.simbolos.get_indexer(pd.Index(simbolos, dtype=object))
+
+    def precios(self, simbolos: Iterable[str], campo: str = "last") -> np.ndarray:
+        """`last` (o `bid`/`ask`/`volumen_quote`) de cada símbolo; NaN si falta en el snapshot."""
+        ids = self.ids(simbolos)
+        out = np.full(len(ids), np.nan, dtype=np.float64)
+        fuente = getattr(self, campo)
+        if fuente is None:
+            return out
+        ok = ids >= 0
+        out[ok] = fuente[ids[ok]]
+        return out
+
+    def textos(self, simbolos: Iterable[str]) -> np.ndarray:
+        """`last` original en texto de cada símbolo (None si falta)."""
+        ids = self.ids(simbolos)
+        out = np.full(len(ids), None, dtype=object)
+        if self.last_texto is not None:
+            ok = ids >= 0
+            out[ok] = self.last_texto[ids[ok]]
+        return out
+
+
+def como_tabla(tickers: Union[TablaPrecios, Dict[str, dict]]) -> TablaPrecios:
+    """Acepta el dict de tickers del snapshot o una `TablaPrecios` ya construida."""
+    return tickers if isinstance(tickers, TablaPrecios) else TablaPrecios.desde_tickers(tickers)
+
+
+def mapa_equivalencias(df_eq: pd.DataFrame) -> pd.Series:
+    """Serie `base → 1_usdt_equivale_base` (float); ante bases repetidas gana la última."""
+    if df_eq.empty:
+        return pd.Series(dtype=np.float64)
+    s = pd.Series(pd.to_numeric(df_eq[COL_EQUIV], errors="coerce").to_numpy(), index=df_eq["base"].to_numpy())
+    return s[~s.index.duplicated(keep="last")]
+
+
+def _valido(x: np.ndarray) -> np.ndarray:
+    return np.isfinite(x) & (x > 0)
+
+
+def equivalencias_directas(tabla: TablaPrecios, df_dir: pd.DataFrame):
+    """Directos base/USDT → (máscara de filas válidas, precios, 1/p)."""
+    p = tabla.precios(df_dir["symbol"]) if not df_dir.empty else np.empty(0)
+    ok = _valido(p)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        eq = 1.0 / p
+    return ok, p, eq
+
+
+def equivalencias_invertidas(tabla: TablaPrecios, df_inv: pd.DataFrame):
+    """Invertidos USDT/quote → (máscara de filas válidas, precios, p)."""
+    p = tabla.precios(df_inv["symbol"]) if not df_inv.empty else np.empty(0)
+    return _valido(p), p, p
+
+
+# ─────────── Modo verificación Decimal (solo auditoría) ───────────
+
+def verificar_decimal(
+    textos: Iterable[Optional[str]],
+    resultado: np.ndarray,
+    modo: str,
+    eq_quote: Optional[np.ndarray] = None,
+) -> float:
+    """
+    Recalcula `resultado` con Decimal (prec 50) desde los precios en texto del
+    exchange (`TablaPrecios.textos`) y devuelve el error relativo máximo.
+    modo: "directo" (1/p), "invertido" (p) o "indirecto" (eq_quote/p).
+    En "indirecto" la equivalencia de la quote entra tal cual (su propio error
+    ya se midió en la etapa que la produjo): se verifica el salto de este par.
+    """
+    getcontext().prec = 50
+    peor = 0.0
+    for i, (texto, r) in enumerate(zip(textos, resultado)):
+        if texto is None or not np.isfinite(r):
+            continue
+        try:
+            dp = Decimal(str(texto))
+        except ArithmeticError:
+            continue
+        if not dp.is_finite() or dp <= 0:
+            continue
+        if modo == "directo":
+            ref = Decimal(1) / dp
+        elif modo == "invertido":
+            ref = +dp
+        elif modo == "indirecto":
+            ref = Decimal(float(eq_quote[i])) / dp  # type: ignore[index]
+        else:
+            raise ValueError(f"❌ Modo de verificación desconocido: {modo}")
+        if ref != 0:
+            peor = max(peor, float(abs((Decimal(float(r)) - ref) / ref)))
+    return peor
+
+
+def formatear_decimales(df: pd.DataFrame, decimales: Dict[str, int] = DECIMALES_AUDITORIA) -> pd.DataFrame:
+    """Copia del frame con las columnas numéricas como texto de N decimales (formato de los CSV)."""
+    out = df.copy()
+    for col, n in decimales.items():
+        if col in out.columns and pd.api.types.is_float_dtype(out[col]):
+            out[col] = [f"{Decimal(repr(float(v))):.{n}f}" if np.isfinite(v) else "" for v in out[col].to_numpy()]
+    return out
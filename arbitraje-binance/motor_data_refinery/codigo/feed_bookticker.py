@@ -0,0 +1,304 @@
+# codigo/feed_bookticker.py
+"""
+📡 Feed asyncio de bookTicker (WebSocket, combined streams) hacia una tabla en memoria.
+
+Hasta acá todos los precios de la refinería salían de `fetch_tickers()` (REST):
+el cotizador quedaba viejo apenas se escribía. Este módulo:
+
+- Suscribe los símbolos de `simbolos_spot_<exchange>.csv` a streams
+  `<id>@bookTicker`, repartidos en varias conexiones (`WS_STREAMS_POR_CONEXION`
+  por conexión; Binance admite hasta 1024).
+- Aplica cada update sobre `TablaCotizaciones`: arrays preasignados por símbolo
+  (bid, ask, cantidades, updateId, ts). Los updates con `u` menor o igual al
+  último aplicado se descartan (llegan fuera de orden tras una reconexión).
+- Reconecta con backoff exponencial + jitter ante cierre, error o silencio
+  (> `WS_SILENCIO_MAX_S` sin mensajes). Cada corte es un hueco: los símbolos de
+  esa conexión quedan marcados como no vigentes hasta su próximo update y se
+  notifica a los `on_hueco` registrados (p. ej. para pedir un snapshot REST).
+
+Con `--tabla-compartida` cada update se espeja además en la tabla mmap de
+`codigo/tabla_compartida.py`, así otros procesos leen el tope vigente.
+
+Para correr offline, `codigo/replay_ws.py` levanta un servidor WebSocket local
+que reproduce mensajes grabados (`--grabar` en este CLI).
+
+CLI:
+    python -m codigo.feed_bookticker [--url ws://127.0.0.1:8765] [--segundos 30] [--grabar feed.jsonl]
+                                     [--tabla-compartida]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.config import (  # type: ignore
+    BINANCE_WS_URL, DATOS_DIR, EXCHANGE_ID,
+    WS_SILENCIO_MAX_S, WS_STREAMS_POR_CONEXION,
+)
+
+BACKOFF_INICIAL_S = 0.5
+BACKOFF_MAX_S = 30.0
+
+OnUpdate = Callable[[int, float, float], None]      # (fila, bid, ask)
+OnHueco = Callable[[np.ndarray], None]              # filas afectadas
+
+
+def id_stream(simbolo: str, markets: Optional[Dict[str, dict]] = None) -> str:
+    """'BTC/USDT' → 'btcusdt' (usa `markets[symbol]['id']` si está disponible)."""
+    mercado = (markets or {}).get(simbolo) or {}
+    return str(mercado.get("id") or simbolo.replace("/", "")).lower()
+
+
+class TablaCotizaciones:
+    """Tope de libro por símbolo en arrays preasignados, indexado por fila."""
+
+    def __init__(self, simbolos: Sequence[str], ids_exchange: Optional[Sequence[str]] = None):
+        self.simbolos = pd.Index(list(simbolos), dtype=object)
+        ids = list(ids_exchange) if ids_exchange is not None else [id_stream(s) for s in self.simbolos]
+        self.ids = [i.lower() for i in ids]
+        self._fila_id: Dict[str, int] = {i: f for f, i in enumerate(self.ids)}
+        n = len(self.simbolos)
+        self.bid = np.full(n, np.nan)
+        self.ask = np.full(n, np.nan)
+        self.bid_qty = np.zeros(n)
+        self.ask_qty = np.zeros(n)
+        self.update_id = np.full(n, -1, dtype=np.int64)
+        self.ts = np.zeros(n, dtype=np.int64)          # epoch ms de recepción (0 = sin dato)
+        self.vigente = np.zeros(n, dtype=bool)
+        self.aplicados = 0
+        self.descartados = 0
+        self.on_update: List[OnUpdate] = []
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    def fila(self, id_exchange: str) -> int:
+        return self._fila_id.get(id_exchange.lower(), -1)
+
+    def aplicar(
+        self, fila: int, bid: float, ask: float, bid_qty: float, ask_qty: float,
+        update_id: int, ts: Optional[int] = None,
+    ) -> bool:
+        """Aplica un update; False si la fila no existe o `update_id` no avanza."""
+        if fila < 0 or update_id <= self.update_id[fila]:
+            self.descartados += 1
+            return False
+        self.bid[fila] = bid
+        self.ask[fila] = ask
+        self.bid_qty[fila] = bid_qty
+        self.ask_qty[fila] = ask_qty
+        self.update_id[fila] = update_id
+        self.ts[fila] = ts if ts is not None else int(time.time() * 1000)
+        self.vigente[fila] = True
+        self.aplicados += 1
+        for cb in self.on_update:
+            cb(fila, bid, ask)
+        return True
+
+    def aplicar_mensaje(self, data: dict, ts: Optional[int] = None) -> bool:
+        """Payload bookTicker de Binance: {u, s, b, B, a, A}."""
+        return self.aplicar(
+            self.fila(data["s"]),
+            float(data["b"]), float(data["a"]), float(data["B"]), float(data["A"]),
+            int(data["u"]), ts,
+        )
+
+    def marcar_hueco(self, filas: np.ndarray) -> None:
+        """Los símbolos dejan de estar vigentes hasta su próximo update."""
+        self.vigente[filas] = False
+
+    def a_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "symbol": self.simbolos, "bid": self.bid, "ask": self.ask,
+            "bid_qty": self.bid_qty, "ask_qty": self.ask_qty,
+            "update_id": self.update_id, "ts": self.ts, "vigente": self.vigente,
+        })
+
+
+class FeedBookTicker:
+    """Conexiones WebSocket (una por shard de streams) que alimentan una `TablaCotizaciones`."""
+
+    def __init__(
+        self,
+        tabla: TablaCotizaciones,
+        url_base: str = BINANCE_WS_URL,
+        streams_por_conexion: int = WS_STREAMS_POR_CONEXION,
+        silencio_max_s: float = WS_SILENCIO_MAX_S,
+        grabar: Optional[Path] = None,
+    ):
+        self.tabla = tabla
+        self.url_base = url_base.rstrip("/")
+        self.silencio_max_s = silencio_max_s
+        self.grabar = grabar
+        n = max(1, int(streams_por_conexion))
+        filas = np.arange(len(tabla))
+        self.shards: List[np.ndarray] = [filas[i:i + n] for i in range(0, len(filas), n)]
+        self.on_hueco: List[OnHueco] = []
+        self.mensajes = 0
+        self.reconexiones = 0
+        self.huecos = 0
+        self._detener = asyncio.Event()
+        self._archivo = None
+
+    def url_shard(self, filas: np.ndarray) -> str:
+        streams = "/".join(f"{self.tabla.ids[f]}@bookTicker" for f in filas)
+        return f"{self.url_base}/stream?streams={streams}"
+
+    def detener(self) -> None:
+        self._detener.set()
+
+    async def correr(self, duracion_s: Optional[float] = None) -> None:
+        """Corre todas las conexiones hasta `detener()` o `duracion_s`."""
+        import aiohttp  # import diferido: la tabla se usa sin red
+
+        if self.grabar:
+            self.grabar.parent.mkdir(parents=True, exist_ok=True)
+            self._archivo = open(self.grabar, "a", encoding="utf-8")
+        try:
+            async with aiohttp.ClientSession() as session:
+                tareas = [asyncio.create_task(self._conexion(session, i, f)) for i, f in enumerate(self.shards)]
+                if duracion_s is not None:
+                    asyncio.get_running_loop().call_later(duracion_s, self.detener)
+                await self._detener.wait()
+                for t in tareas:
+                    t.cancel()
+                await asyncio.gather(*tareas, return_exceptions=True)
+        finally:
+            if self._archivo:
+                self._archivo.close()
+                self._archivo = None
+
+    def _hueco(self, filas: np.ndarray) -> None:
+        self.huecos += 1
+        self.tabla.marcar_hueco(filas)
+        for cb in self.on_hueco:
+            cb(filas)
+
+    async def _conexion(self, session, shard: int, filas: np.ndarray) -> None:
+        import aiohttp
+
+        url = self.url_shard(filas)
+        backoff = BACKOFF_INICIAL_S
+        primera = True
+        while not self._detener.is_set():
+            try:
+                async with session.ws_connect(url, heartbeat=self.silencio_max_s / 2) as ws:
+                    if not primera:
+                        self.reconexiones += 1
+                    primera = False
+                    backoff = BACKOFF_INICIAL_S
+                    while True:
+                        msg = await ws.receive(timeout=self.silencio_max_s)
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            self._procesar(msg.data)
+                        elif msg.type in (aiohttp.WSMsgType.CLOSE, aiohttp.WSMsgType.CLOSED,
+                                          aiohttp.WSMsgType.CLOSING, aiohttp.WSMsgType.ERROR):
+                            break
+            except asyncio.CancelledError:
+                raise
+            except (asyncio.TimeoutError, aiohttp.ClientError, OSError) as e:
+                print(f"⚠️ Shard {shard}: {type(e).__name__} {e or ''}".rstrip())
+            if self._detener.is_set():
+                break
+            self._hueco(filas)
+            espera = backoff * (1 + random.random() * 0.5)
+            backoff = min(backoff * 2, BACKOFF_MAX_S)
+            try:
+                await asyncio.wait_for(self._detener.wait(), timeout=espera)
+            except asyncio.TimeoutError:
+                pass
+
+    def _procesar(self, texto: str) -> None:
+        self.mensajes += 1
+        ts = int(time.time() * 1000)
+        try:
+            payload = json.loads(texto)
+            data = payload.get("data", payload)  # combined stream: {"stream", "data"}
+            self.tabla.aplicar_mensaje(data, ts)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"⚠️ Mensaje inválido descartado ({type(e).__name__}): {texto[:120]}")
+            return
+        if self._archivo:
+            self._archivo.write(texto.rstrip("\n") + "\n")
+
+
+def simbolos_spot(exchange_id: str = EXCHANGE_ID) -> List[str]:
+    """Símbolos de la tabla spot filtrada (etapa 2)."""
+    path = DATOS_DIR / "estandar" / f"simbolos_spot_{exchange_id}.csv"
+    if not path.exists():
+        print(f"❌ No se encontró: {path} (corré la refinería primero)")
+        return []
+    return pd.read_csv(path, usecols=["symbol"], dtype=str)["symbol"].dropna().tolist()
+
+
+def tabla_para(simbolos: Iterable[str], markets: Optional[Dict[str, dict]] = None) -> TablaCotizaciones:
+    simbolos = list(dict.fromkeys(simbolos))
+    return TablaCotizaciones(simbolos, [id_stream(s, markets) for s in simbolos])
+
+
+def espejar_en(tabla: TablaCotizaciones, compartida) -> OnUpdate:
+    """Callback `on_update` que copia cada update a una `TablaCompartida` (filas mapeadas por símbolo)."""
+    destino = compartida.ids(tabla.simbolos)
+
+    def _copiar(fila: int, bid: float, ask: float) -> None:
+        d = destino[fila]
+        if d >= 0:
+            compartida.escribir_fila(d, bid, ask, tabla.bid_qty[fila], tabla.ask_qty[fila], tabla.ts[fila])
+
+    tabla.on_update.append(_copiar)
+    return _copiar
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Feed bookTicker → tabla de cotizaciones en memoria")
+    parser.add_argument("--url", default=BINANCE_WS_URL, help="Base WebSocket (p. ej. ws://127.0.0.1:8765)")
+    parser.add_argument("--segundos", type=float, default=30.0)
+    parser.add_argument("--streams-por-conexion", type=int, default=WS_STREAMS_POR_CONEXION)
+    parser.add_argument("--grabar", type=Path, help="Agregar los mensajes crudos a este JSONL")
+    parser.add_argument("--tabla-compartida", action="store_true",
+                        help="Espejar los updates en la tabla mmap (TABLA_COMPARTIDA_PATH)")
+    args = parser.parse_args(argv)
+
+    simbolos = simbolos_spot()
+    if not simbolos:
+        sys.exit(1)
+    from codigo.snapshot import obtener_snapshot  # type: ignore
+
+    tabla = tabla_para(simbolos, obtener_snapshot(incluir_tickers=False).markets)
+    if args.tabla_compartida:
+        from codigo.config import TABLA_COMPARTIDA_PATH  # type: ignore
+        from codigo.tabla_compartida import TablaCompartida  # type: ignore
+
+        if TABLA_COMPARTIDA_PATH.exists():
+            compartida = TablaCompartida.abrir(TABLA_COMPARTIDA_PATH, escritura=True)
+        else:
+            compartida = TablaCompartida.crear(TABLA_COMPARTIDA_PATH, tabla.simbolos)
+        espejar_en(tabla, compartida)
+    feed = FeedBookTicker(tabla, args.url, args.streams_por_conexion, grabar=args.grabar)
+    print(f"📡 {len(tabla)} símbolos en {len(feed.shards)} conexiones → {args.url}")
+
+    t0 = time.perf_counter()
+    asyncio.run(feed.correr(args.segundos))
+    dt = time.perf_counter() - t0
+    print(f"✅ {feed.mensajes} mensajes en {dt:.1f}s ({feed.mensajes / max(dt, 1e-9):.0f}/s) · "
+          f"{tabla.aplicados} aplicados · {tabla.descartados} descartados · "
+          f"{feed.reconexiones} reconexiones · {feed.huecos} huecos")
+    print(f"📈 Vigentes: {int(tabla.vigente.sum())}/{len(tabla)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+# codigo/grafo_activos.py
+"""
+🕸️ Grafo de activos + resolutor multi-salto de equivalencias USDT.
+
+La etapa 5 original solo cotizaba un par si su `quote` ya estaba en
+1_usdt_equivale.csv: todo activo a 2+ saltos de USDT terminaba en
+no_ruteables_indirectos.csv. Acá:
+
+- El grafo se arma una vez desde la tabla spot: nodos = activos, aristas =
+  símbolos, con `log(last)` y un peso de "costo de ruta" derivado del libro
+  (spread log(ask/bid), penalización por bajo volumen y costo fijo por salto).
+- `ResolutorEquivalencias` corre un Dijkstra sobre esos pesos desde las semillas
+  (USDT y/o equivalencias ya conocidas) y obtiene, en una sola pasada, la ruta
+  más líquida y `1_usdt_equivale_base` de TODO activo alcanzable, sumando
+  log-precios a lo largo del árbol de rutas.
+- El árbol queda cacheado (padre + hijos por nodo): `actualizar_precios` solo
+  recalcula el subárbol colgado de las aristas del árbol cuyo precio cambió.
+  Si cambia la forma del árbol se re-resuelve entero: una arista aparece o
+  desaparece (precio válido ↔ NaN), cambia el costo de una arista del árbol
+  o una arista fuera del árbol pasa a acortar la ruta de alguno de sus extremos.
+  Todavía no hay un consumidor de precios en vivo que lo llame: la etapa 5
+  resuelve desde cero con cada snapshot.
+
+Convención de arcos (desde el activo conocido `u` hacia `v` por el símbolo BASE/QUOTE):
+    u = quote → v = base :  log_eq[v] = log_eq[u] - log(p)
+    u = base  → v = quote:  log_eq[v] = log_eq[u] + log(p)
+"""
+
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from codigo.equivalencias import TablaPrecios  # type: ignore
+
+# Pesos del costo de ruta (heurísticos; solo ordenan rutas, no afectan el precio)
+PESO_SALTO = 1e-3       # costo fijo por salto: a igual liquidez gana la ruta más corta
+PESO_SIN_LIBRO = 1e-2   # spread asumido si el ticker no trae bid/ask
+PESO_LIQUIDEZ = 1e-3    # escala de la penalización por bajo volumen (÷ log1p(volumen))
+
+
+@dataclass
+class GrafoActivos:
+    """Grafo no dirigido activo ↔ activo con una arista por símbolo, en arrays + CSR."""
+    activos: pd.Index
+    simbolos: np.ndarray
+    base: np.ndarray
+    quote: np.ndarray
+    log_precio: np.ndarray
+    peso: np.ndarray
+    # CSR de arcos salientes por activo: arista, destino y signo (+1 base→quote, -1 quote→base)
+    indptr: np.ndarray = field(repr=False, default=None)  # type: ignore[assignment]
+    arco_arista: np.ndarray = field(repr=False, default=None)  # type: ignore[assignment]
+    arco_destino: np.ndarray = field(repr=False, default=None)  # type: ignore[assignment]
+    arco_signo: np.ndarray = field(repr=False, default=None)  # type: ignore[assignment]
+
+    @classmethod
+    def desde_pares(cls, df: pd.DataFrame, tabla: TablaPrecios) -> "GrafoActivos":
+        """Arma el grafo desde un frame `symbol | base | quote` y los precios del snapshot."""
+        df = df.drop_duplicates(subset=["symbol"])
+        simbolos = df["symbol"].to_numpy(dtype=object)
+        activos = pd.Index(pd.unique(np.concatenate([
+            df["base"].to_numpy(dtype=object), df["quote"].to_numpy(dtype=object),
+        ])), dtype=object)
+        base = activos.get_indexer(df["base"]).astype(np.int32)
+        quote = activos.get_indexer(df["quote"]).astype(np.int32)
+
+        last = tabla.precios(simbolos)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            log_precio = np.where(last > 0, np.log(last), np.nan)
+
+        grafo = cls(
+            activos=activos, simbolos=simbolos, base=base, quote=quote,
+            log_precio=log_precio,
+            peso=calcular_pesos(
+                tabla.precios(simbolos, "bid"),
+                tabla.precios(simbolos, "ask"),
+                tabla.precios(simbolos, "volumen_quote"),
+            ),
+        )
+        grafo._armar_csr()
+        return grafo
+
+    def _armar_csr(self) -> None:
+        n_aristas = len(self.simbolos)
+        aristas = np.arange(n_aristas, dtype=np.int32)
+        origen = np.concatenate([self.base, self.quote])
+        destino = np.concatenate([self.quote, self.base])
+        signo = np.concatenate([np.ones(n_aristas, np.int8), -np.ones(n_aristas, np.int8)])
+        orden = np.argsort(origen, kind="stable")
+        self.arco_arista = np.concatenate([aristas, aristas])[orden]
+        self.arco_destino = destino[orden]
+        self.arco_signo = signo[orden]
+        self.indptr = np.zeros(len(self.activos) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origen, minlength=len(self.activos)), out=self.indptr[1:])
+
+
+def calcular_pesos(bid: np.ndarray, ask: np.ndarray, volumen: np.ndarray) -> np.ndarray:
+    """Costo de ruta por arista: salto + spread log(ask/bid) + penalización por bajo volumen."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        spread = np.log(ask / bid)
+        spread = np.where(np.isfinite(spread) & (spread >= 0), spread, PESO_SIN_LIBRO)
+        liq = PESO_LIQUIDEZ / np.log1p(np.where(np.isfinite(volumen) & (volumen > 0), volumen, 0.0))
+        liq = np.where(np.isfinite(liq), liq, PESO_LIQUIDEZ * 10)
+    return PESO_SALTO + spread + liq
+
+
+class ResolutorEquivalencias:
+    """
+    Resuelve `1_usdt_equivale_<activo>` para todo activo alcanzable desde las semillas
+    y cachea el árbol de rutas para recalcular incrementalmente ante cambios de precio.
+    """
+
+    def __init__(self, grafo: GrafoActivos, semillas: Dict[str, float]):
+        self.grafo = grafo
+        self.semillas = {a: float(v) for a, v in semillas.items() if a in grafo.activos and v > 0}
+        n = len(grafo.activos)
+        self.log_eq = np.full(n, np.nan)
+        self.costo = np.full(n, np.inf)
+        self.saltos = np.full(n, -1, dtype=np.int32)
+        self.padre = np.full(n, -1, dtype=np.int32)          # activo padre en el árbol
+        self.padre_arista = np.full(n, -1, dtype=np.int32)   # arista usada para llegar
+        self.padre_signo = np.zeros(n, dtype=np.int8)
+        self.hijos: List[List[int]] = [[] for _ in range(n)]
+        self.hijo_de_arista = np.full(len(grafo.simbolos), -1, dtype=np.int32)  # aristas del árbol
+        self._arista_de = {s: i for i, s in enumerate(grafo.simbolos.tolist())}
+        self.resolver()
+
+    # ─────────── Resolución completa (Dijkstra) ───────────
+    def resolver(self) -> None:
+        g = self.grafo
+        n = len(g.activos)
+        self.log_eq.fill(np.nan)
+        self.costo.fill(np.inf)
+        self.saltos.fill(-1)
+        self.padre.fill(-1)
+        self.padre_arista.fill(-1)
+        self.padre_signo.fill(0)
+        self.hijos = [[] for _ in range(n)]
+
+        indptr = g.indptr.tolist()
+        arista = g.arco_arista.tolist()
+        destino = g.arco_destino.tolist()
+        signo = g.arco_signo.tolist()
+        peso = g.peso.tolist()
+        logp = g.log_precio.tolist()
+        costo = [float("inf")] * n
+        log_eq = [float("nan")] * n
+        saltos = [-1] * n
+        padre = [-1] * n
+        padre_arista = [-1] * n
+        padre_signo = [0] * n
+        cerrado = [False] * n
+
+        heap = []
+        for activo, eq in self.semillas.items():
+            i = int(g.activos.get_loc(activo))
+            costo[i], log_eq[i], saltos[i] = 0.0, float(np.log(eq)), 0
+            heap.append((0.0, 0, i))
+        heapq.heapify(heap)
+
+        while heap:
+            c, h, u = heapq.heappop(heap)
+            if cerrado[u]:
+                continue
+            cerrado[u] = True
+            for k in range(indptr[u], indptr[u + 1]):
+                e = arista[k]
+                lp = logp[e]
+                if lp != lp:  # NaN: arista sin precio, no transitable
+                    continue
+                v = destino[k]
+                nc = c + peso[e]
+                if nc < costo[v] - 1e-15 and not cerrado[v]:
+                    costo[v] = nc
+                    saltos[v] = h + 1
+                    log_eq[v] = log_eq[u] + signo[k] * lp
+                    padre[v], padre_arista[v], padre_signo[v] = u, e, signo[k]
+                    heapq.heappush(heap, (nc, h + 1, v))
+
+        self.costo[:] = costo
+        self.log_eq[:] = log_eq
+        self.saltos[:] = saltos
+        self.padre[:] = padre
+        self.padre_arista[:] = padre_arista
+        self.padre_signo[:] = padre_signo
+        self.hijo_de_arista.fill(-1)
+        for v, u in enumerate(padre):
+            if u >= 0:
+                self.hijos[u].append(v)
+                self.hijo_de_arista[padre_arista[v]] = v
+
+    # ─────────── Consultas ───────────
+    def _ids(self, activos: Iterable[str]) -> np.ndarray:
+        return self.grafo.activos.get_indexer(pd.Index(list(activos), dtype=object))
+
+    def equivalencias(self, activos: Iterable[str]) -> np.ndarray:
+        """`1 USDT = X activo` por activo pedido (NaN si no es alcanzable)."""
+        ids = self._ids(activos)
+        out = np.full(len(ids), np.nan)
+        ok = ids >= 0
+        out[ok] = np.exp(self.log_eq[ids[ok]])
+        return out
+
+    def saltos_de(self, activos: Iterable[str]) -> np.ndarray:
+        ids = self._ids(activos)
+        out = np.full(len(ids), -1, dtype=np.int32)
+        ok = ids >= 0
+        out[ok] = self.saltos[ids[ok]]
+        return out
+
+    def ruta(self, activo: str) -> List[str]:
+        """Símbolos recorridos desde la semilla hasta `activo` (vacío si es semilla o inalcanzable)."""
+        if activo not in self.grafo.activos:
+            return []
+        v = int(self.grafo.activos.get_loc(activo))
+        out: List[str] = []
+        while self.padre[v] >= 0:
+            out.append(str(self.grafo.simbolos[self.padre_arista[v]]))
+            v = int(self.padre[v])
+        return out[::-1]
+
+    def cobertura(self) -> float:
+        return float(np.isfinite(self.log_eq).mean()) if len(self.log_eq) else 0.0
+
+    # ─────────── Recalculo incremental ───────────
+    def _aristas(self, simbolos: Iterable[str]) -> np.ndarray:
+        """Ids de arista por símbolo (-1 si no está); dict y no `get_indexer`: los updates traen pocos símbolos."""
+        get = self._arista_de.get
+        return np.fromiter((get(s, -1) for s in simbolos), dtype=np.int64)
+
+    def _cambia_arbol(self, aristas: np.ndarray, peso: np.ndarray) -> bool:
+        """True si con estos costos nuevos alguna arista con precio cambia el árbol de rutas."""
+        g = self.grafo
+        en_arbol = self.hijo_de_arista[aristas] >= 0
+        cb, cq = self.costo[g.base[aristas]], self.costo[g.quote[aristas]]
+        with np.errstate(invalid="ignore"):
+            acorta = (cb + peso < cq - 1e-15) | (cq + peso < cb - 1e-15)
+        return bool(np.any(np.isfinite(g.log_precio[aristas]) & (en_arbol | acorta)))
+
+    def actualizar_precios(self, cambios: Dict[str, float],
+                           libros: Optional[Dict[str, Tuple[float, float, float]]] = None) -> np.ndarray:
+        """
+        Aplica nuevos `last` por símbolo (y `bid, ask, volumen_quote` en `libros`,
+        que mueven el costo de ruta) y recalcula solo los subárboles afectados.
+        Devuelve los ids de activos cuya equivalencia se recalculó.
+        """
+        g = self.grafo
+        pos = self._aristas(cambios.keys())
+        nuevos = np.array(list(cambios.values()), dtype=np.float64)
+        ok = pos >= 0
+        pos, nuevos = pos[ok], nuevos[ok]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            nuevo_log = np.where(nuevos > 0, np.log(nuevos), np.nan)
+        antes_valida = np.isfinite(g.log_precio[pos])
+        g.log_precio[pos] = nuevo_log
+        # Arista que aparece/desaparece: el árbol ya no es válido
+        estructural = bool(np.any(antes_valida != np.isfinite(nuevo_log)))
+
+        if libros:
+            pos_l = self._aristas(libros.keys())
+            bid, ask, vol = np.array(list(libros.values()), dtype=np.float64).reshape(-1, 3).T
+            ok_l = pos_l >= 0
+            pos_l = pos_l[ok_l]
+            peso = calcular_pesos(bid[ok_l], ask[ok_l], vol[ok_l])
+            distinto = peso != g.peso[pos_l]
+            pos_l, peso = pos_l[distinto], peso[distinto]
+            estructural = estructural or self._cambia_arbol(pos_l, peso)
+            g.peso[pos_l] = peso
+
+        if estructural:
+            self.resolver()
+            return np.arange(len(g.activos), dtype=np.int32)
+        if not len(pos):
+            return np.empty(0, dtype=np.int32)
+
+        # Raíces afectadas: hijos cuyo arco padre es una arista modificada
+        # (las aristas fuera del árbol no alteran ninguna equivalencia)
+        raices = self.hijo_de_arista[pos]
+        tocados: List[int] = []
+        pila = raices[raices >= 0].tolist()
+        while pila:
+            v = pila.pop()
+            u, e, s = int(self.padre[v]), int(self.padre_arista[v]), int(self.padre_signo[v])
+            self.log_eq[v] = self.log_eq[u] + s * g.log_precio[e]
+            tocados.append(v)
+            pila.extend(self.hijos[v])
+        return np.unique(np.array(tocados, dtype=np.int32))
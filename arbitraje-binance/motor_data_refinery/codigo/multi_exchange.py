@@ -0,0 +1,200 @@
+# codigo/multi_exchange.py
+"""
+🌐 Corrida de la refinería para varios exchanges en paralelo (pool de procesos).
+
+Cada exchange corre el pipeline completo (`codigo/pipeline.py`) en su propio
+proceso: el trabajo de pandas es CPU-bound y el GIL serializaría hilos, así que
+el tiempo total tiende al del exchange más lento y no a la suma.
+
+- Namespace por exchange: el hijo fija `REFINERIA_EXCHANGE` antes de importar
+  la config, así que sus rutas (`codigo/datos/<exchange>/`,
+  `absorcion/datos/<exchange>/`, canal `refineria:artefactos:<exchange>`) no
+  pisan las de otro. El exchange principal conserva las rutas de siempre.
+- Config compartida: mapeos, criterios de filtrado y fiat viven en
+  `codigo/static/` y los leen todos los procesos por igual.
+- Un proceso nuevo por exchange (`spawn`, una tarea por hijo): nada de estado
+  de import heredado entre exchanges.
+- Reporte agregado: resumen por exchange (o el error, sin tumbar al resto),
+  tiempo de pared vs suma de tiempos individuales.
+
+Este módulo no importa la config en el nivel superior: con `spawn` el hijo lo
+re-importa antes de correr la tarea y la config tiene que leerse recién
+después de fijar el exchange.
+
+Uso (desde la raíz del motor):
+    python -m codigo.multi_exchange [--exchanges binance,kraken] [--procesos N] [--sin-auditoria] [--sin-historial] ...
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
+
+@dataclass
+class ResultadoExchange:
+    """Resumen liviano (picklable) de la corrida de un exchange; los frames quedan en el hijo."""
+
+    exchange_id: str
+    ok: bool = False
+    error: str = ""
+    duracion_s: float = 0.0
+    snapshot_ts: int = 0
+    refresco: str = ""
+    generacion: int = 0
+    conteos: Dict[str, int] = field(default_factory=dict)
+    tiempos: Dict[str, float] = field(default_factory=dict)
+    destino: str = ""
+    pid: int = 0
+
+
+@dataclass
+class ReporteMulti:
+    resultados: List[ResultadoExchange]
+    pared_s: float
+    procesos: int
+
+    @property
+    def suma_s(self) -> float:
+        return sum(r.duracion_s for r in self.resultados)
+
+    @property
+    def mas_lento_s(self) -> float:
+        return max((r.duracion_s for r in self.resultados), default=0.0)
+
+    @property
+    def ok(self) -> bool:
+        return all(r.ok for r in self.resultados)
+
+
+def correr_exchange(exchange_id: str, opciones: Dict[str, Any]) -> ResultadoExchange:
+    """Corre el pipeline de un exchange en este proceso (pensado para un hijo recién creado)."""
+    os.environ["REFINERIA_EXCHANGE"] = exchange_id
+    if "codigo.config" in sys.modules:
+        raise RuntimeError(
+            f"❌ La config ya estaba importada en este proceso; no se puede aislar '{exchange_id}'. "
+            f"El script que llama a ejecutar_multi no debe importar codigo.* en el nivel superior "
+            f"(con spawn el hijo lo re-importa antes de la tarea)."
+        )
+
+    out = ResultadoExchange(exchange_id=exchange_id, pid=os.getpid())
+    t0 = time.perf_counter()
+    try:
+        from codigo.config import ensure_runtime_dirs  # type: ignore
+        from codigo.pipeline import ejecutar  # type: ignore
+
+        ensure_runtime_dirs()
+        res = ejecutar(exchange_id=exchange_id, **opciones)
+        out.ok = True
+        out.snapshot_ts = res.snapshot_ts
+        out.refresco = res.refresco
+        out.generacion = res.generacion
+        out.conteos = {nombre: len(df) for nombre, df in res.frames.items()}
+        out.conteos["triadas"] = len(res.triadas) if res.triadas is not None else 0
+        out.conteos["historial"] = res.filas_historial
+        out.tiempos = dict(res.tiempos)
+        out.destino = str(res.destino or "")
+    except Exception as e:  # noqa: BLE001 — un exchange caído no tumba al resto
+        out.error = f"{type(e).__name__}: {e}"
+        traceback.print_exc()
+    out.duracion_s = time.perf_counter() - t0
+    return out
+
+
+def ejecutar_multi(
+    exchanges: Sequence[str],
+    procesos: int = 0,
+    opciones: Optional[Dict[str, Any]] = None,
+) -> ReporteMulti:
+    """Corre `exchanges` en un pool de procesos (0 = uno por exchange, tope núcleos) y agrega los resultados."""
+    exchanges = list(dict.fromkeys(exchanges))
+    opciones = opciones or {}
+    n = procesos or min(len(exchanges), os.cpu_count() or 1)
+    n = max(1, min(n, len(exchanges)))
+
+    t0 = time.perf_counter()
+    resultados: Dict[str, ResultadoExchange] = {}
+    with ProcessPoolExecutor(
+        max_workers=n,
+        mp_context=multiprocessing.get_context("spawn"),
+        max_tasks_per_child=1,
+    ) as pool:
+        futuros = {pool.submit(correr_exchange, ex, opciones): ex for ex in exchanges}
+        for fut in as_completed(futuros):
+            ex = futuros[fut]
+            try:
+                resultados[ex] = fut.result()
+            except Exception as e:  # noqa: BLE001 — el hijo murió (p. ej. OOM) antes de devolver
+                resultados[ex] = ResultadoExchange(exchange_id=ex, error=f"{type(e).__name__}: {e}")
+    pared = time.perf_counter() - t0
+    return ReporteMulti([resultados[ex] for ex in exchanges], pared, n)
+
+
+def imprimir_reporte(rep: ReporteMulti) -> None:
+    print(f"\n🌐 Refinería multi-exchange — {len(rep.resultados)} exchanges en {rep.procesos} procesos")
+    for r in rep.resultados:
+        if not r.ok:
+            print(f"❌ {r.exchange_id:<10} {r.duracion_s * 1000:9.1f} ms  {r.error}")
+            continue
+        c = r.conteos
+        print(f"✅ {r.exchange_id:<10} {r.duracion_s * 1000:9.1f} ms  "
+              f"estandar {c.get('estandar', 0)}, spot {c.get('spot', 0)}, "
+              f"cotizador {c.get('unificado', 0)}, triadas {c.get('triadas', 0)} "
+              f"— {r.refresco} (generación {r.generacion}, pid {r.pid})")
+        if r.destino:
+            print(f"   ↳ {r.destino}")
+    print(f"\n⏱️  Pared {rep.pared_s * 1000:.1f} ms | suma individual {rep.suma_s * 1000:.1f} ms | "
+          f"más lento {rep.mas_lento_s * 1000:.1f} ms\n")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Refinería para varios exchanges en paralelo")
+    parser.add_argument("--exchanges", help="Lista separada por comas (default: EXCHANGES de la config)")
+    parser.add_argument("--procesos", type=int, default=None, help="Tamaño del pool (0 = uno por exchange)")
+    parser.add_argument("--forzar-snapshot", action="store_true", help="Ignora el caché del snapshot")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--auditoria", dest="auditoria", action="store_true", default=None,
+                       help="Emite los CSV intermedios (ignora AUDIT_STRUCT_EXPORT)")
+    grupo.add_argument("--sin-auditoria", dest="auditoria", action="store_false",
+                       help="No emite CSV intermedios")
+    parser.add_argument("--reconstruir", action="store_true", help="Ignora el estado del refresco incremental")
+    parser.add_argument("--sin-historial", action="store_true", help="No persiste en MariaDB")
+    args = parser.parse_args(argv)
+
+    # En el proceso padre la config se lee sólo para los defaults (el namespace lo fija cada hijo)
+    from codigo.config import EXCHANGES, MULTI_EXCHANGE_PROCESOS  # type: ignore
+
+    exchanges = [e.strip() for e in args.exchanges.split(",") if e.strip()] if args.exchanges else list(EXCHANGES)
+    opciones: Dict[str, Any] = {"forzar_snapshot": args.forzar_snapshot, "reconstruir": args.reconstruir}
+    if args.auditoria is not None:
+        opciones["auditoria"] = args.auditoria
+    if args.sin_historial:
+        opciones["historial"] = False
+
+    rep = ejecutar_multi(
+        exchanges,
+        MULTI_EXCHANGE_PROCESOS if args.procesos is None else args.procesos,
+        opciones,
+    )
+    imprimir_reporte(rep)
+    if not rep.ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+# codigo/persistencia.py
+"""
+🗄️ Historial en MariaDB de mercados, equivalencias y spreads de triadas.
+
+Tablas (creadas con `Historial.crear_tablas`):
+
+- `mercados_hist`      : tabla estandarizada (etapa 1) por corrida.
+- `equivalencias_hist` : cotizador unificado (etapa 6) por corrida, particionada por día.
+- `triadas_hist`       : ranking de triadas evaluadas, particionada por día.
+
+Las particionadas usan `PARTITION BY RANGE COLUMNS(dia)` con una partición por
+día más `pmax`; `asegurar_particiones` parte `pmax` para los días que vienen y
+`purgar_particiones` borra los viejos con DROP PARTITION (sin DELETE masivo).
+
+Escritura:
+- `PoolConexiones` reutiliza conexiones pymysql (ping + reconexión al sacarlas)
+  en vez de abrir una por llamada como `codigo.config.connect()`.
+- `Historial.insertar` escribe por lotes con `executemany` (pymysql lo reescribe
+  como INSERT multi-fila); por encima de `PERSISTENCIA_UMBRAL_INFILE` filas
+  usa `LOAD DATA LOCAL INFILE` desde un TSV temporal. `INSERT IGNORE`: re-correr
+  la misma corrida no duplica.
+- `EscritorFondo` es un hilo con cola acotada: `encolar` nunca bloquea al
+  pipeline; si la cola está llena el lote se descarta y se cuenta. `cerrar`
+  tampoco falla con la cola llena: descarta el lote más viejo para el centinela.
+
+Para pruebas y benchmarks sin servidor: `PoolConexiones.sqlite(ruta)` (mismo
+esquema, sin particiones ni LOAD DATA).
+"""
+
+from __future__ import annotations
+
+import queue
+import sqlite3
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.config import (  # type: ignore
+    EXCHANGE_ID,
+    PERSISTENCIA_COLA_MAX, PERSISTENCIA_DIAS_ADELANTE, PERSISTENCIA_LOTE,
+    PERSISTENCIA_POOL, PERSISTENCIA_UMBRAL_INFILE,
+)
+
+Fila = Tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class Tabla:
+    nombre: str
+    columnas: Tuple[Tuple[str, str], ...]  # (nombre, tipo SQL)
+    clave: Tuple[str, ...]
+    particionada: bool = False
+
+    @property
+    def nombres(self) -> List[str]:
+        return [c for c, _ in self.columnas]
+
+
+MERCADOS = Tabla(
+    "mercados_hist",
+    (
+        ("ts", "BIGINT NOT NULL"), ("exchange", "VARCHAR(32) NOT NULL"), ("symbol", "VARCHAR(64) NOT NULL"),
+        ("base", "VARCHAR(32)"), ("quote", "VARCHAR(32)"), ("active", "TINYINT(1)"),
+        ("fee_maker", "DOUBLE"), ("fee_taker", "DOUBLE"),
+        ("price_precision", "DOUBLE"), ("amount_precision", "DOUBLE"),
+        ("min_price", "DOUBLE"), ("min_amount", "DOUBLE"), ("min_cost", "DOUBLE"),
+    ),
+    clave=("exchange", "symbol", "ts"),
+)
+
+EQUIVALENCIAS = Tabla(
+    "equivalencias_hist",
+    (
+        ("dia", "DATE NOT NULL"), ("ts", "BIGINT NOT NULL"), ("exchange", "VARCHAR(32) NOT NULL"),
+        ("symbol", "VARCHAR(64) NOT NULL"), ("base", "VARCHAR(32)"), ("quote", "VARCHAR(32)"),
+        ("usdt_equivale_base", "DOUBLE"), ("indirecta", "TINYINT(1)"), ("fuente", "VARCHAR(32)"),
+    ),
+    clave=("dia", "exchange", "symbol", "ts"),
+    particionada=True,
+)
+
+TRIADAS = Tabla(
+    "triadas_hist",
+    (
+        ("dia", "DATE NOT NULL"), ("ts", "BIGINT NOT NULL"), ("exchange", "VARCHAR(32) NOT NULL"),
+        ("ruta", "VARCHAR(400) NOT NULL"), ("piernas", "TINYINT"),
+        ("gross_spread", "DOUBLE"), ("fees_total", "DOUBLE"), ("net_spread_expected", "DOUBLE"),
+    ),
+    clave=("dia", "exchange", "ruta", "ts"),
+    particionada=True,
+)
+
+TABLAS: Dict[str, Tabla] = {t.nombre: t for t in (MERCADOS, EQUIVALENCIAS, TRIADAS)}
+
+
+# ─────────── Filas desde los frames del pipeline ───────────
+def dia_de(ts_ms: int) -> str:
+    """Día UTC (ISO) de un epoch en ms: la clave de partición."""
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).date().isoformat()
+
+
+def _columna(df: pd.DataFrame, col: str, numerica: bool = False) -> pd.Series:
+    if col not in df.columns:
+        return pd.Series([None] * len(df), index=df.index, dtype=object)
+    serie = pd.to_numeric(df[col], errors="coerce") if numerica else df[col]
+    return serie.astype(object).where(serie.notna(), None)
+
+
+def _filas(constantes: Sequence[Any], columnas: Sequence[pd.Series]) -> List[Fila]:
+    fijo = tuple(constantes)
+    return [fijo + resto for resto in zip(*(c.tolist() for c in columnas))]
+
+
+def _bool(serie: pd.Series) -> pd.Series:
+    return serie.map(lambda v: None if v is None else int(str(v).strip().lower() in ("true", "1")))
+
+
+def filas_mercados(df: pd.DataFrame, ts: int, exchange_id: str = EXCHANGE_ID) -> List[Fila]:
+    numericas = [c for c, _ in MERCADOS.columnas[6:]]
+    return _filas(
+        (ts, exchange_id),
+        [_columna(df, "symbol"), _columna(df, "base"), _columna(df, "quote"), _bool(_columna(df, "active"))]
+        + [_columna(df, c, numerica=True) for c in numericas],
+    )
+
+
+def filas_equivalencias(df: pd.DataFrame, ts: int, exchange_id: str = EXCHANGE_ID) -> List[Fila]:
+    return _filas(
+        (dia_de(ts), ts, exchange_id),
+        [
+            _columna(df, "symbol"), _columna(df, "base"), _columna(df, "quote"),
+            _columna(df, "1_usdt_equivale_base", numerica=True),
+            _bool(_columna(df, "cotizacion_indirecta")), _columna(df, "fuente"),
+        ],
+    )
+
+
+def filas_triadas(df: pd.DataFrame, ts: int, exchange_id: str = EXCHANGE_ID) -> List[Fila]:
+    """Una fila por ruta del ranking (`leg<i>`/`dir<i>` → "SIM:dir>SIM:dir>...")."""
+    legs = sorted((c for c in df.columns if c.startswith("leg")), key=lambda c: int(c[3:]))
+    n = len(legs)
+    rutas, piernas = [], []
+    for fila in zip(*(df[c].tolist() for c in legs), *(df[f"dir{c[3:]}"].tolist() for c in legs)):
+        tramos = [f"{s}:{d}" for s, d in zip(fila[:n], fila[n:]) if s]
+        rutas.append(">".join(tramos))
+        piernas.append(len(tramos))
+    return _filas(
+        (dia_de(ts), ts, exchange_id),
+        [
+            pd.Series(rutas, dtype=object), pd.Series(piernas, dtype=object),
+            _columna(df, "gross_spread", numerica=True),
+            _columna(df, "fees_total", numerica=True),
+            _columna(df, "net_spread_expected", numerica=True),
+        ],
+    )
+
+
+# ─────────── Pool de conexiones ───────────
+class PoolConexiones:
+    """Hasta `tamano` conexiones vivas, reutilizadas entre llamadas y entre hilos."""
+
+    def __init__(
+        self,
+        fabrica: Callable[[], Any],
+        tamano: int = PERSISTENCIA_POOL,
+        dialecto: str = "mariadb",
+        local_infile: bool = False,
+    ):
+        self._fabrica = fabrica
+        self._libres: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._cupos = threading.BoundedSemaphore(tamano)
+        self.dialecto = dialecto
+        self.local_infile = local_infile
+
+    @classmethod
+    def mariadb(cls, tamano: int = PERSISTENCIA_POOL) -> "PoolConexiones":
+        from codigo.config import connect  # type: ignore
+
+        return cls(lambda: connect(local_infile=True, autocommit=False, connect_timeout=2), tamano, "mariadb", local_infile=True)
+
+    @classmethod
+    def sqlite(cls, ruta: Path, tamano: int = PERSISTENCIA_POOL) -> "PoolConexiones":
+        """Stand-in local (un archivo; `:memory:` no se comparte entre conexiones)."""
+        def fabrica():
+            conn = sqlite3.connect(str(ruta), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            return conn
+        return cls(fabrica, tamano, "sqlite")
+
+    @contextmanager
+    def conexion(self) -> Iterator[Any]:
+        """Conexión prestada: commit al salir bien; rollback y descarte si hubo error."""
+        with self._cupos:
+            try:
+                conn = self._libres.get_nowait()
+                if hasattr(conn, "ping"):  # pymysql: reconecta si el servidor cortó por wait_timeout
+                    conn.ping(reconnect=True)
+            except queue.Empty:
+                conn = self._fabrica()
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                try:
+                    conn.rollback()
+                    conn.close()
+                except Exception:  # noqa: BLE001 — la conexión ya puede estar rota
+                    pass
+                raise
+            self._libres.put(conn)
+
+    def cerrar(self) -> None:
+        while True:
+            try:
+                self._libres.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+# ─────────── DDL / DML ───────────
+def _ddl(tabla: Tabla, dialecto: str, dias: Sequence[date]) -> str:
+    cols = ",\n  ".join(f"{c} {t}" for c, t in tabla.columnas)
+    sql = f"CREATE TABLE IF NOT EXISTS {tabla.nombre} (\n  {cols},\n  PRIMARY KEY ({', '.join(tabla.clave)})\n)"
+    if dialecto != "mariadb":
+        return sql
+    sql += " ENGINE=InnoDB"
+    if tabla.particionada:
+        sql += f"\nPARTITION BY RANGE COLUMNS(dia) (\n  {_particiones(dias)}\n)"
+    return sql
+
+
+def _nombre_particion(dia: date) -> str:
+    return f"p{dia:%Y%m%d}"
+
+
+def _particiones(dias: Sequence[date]) -> str:
+    partes = [f"PARTITION {_nombre_particion(d)} VALUES LESS THAN ('{d + timedelta(days=1)}')" for d in dias]
+    partes.append("PARTITION pmax VALUES LESS THAN (MAXVALUE)")
+    return ",\n  ".join(partes)
+
+
+def _tsv(valor: Any) -> str:
+    if valor is None:
+        return r"\N"
+    if isinstance(valor, bool):
+        return str(int(valor))
+    if isinstance(valor, float):
+        return repr(valor)
+    return str(valor).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+class Historial:
+    """Escritura por lotes y mantenimiento de particiones sobre un `PoolConexiones`."""
+
+    def __init__(self, pool: PoolConexiones, lote: int = PERSISTENCIA_LOTE, umbral_infile: int = PERSISTENCIA_UMBRAL_INFILE):
+        self.pool = pool
+        self.lote = int(lote)
+        self.umbral_infile = int(umbral_infile)
+        self._marca = "%s" if pool.dialecto == "mariadb" else "?"
+
+    @classmethod
+    def por_defecto(cls) -> Optional["Historial"]:
+        """Historial sobre MariaDB con las tablas creadas, o None si la base no responde."""
+        try:
+            historial = cls(PoolConexiones.mariadb())
+            historial.crear_tablas()
+        except Exception as e:  # noqa: BLE001 — sin base la refinería sigue sin historial
+            print(f"⚠️ MariaDB no disponible ({type(e).__name__}); se sigue sin historial")
+            return None
+        return historial
+
+    def crear_tablas(self, dias_adelante: int = PERSISTENCIA_DIAS_ADELANTE) -> None:
+        hoy = datetime.now(timezone.utc).date()
+        dias = [hoy + timedelta(days=i) for i in range(dias_adelante + 1)]
+        with self.pool.conexion() as conn:
+            cur = conn.cursor()
+            for tabla in TABLAS.values():
+                cur.execute(_ddl(tabla, self.pool.dialecto, dias))
+                if self.pool.dialecto == "mariadb":
+                    self._agregar_columnas(cur, tabla)
+        if self.pool.dialecto == "mariadb":
+            self.asegurar_particiones(dias_adelante)
+
+    def _agregar_columnas(self, cur, tabla: Tabla) -> None:
+        """Tablas creadas por una versión anterior del esquema: agrega las columnas nuevas (p.ej. `min_cost`)."""
+        cur.execute(
+            "SELECT COLUMN_NAME FROM information_schema.COLUMNS WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (tabla.nombre,),
+        )
+        existentes = {fila["COLUMN_NAME"] if isinstance(fila, dict) else fila[0] for fila in cur.fetchall()}
+        for columna, tipo in tabla.columnas:
+            if columna not in existentes:
+                cur.execute(f"ALTER TABLE {tabla.nombre} ADD COLUMN IF NOT EXISTS {columna} {tipo}")
+
+    # ─────────── Particiones (solo MariaDB) ───────────
+    def _particiones_existentes(self, cur, tabla: str) -> List[str]:
+        cur.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+            (tabla,),
+        )
+        return [fila["PARTITION_NAME"] if isinstance(fila, dict) else fila[0] for fila in cur.fetchall()]
+
+    def asegurar_particiones(self, dias_adelante: int = PERSISTENCIA_DIAS_ADELANTE) -> int:
+        """Parte `pmax` para que hoy y los próximos `dias_adelante` tengan partición propia."""
+        if self.pool.dialecto != "mariadb":
+            return 0
+        hoy = datetime.now(timezone.utc).date()
+        creadas = 0
+        with self.pool.conexion() as conn:
+            cur = conn.cursor()
+            for tabla in (t for t in TABLAS.values() if t.particionada):
+                existentes = set(self._particiones_existentes(cur, tabla.nombre))
+                ultima = max((p for p in existentes if p != "pmax"), default=None)
+                faltan = [
+                    d for d in (hoy + timedelta(days=i) for i in range(dias_adelante + 1))
+                    if _nombre_particion(d) not in existentes and (ultima is None or _nombre_particion(d) > ultima)
+                ]
+                if faltan:
+                    cur.execute(f"ALTER TABLE {tabla.nombre} REORGANIZE PARTITION pmax INTO (\n  {_particiones(faltan)}\n)")
+                    creadas += len(faltan)
+        return creadas
+
+    def purgar_particiones(self, dias_retencion: int) -> List[str]:
+        """DROP PARTITION de los días anteriores a hoy − `dias_retencion`."""
+        if self.pool.dialecto != "mariadb":
+            return []
+        limite = _nombre_particion(datetime.now(timezone.utc).date() - timedelta(days=dias_retencion))
+        borradas: List[str] = []
+        with self.pool.conexion() as conn:
+            cur = conn.cursor()
+            for tabla in (t for t in TABLAS.values() if t.particionada):
+                viejas = [p for p in self._particiones_existentes(cur, tabla.nombre) if p != "pmax" and p < limite]
+                if viejas:
+                    cur.execute(f"ALTER TABLE {tabla.nombre} DROP PARTITION {', '.join(viejas)}")
+                    borradas += [f"{tabla.nombre}.{p}" for p in viejas]
+        return borradas
+
+    # ─────────── Inserción ───────────
+    def insertar(self, tabla: str, filas: Sequence[Fila]) -> int:
+        """Inserta `filas` (tuplas en el orden de columnas de la tabla); devuelve cuántas envió."""
+        if not filas:
+            return 0
+        t = TABLAS[tabla]
+        with self.pool.conexion() as conn:
+            if self.pool.local_infile and len(filas) >= self.umbral_infile:
+                self._load_data(conn, t, filas)
+            else:
+                verbo = "INSERT IGNORE" if self.pool.dialecto == "mariadb" else "INSERT OR IGNORE"
+                sql = f"{verbo} INTO {t.nombre} ({', '.join(t.nombres)}) VALUES ({', '.join([self._marca] * len(t.columnas))})"
+                cur = conn.cursor()
+                for i in range(0, len(filas), self.lote):
+                    cur.executemany(sql, filas[i:i + self.lote])
+        return len(filas)
+
+    def _load_data(self, conn, tabla: Tabla, filas: Sequence[Fila]) -> None:
+        with tempfile.NamedTemporaryFile("w", suffix=".tsv", encoding="utf-8", newline="\n", delete=False) as tmp:
+            for fila in filas:
+                tmp.write("\t".join(_tsv(v) for v in fila))
+                tmp.write("\n")
+        ruta = Path(tmp.name)
+        try:
+            conn.cursor().execute(
+                f"LOAD DATA LOCAL INFILE %s IGNORE INTO TABLE {tabla.nombre} "
+                f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(tabla.nombres)})",
+                (str(ruta),),
+            )
+        finally:
+            ruta.unlink(missing_ok=True)
+
+    def contar(self, tabla: str) -> int:
+        with self.pool.conexion() as conn:
+            cur = conn.cursor()
+            cur.execute(f"SELECT COUNT(*) AS n FROM {TABLAS[tabla].nombre}")
+            fila = cur.fetchone()
+        return int(fila["n"] if isinstance(fila, dict) else fila[0])
+
+
+# ─────────── Escritor en segundo plano ───────────
+class EscritorFondo:
+    """Hilo único que vacía una cola acotada de lotes `(tabla, filas)` hacia el `Historial`."""
+
+    def __init__(self, historial: Historial, cola_max: int = PERSISTENCIA_COLA_MAX):
+        self.historial = historial
+        self._cola: "queue.Queue[Optional[Tuple[str, Sequence[Fila]]]]" = queue.Queue(maxsize=cola_max)
+        self._hilo = threading.Thread(target=self._bucle, name="persistencia", daemon=True)
+        self.escritas = 0
+        self.descartadas = 0
+        self.errores = 0
+
+    def iniciar(self) -> "EscritorFondo":
+        self._hilo.start()
+        return self
+
+    def encolar(self, tabla: str, filas: Sequence[Fila]) -> bool:
+        """No bloquea: si la cola está llena el lote se descarta (y se cuenta)."""
+        if not filas:
+            return True
+        try:
+            self._cola.put_nowait((tabla, filas))
+            return True
+        except queue.Full:
+            self.descartadas += len(filas)
+            return False
+
+    def _bucle(self) -> None:
+        while True:
+            item = self._cola.get()
+            pendientes: Dict[str, List[Fila]] = {}
+            fin = item is None
+            while item is not None:
+                pendientes.setdefault(item[0], []).extend(item[1])
+                try:  # junta lo que ya esté encolado: menos transacciones con carga alta
+                    item = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                fin = fin or item is None
+            for tabla, filas in pendientes.items():
+                try:
+                    self.escritas += self.historial.insertar(tabla, filas)
+                except Exception as e:  # noqa: BLE001 — la persistencia nunca tumba a la refinería
+                    self.errores += 1
+                    print(f"⚠️ Historial: no se pudo escribir {len(filas)} filas en {tabla} ({type(e).__name__}: {e})")
+            if fin:
+                return
+
+    def cerrar(self, timeout: Optional[float] = None) -> None:
+        """Vacía lo encolado y termina el hilo (espera a lo sumo `timeout` segundos).
+
+        Si la cola sigue llena al vencer `timeout`, el lote más viejo se descarta
+        (y se cuenta) para hacerle lugar al centinela de fin.
+        """
+        if not self._hilo.is_alive():
+            return
+        try:
+            self._cola.put(None, timeout=timeout)
+        except queue.Full:
+            while True:
+                try:
+                    viejo = self._cola.get_nowait()
+                    if viejo is not None:
+                        self.descartadas += len(viejo[1])
+                except queue.Empty:
+                    pass  # el hilo se llevó un lote en el medio: ya hay lugar
+                try:
+                    self._cola.put_nowait(None)
+                    break
+                except queue.Full:
+                    continue
+        self._hilo.join(timeout)
+
+    def __enter__(self) -> "EscritorFondo":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+def escritor_por_defecto() -> Optional[EscritorFondo]:
+    """Escritor en marcha sobre MariaDB, o None si la base no está disponible."""
+    historial = Historial.por_defecto()
+    return EscritorFondo(historial).iniciar() if historial is not None else None
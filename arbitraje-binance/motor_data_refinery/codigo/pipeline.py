@@ -0,0 +1,234 @@
+# codigo/pipeline.py
+"""
+🏭 Runner en proceso del pipeline de la refinería (etapas 0 → 7).
+
+Las etapas siguen pudiendo correrse sueltas como scripts (hand-off por CSV),
+pero acá se ejecutan en un solo proceso pasando DataFrames tipados en memoria:
+sin arranque de intérprete por etapa, sin re-importar pandas y sin
+parsear/serializar CSV entre etapas.
+
+La emisión de CSV intermedios queda como sink de auditoría opcional y respeta
+`AUDIT_STRUCT_EXPORT` (se puede forzar con --auditoria / --sin-auditoria).
+El cotizador final siempre se escribe en absorcion/datos/, junto con la tabla
+compartida de tope de libro (mmap) para realtime / sentinel.
+
+Las etapas 1 → 3 (y las triadas USDT) corren como refresco incremental
+(`codigo/refresco.py`): solo se propaga el diff de listados contra la corrida
+anterior, y si no cambió nada la generación es no-op. Mercados y
+equivalencias se encolan al historial de MariaDB (`codigo/persistencia.py`),
+que escribe en un hilo aparte mientras siguen las etapas.
+
+Corre un solo exchange (config.EXCHANGE_ID); para varios en paralelo, cada uno
+en su proceso y namespace de salida, ver `codigo/multi_exchange.py`.
+
+Uso (desde la raíz del motor):
+    python -m codigo.pipeline [--schema] [--auditoria | --sin-auditoria] [--forzar-snapshot] [--reconstruir] [--sin-historial]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
+import pandas as pd
+
+from codigo.config import EXCHANGE_ID, AUDIT_STRUCT_EXPORT, PERSISTENCIA_HISTORIAL, PERSISTENCIA_CIERRE_S  # type: ignore
+from codigo.snapshot import obtener_snapshot  # type: ignore
+from codigo.tablas import exportar_auditoria  # type: ignore
+from codigo.publicador import publicador_por_defecto  # type: ignore
+from codigo.cache_redis import CacheRefineria  # type: ignore
+from codigo.persistencia import escritor_por_defecto, filas_equivalencias, filas_mercados  # type: ignore
+from codigo.refresco import anunciar, cargar_estado, guardar_estado, refrescar  # type: ignore
+from codigo.equivalencias import TablaPrecios, formatear_decimales  # type: ignore
+
+
+def _etapa(nombre: str):
+    """Importa una etapa `codigo/<n>_<nombre>.py` (los nombres con dígito no admiten `import` directo)."""
+    return importlib.import_module(f"codigo.{nombre}")
+
+
+@dataclass
+class ResultadoPipeline:
+    exchange_id: str
+    snapshot_ts: int = 0
+    frames: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    tiempos: Dict[str, float] = field(default_factory=dict)
+    destino: Path | None = None
+    generacion: int = 0
+    filas_historial: int = 0
+    generacion_mercados: int = 0
+    refresco: str = ""          # "completo" | "incremental (+a −e ~c)" | "no-op"
+    triadas: Any = None         # absorcion.triadas.Triadas (ancla USDT, pares spot)
+
+
+@contextmanager
+def _cronometro(tiempos: Dict[str, float], nombre: str):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        tiempos[nombre] = time.perf_counter() - t0
+
+
+def ejecutar(
+    exchange_id: str = EXCHANGE_ID,
+    auditoria: bool = AUDIT_STRUCT_EXPORT,
+    generar_schema: bool = False,
+    forzar_snapshot: bool = False,
+    historial: bool = PERSISTENCIA_HISTORIAL,
+    reconstruir: bool = False,
+) -> ResultadoPipeline:
+    """Corre las etapas en proceso y devuelve los frames intermedios y los tiempos."""
+    res = ResultadoPipeline(exchange_id=exchange_id)
+    t = res.tiempos
+    f = res.frames
+
+    e1 = _etapa("1_mapear_campos_estandar")
+    e2 = _etapa("2_filtrar_spot")
+    e3 = _etapa("3_simbolos_separacion")
+    e4 = _etapa("4_generar_equivalencias_directas_e_invertidas")
+    e5 = _etapa("5_generar_equivalencias_indirectas")
+    e6 = _etapa("6_unificar_equivalencias")
+    e7 = _etapa("7_exportar_a_absorcion")
+
+    with _cronometro(t, "snapshot"):
+        snap = obtener_snapshot(exchange_id, forzar=forzar_snapshot)
+        res.snapshot_ts = snap.ts
+        # Ids + last en float64 una sola vez para las etapas 4, 5 y 6
+        precios = TablaPrecios.desde_tickers(snap.tickers)
+
+    # El hilo del historial se vacía y se cierra aunque una etapa falle
+    escritor = escritor_por_defecto() if historial else None
+    try:
+        if generar_schema:
+            with _cronometro(t, "0_schema"):
+                _etapa("0_generar_schemas").generate_schema()
+
+        with _cronometro(t, "1-3_refresco"):
+            refresco = refrescar(snap.markets, snap.ts, None if reconstruir else cargar_estado(exchange_id), exchange_id)
+            estado = refresco.estado
+            f["estandar"], f["spot"], f["descartados"] = estado.estandar, estado.spot, estado.descartados
+            f["directo"], f["invertido"], f["indirecto"] = estado.separados[e3.INTERESADO_EN]
+            res.triadas = estado.triadas
+            res.generacion_mercados = estado.generacion
+            res.refresco = "completo" if refresco.completo else (
+                "no-op" if refresco.noop else f"incremental ({refresco.diff.resumen()})"
+            )
+            guardar_estado(estado)
+            anunciar(refresco)
+
+        # Sin cambios de listados los CSV de auditoría y el historial de mercados ya están al día
+        if not refresco.noop:
+            with _cronometro(t, "1-3_auditoria"):
+                exportar_auditoria(f["estandar"], e1.ruta_salida(exchange_id), auditoria)
+                exportar_auditoria(f["spot"], e2.OUTPUT_DIR / f"simbolos_spot_{exchange_id}.csv", auditoria)
+                exportar_auditoria(f["descartados"], e2.OUTPUT_DIR / f"descartados_spot_{exchange_id}.csv", auditoria)
+                for ancla, frames in estado.separados.items():
+                    for nombre, df_sep in zip(("directo", "invertido", "indirecto"), frames):
+                        exportar_auditoria(df_sep, e3.OUTPUT_DIR / f"{nombre}_{ancla}.csv", auditoria)
+            if escritor is not None:
+                escritor.encolar("mercados_hist", filas_mercados(f["estandar"], snap.ts, exchange_id))
+
+        with _cronometro(t, "4_equiv_directas"):
+            f["equivalencias"] = e4.equivalencias_directas_e_invertidas(
+                f["directo"], f["invertido"], precios, verificar=auditoria
+            )
+            if auditoria:
+                exportar_auditoria(formatear_decimales(f["equivalencias"]), e4.OUTPUT_USDT_EQUIVALE, auditoria)
+
+        with _cronometro(t, "5_equiv_indirectas"):
+            f["indirectos"], f["no_ruteables"] = e5.equivalencias_indirectas(
+                f["indirecto"], f["spot"], precios, verificar=auditoria
+            )
+            if auditoria:
+                exportar_auditoria(formatear_decimales(f["indirectos"]), e5.OUTPUT_RUTEABLES, auditoria)
+            exportar_auditoria(f["no_ruteables"], e5.OUTPUT_NO_RUTEABLES, auditoria)
+
+        with _cronometro(t, "6_unificado"):
+            f["unificado"] = e6.unificar(f["directo"], f["indirectos"], precios)
+            if auditoria:
+                exportar_auditoria(formatear_decimales(f["unificado"]), e6.OUTPUT_UNIFICADO, auditoria)
+            if escritor is not None:
+                escritor.encolar("equivalencias_hist", filas_equivalencias(f["unificado"], snap.ts, exchange_id))
+
+        with _cronometro(t, "7_export"):
+            publicador = publicador_por_defecto()
+            with publicador.lote():
+                res.destino = e7.exportar(formatear_decimales(f["unificado"]), publicador)
+                e7.exportar_binario(f["unificado"], publicador)
+            res.generacion = publicador.generacion
+            e7.exportar_tabla_compartida(f["spot"]["symbol"], snap.tickers, snap.ts)
+
+        cache = CacheRefineria.por_defecto(exchange_id)
+        if cache is not None:
+            with _cronometro(t, "cache_redis"):
+                cache.guardar_tabla("estandar", f["estandar"])
+                cache.guardar_tabla("spot", f["spot"])
+                cache.guardar_equivalencias(f["unificado"])
+    finally:
+        if escritor is not None:
+            with _cronometro(t, "historial"):
+                escritor.cerrar(PERSISTENCIA_CIERRE_S)
+            res.filas_historial = escritor.escritas
+
+    return res
+
+
+def imprimir_reporte(res: ResultadoPipeline, auditoria: bool) -> None:
+    f = res.frames
+    print(f"\n🏭 Pipeline refinería — {res.exchange_id} (snapshot ts={res.snapshot_ts})")
+    print(f"🔹 Mercados       : generación {res.generacion_mercados} — {res.refresco}")
+    print(f"🔹 Estandarizados : {len(f['estandar'])}")
+    print(f"🔹 Spot funcional : {len(f['spot'])} (descartados {len(f['descartados'])})")
+    print(f"🔹 Directo/Inv/Ind: {len(f['directo'])}/{len(f['invertido'])}/{len(f['indirecto'])}")
+    print(f"🔹 Equivalencias  : {len(f['equivalencias'])} directas+invertidas, "
+          f"{len(f['indirectos'])} indirectas ({len(f['no_ruteables'])} no ruteables)")
+    print(f"🔺 Triadas USDT   : {len(res.triadas) if res.triadas is not None else 0}")
+    print(f"🔸 Cotizador      : {len(f['unificado'])} símbolos → {res.destino} (generación {res.generacion})")
+    print(f"📄 Auditoría CSV  : {'sí' if auditoria else 'no'}")
+    print(f"🗄️  Historial DB   : {res.filas_historial} filas")
+    print("\n⏱️  Tiempos por etapa:")
+    for nombre, seg in res.tiempos.items():
+        print(f"   - {nombre:<18} {seg * 1000:9.1f} ms")
+    print(f"   = {'total':<18} {sum(res.tiempos.values()) * 1000:9.1f} ms\n")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Pipeline en proceso de la refinería")
+    parser.add_argument("--schema", action="store_true", help="Regenera temp/schema (etapa 0)")
+    parser.add_argument("--forzar-snapshot", action="store_true", help="Ignora el caché del snapshot")
+    grupo = parser.add_mutually_exclusive_group()
+    grupo.add_argument("--auditoria", dest="auditoria", action="store_true", default=None,
+                       help="Emite los CSV intermedios (ignora AUDIT_STRUCT_EXPORT)")
+    grupo.add_argument("--sin-auditoria", dest="auditoria", action="store_false",
+                       help="No emite CSV intermedios")
+    parser.add_argument("--reconstruir", action="store_true", help="Ignora el estado del refresco incremental")
+    parser.add_argument("--sin-historial", action="store_true", help="No persiste en MariaDB")
+    args = parser.parse_args(argv)
+
+    auditoria = AUDIT_STRUCT_EXPORT if args.auditoria is None else args.auditoria
+    res = ejecutar(
+        auditoria=auditoria,
+        generar_schema=args.schema,
+        forzar_snapshot=args.forzar_snapshot,
+        historial=PERSISTENCIA_HISTORIAL and not args.sin_historial,
+        reconstruir=args.reconstruir,
+    )
+    imprimir_reporte(res, auditoria)
+
+
+if __name__ == "__main__":
+    main()
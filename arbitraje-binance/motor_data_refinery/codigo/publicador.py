@@ -0,0 +1,241 @@
+# codigo/publicador.py
+"""
+📣 Publicación atómica y versionada de artefactos de absorción, con aviso de cambios.
+
+Antes las etapas escribían en el lugar (`df.to_csv(out)`) o con `shutil.copy2`:
+un lector de `absorcion/datos/` podía ver archivos a medio escribir y no tenía
+forma barata de saber si algo cambió. Ahora:
+
+1. Cada artefacto se escribe en un temporal del mismo directorio, se hace
+   `fsync` y se renombra encima del destino (`os.replace`, atómico en POSIX).
+2. Si el contenido no cambió (mismo sha256) no se toca el destino.
+3. `manifest.json` lleva una `generacion` global monótona y, por artefacto, la
+   generación en que cambió por última vez, su sha256, tamaño y timestamp. El
+   manifest se publica también de forma atómica.
+4. Cada generación nueva se anuncia por Redis pub/sub en `CANAL_ARTEFACTOS`
+   (`{"generacion", "artefactos": [...]}`), con `codigo/redis_local.py` como
+   stand-in cuando no hay servidor.
+
+Varios artefactos escritos juntos (CSV + binario del cotizador) se agrupan con
+`with publicador.lote():` → una sola generación y un solo aviso.
+
+Del lado consumidor, `Suscriptor` recarga solo ante una generación nueva (por
+pub/sub, o comparando el manifest si no hay Redis).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.config import ABSORCION_DATOS_DIR, CANAL_ARTEFACTOS, MANIFEST_PATH  # type: ignore
+
+BLOQUE_HASH = 1 << 20
+
+
+def sha256_de(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for bloque in iter(lambda: f.read(BLOQUE_HASH), b""):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def _fsync_dir(directorio: Path) -> None:
+    """Persiste la entrada del rename (no-op donde no se pueden abrir directorios)."""
+    try:
+        fd = os.open(directorio, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def escribir_atomico(destino: Path, escribir: Callable[[Path], None]) -> Path:
+    """`escribir(tmp)` + fsync + rename sobre `destino`. Devuelve el destino."""
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f".{destino.name}.{os.getpid()}.tmp")
+    try:
+        escribir(tmp)
+        with open(tmp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(tmp, destino)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+    _fsync_dir(destino.parent)
+    return destino
+
+
+def leer_manifest(path: Path = MANIFEST_PATH) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"generacion": 0, "artefactos": {}}
+
+
+@dataclass
+class Publicacion:
+    nombre: str
+    path: Path
+    sha256: str
+    generacion: int
+    cambio: bool
+
+
+class Publicador:
+    """Escritor único de los artefactos de un directorio (y de su manifest)."""
+
+    def __init__(self, directorio: Path = ABSORCION_DATOS_DIR, redis=None, canal: str = CANAL_ARTEFACTOS):
+        self.directorio = Path(directorio)
+        self.manifest_path = self.directorio / MANIFEST_PATH.name
+        self.redis = redis
+        self.canal = canal
+        self._lote: Optional[List[str]] = None
+        self._pendientes: Dict[str, dict] = {}  # entradas de manifest aún no cerradas en una generación
+
+    def manifest(self) -> dict:
+        return leer_manifest(self.manifest_path)
+
+    @property
+    def generacion(self) -> int:
+        return int(self.manifest().get("generacion", 0))
+
+    @contextmanager
+    def lote(self) -> Iterator[None]:
+        """Agrupa varias publicaciones en una sola generación y un solo aviso."""
+        if self._lote is not None:
+            yield
+            return
+        self._lote = []
+        try:
+            yield
+        finally:
+            cambiados, self._lote = self._lote, None
+            if cambiados:
+                self._cerrar_generacion(cambiados)
+
+    # ─────────── Publicación ───────────
+    def publicar(self, nombre: str, escribir: Callable[[Path], None]) -> Publicacion:
+        """Escribe `nombre` con `escribir(path)`; solo lo reemplaza (y versiona) si cambió el contenido."""
+        destino = self.directorio / nombre
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        tmp = destino.with_name(f".{destino.name}.{os.getpid()}.tmp")
+        try:
+            escribir(tmp)
+            sha = sha256_de(tmp)
+            previo = self.manifest().get("artefactos", {}).get(nombre, {})
+            if previo.get("sha256") == sha and destino.exists():
+                return Publicacion(nombre, destino, sha, int(previo.get("generacion", 0)), cambio=False)
+            with open(tmp, "rb+") as f:
+                os.fsync(f.fileno())
+            os.replace(tmp, destino)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        _fsync_dir(self.directorio)
+
+        self._pendientes[nombre] = {"sha256": sha, "bytes": destino.stat().st_size, "ts": int(time.time() * 1000)}
+        if self._lote is not None:
+            self._lote.append(nombre)
+            return Publicacion(nombre, destino, sha, self.generacion + 1, cambio=True)
+        gen = self._cerrar_generacion([nombre])
+        return Publicacion(nombre, destino, sha, gen, cambio=True)
+
+    def publicar_csv(self, nombre: str, df: pd.DataFrame) -> Publicacion:
+        return self.publicar(nombre, lambda p: df.to_csv(p, index=False))
+
+    def publicar_archivo(self, nombre: str, origen: Path) -> Publicacion:
+        return self.publicar(nombre, lambda p: shutil.copyfile(origen, p))
+
+    def _cerrar_generacion(self, cambiados: List[str]) -> int:
+        cambiados = list(dict.fromkeys(cambiados))
+        manifest = self.manifest()
+        gen = int(manifest.get("generacion", 0)) + 1
+        artefactos = manifest.setdefault("artefactos", {})
+        for nombre in cambiados:
+            artefactos[nombre] = {"generacion": gen, **self._pendientes.pop(nombre)}
+        manifest["generacion"] = gen
+        manifest["ts"] = int(time.time() * 1000)
+        texto = json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True)
+        escribir_atomico(self.manifest_path, lambda p: p.write_text(texto, encoding="utf-8"))
+        self._notificar(gen, cambiados)
+        return gen
+
+    def _notificar(self, generacion: int, cambiados: List[str]) -> None:
+        if self.redis is None:
+            return
+        msg = json.dumps({"generacion": generacion, "artefactos": sorted(cambiados)})
+        try:
+            self.redis.publish(self.canal, msg)
+        except Exception as e:  # noqa: BLE001 — el aviso es best effort; el manifest ya quedó publicado
+            print(f"⚠️ No se pudo anunciar la generación {generacion} en Redis: {e}")
+
+
+class Suscriptor:
+    """Lado consumidor: detecta generaciones nuevas sin re-leer los artefactos."""
+
+    def __init__(self, directorio: Path = ABSORCION_DATOS_DIR, redis=None, canal: str = CANAL_ARTEFACTOS):
+        self.manifest_path = Path(directorio) / MANIFEST_PATH.name
+        self.generacion = 0
+        self._pubsub = None
+        if redis is not None:
+            self._pubsub = redis.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(canal)
+
+    def cambios(self) -> Dict[str, dict]:
+        """Artefactos con generación mayor a la última vista (y avanza la generación vista)."""
+        manifest = leer_manifest(self.manifest_path)
+        gen = int(manifest.get("generacion", 0))
+        if gen <= self.generacion:
+            return {}
+        nuevos = {n: a for n, a in manifest.get("artefactos", {}).items() if a.get("generacion", 0) > self.generacion}
+        self.generacion = gen
+        return nuevos
+
+    def esperar(self, timeout: float = 1.0, intervalo: float = 0.2) -> Dict[str, dict]:
+        """Bloquea hasta una generación nueva o `timeout`: por pub/sub si hay Redis, si no comparando el manifest."""
+        limite = time.monotonic() + timeout
+        while True:
+            cambios = self.cambios()
+            if cambios:
+                return cambios
+            resto = limite - time.monotonic()
+            if resto <= 0:
+                return {}
+            if self._pubsub is not None:
+                self._pubsub.get_message(timeout=resto)
+            else:
+                time.sleep(min(intervalo, resto))
+
+    def cerrar(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+def publicador_por_defecto(directorio: Path = ABSORCION_DATOS_DIR) -> Publicador:
+    """Publicador con Redis si está disponible (cliente instalado y servidor accesible); si no, solo manifest."""
+    from codigo.cache_redis import conectar  # type: ignore
+
+    return Publicador(directorio, conectar())
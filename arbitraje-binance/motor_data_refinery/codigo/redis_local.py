@@ -0,0 +1,240 @@
+# codigo/redis_local.py
+"""
+🧪 Stand-in en proceso de Redis para correr sin el servicio del docker-compose.
+
+Implementa el subconjunto de la API de `redis-py` (con `decode_responses=True`)
+que usa la refinería: `publish` + `pubsub()` (`subscribe`, `get_message`,
+`listen`), strings (`get` / `set` con `ex` / `incr` / `delete` / `exists`),
+hashes (`hset` con `mapping`, `hget`, `hmget`, `hgetall`, `hlen`), expiración
+(`expire` / `ttl`, perezosa como en Redis) y `pipeline()` (encola y ejecuta en
+`execute()`). Es thread-safe, así que un publicador y un suscriptor en hilos
+distintos del mismo proceso se comportan como con Redis real. El reloj de la
+expiración es inyectable (`RedisLocal(reloj=...)`) para probar TTL sin esperar.
+
+Uso:
+    r = RedisLocal()
+    ps = r.pubsub(ignore_subscribe_messages=True); ps.subscribe("canal")
+    r.publish("canal", "hola")
+    ps.get_message(timeout=1.0)  # {"type": "message", "channel": "canal", "data": "hola", ...}
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+
+def _texto(valor: Any) -> str:
+    return valor.decode("utf-8") if isinstance(valor, bytes) else str(valor)
+
+
+class PubSubLocal:
+    """Suscripción a canales de un `RedisLocal` (cola propia por suscriptor)."""
+
+    def __init__(self, servidor: "RedisLocal", ignore_subscribe_messages: bool = False):
+        self._servidor = servidor
+        self._ignorar = ignore_subscribe_messages
+        self._cola: "queue.Queue[dict]" = queue.Queue()
+        self.canales: Set[str] = set()
+
+    def subscribe(self, *canales: str) -> None:
+        for canal in canales:
+            canal = _texto(canal)
+            self._servidor._suscribir(canal, self)
+            self.canales.add(canal)
+            if not self._ignorar:
+                self._cola.put({"type": "subscribe", "pattern": None, "channel": canal, "data": len(self.canales)})
+
+    def unsubscribe(self, *canales: str) -> None:
+        for canal in [_texto(c) for c in canales] or list(self.canales):
+            self._servidor._desuscribir(canal, self)
+            self.canales.discard(canal)
+
+    def _entregar(self, canal: str, data: str) -> None:
+        self._cola.put({"type": "message", "pattern": None, "channel": canal, "data": data})
+
+    def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[dict]:
+        try:
+            msg = self._cola.get(timeout=timeout) if timeout else self._cola.get_nowait()
+        except queue.Empty:
+            return None
+        if msg["type"] != "message" and ignore_subscribe_messages:
+            return None
+        return msg
+
+    def listen(self) -> Iterator[dict]:
+        while self.canales:
+            yield self._cola.get()
+
+    def close(self) -> None:
+        self.unsubscribe()
+
+
+class PipelineLocal:
+    """Encola comandos y los ejecuta juntos (sin MULTI: igual que `transaction=False`)."""
+
+    def __init__(self, servidor: "RedisLocal"):
+        self._servidor = servidor
+        self._comandos: List[tuple] = []
+
+    def __getattr__(self, nombre: str):
+        metodo = getattr(self._servidor, nombre)
+
+        def encolar(*args, **kwargs):
+            self._comandos.append((metodo, args, kwargs))
+            return self
+        return encolar
+
+    def execute(self) -> List[Any]:
+        comandos, self._comandos = self._comandos, []
+        with self._servidor._lock:
+            return [m(*a, **k) for m, a, k in comandos]
+
+    def __enter__(self) -> "PipelineLocal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._comandos = []
+
+
+class RedisLocal:
+    """Servidor + cliente en memoria (un único espacio de claves por instancia)."""
+
+    def __init__(self, reloj: Callable[[], float] = time.monotonic) -> None:
+        self._reloj = reloj
+        self._lock = threading.RLock()
+        self._datos: Dict[str, Any] = {}          # str o dict (hash)
+        self._vence: Dict[str, float] = {}        # clave → instante de expiración (según `reloj`)
+        self._subs: Dict[str, List[PubSubLocal]] = {}
+
+    def ping(self) -> bool:
+        return True
+
+    def pipeline(self, transaction: bool = True) -> PipelineLocal:
+        return PipelineLocal(self)
+
+    # ─────────── Pub/Sub ───────────
+    def pubsub(self, ignore_subscribe_messages: bool = False) -> PubSubLocal:
+        return PubSubLocal(self, ignore_subscribe_messages)
+
+    def _suscribir(self, canal: str, ps: PubSubLocal) -> None:
+        with self._lock:
+            subs = self._subs.setdefault(canal, [])
+            if ps not in subs:
+                subs.append(ps)
+
+    def _desuscribir(self, canal: str, ps: PubSubLocal) -> None:
+        with self._lock:
+            subs = self._subs.get(canal, [])
+            if ps in subs:
+                subs.remove(ps)
+
+    def publish(self, canal: str, mensaje: Any) -> int:
+        """Entrega a los suscriptores actuales; devuelve cuántos lo recibieron (como Redis)."""
+        canal, mensaje = _texto(canal), _texto(mensaje)
+        with self._lock:
+            subs = list(self._subs.get(canal, []))
+        for ps in subs:
+            ps._entregar(canal, mensaje)
+        return len(subs)
+
+    # ─────────── Claves y expiración ───────────
+    def _vivo(self, clave: str) -> Any:
+        """Valor de la clave, borrándola si ya venció (expiración perezosa)."""
+        vence = self._vence.get(clave)
+        if vence is not None and self._reloj() >= vence:
+            self._datos.pop(clave, None)
+            self._vence.pop(clave, None)
+        return self._datos.get(clave)
+
+    def exists(self, *claves: str) -> int:
+        with self._lock:
+            return sum(self._vivo(_texto(c)) is not None for c in claves)
+
+    def delete(self, *claves: str) -> int:
+        with self._lock:
+            borradas = 0
+            for c in claves:
+                c = _texto(c)
+                borradas += self._vivo(c) is not None
+                self._datos.pop(c, None)
+                self._vence.pop(c, None)
+            return borradas
+
+    def expire(self, clave: str, segundos: float) -> bool:
+        with self._lock:
+            clave = _texto(clave)
+            if self._vivo(clave) is None:
+                return False
+            self._vence[clave] = self._reloj() + float(segundos)
+            return True
+
+    def ttl(self, clave: str) -> int:
+        """Segundos restantes; -1 sin expiración, -2 si no existe (como Redis)."""
+        with self._lock:
+            clave = _texto(clave)
+            if self._vivo(clave) is None:
+                return -2
+            vence = self._vence.get(clave)
+            return -1 if vence is None else max(0, round(vence - self._reloj()))
+
+    # ─────────── Strings ───────────
+    def get(self, clave: str) -> Optional[str]:
+        with self._lock:
+            valor = self._vivo(_texto(clave))
+            return valor if isinstance(valor, str) or valor is None else None
+
+    def set(self, clave: str, valor: Any, ex: Optional[float] = None) -> bool:
+        with self._lock:
+            clave = _texto(clave)
+            self._datos[clave] = _texto(valor)
+            self._vence.pop(clave, None)
+            if ex is not None:
+                self._vence[clave] = self._reloj() + float(ex)
+        return True
+
+    def incr(self, clave: str, cantidad: int = 1) -> int:
+        with self._lock:
+            clave = _texto(clave)
+            valor = int(self._vivo(clave) or 0) + int(cantidad)
+            self._datos[clave] = str(valor)
+            return valor
+
+    # ─────────── Hashes ───────────
+    def _hash(self, clave: str, crear: bool = False) -> Optional[Dict[str, str]]:
+        valor = self._vivo(clave)
+        if valor is None and crear:
+            valor = self._datos[clave] = {}
+        return valor if isinstance(valor, dict) else None
+
+    def hset(self, clave: str, campo: Any = None, valor: Any = None, mapping: Optional[Dict] = None) -> int:
+        with self._lock:
+            h = self._hash(_texto(clave), crear=True)
+            nuevos = dict(mapping or {})
+            if campo is not None:
+                nuevos[campo] = valor
+            agregados = 0
+            for c, v in nuevos.items():
+                c = _texto(c)
+                agregados += c not in h
+                h[c] = _texto(v)
+            return agregados
+
+    def hget(self, clave: str, campo: Any) -> Optional[str]:
+        with self._lock:
+            return (self._hash(_texto(clave)) or {}).get(_texto(campo))
+
+    def hmget(self, clave: str, campos) -> List[Optional[str]]:
+        with self._lock:
+            h = self._hash(_texto(clave)) or {}
+            return [h.get(_texto(c)) for c in campos]
+
+    def hgetall(self, clave: str) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._hash(_texto(clave)) or {})
+
+    def hlen(self, clave: str) -> int:
+        with self._lock:
+            return len(self._hash(_texto(clave)) or {})
@@ -0,0 +1,383 @@
+# codigo/refresco.py
+"""
+🔄 Refresco incremental de mercados (etapas 1 → 3 + triadas USDT).
+
+Binance cambia sus listados unas pocas veces por semana, pero cada corrida
+reconstruía la tabla estandarizada, el filtro spot, la separación por anclas y
+las triadas desde cero. Acá se guarda el estado de la corrida anterior y solo
+se propaga el delta:
+
+1. Los markets crudos se comparan contra los de la generación previa
+   (igualdad de dicts) y solo los agregados/cambiados se normalizan; la tabla
+   estandarizada resultante se compara contra la previa (vectorizado):
+   símbolos agregados, eliminados y cambiados (`active`, precisiones, mínimos…).
+2. Solo las filas agregadas/cambiadas pasan por `filtrar` (el filtro es fila a
+   fila); el resto de `spot` / `descartados` se reutiliza.
+3. La separación por ancla se reutiliza si no cambió el conjunto de pares spot
+   (symbol / base / quote); si cambió, solo en los directo / invertido /
+   indirecto previos donde cae algún par que salió o entró se quitan e
+   intercalan esas filas (el resto de los frames se reutiliza).
+4. Las triadas, en ese mismo caso, se rehacen con
+   `absorcion.triadas.actualizar_triadas`: se conservan las previas y solo se
+   enumera el subgrafo alrededor de los pares que entraron.
+
+Cada refresco es una generación. Sin cambios (o con el mismo snapshot) la
+generación es "no-op": no se normaliza, filtra, separa ni enumera nada. Si
+cambian el mapeo de campos, los criterios del filtro o las anclas
+(`firma_config`) se reconstruye todo. La generación y
+el diff se anuncian por Redis (`CANAL_MERCADOS`) si hay servidor.
+
+Estado: `datos/estandar/refresco_<exchange>.pkl` (escritura atómica).
+
+CLI:
+    python -m codigo.refresco [--reconstruir]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import sys
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.arranque import perfil_si_se_pide  # type: ignore
+perfil_si_se_pide(__name__, __file__)
+
+import numpy as np
+import pandas as pd
+
+from absorcion.triadas import GrafoMercados, Triadas, actualizar_triadas, enumerar_triadas  # type: ignore
+from codigo.config import ANCLAS, CANAL_MERCADOS, DATOS_DIR, EXCHANGE_ID  # type: ignore
+
+_VERSION_ESTADO = 1
+Separados = Dict[str, Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]]
+
+
+def _etapa(nombre: str):
+    return importlib.import_module(f"codigo.{nombre}")
+
+
+def ruta_estado(exchange_id: str = EXCHANGE_ID) -> Path:
+    return DATOS_DIR / "estandar" / f"refresco_{exchange_id}.pkl"
+
+
+# ─────────── Diff de la tabla estandarizada ───────────
+@dataclass
+class DiffMercados:
+    agregados: List[str] = field(default_factory=list)
+    eliminados: List[str] = field(default_factory=list)
+    cambiados: Dict[str, List[str]] = field(default_factory=dict)  # símbolo → campos que cambiaron
+
+    @property
+    def vacio(self) -> bool:
+        return not (self.agregados or self.eliminados or self.cambiados)
+
+    @property
+    def tocados(self) -> List[str]:
+        return self.agregados + list(self.cambiados)
+
+    def resumen(self) -> str:
+        return f"+{len(self.agregados)} −{len(self.eliminados)} ~{len(self.cambiados)}"
+
+    def a_dict(self) -> dict:
+        return {"agregados": self.agregados, "eliminados": self.eliminados, "cambiados": self.cambiados}
+
+
+def diff_tablas(previa: pd.DataFrame, nueva: pd.DataFrame, clave: str = "symbol") -> DiffMercados:
+    """Compara dos tablas estandarizadas por `clave` en sus columnas comunes (NaN == NaN cuenta como igual)."""
+    a = previa.drop_duplicates(clave, keep="last").set_index(clave)
+    b = nueva.drop_duplicates(clave, keep="last").set_index(clave)
+    comunes = a.index.intersection(b.index, sort=False)
+    columnas = [c for c in b.columns if c in a.columns]
+    ca, cb = a.loc[comunes, columnas], b.loc[comunes, columnas]
+    # Hash por fila (vectorizado) y comparación campo a campo solo en las filas que difieren
+    difieren = np.flatnonzero(
+        pd.util.hash_pandas_object(ca, index=False).to_numpy()
+        != pd.util.hash_pandas_object(cb, index=False).to_numpy()
+    )
+    va = ca.iloc[difieren].astype(object).to_numpy()
+    vb = cb.iloc[difieren].astype(object).to_numpy()
+    distinto = ~((va == vb) | (pd.isna(va) & pd.isna(vb)))
+    cols = np.asarray(columnas, dtype=object)
+    cambiados = {
+        str(comunes[i]): cols[fila].tolist() for i, fila in zip(difieren, distinto) if fila.any()
+    }
+    return DiffMercados(
+        agregados=[str(s) for s in b.index.difference(a.index, sort=False)],
+        eliminados=[str(s) for s in a.index.difference(b.index, sort=False)],
+        cambiados=cambiados,
+    )
+
+
+# ─────────── Estado entre corridas ───────────
+@dataclass
+class EstadoRefresco:
+    exchange_id: str
+    generacion: int
+    markets_ts: int
+    firma: str                    # firma_config() con la que se construyó
+    markets: Dict[str, dict]      # load_markets() crudo de la generación (diff barato por igualdad)
+    estandar: pd.DataFrame
+    spot: pd.DataFrame
+    descartados: pd.DataFrame
+    separados: Separados
+    triadas: Triadas
+
+
+def cargar_estado(exchange_id: str = EXCHANGE_ID, path: Optional[Path] = None) -> Optional[EstadoRefresco]:
+    path = path or ruta_estado(exchange_id)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "rb") as f:
+            version, estado = pickle.load(f)
+    except Exception as e:  # noqa: BLE001 — estado ilegible = reconstrucción completa
+        print(f"⚠️ Estado de refresco ilegible ({path.name}): {e}")
+        return None
+    if version != _VERSION_ESTADO or estado.exchange_id != exchange_id:
+        return None
+    return estado
+
+
+def guardar_estado(estado: EstadoRefresco, path: Optional[Path] = None) -> None:
+    path = path or ruta_estado(estado.exchange_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump((_VERSION_ESTADO, estado), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, path)
+
+
+# ─────────── Propagación del delta ───────────
+def _ordenar_como(df: pd.DataFrame, orden: pd.Index) -> pd.DataFrame:
+    """Filas de `df` en el orden de `orden` (el de la tabla estandarizada, como en una corrida completa)."""
+    pos = orden.get_indexer(df["symbol"])
+    return df.iloc[np.argsort(pos, kind="stable")].reset_index(drop=True)
+
+
+def _reemplazar(previo: pd.DataFrame, fuera: pd.Index, delta: pd.DataFrame) -> pd.DataFrame:
+    conservado = previo[~previo["symbol"].isin(fuera)]
+    if delta.empty:
+        return conservado
+    if conservado.empty:
+        return delta
+    return pd.concat([conservado, delta], ignore_index=True)
+
+
+def _lado(base: np.ndarray, quote: np.ndarray, ancla: str) -> np.ndarray:
+    """Frame de `separar` en el que cae cada par: 0 directo, 1 invertido, 2 indirecto."""
+    return np.where(quote == ancla, 0, np.where(base == ancla, 1, 2))
+
+
+def _separar_delta(previos: Separados, salen: pd.DataFrame, entran: pd.DataFrame) -> Separados:
+    """
+    Separación por ancla de la tabla spot nueva a partir de la previa: mismas
+    filas y orden que `separar_por_anclas(spot)`; los frames que se tocan
+    quedan con índice posicional. `salen` son los pares previos que ya no
+    están y `entran` las filas spot con pares nuevos (un símbolo que cambió de
+    base/quote está en ambos). Cada par se ubica con `_lado` y solo se
+    recortan / intercalan (por búsqueda binaria sobre el symbol ya ordenado)
+    los frames donde cae alguno.
+    """
+    cols = ["symbol", "base", "quote"]
+    entran = entran[cols].sort_values(by="symbol")
+    e_sym, e_base, e_quote = (entran[c].to_numpy(dtype=object) for c in cols)
+    s_sym, s_base, s_quote = (salen[c].to_numpy(dtype=object) for c in cols)
+
+    out: Separados = {}
+    for ancla, frames in previos.items():
+        lado_e, lado_s = _lado(e_base, e_quote, ancla), _lado(s_base, s_quote, ancla)
+        parchados = []
+        for k, f in enumerate(frames):
+            quita = np.sort(s_sym[lado_s == k])
+            agrega = np.flatnonzero(lado_e == k)
+            if not len(quita) and not len(agrega):
+                parchados.append(f)
+                continue
+            f_sym = f["symbol"].to_numpy(dtype=object)
+            quedan = np.delete(np.arange(len(f)), np.searchsorted(f_sym, quita))
+            pos = np.searchsorted(f_sym[quedan], e_sym[agrega]) + np.arange(len(agrega))
+            origen = np.empty(len(quedan) + len(agrega), dtype=np.int64)
+            libre = np.ones(len(origen), dtype=bool)
+            libre[pos] = False
+            origen[libre] = quedan
+            origen[pos] = len(f) + agrega
+            fuente = entran if f.empty else pd.concat([f, entran])
+            parchados.append(fuente.iloc[origen].reset_index(drop=True))
+        out[ancla] = tuple(parchados)  # type: ignore[assignment]
+    return out
+
+
+def _pares(df: pd.DataFrame) -> pd.Series:
+    return df["symbol"].astype(str) + "|" + df["base"].astype(str) + "|" + df["quote"].astype(str)
+
+
+@dataclass
+class Refresco:
+    estado: EstadoRefresco
+    diff: DiffMercados
+    noop: bool = False
+    completo: bool = False  # sin estado previo: reconstrucción entera
+    tiempo_s: float = 0.0
+
+
+def firma_config(exchange_id: str = EXCHANGE_ID) -> str:
+    """Mapeo de campos, criterios del filtro y anclas: si cambian, el estado previo no sirve."""
+    from codigo.static.campos_estandar import MAPPING, TARGET_FIELDS  # type: ignore
+
+    e2, e3 = _etapa("2_filtrar_spot"), _etapa("3_simbolos_separacion")
+    criterios = sorted((c, sorted(v)) for c, v in e2.cargar_criterios().items())
+    partes = (TARGET_FIELDS, sorted(MAPPING.get(exchange_id, {}).items()), criterios, e3.INTERESADO_EN, ANCLAS)
+    return hashlib.sha1(repr(partes).encode()).hexdigest()
+
+
+def _completo(markets: Dict[str, dict], ts: int, generacion: int, exchange_id: str, firma: str) -> EstadoRefresco:
+    e2, e3 = _etapa("2_filtrar_spot"), _etapa("3_simbolos_separacion")
+    estandar = _etapa("1_mapear_campos_estandar").construir_tabla_estandar(markets, exchange_id)
+    spot, descartados = e2.filtrar(estandar)
+    spot = spot.reset_index(drop=True)
+    return EstadoRefresco(
+        exchange_id=exchange_id,
+        generacion=generacion,
+        markets_ts=ts,
+        firma=firma,
+        markets=dict(markets),
+        estandar=estandar,
+        spot=spot,
+        descartados=descartados.reset_index(drop=True),
+        separados=e3.separar_por_anclas(spot),
+        triadas=enumerar_triadas(GrafoMercados.desde_pares(spot), e3.INTERESADO_EN),
+    )
+
+
+def refrescar(
+    markets: Dict[str, dict],
+    ts: int,
+    previo: Optional[EstadoRefresco] = None,
+    exchange_id: str = EXCHANGE_ID,
+) -> Refresco:
+    """Nueva generación de estandar / spot / separación / triadas a partir de `previo` + delta."""
+    t0 = time.perf_counter()
+    generacion = (previo.generacion if previo is not None else 0) + 1
+
+    # Mismo snapshot que la generación anterior: nada que mirar
+    if previo is not None and previo.markets_ts == ts:
+        return Refresco(replace(previo, generacion=generacion), DiffMercados(), noop=True,
+                        tiempo_s=time.perf_counter() - t0)
+
+    firma = firma_config(exchange_id)
+    if previo is None or previo.firma != firma:
+        estado = _completo(markets, ts, generacion, exchange_id, firma)
+        diff = DiffMercados(agregados=estado.estandar["symbol"].astype(str).tolist())
+        return Refresco(estado, diff, completo=True, tiempo_s=time.perf_counter() - t0)
+
+    # 1) Diff crudo (igualdad de dicts, en C) y normalización solo de lo que cambió
+    claves = list(markets)
+    crudos = [k for k in claves if previo.markets.get(k) != markets[k]]
+    quitados = [k for k in previo.markets if k not in markets]
+    if not crudos and not quitados:
+        estado = replace(previo, generacion=generacion, markets_ts=ts, markets=dict(markets))
+        return Refresco(estado, DiffMercados(), noop=True, tiempo_s=time.perf_counter() - t0)
+
+    e1 = _etapa("1_mapear_campos_estandar")
+    estandar_d = e1.construir_tabla_estandar({k: markets[k] for k in crudos}, exchange_id)
+    pos_prev = pd.Index(list(previo.markets), dtype=object)
+    tocados_prev = pos_prev.get_indexer(pd.Index(crudos + quitados, dtype=object))
+    diff = diff_tablas(previo.estandar.iloc[tocados_prev[tocados_prev >= 0]], estandar_d)
+
+    # Tabla completa en el orden de `markets` (filas previas + filas re-normalizadas)
+    nuevo = pd.Series(np.arange(len(crudos)) + len(previo.estandar), index=crudos)
+    fila = pos_prev.get_indexer(pd.Index(claves, dtype=object))
+    fila[pd.Index(claves, dtype=object).isin(crudos)] = nuevo.reindex([k for k in claves if k in nuevo.index]).to_numpy()
+    estandar = pd.concat([previo.estandar, estandar_d], ignore_index=True).iloc[fila].reset_index(drop=True)
+
+    if diff.vacio:  # cambió algo crudo que no llega a la tabla estandarizada (p. ej. `info`)
+        estado = replace(previo, generacion=generacion, markets_ts=ts, markets=dict(markets), estandar=estandar)
+        return Refresco(estado, diff, noop=True, tiempo_s=time.perf_counter() - t0)
+
+    e2, e3 = _etapa("2_filtrar_spot"), _etapa("3_simbolos_separacion")
+    orden = pd.Index(estandar["symbol"], dtype=object)
+    fuera = pd.Index(diff.eliminados + diff.tocados, dtype=object)
+
+    # 2) Filtro solo sobre lo agregado/cambiado
+    spot_d, desc_d = e2.filtrar(estandar_d[estandar_d["symbol"].isin(diff.tocados)])
+    spot = _ordenar_como(_reemplazar(previo.spot, fuera, spot_d), orden)
+    descartados = _ordenar_como(_reemplazar(previo.descartados, fuera, desc_d), orden)
+
+    # 3) y 4) Separación y triadas dependen solo de los pares spot (symbol / base / quote)
+    pares_prev, pares_nuevos = _pares(previo.spot), _pares(spot)
+    nuevo_par = ~pares_nuevos.isin(pares_prev).to_numpy()
+    sale_par = ~pares_prev.isin(pares_nuevos).to_numpy()
+    if not nuevo_par.any() and not sale_par.any():
+        separados, triadas = previo.separados, previo.triadas
+    else:
+        entran = spot.loc[nuevo_par]
+        separados = _separar_delta(previo.separados, previo.spot.loc[sale_par], entran)
+        triadas = actualizar_triadas(previo.triadas, spot, entran["symbol"], e3.INTERESADO_EN)
+
+    estado = EstadoRefresco(
+        exchange_id=exchange_id,
+        generacion=generacion,
+        markets_ts=ts,
+        firma=firma,
+        markets=dict(markets),
+        estandar=estandar,
+        spot=spot,
+        descartados=descartados,
+        separados=separados,  # type: ignore[arg-type]
+        triadas=triadas,
+    )
+    return Refresco(estado, diff, tiempo_s=time.perf_counter() - t0)
+
+
+def anunciar(ref: Refresco, cliente=None) -> None:
+    """Publica generación + diff en `CANAL_MERCADOS` (no-op si no hay Redis)."""
+    if cliente is None:
+        from codigo.cache_redis import conectar  # type: ignore
+
+        cliente = conectar(avisar=False)
+    if cliente is None:
+        return
+    cliente.publish(CANAL_MERCADOS, json.dumps({
+        "exchange": ref.estado.exchange_id,
+        "generacion": ref.estado.generacion,
+        "markets_ts": ref.estado.markets_ts,
+        "noop": ref.noop,
+        "completo": ref.completo,
+        "diff": {} if ref.completo else ref.diff.a_dict(),
+    }))
+
+
+def main(argv: list[str] | None = None) -> None:
+    from codigo.snapshot import obtener_snapshot  # type: ignore
+
+    parser = argparse.ArgumentParser(description="Refresco incremental de mercados")
+    parser.add_argument("--reconstruir", action="store_true", help="Ignora el estado previo")
+    args = parser.parse_args(argv)
+
+    snap = obtener_snapshot(EXCHANGE_ID, incluir_tickers=False)
+    previo = None if args.reconstruir else cargar_estado(EXCHANGE_ID)
+    ref = refrescar(snap.markets, snap.ts, previo, EXCHANGE_ID)
+    guardar_estado(ref.estado)
+    anunciar(ref)
+
+    tipo = "completa" if ref.completo else ("no-op" if ref.noop else "incremental")
+    print(f"🔄 Generación {ref.estado.generacion} ({tipo}) en {ref.tiempo_s * 1000:.1f} ms — diff {ref.diff.resumen()}")
+    print(f"🔹 Spot {len(ref.estado.spot)} · descartados {len(ref.estado.descartados)} · triadas {len(ref.estado.triadas)}")
+    for simbolo, campos in list(ref.diff.cambiados.items())[:10]:
+        print(f"   ~ {simbolo}: {', '.join(campos)}")
+
+
+if __name__ == "__main__":
+    main()
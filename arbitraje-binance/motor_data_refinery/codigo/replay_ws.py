@@ -0,0 +1,210 @@
+# codigo/replay_ws.py
+"""
+🔁 Servidor WebSocket local que reproduce mensajes bookTicker grabados.
+
+Imita el endpoint de combined streams de Binance (`/stream?streams=a@bookTicker/b@bookTicker`)
+para probar `codigo/feed_bookticker.py` sin red:
+
+- Lee un JSONL con mensajes combinados `{"stream", "data"}` (lo que graba
+  `feed_bookticker --grabar`) y a cada cliente le envía solo los de sus streams.
+- `--velocidad` escala el ritmo original (según `data.E` o el orden si no hay
+  timestamps); `--velocidad 0` envía todo sin pausas.
+- `--cortar-cada N` cierra la conexión cada N mensajes para ejercitar la
+  reconexión y la detección de huecos del feed.
+- `--sintetico N` genera una grabación de N updates sobre los símbolos de
+  `simbolos_spot_<exchange>.csv` (random walk con spread fijo).
+
+CLI:
+    python -m codigo.replay_ws --grabacion feed.jsonl [--puerto 8765] [--velocidad 1] [--loop]
+    python -m codigo.replay_ws --sintetico 50000 --grabacion feed.jsonl   # solo genera
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.feed_bookticker import id_stream, simbolos_spot  # type: ignore
+
+PUERTO_DEFECTO = 8765
+
+
+def cargar_grabacion(path: Path) -> List[dict]:
+    """Mensajes combinados del JSONL (acepta también payloads sueltos de bookTicker)."""
+    mensajes = []
+    with open(path, encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            msg = json.loads(linea)
+            if "data" not in msg:
+                msg = {"stream": f"{str(msg['s']).lower()}@bookTicker", "data": msg}
+            mensajes.append(msg)
+    return mensajes
+
+
+def grabacion_sintetica(simbolos: Sequence[str], n: int, semilla: int = 7, spread: float = 2e-4) -> List[dict]:
+    """n updates bookTicker (random walk por símbolo), con updateId creciente global."""
+    rng = np.random.default_rng(semilla)
+    ids = [id_stream(s) for s in simbolos]
+    medio = np.exp(rng.uniform(-5, 5, len(ids)))
+    quien = rng.integers(0, len(ids), n)
+    paso = np.exp(rng.normal(0, 5e-4, n))
+    qty = rng.uniform(0.1, 100, (n, 2))
+    out = []
+    for k, (i, p) in enumerate(zip(quien.tolist(), paso.tolist())):
+        medio[i] *= p
+        out.append({
+            "stream": f"{ids[i]}@bookTicker",
+            "data": {
+                "u": k + 1, "s": ids[i].upper(),
+                "b": f"{medio[i] * (1 - spread):.8g}", "B": f"{qty[k, 0]:.4f}",
+                "a": f"{medio[i] * (1 + spread):.8g}", "A": f"{qty[k, 1]:.4f}",
+            },
+        })
+    return out
+
+
+def guardar_grabacion(mensajes: List[dict], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for m in mensajes:
+            f.write(json.dumps(m, separators=(",", ":")) + "\n")
+
+
+class ServidorReplay:
+    """App aiohttp con el endpoint `/stream` que reproduce `mensajes`."""
+
+    def __init__(
+        self,
+        mensajes: List[dict],
+        velocidad: float = 0.0,
+        loop: bool = False,
+        cortar_cada: int = 0,
+        intervalo_s: float = 0.001,
+    ):
+        self.mensajes = mensajes
+        self.velocidad = velocidad
+        self.loop = loop
+        self.cortar_cada = cortar_cada
+        self.intervalo_s = intervalo_s  # pausa por mensaje si la grabación no trae `E`
+        self.enviados = 0
+        self.conexiones = 0
+        # Posición por conjunto de streams: al reconectar, el cliente sigue donde quedó
+        self._posicion: dict = {}
+
+    def app(self):
+        from aiohttp import web
+
+        app = web.Application()
+        app.router.add_get("/stream", self._stream)
+        app.router.add_get("/ws", self._stream)
+        return app
+
+    async def _esperar(self, previo: Optional[dict], actual: dict) -> None:
+        if self.velocidad <= 0:
+            if self.enviados % 1000 == 0:
+                await asyncio.sleep(0)  # cede el loop a los demás clientes
+            return
+        e0, e1 = (previo or {}).get("data", {}).get("E"), actual["data"].get("E")
+        dt = (e1 - e0) / 1000.0 if e0 is not None and e1 is not None else self.intervalo_s
+        await asyncio.sleep(max(dt, 0.0) / self.velocidad)
+
+    async def _stream(self, request):
+        from aiohttp import web
+
+        streams = frozenset(s for s in request.query.get("streams", "").split("/") if s)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.conexiones += 1
+
+        propios = [m for m in self.mensajes if not streams or m["stream"] in streams]
+        pos = self._posicion.get(streams, 0)
+        enviados_conexion = 0
+        previo = None
+        try:
+            while propios and not ws.closed:
+                if pos >= len(propios):
+                    if not self.loop:
+                        break
+                    pos = 0
+                msg = propios[pos]
+                await self._esperar(previo, msg)
+                await ws.send_str(json.dumps(msg, separators=(",", ":")))
+                previo = msg
+                pos += 1
+                self.enviados += 1
+                enviados_conexion += 1
+                if self.cortar_cada and enviados_conexion >= self.cortar_cada:
+                    break
+            self._posicion[streams] = pos
+            if not self.cortar_cada:
+                # Fin de la grabación: se deja abierta (el feed decide por silencio)
+                async for _ in ws:
+                    pass
+        except ConnectionResetError:
+            self._posicion[streams] = pos
+        finally:
+            await ws.close()
+        return ws
+
+
+async def servir(servidor: ServidorReplay, host: str = "127.0.0.1", puerto: int = PUERTO_DEFECTO):
+    """Levanta el servidor y devuelve el runner (llamar `await runner.cleanup()` al terminar)."""
+    from aiohttp import web
+
+    runner = web.AppRunner(servidor.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, puerto).start()
+    return runner
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay WebSocket local de bookTicker grabado")
+    parser.add_argument("--grabacion", type=Path, required=True, help="JSONL de mensajes combinados")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=PUERTO_DEFECTO)
+    parser.add_argument("--velocidad", type=float, default=1.0, help="0 = sin pausas")
+    parser.add_argument("--loop", action="store_true", help="Repetir la grabación indefinidamente")
+    parser.add_argument("--cortar-cada", type=int, default=0, help="Cerrar la conexión cada N mensajes")
+    parser.add_argument("--sintetico", type=int, default=0, help="Generar N updates sintéticos en --grabacion y salir")
+    args = parser.parse_args(argv)
+
+    if args.sintetico:
+        simbolos = simbolos_spot()
+        if not simbolos:
+            sys.exit(1)
+        guardar_grabacion(grabacion_sintetica(simbolos, args.sintetico), args.grabacion)
+        print(f"✅ {args.sintetico} updates sintéticos ({len(simbolos)} símbolos) → {args.grabacion}")
+        return
+
+    mensajes = cargar_grabacion(args.grabacion)
+    servidor = ServidorReplay(mensajes, args.velocidad, args.loop, args.cortar_cada)
+    print(f"🔁 {len(mensajes)} mensajes · ws://{args.host}:{args.puerto}/stream?streams=...")
+
+    async def _correr():
+        runner = await servir(servidor, args.host, args.puerto)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await runner.cleanup()
+
+    try:
+        asyncio.run(_correr())
+    except KeyboardInterrupt:
+        print(f"\n👋 {servidor.enviados} mensajes enviados en {servidor.conexiones} conexiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# codigo/snapshot.py
+"""
+📸 Snapshot único de markets + tickers para toda la refinería.
+
+Antes cada etapa (1, 4, 5, 6) instanciaba su propio `ccxt.<exchange>` y llamaba
+a `load_markets()` / `fetch_tickers()`: una corrida pagaba ~4 descargas de
+markets y 3 de tickers, y cada etapa cotizaba contra un instante distinto.
+
+Este módulo descarga ambos UNA sola vez, los sella con un timestamp y los
+persiste en un caché compacto en disco (JSON gzip) con TTL. Todas las etapas
+usan el mismo accessor `obtener_snapshot()`, por lo que las equivalencias
+derivadas quedan consistentes al mismo tick.
+
+Uso:
+    from codigo.snapshot import obtener_snapshot, precio_last
+    snap = obtener_snapshot()            # markets + tickers (caché si vigente)
+    snap = obtener_snapshot(forzar=True) # fuerza descarga nueva
+
+CLI:
+    python codigo/snapshot.py [--forzar]
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+# Rutas/imports robustos (script o módulo)
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.config import EXCHANGE_ID, CCXT_OPTIONS, SNAPSHOT_DIR, SNAPSHOT_TTL_S  # type: ignore
+
+# Campos del ticker que conservamos en el caché (el resto, incl. `info`, se descarta)
+CAMPOS_TICKER = (
+    "symbol", "timestamp", "last", "close",
+    "bid", "ask", "bidVolume", "askVolume",
+    "baseVolume", "quoteVolume",
+)
+
+
+@dataclass
+class Snapshot:
+    """Markets + tickers de un exchange tomados en el mismo instante."""
+    exchange_id: str
+    ts: int                                   # epoch ms del momento de captura
+    markets: Dict[str, Dict[str, Any]]
+    tickers: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def edad_s(self) -> float:
+        return max(0.0, time.time() - self.ts / 1000.0)
+
+
+# Memo en proceso: una sola lectura/descarga por exchange y proceso
+_MEMO: Dict[str, Snapshot] = {}
+
+
+def ruta_cache(exchange_id: str = EXCHANGE_ID) -> Path:
+    return SNAPSHOT_DIR / f"snapshot_{exchange_id}.json.gz"
+
+
+def precio_last(ticker: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Devuelve el último precio del ticker (last → close → info.lastPrice)."""
+    if not ticker:
+        return None
+    last = ticker.get("last") or ticker.get("close") or (ticker.get("info") or {}).get("lastPrice")
+    if last is None:
+        return None
+    try:
+        return float(last)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compactar_ticker(t: Dict[str, Any]) -> Dict[str, Any]:
+    out = {k: t.get(k) for k in CAMPOS_TICKER}
+    if out.get("last") is None:
+        out["last"] = precio_last(t)
+    # Texto original del exchange (antes de que ccxt lo pase a float): la
+    # verificación Decimal de las equivalencias parte de acá
+    texto = (t.get("info") or {}).get("lastPrice")
+    if isinstance(texto, str):
+        out["last_texto"] = texto
+    return out
+
+
+def _descargar(exchange_id: str, incluir_tickers: bool) -> Snapshot:
+    import ccxt  # import diferido: los caminos con caché no pagan ccxt
+
+    ex_class = getattr(ccxt, exchange_id)
+    ex = ex_class(CCXT_OPTIONS)
+    markets = ex.load_markets()
+    tickers = ex.fetch_tickers() if incluir_tickers else {}
+    ts = int(time.time() * 1000)
+    return Snapshot(
+        exchange_id=exchange_id,
+        ts=ts,
+        markets=dict(markets),
+        tickers={s: _compactar_ticker(t) for s, t in tickers.items()},
+    )
+
+
+def _leer_cache(path: Path) -> Optional[Snapshot]:
+    if not path.exists():
+        return None
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            raw = json.load(f)
+        return Snapshot(
+            exchange_id=raw["exchange_id"],
+            ts=int(raw["ts"]),
+            markets=raw["markets"],
+            tickers=raw.get("tickers") or {},
+        )
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️ Caché de snapshot ilegible ({path.name}): {e}")
+        return None
+
+
+def _escribir_cache(snap: Snapshot, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    payload = {
+        "exchange_id": snap.exchange_id,
+        "ts": snap.ts,
+        "markets": snap.markets,
+        "tickers": snap.tickers,
+    }
+    with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+        json.dump(payload, f, separators=(",", ":"), default=str)
+    os.replace(tmp, path)
+
+
+def _vigente(snap: Optional[Snapshot], ttl_s: float, incluir_tickers: bool) -> bool:
+    if snap is None:
+        return False
+    if incluir_tickers and not snap.tickers:
+        return False
+    return snap.edad_s() <= ttl_s
+
+
+def obtener_snapshot(
+    exchange_id: str = EXCHANGE_ID,
+    ttl_s: float = SNAPSHOT_TTL_S,
+    incluir_tickers: bool = True,
+    forzar: bool = False,
+) -> Snapshot:
+    """
+    Accessor común de todas las etapas.
+
+    Orden de resolución: memo en proceso → caché en disco (si no venció el TTL)
+    → caché Redis compartida entre contenedores (`codigo/cache_redis.py`)
+    → descarga CCXT (una sola instancia, un load_markets y un fetch_tickers).
+    Redis (y su sondeo TCP) se resuelve recién si fallan el memo y el disco.
+    """
+    from codigo.cache_redis import CacheRefineria  # type: ignore  (import diferido: evita el ciclo)
+
+    if not forzar:
+        snap = _MEMO.get(exchange_id)
+        if not _vigente(snap, ttl_s, incluir_tickers):
+            snap = _leer_cache(ruta_cache(exchange_id))
+        if _vigente(snap, ttl_s, incluir_tickers):
+            _MEMO[exchange_id] = snap  # type: ignore[assignment]
+            return snap  # type: ignore[return-value]
+
+    cache = CacheRefineria.por_defecto(exchange_id)
+    if not forzar and cache is not None:
+        snap = cache.leer_snapshot(incluir_tickers)
+        if _vigente(snap, ttl_s, incluir_tickers):
+            _escribir_cache(snap, ruta_cache(exchange_id))  # type: ignore[arg-type]
+            _MEMO[exchange_id] = snap  # type: ignore[assignment]
+            return snap  # type: ignore[return-value]
+
+    snap = _descargar(exchange_id, incluir_tickers)
+    _escribir_cache(snap, ruta_cache(exchange_id))
+    if cache is not None:
+        cache.guardar_snapshot(snap)
+    _MEMO[exchange_id] = snap
+    return snap
+
+
+def main() -> None:
+    forzar = "--forzar" in sys.argv[1:]
+    snap = obtener_snapshot(forzar=forzar)
+    print(f"✅ Snapshot {snap.exchange_id}: {len(snap.markets)} markets, {len(snap.tickers)} tickers")
+    print(f"🕒 ts={snap.ts} (edad {snap.edad_s():.1f}s, TTL {SNAPSHOT_TTL_S}s)")
+    print(f"📦 Caché: {ruta_cache(snap.exchange_id)}")
+
+
+if __name__ == "__main__":
+    main()
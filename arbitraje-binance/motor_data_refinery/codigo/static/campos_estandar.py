@@ -14,7 +14,7 @@ Campos objetivo sugeridos (mínimos para spot):
 - symbol, base, quote, active
 - fee_maker, fee_taker
 - price_precision, amount_precision
-- min_price, min_amount
+- min_price, min_amount, min_cost (notional mínimo en moneda quote)
 
 Puedes ampliar TARGET_FIELDS si querés estandarizar más columnas.
 """
@@ -33,6 +33,7 @@ TARGET_FIELDS: List[str] = [
     "amount_precision",
     "min_price",
     "min_amount",
+    "min_cost",
     "spot",
     "type",
     "active", # spot, future, swap, etc. (Dominus: no implementado aún)
@@ -54,6 +55,7 @@ MAPPING: Dict[str, Dict[str, str]] = {
         "precision_amount": "amount_precision",
         "limits_price_min": "min_price",
         "limits_amount_min": "min_amount",
+        "limits_cost_min": "min_cost",
         "active": "active",
         "spot": "spot",
         "type": "type",
@@ -73,6 +75,7 @@ MAPPING: Dict[str, Dict[str, str]] = {
         "type": "type",
         "limits_price_min": "min_price",
         "limits_amount_min": "min_amount",
+        "limits_cost_min": "min_cost",
     },
 }
 
@@ -0,0 +1,308 @@
+# codigo/tabla_compartida.py
+"""
+🧠 Tabla de cotizaciones en memoria compartida (archivo mmap, layout fijo).
+
+La refinería escribe el tope de libro de cada símbolo spot en un archivo de
+layout fijo que otros procesos mapean en memoria: leen el precio vigente en
+microsegundos, sin parsear ni copiar CSV del volumen compartido.
+
+Layout (little-endian, todo alineado a 64 bytes):
+
+    [0, 64)        cabecera  : magic b"ARBQT01\\0" · version u32 · n u32 ·
+                               ancho_simbolo u32 · retirada u32 ·
+                               generacion u64 · creada_ms i64 · (relleno)
+    [64, A)        diccionario: n × S32 (símbolo ASCII, relleno con \\0)
+    [A, A + 64·n)  filas      : seq u64 · id u32 · (pad u32) · bid f64 · ask f64 ·
+                               bid_qty f64 · ask_qty f64 · ts i64 (epoch ms) · (pad u64)
+
+    A = 64 + redondeo_arriba(32·n, 64)
+
+Cada fila es una línea de caché con su propio seqlock: el escritor pasa `seq`
+a impar, escribe los campos y lo vuelve a par. El lector copia la fila entre
+dos lecturas de `seq` y reintenta si cambió o era impar. `generacion` sube en
+cada escritura (barato para saber si hubo cambios). Hay un único escritor por
+archivo; el orden de stores lo garantiza x86 (TSO); en otras arquitecturas un
+lector nativo debe usar barreras acquire al leer `seq`.
+
+Si cambia el universo de símbolos, `crear` arma un archivo nuevo y lo renombra
+encima del anterior (atómico), y después marca `retirada = 1` en el viejo (que
+sigue mapeado): los lectores que lo tenían mapeado lo ven y, al reabrir, ya
+encuentran el nuevo.
+
+Uso:
+    tabla = TablaCompartida.crear(TABLA_COMPARTIDA_PATH, simbolos)   # escritor
+    tabla.escribir(filas, bid, ask, bid_qty, ask_qty, ts)
+    lector = TablaCompartida.abrir(TABLA_COMPARTIDA_PATH)            # otro proceso
+    lector.leer("BTC/USDT")                                          # (bid, ask, bid_qty, ask_qty, ts)
+
+CLI (inspección):
+    python -m codigo.tabla_compartida [--path ...] [--simbolo BTC/USDT]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
+
+from codigo.config import TABLA_COMPARTIDA_PATH  # type: ignore
+
+MAGIC = b"ARBQT01\0"
+VERSION = 1
+ANCHO_SIMBOLO = 32
+ESPERA_MAX_S = 1.0  # un escritor desalojado a mitad de fila deja `seq` impar: se cede la CPU y se reintenta
+
+CABECERA = np.dtype([
+    ("magic", "S8"), ("version", "<u4"), ("n", "<u4"),
+    ("ancho_simbolo", "<u4"), ("retirada", "<u4"),
+    ("generacion", "<u8"), ("creada_ms", "<i8"),
+    ("_relleno", "V24"),
+])
+FILA = np.dtype([
+    ("seq", "<u8"), ("id", "<u4"), ("_pad", "<u4"),
+    ("bid", "<f8"), ("ask", "<f8"), ("bid_qty", "<f8"), ("ask_qty", "<f8"),
+    ("ts", "<i8"), ("_pad2", "<u8"),
+])
+CAMPOS = ("bid", "ask", "bid_qty", "ask_qty", "ts")
+assert CABECERA.itemsize == 64 and FILA.itemsize == 64
+
+
+def _redondear(n: int, a: int = 64) -> int:
+    return (n + a - 1) // a * a
+
+
+def _offsets(n: int) -> Tuple[int, int, int]:
+    """(inicio del diccionario, inicio de las filas, tamaño total)."""
+    inicio_filas = CABECERA.itemsize + _redondear(ANCHO_SIMBOLO * n)
+    return CABECERA.itemsize, inicio_filas, inicio_filas + FILA.itemsize * n
+
+
+def _ceder(limite: Optional[float], que: str) -> float:
+    """Cede la CPU al escritor; aborta si el seqlock no se estabiliza en `ESPERA_MAX_S`."""
+    ahora = time.monotonic()
+    if limite is None:
+        return ahora + ESPERA_MAX_S
+    if ahora > limite:
+        raise RuntimeError(f"❌ {que} en escritura continua (seqlock sin estabilizar)")
+    time.sleep(0)
+    return limite
+
+
+class TablaCompartida:
+    """Vista numpy (sin copias) sobre el archivo mapeado."""
+
+    def __init__(self, path: Path, escritura: bool = False):
+        self.path = Path(path)
+        self.escritura = escritura
+        modo = "r+" if escritura else "r"
+        cab = np.memmap(self.path, dtype=CABECERA, mode="r", shape=(1,))
+        if bytes(cab["magic"][0]) != MAGIC.rstrip(b"\0") or int(cab["version"][0]) != VERSION:
+            raise ValueError(f"❌ {self.path} no es una tabla compartida v{VERSION}")
+        n = int(cab["n"][0])
+        del cab
+        inicio_dic, inicio_filas, total = _offsets(n)
+        self._mm = np.memmap(self.path, dtype=np.uint8, mode=modo, shape=(total,))
+        self.cabecera = self._mm[:CABECERA.itemsize].view(CABECERA)
+        dic = self._mm[inicio_dic:inicio_dic + ANCHO_SIMBOLO * n].view(f"S{ANCHO_SIMBOLO}")
+        self.simbolos = pd.Index([s.decode("ascii") for s in dic.tolist()], dtype=object)
+        self.filas = self._mm[inicio_filas:total].view(FILA)
+        # Vistas por campo: los caminos escalares leen/escriben directo en el mapeo
+        self._seq = self.filas["seq"]
+        self._col = {c: self.filas[c] for c in CAMPOS}
+        self._fila: Dict[str, int] = {s: i for i, s in enumerate(self.simbolos)}
+
+    # ─────────── Creación / apertura ───────────
+    @classmethod
+    def crear(cls, path: Path = TABLA_COMPARTIDA_PATH, simbolos: Sequence[str] = ()) -> "TablaCompartida":
+        """Arma un archivo nuevo (tmp + rename) y retira el anterior si existía."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        simbolos = list(dict.fromkeys(simbolos))
+        largos = [len(s.encode("ascii")) for s in simbolos]
+        if largos and max(largos) > ANCHO_SIMBOLO:
+            raise ValueError(f"❌ Símbolo de más de {ANCHO_SIMBOLO} bytes: {simbolos[int(np.argmax(largos))]}")
+        n = len(simbolos)
+        inicio_dic, inicio_filas, total = _offsets(n)
+
+        buf = np.zeros(total, dtype=np.uint8)
+        cab = buf[:CABECERA.itemsize].view(CABECERA)
+        cab["magic"], cab["version"], cab["n"] = MAGIC, VERSION, n
+        cab["ancho_simbolo"], cab["creada_ms"] = ANCHO_SIMBOLO, int(time.time() * 1000)
+        buf[inicio_dic:inicio_dic + ANCHO_SIMBOLO * n].view(f"S{ANCHO_SIMBOLO}")[:] = simbolos
+        filas = buf[inicio_filas:].view(FILA)
+        filas["id"] = np.arange(n, dtype=np.uint32)
+        for campo in ("bid", "ask"):
+            filas[campo] = np.nan
+
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(buf.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        viejo = None
+        if path.exists():
+            try:
+                viejo = cls(path, escritura=True)
+            except (ValueError, OSError):
+                pass  # archivo ajeno o truncado: se pisa igual
+        os.replace(tmp, path)
+        if viejo is not None:
+            # Recién ahora: un lector que ve la marca y reabre ya encuentra el archivo nuevo
+            viejo.cabecera["retirada"] = 1
+            viejo.cerrar()
+        return cls(path, escritura=True)
+
+    @classmethod
+    def abrir(cls, path: Path = TABLA_COMPARTIDA_PATH, escritura: bool = False) -> "TablaCompartida":
+        return cls(path, escritura)
+
+    def cerrar(self) -> None:
+        if self.escritura:
+            self._mm.flush()
+        del self.filas, self.cabecera, self._seq, self._col, self._mm  # el mapeo se libera con la última vista
+
+    def __len__(self) -> int:
+        return len(self.simbolos)
+
+    @property
+    def generacion(self) -> int:
+        return int(self.cabecera["generacion"][0])
+
+    @property
+    def retirada(self) -> bool:
+        """True si el escritor reemplazó el archivo: hay que reabrir."""
+        return bool(self.cabecera["retirada"][0])
+
+    def fila(self, simbolo: str) -> int:
+        return self._fila.get(simbolo, -1)
+
+    def ids(self, simbolos: Sequence[str]) -> np.ndarray:
+        return self.simbolos.get_indexer(pd.Index(list(simbolos), dtype=object))
+
+    # ─────────── Escritura (un solo escritor) ───────────
+    def escribir(
+        self,
+        filas: np.ndarray,
+        bid: np.ndarray,
+        ask: np.ndarray,
+        bid_qty: Optional[np.ndarray] = None,
+        ask_qty: Optional[np.ndarray] = None,
+        ts: Optional[np.ndarray] = None,
+    ) -> None:
+        """Actualiza varias filas (vectorizado), cada una bajo su seqlock."""
+        filas = np.asarray(filas, dtype=np.int64)
+        ok = filas >= 0
+        filas = filas[ok]
+        if not len(filas):
+            return
+        seq = self._seq
+        seq[filas] += 1  # impar: escritura en curso
+        self.filas["bid"][filas] = np.asarray(bid, dtype=np.float64)[ok]
+        self.filas["ask"][filas] = np.asarray(ask, dtype=np.float64)[ok]
+        if bid_qty is not None:
+            self.filas["bid_qty"][filas] = np.asarray(bid_qty, dtype=np.float64)[ok]
+        if ask_qty is not None:
+            self.filas["ask_qty"][filas] = np.asarray(ask_qty, dtype=np.float64)[ok]
+        self.filas["ts"][filas] = np.asarray(ts, dtype=np.int64)[ok] if ts is not None else int(time.time() * 1000)
+        seq[filas] += 1  # par: fila consistente
+        self.cabecera["generacion"] += 1
+
+    def escribir_fila(self, fila: int, bid: float, ask: float, bid_qty: float, ask_qty: float, ts: int) -> None:
+        """Camino escalar (un update de bookTicker): evita el costo de indexado vectorizado."""
+        seq, col = self._seq, self._col
+        seq[fila] += 1
+        col["bid"][fila] = bid
+        col["ask"][fila] = ask
+        col["bid_qty"][fila] = bid_qty
+        col["ask_qty"][fila] = ask_qty
+        col["ts"][fila] = ts
+        seq[fila] += 1
+        self.cabecera["generacion"] += 1
+
+    def escribir_tickers(self, tickers: Dict[str, dict], ts: Optional[int] = None) -> int:
+        """Vuelca bid/ask/bidVolume/askVolume de un dict de tickers ccxt; devuelve filas escritas."""
+        presentes = [s for s in self.simbolos if s in tickers]
+        if not presentes:
+            return 0
+
+        def campo(c: str) -> np.ndarray:
+            return np.array([tickers[s].get(c) or np.nan for s in presentes], dtype=np.float64)
+
+        marcas = np.array([tickers[s].get("timestamp") or ts or 0 for s in presentes], dtype=np.int64)
+        self.escribir(self.ids(presentes), campo("bid"), campo("ask"),
+                      campo("bidVolume"), campo("askVolume"), marcas)
+        return len(presentes)
+
+    # ─────────── Lectura (cualquier proceso) ───────────
+    def leer_fila(self, fila: int) -> Tuple[float, float, float, float, int]:
+        """(bid, ask, bid_qty, ask_qty, ts) consistente de una fila."""
+        seq, col = self._seq, self._col
+        limite = None
+        while True:
+            s1 = int(seq[fila])
+            if s1 & 1:
+                limite = _ceder(limite, f"Fila {fila}")
+                continue
+            copia = (float(col["bid"][fila]), float(col["ask"][fila]), float(col["bid_qty"][fila]),
+                     float(col["ask_qty"][fila]), int(col["ts"][fila]))
+            if int(seq[fila]) == s1:
+                return copia
+
+    def leer(self, simbolo: str) -> Optional[Tuple[float, float, float, float, int]]:
+        fila = self.fila(simbolo)
+        return self.leer_fila(fila) if fila >= 0 else None
+
+    def instantanea(self) -> np.ndarray:
+        """Copia consistente de todas las filas (reintenta solo las que cambiaron durante la copia)."""
+        seq = self._seq
+        s1 = seq.copy()
+        out = np.array(self.filas)
+        malas = np.flatnonzero((s1 != seq) | (s1 & 1).astype(bool))
+        limite = None
+        while len(malas):
+            limite = _ceder(limite, f"{len(malas)} filas")
+            s1 = seq[malas].copy()
+            out[malas] = self.filas[malas]
+            malas = malas[(s1 != seq[malas]) | (s1 & 1).astype(bool)]
+        return out
+
+    def a_dataframe(self) -> pd.DataFrame:
+        filas = self.instantanea()
+        df = pd.DataFrame({c: filas[c] for c in CAMPOS})
+        df.insert(0, "symbol", self.simbolos)
+        return df
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Inspección de la tabla de cotizaciones compartida")
+    parser.add_argument("--path", type=Path, default=TABLA_COMPARTIDA_PATH)
+    parser.add_argument("--simbolo", help="Leer un solo símbolo")
+    args = parser.parse_args(argv)
+
+    if not args.path.exists():
+        print(f"❌ No se encontró: {args.path} (corré la refinería primero)")
+        sys.exit(1)
+    tabla = TablaCompartida.abrir(args.path)
+    print(f"🧠 {args.path} · {len(tabla)} símbolos · generación {tabla.generacion}"
+          f"{' · RETIRADA' if tabla.retirada else ''}")
+    if args.simbolo:
+        t0 = time.perf_counter()
+        valor = tabla.leer(args.simbolo)
+        dt = (time.perf_counter() - t0) * 1e6
+        print(f"🔹 {args.simbolo}: {valor} ({dt:.1f} µs)")
+    else:
+        print(tabla.a_dataframe().to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# codigo/tablas.py
+"""
+Helpers de tablas compartidos por las etapas de la refinería.
+
+- Normalización única de claves (`symbol`, `base`, `quote` → strip + upper).
+- Tipado de la tabla estandarizada (booleanos reales y números float) para que
+  el pipeline en proceso pase frames tipados entre etapas sin re-parsear.
+- Lectura de CSV de hand-off (modo script) y sink de auditoría (modo pipeline).
+- `salidas_al_dia`: atajo de los scripts sueltos cuando la entrada no cambió.
+
+pandas se importa recién dentro de las funciones que lo usan: los caminos que
+sólo chequean si hay algo que hacer arrancan sin pagarlo.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+COLUMNAS_CLAVE = ("symbol", "base", "quote")
+
+# Columnas de symbols_estandar_<exchange>.csv según su tipo real
+COLUMNAS_BOOL = ("spot", "active")
+COLUMNAS_FLOAT = (
+    "fee_maker", "fee_taker",
+    "price_precision", "amount_precision",
+    "min_price", "min_amount", "min_cost",
+)
+
+_VERDADEROS = {"true", "1", "yes"}
+_FALSOS = {"false", "0", "no"}
+
+
+def normalizar_claves(df: pd.DataFrame, columnas: Iterable[str] = COLUMNAS_CLAVE) -> pd.DataFrame:
+    """Normaliza in-place las columnas clave (strip + upper) y devuelve el frame."""
+    for col in columnas:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().str.upper()
+    return df
+
+
+def _a_bool(serie: pd.Series) -> pd.Series:
+    import pandas as pd
+
+    txt = serie.astype(str).str.strip().str.lower()
+    out = pd.Series(pd.NA, index=serie.index, dtype="boolean")
+    out[txt.isin(_VERDADEROS)] = True
+    out[txt.isin(_FALSOS)] = False
+    return out
+
+
+def tipar_estandar(df: pd.DataFrame) -> pd.DataFrame:
+    """Convierte la tabla estandarizada a tipos reales (bool / float64)."""
+    import pandas as pd
+
+    normalizar_claves(df)
+    for col in COLUMNAS_BOOL:
+        if col in df.columns:
+            df[col] = _a_bool(df[col])
+    for col in COLUMNAS_FLOAT:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
+
+def leer_csv(path: Path, normalizar: bool = True) -> pd.DataFrame:
+    """Lee un CSV de hand-off como texto; devuelve frame vacío si no existe."""
+    import pandas as pd
+
+    if not path.exists():
+        print(f"⚠️ No se encontró: {path}")
+        return pd.DataFrame()
+    df = pd.read_csv(path, dtype=str)
+    return normalizar_claves(df) if normalizar else df
+
+
+def exportar_auditoria(df: pd.DataFrame, path: Path, habilitado: bool) -> None:
+    """Sink opcional: vuelca el frame a CSV solo si la auditoría está habilitada."""
+    if not habilitado:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(path, index=False)
+
+
+def salidas_al_dia(entrada: Path, salidas: Iterable[Path]) -> bool:
+    """True si todas las salidas existen y son más nuevas que la entrada (nada que regenerar)."""
+    if not entrada.exists():
+        return False
+    t_entrada = entrada.stat().st_mtime_ns
+    for salida in salidas:
+        if not salida.exists() or salida.stat().st_mtime_ns < t_entrada:
+            return False
+    return True
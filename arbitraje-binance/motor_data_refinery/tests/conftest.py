@@ -0,0 +1,15 @@
+# tests/conftest.py
+"""
+🧪 Tests offline de la refinería (sin red, sin Redis ni MariaDB reales).
+
+Los módulos se importan como en los scripts (`from codigo... import`), así que
+la raíz del motor va al sys.path. Correr desde la raíz del motor:
+    python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parents[1]
+if str(APP_DIR) not in sys.path:
+    sys.path.insert(0, str(APP_DIR))
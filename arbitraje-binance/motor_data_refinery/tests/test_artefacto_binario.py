@@ -0,0 +1,100 @@
+# tests/test_artefacto_binario.py
+"""
+📦 Artefacto columnar binario (codigo/artefacto_binario.py): ida y vuelta
+por `escribir` / `cargar`, índice, schema esperado y archivos ajenos.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from codigo.artefacto_binario import CABECERA, cargar, escribir, schema_hash  # type: ignore
+
+
+def frame():
+    return pd.DataFrame({
+        "symbol": ["BTC/USDT", "ETH/BTC", "ñandú/USDT", None],
+        "quote": ["USDT", "BTC", "USDT", None],
+        "precio": [60_000.5, np.nan, 1e-8, 0.0],
+        "ejecutable": [True, False, True, False],
+        "saltos": np.array([1, 2, 1, -1], dtype=np.int64),
+    })
+
+
+def test_ida_y_vuelta_con_nan_bool_int_y_nulos(tmp_path):
+    path = tmp_path / "cotizador.col"
+    hash_ = escribir(frame(), path)
+    art = cargar(path)
+
+    assert len(art) == 4 and art.schema_hash == hash_
+    assert art.tipos == {"symbol": "dic", "quote": "dic", "precio": "f8", "ejecutable": "b1", "saltos": "i8"}
+    assert hash_ == schema_hash(list(art.tipos.items()))
+
+    np.testing.assert_array_equal(art["precio"], [60_000.5, np.nan, 1e-8, 0.0])
+    assert art["ejecutable"].dtype == np.bool_ and art["ejecutable"].tolist() == [True, False, True, False]
+    assert art["saltos"].dtype == np.int64 and art["saltos"].tolist() == [1, 2, 1, -1]
+
+    # Diccionario: códigos int32, -1 = nulo, y `valores()` lo decodifica como None
+    assert art["quote"].dtype == np.int32 and art["quote"].tolist() == [0, 1, 0, -1]
+    assert art.diccionario("quote").tolist() == ["USDT", "BTC"]
+    assert art.valores("symbol").tolist() == ["BTC/USDT", "ETH/BTC", "ñandú/USDT", None]
+    assert art.valores("quote").tolist() == ["USDT", "BTC", "USDT", None]
+    assert art.valores("precio") is art["precio"]
+
+    df = art.a_dataframe()
+    assert df["symbol"].isna().tolist() == [False, False, False, True]
+    assert df["saltos"].tolist() == [1, 2, 1, -1]
+
+
+def test_vistas_alineadas_y_de_solo_lectura(tmp_path):
+    path = tmp_path / "a.col"
+    escribir(frame(), path)
+    art = cargar(path)
+    for nombre in art.columnas:
+        assert art[nombre].ctypes.data % 64 == 0  # el mmap arranca en página: offset alineado = dirección alineada
+        assert not art[nombre].flags.writeable
+    with pytest.raises(ValueError):
+        art["precio"][0] = 1.0
+
+
+def test_indice_salta_nulos(tmp_path):
+    path = tmp_path / "a.col"
+    escribir(frame(), path)
+    assert cargar(path).indice() == {"BTC/USDT": 0, "ETH/BTC": 1, "ñandú/USDT": 2}
+
+
+def test_schema_esperado_distinto_falla(tmp_path):
+    path = tmp_path / "a.col"
+    hash_ = escribir(frame(), path)
+    assert cargar(path, schema_esperado=hash_).schema_hash == hash_
+    with pytest.raises(ValueError, match="Schema distinto"):
+        cargar(path, schema_esperado="0" * 32)
+    # Cambiar el tipo de una columna cambia el hash
+    assert escribir(frame().astype({"saltos": float}), tmp_path / "b.col") != hash_
+
+
+@pytest.mark.parametrize("campo, valor", [("magic", b"NOTACOL1"), ("version", 99)])
+def test_magic_o_version_ajenos_fallan(tmp_path, campo, valor):
+    path = tmp_path / "a.col"
+    escribir(frame(), path)
+    crudo = bytearray(path.read_bytes())
+    cab = np.frombuffer(bytes(crudo[:CABECERA.itemsize]), dtype=CABECERA).copy()
+    cab[campo] = valor
+    crudo[:CABECERA.itemsize] = cab.tobytes()
+    path.write_bytes(bytes(crudo))
+    with pytest.raises(ValueError, match="no es un artefacto columnar"):
+        cargar(path)
+
+
+def test_frame_vacio(tmp_path):
+    path = tmp_path / "vacio.col"
+    vacio = frame().iloc[:0]
+    hash_ = escribir(vacio, path)
+    art = cargar(path, schema_esperado=hash_)
+    assert len(art) == 0
+    assert list(art.tipos) == list(vacio.columns)
+    assert all(len(art[c]) == 0 for c in art.columnas)
+    assert art.diccionario("symbol").tolist() == []
+    assert art.valores("symbol").tolist() == []
+    assert art.indice() == {}
+    assert art.a_dataframe().empty
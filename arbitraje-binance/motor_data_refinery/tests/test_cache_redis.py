@@ -0,0 +1,191 @@
+# tests/test_cache_redis.py
+"""
+🧊 CacheRefineria (codigo/cache_redis.py) sobre `RedisLocal` con reloj manual.
+
+Ida y vuelta de tablas, mapas y snapshot; el puntero de generación que se mueve
+recién con la tabla completa; TTL y gracia de la generación anterior; y el
+orden de resolución de `obtener_snapshot` (memo → disco → Redis → descarga).
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from codigo import cache_redis, snapshot  # type: ignore
+from codigo.cache_redis import CacheRefineria, leer_tabla_o_csv  # type: ignore
+from codigo.redis_local import RedisLocal  # type: ignore
+from codigo.snapshot import Snapshot  # type: ignore
+
+TTL_S = 600
+GRACIA_S = 60
+
+
+class Reloj:
+    def __init__(self):
+        self.t = 1_000.0
+
+    def __call__(self):
+        return self.t
+
+    def avanzar(self, segundos):
+        self.t += segundos
+
+
+@pytest.fixture
+def reloj():
+    return Reloj()
+
+
+@pytest.fixture
+def cache(reloj, monkeypatch):
+    monkeypatch.setattr(cache_redis, "CACHE_REDIS_GRACIA_S", GRACIA_S)
+    return CacheRefineria(RedisLocal(reloj), "testex", ttl_s=TTL_S, prefijo="t")
+
+
+@pytest.fixture
+def con_cliente(cache, monkeypatch):
+    """`CacheRefineria.por_defecto()` resuelve al RedisLocal del test (sin sondeo TCP)."""
+    monkeypatch.setattr(cache_redis, "_CLIENTE", {"cliente": cache.redis})
+    return cache
+
+
+def tabla_spot():
+    return pd.DataFrame({
+        "symbol": ["ETH/USDT", "BTC/USDT", "XRP/BTC"],
+        "base": ["ETH", "BTC", "XRP"],
+        "fee_taker": [0.001, 0.00075, np.nan],
+        "niveles": np.array([20, 20, 5], dtype=np.int64),
+        "activo": [True, True, False],
+    })
+
+
+def test_ida_y_vuelta_de_tabla_y_filas(cache):
+    df = tabla_spot()
+    gen = cache.guardar_tabla("spot", df)
+    leida = cache.leer_tabla("spot")
+
+    assert gen == cache.generacion("spot") == 1
+    pd.testing.assert_frame_equal(leida, df)  # mismo orden de filas, columnas y dtypes
+    filas = cache.leer_filas("spot", ["XRP/BTC", "NO/EXISTE"])
+    assert list(filas) == ["XRP/BTC"]
+    assert filas["XRP/BTC"]["niveles"] == 5 and filas["XRP/BTC"]["fee_taker"] is None
+
+
+def test_equivalencias_prioriza_directa(cache):
+    unificado = pd.DataFrame({
+        "symbol": ["ADA/BTC", "ADA/USDT", "BTC/USDT"],
+        "base": ["ADA", "ADA", "BTC"],
+        "1_usdt_equivale_base": ["2.51", "2.5", "1.6e-05"],
+        "cotizacion_indirecta": ["True", "False", "False"],
+    })
+    cache.guardar_equivalencias(unificado)
+    assert cache.equivalencias() == {"ADA": 2.5, "BTC": 1.6e-05}
+    assert cache.equivalencia("BTC") == 1.6e-05
+    assert cache.equivalencia("DOGE") is None
+
+
+def test_snapshot_ida_y_vuelta_y_coherencia(cache, monkeypatch):
+    snap = Snapshot("testex", 123, {"BTC/USDT": {"id": "BTCUSDT", "precision": {"price": 0.01}}},
+                    {"BTC/USDT": {"symbol": "BTC/USDT", "last": 60000.5, "last_texto": "60000.50"}})
+    cache.guardar_snapshot(snap)
+    leido = cache.leer_snapshot()
+    assert (leido.ts, leido.markets, leido.tickers) == (snap.ts, snap.markets, snap.tickers)
+
+    # Tickers de otro instante que los markets: el snapshot no es coherente
+    cache.guardar_snapshot(Snapshot("testex", 124, snap.markets, {}))
+    assert cache.leer_snapshot() is None
+    assert cache.leer_snapshot(incluir_tickers=False).ts == 124
+
+
+def test_puntero_de_generacion_y_gracia(cache, reloj):
+    df1 = tabla_spot()
+    df2 = df1.iloc[:2].assign(fee_taker=0.002)
+    cache.guardar_tabla("spot", df1)
+    cache.guardar_tabla("spot", df2)
+    r = cache.redis
+
+    # El puntero apunta a la generación nueva, ya completa
+    assert r.get("t:testex:spot:gen") == "2"
+    pd.testing.assert_frame_equal(cache.leer_tabla("spot"), df2)
+    # La anterior sigue leíble por quien ya tenía su número, solo durante la gracia
+    assert r.hlen("t:testex:spot:g1") == len(df1) + 1
+    assert r.ttl("t:testex:spot:g1") == GRACIA_S
+    assert r.ttl("t:testex:spot:g2") == TTL_S
+
+    reloj.avanzar(GRACIA_S + 1)
+    assert not r.exists("t:testex:spot:g1")
+    pd.testing.assert_frame_equal(cache.leer_tabla("spot"), df2)
+
+
+def test_ttl_vence_y_degrada_a_csv(con_cliente, reloj, tmp_path):
+    cache = CacheRefineria(con_cliente.redis, cache_redis.EXCHANGE_ID, ttl_s=TTL_S)  # lo que ve por_defecto()
+    cache.guardar_tabla("spot", tabla_spot())
+    csv = tmp_path / "spot.csv"
+    pd.DataFrame({"symbol": ["DESDE/CSV"]}).to_csv(csv, index=False)
+
+    # Vigente: se lee de Redis aunque exista el CSV
+    assert leer_tabla_o_csv("spot", csv)["symbol"].tolist() == ["ETH/USDT", "BTC/USDT", "XRP/BTC"]
+
+    reloj.avanzar(TTL_S + 1)
+    assert cache.generacion("spot") == 0
+    assert cache.leer_tabla("spot") is None
+    assert leer_tabla_o_csv("spot", csv)["symbol"].tolist() == ["DESDE/CSV"]
+    assert leer_tabla_o_csv("spot", tmp_path / "no_existe.csv") is None
+
+
+def test_tickers_vencen_antes_que_los_markets(cache, reloj):
+    cache.guardar_snapshot(Snapshot("testex", 1, {"A/B": {}}, {"A/B": {"last": 1.0}}))
+    reloj.avanzar(snapshot.SNAPSHOT_TTL_S + 1)
+    assert cache.leer_snapshot() is None
+    assert cache.leer_snapshot(incluir_tickers=False).markets == {"A/B": {}}
+
+
+# ─────────── Orden de resolución de obtener_snapshot ───────────
+
+@pytest.fixture
+def aislado(tmp_path, monkeypatch):
+    """Memo vacío, caché en disco en tmp y descarga prohibida."""
+    monkeypatch.setattr(snapshot, "_MEMO", {})
+    ruta = tmp_path / "snapshot_testex.json.gz"
+    monkeypatch.setattr(snapshot, "ruta_cache", lambda exchange_id=None: ruta)
+
+    def sin_red(*_):
+        raise AssertionError("no debería descargar")
+    monkeypatch.setattr(snapshot, "_descargar", sin_red)
+    return ruta
+
+
+def snap_fresco(ts_offset_s=0.0):
+    return Snapshot("testex", int((time.time() + ts_offset_s) * 1000), {"A/B": {"id": "AB"}}, {"A/B": {"last": 2.0}})
+
+
+def prohibir_redis(monkeypatch):
+    def _falla(*_a, **_k):
+        raise AssertionError("no debería consultar Redis")
+    monkeypatch.setattr(CacheRefineria, "por_defecto", classmethod(lambda cls, *a, **k: _falla()))
+
+
+def test_memo_no_consulta_redis(aislado, monkeypatch):
+    snap = snap_fresco()
+    snapshot._MEMO["testex"] = snap
+    prohibir_redis(monkeypatch)
+    assert snapshot.obtener_snapshot("testex") is snap
+
+
+def test_disco_no_consulta_redis(aislado, monkeypatch):
+    snap = snap_fresco()
+    snapshot._escribir_cache(snap, aislado)
+    prohibir_redis(monkeypatch)
+    leido = snapshot.obtener_snapshot("testex")
+    assert (leido.ts, leido.tickers) == (snap.ts, snap.tickers)
+    assert snapshot._MEMO["testex"] is leido
+
+
+def test_redis_si_fallan_memo_y_disco(aislado, con_cliente):
+    snap = snap_fresco()
+    CacheRefineria(con_cliente.redis, "testex").guardar_snapshot(snap)
+    leido = snapshot.obtener_snapshot("testex")
+    assert (leido.ts, leido.markets) == (snap.ts, snap.markets)
+    assert aislado.exists()  # queda en disco para el próximo proceso
@@ -0,0 +1,77 @@
+# tests/test_cuantizacion.py
+"""
+📏 Cuantización (absorcion/cuantizacion.py): steps con división entera,
+precio mínimo exigido y piernas dimensionadas al tope con el tick sólo como límite.
+"""
+
+import numpy as np
+import pandas as pd
+
+from absorcion.cuantizacion import ESCALA, TablaCuantizacion, dimensionar  # type: ignore
+
+
+def tabla(filas):
+    cols = ["symbol", "price_precision", "amount_precision", "min_price", "min_amount", "min_cost"]
+    return TablaCuantizacion.desde_frame(pd.DataFrame(filas, columns=cols), modo="tick")
+
+
+def test_redondear_cantidad_entera():
+    t = tabla([["A/B", "0.01", "0.1", "", "", ""], ["C/D", "0.01", "", "", "", ""]])
+    ids = np.array([0, 0, 0, 0, 1, 0])
+    cant = np.array([0.3, 0.7, 0.29999, 12_345_678.9, 0.123456789, np.inf])
+    pasos, q = t.redondear_cantidad(ids, cant)
+    assert pasos.dtype == np.int64
+    # 0.3 es 0.29999999999999998 en float: no pierde un step
+    assert pasos.tolist() == [3, 7, 2, 123_456_789, 12_345_678, 0]  # sin step: ↓10⁻⁸
+    assert q.tolist() == [0.3, 0.7, 0.2, 12_345_678.9, 0.12345678, 0.0]
+
+
+def ciclo(filas, bid, ask, notional=1000.0):
+    """Triada USDT → X (compra X/USDT) → BTC (venta X/BTC) → USDT (venta BTC/USDT)."""
+    t = tabla(filas)
+    return dimensionar(t, np.array([[0, 1, 2]]), np.array([[1, 0, 0]]), np.array(bid), np.array(ask), notional)
+
+
+FILAS = [
+    ["X/USDT", "0.01", "0.001", "0.01", "0.001", "5"],
+    ["X/BTC", "0.00001", "0.001", "0.00001", "0.001", "0.0001"],
+    ["BTC/USDT", "0.01", "0.00001", "0.01", "0.00001", "5"],
+]
+
+
+def test_compra_se_dimensiona_al_ask_y_el_tick_es_limite():
+    # ask de X/USDT fuera de la grilla: el límite sube al tick, la cantidad sale del ask
+    bid = [99.994, 0.0016, 60_000.0]
+    ask = [100.004, 0.00161, 60_010.0]
+    dim = ciclo(FILAS, bid, ask)
+
+    assert dim.precio[0].tolist() == [100.01, 0.0016, 60_000.0]
+    assert dim.ejecucion[0].tolist() == [100.004, 0.0016, 60_000.0]
+    assert dim.cantidad[0, 0] == 9.999  # ↓step(1000 / 100.004); al límite 100.01 serían 9.998
+    assert np.isclose(dim.residuo[0, 0], 1000 - 9.999 * 100.004)
+    # Sin fees, lo que falta para volver al notional es el polvo (valuado en el ancla) más el precio
+    sin_polvo = 1000 * (bid[1] * bid[2] / ask[0])
+    assert np.isclose(dim.final[0] + np.nansum(dim.residuo_ancla[0]) * (bid[1] * bid[2] / ask[0]), sin_polvo, rtol=1e-9)
+    assert dim.ejecutable[0]
+
+
+def test_precio_minimo_y_limite_en_cero():
+    bid = [100.0, 0.0016, 60_000.0]
+    ask = [100.0, 0.0016, 60_000.0]
+    # min_price de X/BTC por encima del bid: la pierna no es ejecutable
+    filas = [f[:] for f in FILAS]
+    filas[1][3] = "0.002"
+    dim = ciclo(filas, bid, ask)
+    assert dim.ok_minimos[0].tolist() == [True, False, True] and not dim.ejecutable[0]
+
+    # Tick más grueso que el precio: el límite de la venta baja a 0
+    filas = [f[:] for f in FILAS]
+    filas[1][1] = "0.01"
+    filas[1][3] = ""
+    dim = ciclo(filas, bid, ask)
+    assert dim.precio[0, 1] == 0.0 and not dim.ok_minimos[0, 1]
+
+
+def test_unidades_del_precio_limite():
+    dim = ciclo(FILAS, [100.0, 0.0016, 60_000.0], [100.0, 0.0016, 60_000.0])
+    assert (np.rint(dim.precio * ESCALA) % np.array([10**6, 10**3, 10**6]) == 0).all()
@@ -0,0 +1,143 @@
+# tests/test_descarga_libros.py
+"""
+⚡ DescargadorLibros (absorcion/descarga_libros.py) contra el motor de absorcion/servidor_depth.py.
+
+Con `ExchangeSimulado` (mismo `MotorDepth` que el servidor HTTP, en proceso):
+el peso usado en la ventana nunca pasa el límite del servidor aunque otro
+proceso ya haya gastado parte; un 429 con `Retry-After` frena todo lo que sigue
+al menos ese tiempo; y los libros salen en orden de prioridad. Más el 429 del
+servidor HTTP real (`ServidorDepth`) con sus cabeceras.
+"""
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+from absorcion.descarga_libros import CuboPesos, DescargadorLibros, peso_depth  # type: ignore
+from absorcion.servidor_depth import ExchangeSimulado, MotorDepth  # type: ignore
+
+LIMITE = 100  # peso 5 por libro
+
+
+def simbolos(n):
+    return [f"S{i:03d}/USDT" for i in range(n)]
+
+
+class ExchangeGrabado(ExchangeSimulado):
+    """ExchangeSimulado que anota (instante, símbolo, resultado) de cada pedido."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.llamadas = []
+
+    async def fetch_order_book(self, symbol, limit=100, params=None):
+        t = time.monotonic()
+        try:
+            libro = await super().fetch_order_book(symbol, limit, params)
+        except Exception as e:
+            self.llamadas.append((t, symbol, type(e).__name__))
+            raise
+        self.llamadas.append((t, symbol, "ok"))
+        return libro
+
+
+def descargar(exchange, lista, prioridad=None, timeout=None, **kwargs):
+    descargador = DescargadorLibros(exchange, limite=LIMITE, **kwargs)
+
+    async def _correr():
+        return await asyncio.wait_for(descargador.descargar(lista, prioridad), timeout)
+
+    return asyncio.run(_correr())
+
+
+def test_presupuesto_del_servidor_nunca_se_excede():
+    # Servidor: 300 de peso por ventana; otro proceso ya gastó 150. El cubo local
+    # arranca lleno y sin margen: sólo los X-MBX-USED-WEIGHT-1M (más lo que sigue
+    # en vuelo, que el servidor todavía no contó) lo frenan a tiempo.
+    motor = MotorDepth(peso_por_minuto=300, ventana_s=3600)
+    motor.cobrar(150)
+    exchange = ExchangeGrabado(motor, latencia_s=0.002)
+    lista = simbolos(80)  # 400 de peso: no entra en lo que queda
+
+    with pytest.raises(asyncio.TimeoutError):
+        descargar(exchange, lista, timeout=1.5, concurrencia=8, cubo=CuboPesos(300, 1.0))
+
+    assert motor.rechazados == 0
+    assert motor.usado_max <= motor.peso_por_minuto
+    servidos = motor.usado - 150
+    assert servidos == peso_depth(LIMITE) * motor.servidos and motor.servidos >= 20
+
+
+def test_429_con_retry_after_frena_los_pedidos():
+    # Ventana de 1 s ya agotada por otro proceso: el primer pedido recibe 429
+    motor = MotorDepth(peso_por_minuto=50, ventana_s=1.0)
+    motor.cobrar(50)
+    exchange = ExchangeGrabado(motor, latencia_s=0.0)
+    lista = simbolos(3)
+
+    res = descargar(exchange, lista, timeout=10, concurrencia=1, reintentos=3, cubo=CuboPesos(6000, 0.9))
+
+    assert res.limitados == 1 and motor.rechazados == 1
+    assert list(res.libros) == lista and not res.fallidos
+    (t_429, s_429, r_429), (t_sig, s_sig, r_sig) = exchange.llamadas[:2]
+    assert (r_429, r_sig) == ("RateLimitExceeded", "ok")
+    assert s_sig == s_429 == lista[0]  # el reintento vuelve a su lugar en el heap
+    assert t_sig - t_429 >= 1.0 - 0.05  # Retry-After: 1 (ceil de lo que resta de la ventana)
+
+
+def test_orden_por_prioridad():
+    motor = MotorDepth(peso_por_minuto=100_000)
+    exchange = ExchangeGrabado(motor, latencia_s=0.0)
+    lista = simbolos(8)
+    prioridad = np.array([0.1, np.nan, 0.5, -0.2, 0.5, 0.3, -np.inf, 0.0])
+
+    res = descargar(exchange, lista, prioridad, timeout=10, concurrencia=1, cubo=CuboPesos(100_000, 0.9))
+
+    esperado = [lista[i] for i in (2, 4, 5, 0, 7, 3, 1, 6)]  # empates en el orden dado; NaN = -inf
+    assert [s for _, s, _ in exchange.llamadas] == esperado
+    assert list(res.libros) == esperado
+
+
+def test_orden_por_prioridad_con_presupuesto_escaso():
+    # Sólo entran 6 libros en la ventana: tienen que ser los 6 más prometedores
+    motor = MotorDepth(peso_por_minuto=30, ventana_s=3600)
+    exchange = ExchangeGrabado(motor, latencia_s=0.002)
+    lista = simbolos(20)
+    prioridad = np.arange(20, dtype=np.float64)[::-1] % 7  # orden mezclado con empates
+
+    with pytest.raises(asyncio.TimeoutError):
+        descargar(exchange, lista, prioridad, timeout=1.0, concurrencia=3, cubo=CuboPesos(30, 1.0))
+
+    servidos = {s for _, s, r in exchange.llamadas if r == "ok"}
+    orden = sorted(range(20), key=lambda i: (-prioridad[i], i))
+    assert servidos == {lista[i] for i in orden[:len(servidos)]}
+    assert motor.rechazados == 0
+
+
+def test_servidor_http_responde_429_con_cabeceras():
+    pytest.importorskip("aiohttp")
+    import aiohttp
+
+    from absorcion.servidor_depth import ServidorDepth, servir  # type: ignore
+
+    async def _correr():
+        motor = MotorDepth(["BTC/USDT"], peso_por_minuto=10, ventana_s=3600)
+        runner = await servir(ServidorDepth(motor), "127.0.0.1", 0)
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}/api/v3/depth"
+        respuestas = []
+        try:
+            async with aiohttp.ClientSession() as sesion:
+                for _ in range(3):
+                    async with sesion.get(url, params={"symbol": "BTCUSDT", "limit": "100"}) as r:
+                        respuestas.append((r.status, dict(r.headers), await r.json()))
+        finally:
+            await runner.cleanup()
+        return respuestas
+
+    (s1, h1, b1), (s2, h2, _), (s3, h3, b3) = asyncio.run(_correr())
+    assert (s1, s2, s3) == (200, 200, 429)
+    assert [h["X-MBX-USED-WEIGHT-1M"] for h in (h1, h2, h3)] == ["5", "10", "15"]
+    assert int(h3["Retry-After"]) > 0 and "Retry-After" not in h2
+    assert b3["code"] == -1003 and b1["bids"] and b1["asks"]
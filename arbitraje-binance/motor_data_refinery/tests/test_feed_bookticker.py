@@ -0,0 +1,117 @@
+# tests/test_feed_bookticker.py
+"""
+📡 FeedBookTicker contra el ServidorReplay local (codigo/replay_ws.py).
+
+El servidor corta la conexión cada N mensajes (`--cortar-cada`): el feed tiene
+que reconectar, marcar el hueco de los símbolos del shard, seguir donde quedó y
+terminar con el tope del último mensaje de cada símbolo.
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from codigo import feed_bookticker  # type: ignore
+from codigo.feed_bookticker import FeedBookTicker, TablaCotizaciones, tabla_para  # type: ignore
+from codigo.replay_ws import ServidorReplay, grabacion_sintetica, servir  # type: ignore
+
+SIMBOLOS = ["AAA/USDT", "BBB/USDT", "CCC/USDT", "DDD/BTC", "EEE/ETH"]
+
+
+def ultimo_por_simbolo(mensajes):
+    ultimo = {}
+    for m in mensajes:
+        ultimo[m["data"]["s"].lower()] = m["data"]
+    return ultimo
+
+
+async def correr_contra_replay(mensajes, cortar_cada, streams_por_conexion, huecos_vistos):
+    servidor = ServidorReplay(mensajes, velocidad=0.0, cortar_cada=cortar_cada)
+    runner = await servir(servidor, "127.0.0.1", 0)
+    puerto = runner.addresses[0][1]
+    tabla = tabla_para(SIMBOLOS)
+    feed = FeedBookTicker(tabla, f"ws://127.0.0.1:{puerto}", streams_por_conexion, silencio_max_s=2.0)
+    feed.on_hueco.append(lambda filas: huecos_vistos.append((filas.copy(), tabla.vigente[filas].copy())))
+    tarea = asyncio.create_task(feed.correr())
+    try:
+        async def _hasta_aplicar_todo():
+            while tabla.aplicados < len(mensajes):
+                await asyncio.sleep(0.01)
+
+        await asyncio.wait_for(_hasta_aplicar_todo(), timeout=20)
+        # Un corte más después del último mensaje: el hueco final también se marca
+        huecos = feed.huecos
+        await asyncio.wait_for(_esperar(lambda: feed.huecos > huecos), timeout=5)
+    finally:
+        feed.detener()
+        await asyncio.wait_for(tarea, timeout=5)
+        await runner.cleanup()
+    return servidor, feed, tabla
+
+
+async def _esperar(condicion):
+    while not condicion():
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture(autouse=True)
+def backoff_corto(monkeypatch):
+    # El backoff real arranca en 0.5 s: se acorta para que el test no tarde segundos por corte
+    monkeypatch.setattr(feed_bookticker, "BACKOFF_INICIAL_S", 0.01)
+
+
+@pytest.mark.parametrize("streams_por_conexion", [len(SIMBOLOS), 2])
+def test_reconecta_marca_huecos_y_llega_al_tope_final(streams_por_conexion):
+    mensajes = grabacion_sintetica(SIMBOLOS, 400, semilla=3)
+    cortar_cada = 37
+    huecos_vistos = []
+    servidor, feed, tabla = asyncio.run(
+        correr_contra_replay(mensajes, cortar_cada, streams_por_conexion, huecos_vistos)
+    )
+
+    # Cada mensaje se aplicó una sola vez: al reconectar el servidor sigue donde quedó
+    assert servidor.enviados == len(mensajes)
+    assert tabla.aplicados == len(mensajes)
+    assert tabla.descartados == 0
+
+    # Un corte cada `cortar_cada` mensajes por conexión → reconexiones y huecos
+    cortes_min = len(mensajes) // cortar_cada
+    assert feed.reconexiones >= cortes_min - len(feed.shards)
+    assert feed.huecos >= cortes_min
+    # Al detener, cada shard puede tener un reconectar a medio handshake: el
+    # servidor ya lo contó pero el feed no llegó a sumarlo como reconexión
+    extra = servidor.conexiones - (feed.reconexiones + len(feed.shards))
+    assert 0 <= extra <= len(feed.shards)
+
+    # Cada hueco llega con las filas de un shard, ya marcadas como no vigentes
+    shards = {tuple(s.tolist()) for s in feed.shards}
+    for filas, vigentes in huecos_vistos:
+        assert tuple(filas.tolist()) in shards
+        assert not vigentes.any()
+
+    # Tope final = último mensaje de cada símbolo
+    for id_ex, data in ultimo_por_simbolo(mensajes).items():
+        fila = tabla.fila(id_ex)
+        assert tabla.update_id[fila] == data["u"]
+        assert tabla.bid[fila] == float(data["b"])
+        assert tabla.ask[fila] == float(data["a"])
+        assert tabla.bid_qty[fila] == float(data["B"])
+        assert tabla.ask_qty[fila] == float(data["A"])
+    # Después del último corte ningún símbolo queda vigente hasta un update nuevo
+    assert not tabla.vigente.any()
+
+
+def test_update_viejo_se_descarta_y_el_nuevo_revalida():
+    tabla = TablaCotizaciones(["BTC/USDT"])
+    assert tabla.aplicar_mensaje({"u": 10, "s": "BTCUSDT", "b": "100", "B": "1", "a": "101", "A": "2"})
+    tabla.marcar_hueco(np.array([0]))
+    assert not tabla.vigente[0]
+    # Repetido tras la reconexión: no pisa el tope ni revalida
+    assert not tabla.aplicar_mensaje({"u": 10, "s": "BTCUSDT", "b": "90", "B": "1", "a": "91", "A": "2"})
+    assert not tabla.vigente[0] and tabla.bid[0] == 100.0
+    assert tabla.aplicar_mensaje({"u": 11, "s": "BTCUSDT", "b": "99", "B": "1", "a": "100", "A": "2"})
+    assert tabla.vigente[0] and tabla.bid[0] == 99.0
+    assert (tabla.aplicados, tabla.descartados) == (2, 1)
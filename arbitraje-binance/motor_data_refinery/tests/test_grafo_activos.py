@@ -0,0 +1,98 @@
+# tests/test_grafo_activos.py
+"""
+🕸️ Resolutor de equivalencias (codigo/grafo_activos.py): `actualizar_precios`
+incremental contra un resolutor armado desde cero con los mismos precios.
+"""
+
+import numpy as np
+import pandas as pd
+
+from codigo.equivalencias import TablaPrecios  # type: ignore
+from codigo.grafo_activos import GrafoActivos, ResolutorEquivalencias  # type: ignore
+
+ACTIVOS = ["USDT", "BTC", "ETH", "X", "Y"]
+
+
+def tickers_base():
+    """X cuelga de BTC por X/BTC (libro angosto); X/ETH es la alternativa, con más spread."""
+    def t(last, spread, vol=1e9):
+        return {"last": last, "bid": last * (1 - spread / 2), "ask": last * (1 + spread / 2), "quoteVolume": vol}
+    return {
+        "BTC/USDT": t(60_000.0, 1e-4),
+        "ETH/USDT": t(3_000.0, 1e-4),
+        "ETH/BTC": t(0.05, 5e-3),
+        "X/BTC": t(1e-5, 1e-3),
+        "X/ETH": t(2e-4, 4e-3),
+        "Y/X": t(3.0, 1e-3),
+    }
+
+
+def pares(tickers):
+    filas = [(s, *s.split("/")) for s in tickers]
+    return pd.DataFrame(filas, columns=["symbol", "base", "quote"])
+
+
+def resolutor(tickers):
+    grafo = GrafoActivos.desde_pares(pares(tickers), TablaPrecios.desde_tickers(tickers))
+    return ResolutorEquivalencias(grafo, {"USDT": 1.0})
+
+
+def libro(t):
+    return t["bid"], t["ask"], t["quoteVolume"]
+
+
+def igual_a_nuevo(inc, tickers):
+    ref = resolutor(tickers)
+    np.testing.assert_allclose(inc.equivalencias(ACTIVOS), ref.equivalencias(ACTIVOS), rtol=1e-12)
+    assert inc.saltos_de(ACTIVOS).tolist() == ref.saltos_de(ACTIVOS).tolist()
+    assert [inc.ruta(a) for a in ACTIVOS] == [ref.ruta(a) for a in ACTIVOS]
+    np.testing.assert_allclose(inc.costo, ref.costo)
+
+
+def test_sube_precio_recalcula_solo_el_subarbol():
+    tk = tickers_base()
+    inc = resolutor(tk)
+    assert inc.ruta("Y") == ["BTC/USDT", "X/BTC", "Y/X"]
+
+    tk["BTC/USDT"]["last"] = 66_000.0
+    tocados = inc.actualizar_precios({"BTC/USDT": 66_000.0})
+    assert sorted(inc.grafo.activos[tocados]) == ["BTC", "X", "Y"]
+    igual_a_nuevo(inc, tk)
+    assert np.isclose(inc.equivalencias(["BTC"])[0], 1 / 66_000.0)
+
+
+def test_baja_precio_y_se_abre_el_libro_cambia_el_padre():
+    tk = tickers_base()
+    inc = resolutor(tk)
+    assert inc.ruta("X") == ["BTC/USDT", "X/BTC"]
+
+    x = tk["X/BTC"]
+    x.update(last=8e-6, bid=7e-6, ask=9e-6)  # spread ~25%: X/ETH pasa a ser la ruta más líquida
+    inc.actualizar_precios({"X/BTC": x["last"]}, {"X/BTC": libro(x)})
+    assert inc.ruta("X") == ["ETH/USDT", "X/ETH"]
+    assert inc.ruta("Y") == ["ETH/USDT", "X/ETH", "Y/X"]
+    igual_a_nuevo(inc, tk)
+
+
+def test_libro_fuera_del_arbol_sin_mejora_no_reresuelve():
+    tk = tickers_base()
+    inc = resolutor(tk)
+    e = tk["X/ETH"]
+    e.update(bid=e["last"] * 0.9, ask=e["last"] * 1.1)  # la alternativa empeora: el árbol no cambia
+    assert len(inc.actualizar_precios({}, {"X/ETH": libro(e)})) == 0
+    igual_a_nuevo(inc, tk)
+
+
+def test_arista_quitada_reresuelve():
+    tk = tickers_base()
+    inc = resolutor(tk)
+    tk["X/BTC"]["last"] = None  # sin precio: la arista deja de ser transitable
+    tocados = inc.actualizar_precios({"X/BTC": np.nan})
+    assert len(tocados) == len(ACTIVOS)
+    assert inc.ruta("X") == ["ETH/USDT", "X/ETH"]
+    igual_a_nuevo(inc, tk)
+
+    tk["X/BTC"]["last"] = 1e-5  # vuelve: el árbol original
+    inc.actualizar_precios({"X/BTC": 1e-5})
+    assert inc.ruta("X") == ["BTC/USDT", "X/BTC"]
+    igual_a_nuevo(inc, tk)
@@ -0,0 +1,174 @@
+# tests/test_persistencia.py
+"""
+🗄️ Historial (codigo/persistencia.py) sobre el stand-in SQLite.
+
+`mercados_hist` guarda `min_cost`, el escape del TSV de LOAD DATA, los lotes
+de `insertar`, que re-correr no duplica, y el escritor: junta los lotes
+encolados y `cerrar` no revienta con la cola llena (descarta el lote más
+viejo, contándolo, para meter el centinela).
+"""
+
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from codigo.persistencia import (  # type: ignore
+    EQUIVALENCIAS, MERCADOS, EscritorFondo, Historial, PoolConexiones, _tsv, filas_mercados,
+)
+
+
+def historial_sqlite(tmp_path):
+    historial = Historial(PoolConexiones.sqlite(tmp_path / "hist.sqlite"))
+    historial.crear_tablas()
+    return historial
+
+
+def test_mercados_guarda_min_cost(tmp_path):
+    historial = historial_sqlite(tmp_path)
+    df = pd.DataFrame({
+        "symbol": ["BTC/USDT"], "base": ["BTC"], "quote": ["USDT"], "active": ["True"],
+        "fee_maker": ["0.001"], "fee_taker": ["0.001"], "price_precision": ["0.01"],
+        "amount_precision": ["1e-05"], "min_price": ["0.01"], "min_amount": ["1e-05"], "min_cost": ["5"],
+    })
+    filas = filas_mercados(df, ts=1_700_000_000_000, exchange_id="testex")
+    assert len(filas[0]) == len(MERCADOS.columnas) and filas[0][-1] == 5.0
+
+    assert historial.insertar(MERCADOS.nombre, filas) == 1
+    with historial.pool.conexion() as conn:
+        assert conn.execute("SELECT min_cost FROM mercados_hist").fetchone()[0] == 5.0
+
+
+class HistorialTrabado:
+    """Retiene al hilo escritor dentro de `insertar` hasta que se lo suelte."""
+
+    def __init__(self):
+        self.adentro = threading.Event()
+        self.soltar = threading.Event()
+        self.filas = 0
+
+    def insertar(self, tabla, filas):
+        self.adentro.set()
+        self.soltar.wait(5)
+        self.filas += len(filas)
+        return len(filas)
+
+
+def test_cerrar_con_cola_llena_descarta_el_mas_viejo():
+    historial = HistorialTrabado()
+    escritor = EscritorFondo(historial, cola_max=2).iniciar()
+    assert escritor.encolar("t", [(1,)])
+    assert historial.adentro.wait(5)  # el hilo ya sacó el primer lote y está trabado
+    assert escritor.encolar("t", [(2,), (3,)]) and escritor.encolar("t", [(4,)])
+    assert not escritor.encolar("t", [(5,)])  # cola llena: se descarta y se cuenta
+    assert escritor.descartadas == 1
+
+    escritor.cerrar(timeout=0.05)  # antes: queue.Full
+    assert escritor.descartadas == 3  # el lote más viejo (2 filas) dejó lugar al centinela
+
+    historial.soltar.set()
+    escritor._hilo.join(5)
+    assert not escritor._hilo.is_alive()
+    assert historial.filas == 2  # el primero y el último encolado
+    assert escritor.escritas == 2
+
+
+# ─────────── TSV de LOAD DATA ───────────
+def test_tsv_escapa_nulos_bool_y_separadores():
+    assert _tsv(None) == r"\N"
+    assert _tsv(True) == "1" and _tsv(False) == "0"
+    assert _tsv(5) == "5" and _tsv(0.1) == "0.1" and _tsv(1e-8) == "1e-08"
+    assert _tsv("a\tb") == r"a\tb"
+    assert _tsv("a\nb") == r"a\nb"
+    assert _tsv("a\\b") == r"a\\b"
+    # La barra se escapa primero: una barra seguida de "t" no se confunde con un tab
+    assert _tsv("x\\t\ty") == r"x\\t\ty"
+    assert _tsv("None") == "None"  # el texto "None" no es NULL
+
+
+class CursorGrabador:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, sql, filas):
+        self.conn.lotes.append(list(filas))
+
+    def execute(self, sql, params=()):
+        self.conn.sql.append(sql)
+        self.conn.tsv.append(Path(params[0]).read_text(encoding="utf-8"))  # antes de que se borre
+
+
+class ConexionGrabadora:
+    def __init__(self):
+        self.lotes, self.sql, self.tsv = [], [], []
+
+    def cursor(self):
+        return CursorGrabador(self)
+
+    def commit(self):
+        pass
+
+
+def test_load_data_escribe_una_linea_escapada_por_fila():
+    conn = ConexionGrabadora()
+    historial = Historial(PoolConexiones(lambda: conn, 1, "mariadb", local_infile=True), umbral_infile=2)
+    filas = [("2024-01-02", 1, "ex", "A/B", None, "B", 0.5, True, "con\ttab"),
+             ("2024-01-02", 1, "ex", "C/D", "C", "D", None, False, "línea\nnueva")]
+    assert historial.insertar(EQUIVALENCIAS.nombre, filas) == 2
+    assert conn.lotes == []  # por encima del umbral no pasa por executemany
+    assert "IGNORE INTO TABLE equivalencias_hist" in conn.sql[0]
+    assert conn.tsv == ["2024-01-02\t1\tex\tA/B\t\\N\tB\t0.5\t1\tcon\\ttab\n"
+                        "2024-01-02\t1\tex\tC/D\tC\tD\t\\N\t0\tlínea\\nnueva\n"]
+
+
+# ─────────── Inserción por lotes ───────────
+def test_insertar_parte_en_lotes():
+    conn = ConexionGrabadora()
+    historial = Historial(PoolConexiones(lambda: conn, 1, "sqlite"), lote=3)
+    filas = [(i,) for i in range(7)]
+    assert historial.insertar(MERCADOS.nombre, filas) == 7
+    assert conn.lotes == [[(0,), (1,), (2,)], [(3,), (4,), (5,)], [(6,)]]
+    assert historial.insertar(MERCADOS.nombre, []) == 0 and len(conn.lotes) == 3
+
+
+def test_recorrer_la_misma_corrida_no_duplica(tmp_path):
+    historial = historial_sqlite(tmp_path)
+    historial.lote = 2
+    filas = [(1_700_000_000_000, "ex", f"S{i}/USDT", f"S{i}", "USDT", 1, 0.001, 0.001, 0.01, 0.1, None, None, 5.0)
+             for i in range(5)]
+    historial.insertar(MERCADOS.nombre, filas)
+    historial.insertar(MERCADOS.nombre, filas)  # misma clave (exchange, symbol, ts): INSERT OR IGNORE
+    assert historial.contar(MERCADOS.nombre) == 5
+    otra_corrida = [(f[0] + 1, *f[1:]) for f in filas[:2]]
+    historial.insertar(MERCADOS.nombre, otra_corrida + filas)
+    assert historial.contar(MERCADOS.nombre) == 7
+
+
+# ─────────── Escritor en segundo plano ───────────
+class HistorialGrabador(HistorialTrabado):
+    """Como `HistorialTrabado`, anotando cada llamada a `insertar`."""
+
+    def __init__(self):
+        super().__init__()
+        self.llamadas = []
+
+    def insertar(self, tabla, filas):
+        self.llamadas.append((tabla, list(filas)))
+        return super().insertar(tabla, filas)
+
+
+def test_bucle_junta_los_lotes_encolados_por_tabla():
+    historial = HistorialGrabador()
+    escritor = EscritorFondo(historial).iniciar()
+    escritor.encolar("t", [(1,)])
+    assert historial.adentro.wait(5)  # el hilo está trabado con el primer lote
+    escritor.encolar("t", [(2,), (3,)])
+    escritor.encolar("u", [(9,)])
+    escritor.encolar("t", [(4,)])
+    historial.soltar.set()
+    escritor.cerrar(timeout=5)
+
+    assert not escritor._hilo.is_alive()
+    # Lo encolado mientras tanto sale en una sola pasada: una inserción por tabla
+    assert historial.llamadas == [("t", [(1,)]), ("t", [(2,), (3,), (4,)]), ("u", [(9,)])]
+    assert escritor.escritas == 5 and escritor.descartadas == 0
@@ -0,0 +1,47 @@
+# tests/test_pipeline.py
+"""
+🏭 Pipeline en proceso (codigo/pipeline.py): el escritor del historial se
+vacía y se cierra aunque una etapa falle.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import codigo.pipeline as pipeline  # type: ignore
+from codigo.persistencia import EscritorFondo  # type: ignore
+
+
+class HistorialEnMemoria:
+    def __init__(self):
+        self.filas = []
+
+    def insertar(self, tabla, filas):
+        self.filas.extend((tabla, f) for f in filas)
+        return len(filas)
+
+
+def test_etapa_que_falla_igual_vacia_el_historial(monkeypatch):
+    historial = HistorialEnMemoria()
+    escritores = []
+
+    def escritor_por_defecto():
+        escritor = EscritorFondo(historial).iniciar()
+        escritor.encolar("mercados_hist", [(1,), (2,)])  # lo que ya estaba en cola al fallar
+        escritores.append(escritor)
+        return escritor
+
+    def refrescar(*args, **kwargs):
+        raise RuntimeError("etapa rota")
+
+    monkeypatch.setattr(pipeline, "obtener_snapshot", lambda *a, **k: SimpleNamespace(ts=1, markets={}, tickers={}))
+    monkeypatch.setattr(pipeline, "escritor_por_defecto", escritor_por_defecto)
+    monkeypatch.setattr(pipeline, "cargar_estado", lambda *a, **k: None)
+    monkeypatch.setattr(pipeline, "refrescar", refrescar)
+
+    with pytest.raises(RuntimeError, match="etapa rota"):
+        pipeline.ejecutar(historial=True)
+
+    (escritor,) = escritores
+    assert not escritor._hilo.is_alive()
+    assert historial.filas == [("mercados_hist", (1,)), ("mercados_hist", (2,))]
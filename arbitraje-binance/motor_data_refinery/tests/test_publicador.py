@@ -0,0 +1,149 @@
+# tests/test_publicador.py
+"""
+📣 Publicador / Suscriptor (codigo/publicador.py) con `RedisLocal` como Redis.
+
+Reemplazo atómico, publicaciones sin cambios que no versionan, agrupación por
+`lote()` en una sola generación y detección de cambios del lado consumidor.
+"""
+
+import json
+import threading
+
+import pandas as pd
+import pytest
+
+from codigo.publicador import Publicador, Suscriptor, leer_manifest, sha256_de  # type: ignore
+from codigo.redis_local import RedisLocal  # type: ignore
+
+CANAL = "test:artefactos"
+
+
+@pytest.fixture
+def redis():
+    return RedisLocal()
+
+
+@pytest.fixture
+def avisos(redis):
+    ps = redis.pubsub(ignore_subscribe_messages=True)
+    ps.subscribe(CANAL)
+
+    def _leer():
+        out = []
+        while (msg := ps.get_message()) is not None:
+            out.append(json.loads(msg["data"]))
+        return out
+    return _leer
+
+
+def escribir_texto(texto):
+    return lambda p: p.write_text(texto, encoding="utf-8")
+
+
+def temporales(directorio):
+    return sorted(p.name for p in directorio.iterdir() if p.name.endswith(".tmp"))
+
+
+def test_reemplazo_atomico_y_manifest(tmp_path, redis, avisos):
+    pub = Publicador(tmp_path, redis, CANAL)
+    p1 = pub.publicar("a.csv", escribir_texto("x\n1\n"))
+    p2 = pub.publicar("a.csv", escribir_texto("x\n2\n"))
+
+    assert (p1.cambio, p1.generacion, p2.cambio, p2.generacion) == (True, 1, True, 2)
+    assert (tmp_path / "a.csv").read_text() == "x\n2\n"
+    manifest = leer_manifest(tmp_path / "manifest.json")
+    assert manifest["generacion"] == 2
+    assert manifest["artefactos"]["a.csv"]["sha256"] == sha256_de(tmp_path / "a.csv")
+    assert manifest["artefactos"]["a.csv"]["bytes"] == 4
+    assert temporales(tmp_path) == []
+    assert avisos() == [{"generacion": 1, "artefactos": ["a.csv"]}, {"generacion": 2, "artefactos": ["a.csv"]}]
+
+
+def test_escritura_fallida_no_toca_el_destino(tmp_path, redis, avisos):
+    pub = Publicador(tmp_path, redis, CANAL)
+    pub.publicar("a.csv", escribir_texto("original\n"))
+    avisos()
+
+    def a_medias(p):
+        p.write_text("parcial", encoding="utf-8")
+        raise RuntimeError("se cortó la escritura")
+
+    with pytest.raises(RuntimeError):
+        pub.publicar("a.csv", a_medias)
+    assert (tmp_path / "a.csv").read_text() == "original\n"
+    assert pub.generacion == 1
+    assert temporales(tmp_path) == []
+    assert avisos() == []
+
+
+def test_mismo_sha_no_republica(tmp_path, redis, avisos):
+    pub = Publicador(tmp_path, redis, CANAL)
+    df = pd.DataFrame({"symbol": ["BTC/USDT", "ETH/USDT"], "eq": [1.5e-5, 3e-4]})
+    primera = pub.publicar_csv("c.csv", df)
+    inodo = (tmp_path / "c.csv").stat().st_ino
+    avisos()
+
+    segunda = pub.publicar_csv("c.csv", df.copy())
+    assert not segunda.cambio
+    assert segunda.generacion == primera.generacion == pub.generacion == 1
+    assert segunda.sha256 == primera.sha256
+    assert (tmp_path / "c.csv").stat().st_ino == inodo  # no hubo rename encima
+    assert avisos() == []
+
+    # Si el destino desapareció, el mismo contenido se vuelve a publicar
+    (tmp_path / "c.csv").unlink()
+    tercera = pub.publicar_csv("c.csv", df)
+    assert tercera.cambio and tercera.generacion == 2
+
+
+def test_lote_agrupa_en_una_generacion(tmp_path, redis, avisos):
+    pub = Publicador(tmp_path, redis, CANAL)
+    pub.publicar("viejo.csv", escribir_texto("v\n"))
+    avisos()
+
+    with pub.lote():
+        a = pub.publicar("a.csv", escribir_texto("a\n"))
+        with pub.lote():  # anidado: no cierra antes que el de afuera
+            b = pub.publicar("b.col", escribir_texto("b\n"))
+        sin_cambio = pub.publicar("viejo.csv", escribir_texto("v\n"))
+        assert pub.generacion == 1  # nada cerrado todavía
+    assert (a.generacion, b.generacion) == (2, 2)
+    assert not sin_cambio.cambio
+
+    manifest = leer_manifest(tmp_path / "manifest.json")
+    assert manifest["generacion"] == 2
+    assert {n: e["generacion"] for n, e in manifest["artefactos"].items()} == {"viejo.csv": 1, "a.csv": 2, "b.col": 2}
+    assert avisos() == [{"generacion": 2, "artefactos": ["a.csv", "b.col"]}]
+
+    # Un lote sin cambios no abre generación ni avisa
+    with pub.lote():
+        pub.publicar("a.csv", escribir_texto("a\n"))
+    assert pub.generacion == 2
+    assert avisos() == []
+
+
+@pytest.mark.parametrize("con_redis", [True, False])
+def test_suscriptor_detecta_solo_lo_nuevo(tmp_path, redis, con_redis):
+    r = redis if con_redis else None
+    pub = Publicador(tmp_path, r, CANAL)
+    pub.publicar("a.csv", escribir_texto("a1\n"))
+    pub.publicar("b.csv", escribir_texto("b1\n"))
+
+    sus = Suscriptor(tmp_path, r, CANAL)
+    try:
+        assert set(sus.cambios()) == {"a.csv", "b.csv"}
+        assert sus.cambios() == {}
+        assert sus.esperar(timeout=0.05, intervalo=0.01) == {}
+
+        pub.publicar("b.csv", escribir_texto("b1\n"))  # mismo contenido: no es cambio
+        assert sus.cambios() == {}
+
+        # Publicación desde otro hilo mientras el suscriptor espera
+        hilo = threading.Timer(0.05, lambda: pub.publicar("b.csv", escribir_texto("b2\n")))
+        hilo.start()
+        cambios = sus.esperar(timeout=5.0, intervalo=0.01)
+        hilo.join()
+        assert list(cambios) == ["b.csv"]
+        assert cambios["b.csv"]["generacion"] == sus.generacion == 3
+    finally:
+        sus.cerrar()
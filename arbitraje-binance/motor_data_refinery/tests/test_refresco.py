@@ -0,0 +1,129 @@
+# tests/test_refresco.py
+"""
+🔄 Refresco incremental (codigo/refresco.py): `diff_tablas`, los atajos de
+`refrescar` y la separación por anclas parchada con el delta.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+
+import codigo.refresco as refresco  # type: ignore
+from codigo.refresco import _etapa, _pares, _separar_delta, diff_tablas, refrescar  # type: ignore
+
+
+def market(symbol: str, active: bool = True) -> dict:
+    base, quote = symbol.split("/")
+    return {
+        "id": base + quote, "symbol": symbol, "base": base, "quote": quote,
+        "type": "spot", "spot": True, "active": active, "maker": 0.001, "taker": 0.001,
+        "precision": {"price": 1e-6, "amount": 1e-3},
+        "limits": {"price": {"min": 1e-6, "max": 1e6}, "amount": {"min": 1e-3, "max": 9e6}},
+        "info": {"status": "TRADING", "permissions": ["SPOT"]},
+    }
+
+
+SIMBOLOS = ["BTC/USDT", "ETH/USDT", "ETH/BTC", "BNB/BTC", "BNB/USDT", "USDT/TRY", "SOL/ETH", "SOL/USDT"]
+
+
+def markets():
+    return {s: market(s) for s in SIMBOLOS}
+
+
+# ─────────── diff_tablas ───────────
+def test_diff_agregados_eliminados_y_campos_cambiados():
+    previa = pd.DataFrame({
+        "symbol": ["A/B", "C/D", "E/F"],
+        "active": [True, True, True],
+        "min_amount": [1.0, np.nan, 2.0],
+        "price_precision": ["0.01", "0.1", None],
+    })
+    nueva = pd.DataFrame({
+        "symbol": ["A/B", "C/D", "G/H"],
+        "active": [False, True, True],
+        "min_amount": [1.0, np.nan, 3.0],   # NaN == NaN: C/D no cambia
+        "price_precision": ["0.001", "0.1", "1"],
+    })
+    d = diff_tablas(previa, nueva)
+    assert d.agregados == ["G/H"]
+    assert d.eliminados == ["E/F"]
+    assert d.cambiados == {"A/B": ["active", "price_precision"]}
+    assert d.tocados == ["G/H", "A/B"]
+    assert d.resumen() == "+1 −1 ~1"
+
+
+def test_diff_nan_y_none_iguales_y_tabla_identica_vacia():
+    df = pd.DataFrame({"symbol": ["A/B", "C/D"], "x": [np.nan, 1.0], "y": [None, "z"]})
+    assert diff_tablas(df, df.copy()).vacio
+    # Columnas que solo existen en una de las dos no cuentan como cambio
+    assert diff_tablas(df, df.assign(nueva=1)).vacio
+
+
+# ─────────── refrescar ───────────
+def test_mismo_ts_es_noop_sin_mirar_markets():
+    previo = refrescar(markets(), 1).estado
+    ref = refrescar({}, 1, previo)  # mismo ts: ni siquiera compara los markets
+    assert ref.noop and ref.diff.vacio and not ref.completo
+    assert ref.estado.generacion == previo.generacion + 1
+    assert ref.estado.spot is previo.spot and ref.estado.triadas is previo.triadas
+
+
+def test_cambio_solo_crudo_es_noop_con_ts_nuevo():
+    m = markets()
+    previo = refrescar(m, 1).estado
+    nuevos = copy.deepcopy(m)
+    nuevos["BTC/USDT"]["info"]["status_extra"] = "x"  # no llega a la tabla estandarizada
+    ref = refrescar(nuevos, 2, previo)
+    assert ref.noop and ref.diff.vacio
+    assert ref.estado.markets_ts == 2 and ref.estado.markets == nuevos
+    assert ref.estado.spot is previo.spot and ref.estado.separados is previo.separados
+
+
+def test_cambio_de_firma_reconstruye(monkeypatch):
+    previo = refrescar(markets(), 1).estado
+    monkeypatch.setattr(refresco, "firma_config", lambda exchange_id=None: "otra")
+    ref = refrescar(markets(), 2, previo)
+    assert ref.completo and not ref.noop
+    assert ref.estado.firma == "otra"
+    assert sorted(ref.diff.agregados) == sorted(SIMBOLOS)
+
+
+def test_delta_igual_a_reconstruccion():
+    m = markets()
+    previo = refrescar(m, 1).estado
+    nuevos = copy.deepcopy(m)
+    nuevos.pop("BNB/BTC")
+    nuevos["ADA/USDT"] = market("ADA/USDT")
+    nuevos["ADA/ETH"] = market("ADA/ETH")
+    nuevos["SOL/ETH"]["active"] = False
+    ref = refrescar(nuevos, 2, previo)
+    completo = refrescar(nuevos, 2).estado
+    assert not ref.noop and not ref.completo
+    assert ref.estado.spot.equals(completo.spot)
+    for ancla, frames in completo.separados.items():
+        for a, b in zip(ref.estado.separados[ancla], frames):
+            assert a.reset_index(drop=True).equals(b.reset_index(drop=True))
+
+
+# ─────────── Separación parchada ───────────
+def test_separar_delta_con_simbolo_que_cambia_de_par():
+    separar_por_anclas = _etapa("3_simbolos_separacion").separar_por_anclas
+    cols = ["symbol", "base", "quote"]
+    previo = pd.DataFrame([s.split("/") for s in SIMBOLOS], columns=["base", "quote"])
+    previo.insert(0, "symbol", SIMBOLOS)
+    # Sale BNB/BTC, entra ZRX/USDT y "SOL/ETH" pasa a listar contra USDT (mismo symbol, par nuevo)
+    nuevo = previo[previo["symbol"] != "BNB/BTC"].copy()
+    nuevo.loc[nuevo["symbol"] == "SOL/ETH", "quote"] = "USDT"
+    nuevo = pd.concat([nuevo, pd.DataFrame([["ZRX/USDT", "ZRX", "USDT"]], columns=cols)], ignore_index=True)
+
+    entran = nuevo[~_pares(nuevo).isin(_pares(previo)).to_numpy()]
+    salen = previo[~_pares(previo).isin(_pares(nuevo)).to_numpy()]
+    assert sorted(salen["symbol"]) == ["BNB/BTC", "SOL/ETH"]
+
+    parchado = _separar_delta(separar_por_anclas(previo), salen, entran)
+    esperado = separar_por_anclas(nuevo)
+    assert parchado.keys() == esperado.keys()
+    for ancla in esperado:
+        for a, b in zip(parchado[ancla], esperado[ancla]):
+            assert a[cols].reset_index(drop=True).equals(b[cols].reset_index(drop=True))
@@ -0,0 +1,160 @@
+# tests/test_replica_libros.py
+"""
+📗 GestorReplicas (absorcion/replica_libros.py) reproduciendo diffs grabados.
+
+Una grabación con un hueco U/u inyectado: la réplica tiene que descartar lo
+viejo, marcar el hueco (no vigente + `on_hueco`), encolar lo que sigue,
+resincronizar con el snapshot posterior y terminar con el libro esperado. Más
+el stream sintético completo contra el libro "real" del generador.
+"""
+
+import asyncio
+
+import pytest
+
+from absorcion.descarga_libros import ResultadoDescarga  # type: ignore
+from absorcion.replica_libros import (  # type: ignore
+    APLICADO, HUECO, PENDIENTE, VIEJO, GestorReplicas, grabacion_sintetica, guardar_grabacion,
+)
+
+SIMBOLOS = ["AAA/USDT", "BBB/BTC"]
+
+
+def evento(s, U, u, b=(), a=()):
+    return {"stream": f"{s.lower()}@depth@100ms",
+            "data": {"e": "depthUpdate", "E": 1_700_000_000_000 + u, "s": s, "U": U, "u": u, "b": list(b), "a": list(a)}}
+
+
+def snapshot(symbol, lid, bids, asks):
+    return {"tipo": "snapshot", "symbol": symbol, "lastUpdateId": lid, "bids": bids, "asks": asks}
+
+
+def libro(replica):
+    return (list(zip(replica.bids.claves, replica.bids.cantidades))[::-1],
+            list(zip(replica.asks.claves, replica.asks.cantidades))[::-1])
+
+
+def k(precio):
+    return round(precio * 10 ** 8)
+
+
+GRABACION = [
+    evento("AAAUSDT", 99, 100, b=[["9.00000000", "5"]]),      # antes del snapshot: encolado y luego viejo
+    snapshot("AAA/USDT", 100, [["10.00", "1"], ["9.90", "2"]], [["10.10", "1"], ["10.20", "2"]]),
+    snapshot("BBB/BTC", 7, [["0.00100000", "4"]], [["0.00110000", "4"]]),
+    evento("AAAUSDT", 95, 100, b=[["10.00", "99"]]),          # viejo
+    evento("AAAUSDT", 101, 102, b=[["10.00", "3"]], a=[["10.10", "0"]]),
+    evento("AAAUSDT", 103, 103, a=[["10.15", "0.5"]]),
+    evento("AAAUSDT", 106, 107, b=[["10.05", "1"]]),          # hueco: faltan 104-105
+    evento("AAAUSDT", 108, 109, b=[["9.90", "0"]], a=[["10.15", "0.7"]]),
+    evento("BBBBTC", 8, 8, b=[["0.00100000", "6"]]),          # el otro símbolo sigue vigente
+    # Resincronización por REST: estado real a 107 (con 104-105 que se perdieron)
+    snapshot("AAA/USDT", 107, [["10.05", "1"], ["10.00", "3"], ["9.90", "2"]], [["10.15", "0.5"], ["10.20", "2"]]),
+    evento("AAAUSDT", 110, 110, a=[["10.20", "0"]]),
+]
+
+
+def test_reproducir_con_hueco_resincroniza(tmp_path):
+    ruta = tmp_path / "depth.jsonl"
+    guardar_grabacion(GRABACION, ruta)
+    gestor = GestorReplicas(SIMBOLOS)
+    huecos = []
+    gestor.on_hueco.append(huecos.append)
+
+    assert gestor.reproducir(ruta) == len(GRABACION)
+
+    aaa, bbb = gestor["AAA/USDT"], gestor["BBB/BTC"]
+    assert huecos == ["AAA/USDT"]
+    assert (aaa.huecos, aaa.siembras, aaa.sincronizado, aaa.last_update_id) == (1, 2, True, 110)
+    # 99-100 (encolado antes del snapshot) y 95-100 viejos; 106-107 ya cubierto por el snapshot de 107
+    assert aaa.descartados == 3
+    assert libro(aaa) == (
+        [(k(10.05), 1.0), (k(10.00), 3.0)],
+        [(-k(10.15), 0.7)],
+    )
+    assert aaa.tope() == (10.05, 1.0, 10.15, 0.7)
+    assert (bbb.sincronizado, bbb.huecos, bbb.last_update_id) == (True, 0, 8)
+    assert bbb.tope() == (0.001, 6.0, 0.0011, 4.0)
+    assert gestor.resumen()["vigentes"] == 2
+
+
+def test_estados_del_hueco_paso_a_paso():
+    gestor = GestorReplicas(SIMBOLOS)
+    estados = [gestor.aplicar_mensaje(m) for m in GRABACION[:8]]
+    assert estados == [PENDIENTE, APLICADO, APLICADO, VIEJO, APLICADO, APLICADO, HUECO, PENDIENTE]
+    aaa = gestor["AAA/USDT"]
+    # Sin vigencia, el libro conserva lo aplicado hasta 103 y el hueco queda encolado
+    assert not aaa.sincronizado and len(aaa.pendientes) == 2 and aaa.last_update_id == 103
+    assert gestor.por_sincronizar() == ["AAA/USDT"]
+
+
+class DescargadorFijo:
+    """Devuelve snapshots ya armados; anota qué símbolos se pidieron."""
+
+    def __init__(self, libros):
+        self.libros = libros
+        self.pedidos = []
+
+    async def descargar(self, simbolos, prioridad=None):
+        self.pedidos.append(list(simbolos))
+        return ResultadoDescarga(libros={s: self.libros[s] for s in simbolos})
+
+
+def test_resincronizar_pide_solo_los_no_vigentes():
+    gestor = GestorReplicas(SIMBOLOS)
+    for m in GRABACION[:9]:
+        gestor.aplicar_mensaje(m)
+    rest = GRABACION[9]
+    descargador = DescargadorFijo({"AAA/USDT": {"symbol": "AAA/USDT", "nonce": 107,
+                                                "bids": rest["bids"], "asks": rest["asks"]}})
+
+    assert asyncio.run(gestor.resincronizar(descargador)) == 1
+    assert descargador.pedidos == [["AAA/USDT"]]
+    aaa = gestor["AAA/USDT"]
+    assert aaa.sincronizado and aaa.last_update_id == 109  # 108-109 encolado se aplica tras sembrar
+    assert aaa.tope() == (10.05, 1.0, 10.15, 0.7)
+    assert asyncio.run(gestor.resincronizar(descargador)) == 0
+
+
+def test_snapshot_anterior_a_lo_encolado_avisa_hueco():
+    gestor = GestorReplicas(SIMBOLOS)
+    huecos = []
+    gestor.on_hueco.append(huecos.append)
+    # Encolados desde U=105: un snapshot a 100 no cubre 101-104
+    assert gestor.aplicar_mensaje(evento("AAAUSDT", 105, 106, b=[["10.00", "2"]])) == PENDIENTE
+    assert gestor.aplicar_mensaje(evento("AAAUSDT", 107, 107, a=[["10.10", "3"]])) == PENDIENTE
+    viejo = snapshot("AAA/USDT", 100, [["10.00", "1"]], [["10.10", "1"]])
+
+    assert gestor.aplicar_mensaje(viejo) == HUECO
+    aaa = gestor["AAA/USDT"]
+    assert not aaa.sincronizado and huecos == ["AAA/USDT"]
+    assert gestor.por_sincronizar() == SIMBOLOS
+    assert [e["U"] for e in aaa.pendientes] == [105, 107]  # lo encolado se conserva para el próximo
+
+    # Un snapshot posterior sí cubre lo encolado
+    assert gestor.sembrar("AAA/USDT", {"symbol": "AAA/USDT", "lastUpdateId": 104,
+                                       "bids": [["10.00", "1"]], "asks": [["10.10", "1"]]})
+    assert aaa.sincronizado and aaa.last_update_id == 107 and huecos == ["AAA/USDT"]
+    assert aaa.tope() == (10.0, 2.0, 10.1, 3.0)
+    assert not gestor.sembrar("ZZZ/USDT", viejo)  # símbolo ajeno: ni se siembra ni avisa
+    assert huecos == ["AAA/USDT"]
+
+
+@pytest.mark.parametrize("prob_hueco", [0.0, 0.01])
+def test_stream_sintetico_termina_identico(tmp_path, prob_hueco):
+    simbolos = [f"TK{i}/USDT" for i in range(12)]
+    mensajes, finales = grabacion_sintetica(simbolos, 4_000, 6, prob_hueco, retraso_snapshot=20)
+    ruta = tmp_path / "depth.jsonl"
+    guardar_grabacion(mensajes, ruta)
+    gestor = GestorReplicas(simbolos)
+    gestor.reproducir(ruta)
+
+    res = gestor.resumen()
+    perdidos = 4_000 - sum("data" in m for m in mensajes)
+    assert res["vigentes"] == len(simbolos)
+    assert (res["huecos"] > 0) == (perdidos > 0)
+    for s in simbolos:
+        bids, asks = finales[s]
+        r = gestor[s]
+        assert list(zip(r.bids.claves, r.bids.cantidades)) == bids
+        assert list(zip(r.asks.claves, r.asks.cantidades)) == asks
@@ -0,0 +1,135 @@
+# tests/test_tabla_compartida.py
+"""
+🧠 TablaCompartida (codigo/tabla_compartida.py): seqlock por fila, volcado de
+tickers, retiro del archivo al cambiar el universo y lectura desde otro proceso.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from codigo import tabla_compartida  # type: ignore
+from codigo.tabla_compartida import TablaCompartida  # type: ignore
+
+SIMBOLOS = ["BTC/USDT", "ETH/USDT", "ETH/BTC"]
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return tmp_path / "cotizaciones.tabla"
+
+
+def test_escribir_tickers_y_leer(ruta):
+    tabla = TablaCompartida.crear(ruta, SIMBOLOS)
+    tickers = {
+        "BTC/USDT": {"bid": 60_000.0, "ask": 60_001.5, "bidVolume": 1.5, "askVolume": 2.0, "timestamp": 1_700_000_000_123},
+        "ETH/BTC": {"bid": 0.05, "ask": 0.0501, "bidVolume": None, "askVolume": 3.0, "timestamp": None},
+        "NO/ESTA": {"bid": 1.0, "ask": 2.0},
+    }
+    gen = tabla.generacion
+    assert tabla.escribir_tickers(tickers, ts=1_700_000_000_999) == 2
+    assert tabla.generacion == gen + 1
+
+    lector = TablaCompartida.abrir(ruta)
+    assert list(lector.simbolos) == SIMBOLOS
+    assert lector.leer("BTC/USDT") == (60_000.0, 60_001.5, 1.5, 2.0, 1_700_000_000_123)
+    bid, ask, bid_qty, ask_qty, ts = lector.leer("ETH/BTC")
+    assert (bid, ask, ask_qty, ts) == (0.05, 0.0501, 3.0, 1_700_000_000_999) and np.isnan(bid_qty)
+    sin_dato = lector.leer("ETH/USDT")
+    assert np.isnan(sin_dato[0]) and np.isnan(sin_dato[1]) and sin_dato[4] == 0
+    assert lector.leer("NO/ESTA") is None
+    assert (lector.instantanea()["seq"] % 2 == 0).all()
+
+
+def test_lectura_durante_escritura_espera_la_fila_consistente(ruta):
+    tabla = TablaCompartida.crear(ruta, SIMBOLOS)
+    tabla.escribir_fila(0, 1.0, 2.0, 3.0, 4.0, 5)
+    lector = TablaCompartida.abrir(ruta)
+
+    # Escritor "desalojado" a mitad de fila: seq impar y la mitad de los campos nuevos
+    tabla._seq[0] += 1
+    tabla._col["bid"][0] = 10.0
+    leido = []
+    hilo = threading.Thread(target=lambda: leido.append(lector.leer_fila(0)))
+    hilo.start()
+    time.sleep(0.05)
+    assert hilo.is_alive() and not leido  # reintenta mientras seq es impar
+
+    tabla._col["ask"][0] = 20.0
+    tabla._col["ts"][0] = 50
+    tabla._seq[0] += 1
+    hilo.join(2)
+    assert leido == [(10.0, 20.0, 3.0, 4.0, 50)]
+
+
+def test_seqlock_con_escritor_concurrente(ruta):
+    tabla = TablaCompartida.crear(ruta, SIMBOLOS)
+    lector = TablaCompartida.abrir(ruta)
+    fin = threading.Event()
+
+    def escribir():
+        v = 0
+        while not fin.is_set():
+            v += 1
+            tabla.escribir_fila(1, float(v), v + 0.5, v * 2.0, v * 3.0, v)
+
+    hilo = threading.Thread(target=escribir)
+    hilo.start()
+    try:
+        vistos = set()
+        limite = time.monotonic() + 0.5
+        while time.monotonic() < limite:
+            bid, ask, bid_qty, ask_qty, ts = lector.leer_fila(1)
+            if ts:
+                assert (ask, bid_qty, ask_qty, ts) == (bid + 0.5, bid * 2, bid * 3, int(bid))
+                vistos.add(ts)
+    finally:
+        fin.set()
+        hilo.join(2)
+    assert len(vistos) > 1
+
+
+def test_crear_con_otro_universo_retira_el_viejo(ruta, monkeypatch):
+    tabla = TablaCompartida.crear(ruta, SIMBOLOS[:2])
+    tabla.escribir_fila(0, 1.0, 2.0, 0.0, 0.0, 7)
+    lector = TablaCompartida.abrir(ruta)
+    assert not lector.retirada
+
+    reemplazo = tabla_compartida.os.replace
+    en_rename = []
+
+    def replace(src, dst):
+        en_rename.append(lector.retirada)  # la marca no puede verse antes del rename
+        reemplazo(src, dst)
+
+    monkeypatch.setattr(tabla_compartida.os, "replace", replace)
+    nueva = TablaCompartida.crear(ruta, SIMBOLOS)
+
+    assert en_rename == [False]
+    assert lector.retirada
+    assert lector.leer("BTC/USDT")[4] == 7  # el mapeo viejo sigue siendo legible
+    reabierta = TablaCompartida.abrir(ruta)
+    assert list(reabierta.simbolos) == SIMBOLOS and not reabierta.retirada
+    assert np.isnan(reabierta.leer("BTC/USDT")[0])
+    nueva.escribir_fila(nueva.fila("ETH/BTC"), 0.05, 0.06, 1.0, 1.0, 9)
+    assert reabierta.leer("ETH/BTC") == (0.05, 0.06, 1.0, 1.0, 9)
+
+
+def test_lectura_desde_otro_proceso(ruta):
+    tabla = TablaCompartida.crear(ruta, SIMBOLOS)
+    tabla.escribir_fila(tabla.fila("ETH/USDT"), 3000.25, 3000.5, 4.0, 5.0, 1_700_000_000_000)
+    codigo = (
+        "import sys; sys.path.insert(0, sys.argv[2])\n"
+        "from codigo.tabla_compartida import TablaCompartida\n"
+        "t = TablaCompartida.abrir(sys.argv[1])\n"
+        "print(t.generacion, t.leer('ETH/USDT'))\n"
+    )
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo, str(ruta), str(tabla_compartida.APP_DIR)],
+        capture_output=True, text=True, timeout=60, check=True,
+    ).stdout.strip()
+    assert salida == f"{tabla.generacion} (3000.25, 3000.5, 4.0, 5.0, 1700000000000)"
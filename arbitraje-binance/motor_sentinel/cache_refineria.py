@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Lector mínimo (sin dependencias externas) de la caché Redis de la refinería.
+
+La refinería publica sus tablas normalizadas en hashes versionados
+(ver motor_data_refinery/codigo/cache_redis.py):
+
+    refineria:<exchange>:<tabla>:gen   -> N (generación vigente)
+    refineria:<exchange>:<tabla>:g<N>  -> HASH campo -> fila JSON | número
+
+Sentinel solo necesita consultas puntuales (la equivalencia USDT de una base,
+la lista de símbolos spot), así que habla RESP directo por socket con
+GET / HGET / HKEYS en vez de depender de redis-py.
+
+Uso rápido:
+  python cache_refineria.py equivalencia BTC
+  python cache_refineria.py spot
+Variables: REDIS_HOST (redis), REDIS_PORT (6379), EXCHANGE_ID (binance).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import socket
+from typing import List, Optional, Union
+
+PREFIJO = "refineria"
+CAMPO_META = "_meta"
+
+Respuesta = Union[None, int, str, List["Respuesta"]]
+
+
+class ClienteRESP:
+    """Cliente Redis sincrónico mínimo (protocolo RESP2, una conexión)."""
+
+    def __init__(self, host: str, port: int, timeout: float = 2.0):
+        self._sock = socket.create_connection((host, port), timeout=timeout)
+        self._buf = self._sock.makefile("rb")
+
+    def comando(self, *args: str) -> Respuesta:
+        partes = [f"*{len(args)}\r\n".encode()]
+        for a in args:
+            b = str(a).encode("utf-8")
+            partes.append(b"$%d\r\n%s\r\n" % (len(b), b))
+        self._sock.sendall(b"".join(partes))
+        return self._leer()
+
+    def _leer(self) -> Respuesta:
+        linea = self._buf.readline()
+        if not linea:
+            raise ConnectionError("Conexión cerrada por Redis")
+        tipo, resto = linea[:1], linea[1:-2]
+        if tipo == b"+":
+            return resto.decode()
+        if tipo == b"-":
+            raise RuntimeError(resto.decode())
+        if tipo == b":":
+            return int(resto)
+        if tipo == b"$":
+            n = int(resto)
+            if n < 0:
+                return None
+            return self._buf.read(n + 2)[:-2].decode("utf-8")
+        if tipo == b"*":
+            n = int(resto)
+            return None if n < 0 else [self._leer() for _ in range(n)]
+        raise ValueError(f"Respuesta RESP inesperada: {linea!r}")
+
+    def cerrar(self) -> None:
+        self._buf.close()
+        self._sock.close()
+
+
+class CacheRefineria:
+    """Consultas de solo lectura sobre la generación vigente de cada tabla."""
+
+    def __init__(self, cliente: ClienteRESP, exchange_id: str = "binance"):
+        self.cliente = cliente
+        self.prefijo = f"{PREFIJO}:{exchange_id}"
+
+    def _hash_vigente(self, tabla: str) -> Optional[str]:
+        gen = self.cliente.comando("GET", f"{self.prefijo}:{tabla}:gen")
+        return f"{self.prefijo}:{tabla}:g{gen}" if gen else None
+
+    def equivalencia(self, base: str) -> Optional[float]:
+        clave = self._hash_vigente("equivalencias")
+        valor = self.cliente.comando("HGET", clave, base) if clave else None
+        return float(valor) if valor is not None else None
+
+    def simbolos(self, tabla: str = "spot") -> List[str]:
+        clave = self._hash_vigente(tabla)
+        if not clave:
+            return []
+        meta = self.cliente.comando("HGET", clave, CAMPO_META)
+        if meta:
+            return list(json.loads(meta).get("orden", []))
+        return sorted(k for k in self.cliente.comando("HKEYS", clave) or [] if k != CAMPO_META)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Consulta la caché Redis de la refinería")
+    sub = parser.add_subparsers(dest="accion", required=True)
+    eq = sub.add_parser("equivalencia", help="1 USDT equivale a N unidades de la base")
+    eq.add_argument("base")
+    sub.add_parser("spot", help="Símbolos spot funcionales vigentes")
+    args = parser.parse_args(argv)
+
+    try:
+        cliente = ClienteRESP(os.getenv("REDIS_HOST", "redis"), int(os.getenv("REDIS_PORT", "6379")))
+    except OSError as e:
+        parser.exit(2, f"error: Redis no disponible ({e})\n")
+    cache = CacheRefineria(cliente, os.getenv("EXCHANGE_ID", "binance"))
+    try:
+        if args.accion == "equivalencia":
+            valor = cache.equivalencia(args.base.upper())
+            if valor is None:
+                parser.exit(1, f"error: sin equivalencia para {args.base}\n")
+            print(valor)
+        else:
+            for s in cache.simbolos("spot"):
+                print(s)
+    finally:
+        cliente.cerrar()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())